@@ -0,0 +1,100 @@
+"""Authorization of users' access to conversations, cached between connections.
+
+A Tutor and a Student can chat with each other as long as there is
+a Subscription between them. Whether there is one is looked up once
+per connection (or once per subscription to a conversation) and then
+cached in the shared cache for `MEMBERSHIP_TIMEOUT` seconds, so that
+reconnecting clients do not query the database again, while no work
+is done per message. Cached entries are deleted whenever Subscriptions
+of the pair are created or deleted.
+"""
+from typing import Any
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from subscriptions.models import Subscription
+
+from .models import Conversation
+
+MEMBERSHIP_TIMEOUT = 60
+
+_KEY_PREFIX = "chat:subscribed"
+
+
+async def is_participant(user: Any, tutor_id: int, student_id: int) -> bool:
+    """Check whether a user may chat in the conversation of a Tutor and a Student.
+
+    Args:
+        user: User of the connection, possibly anonymous.
+        tutor_id: Primary key of the Tutor's Profile.
+        student_id: Primary key of the Student's Profile.
+
+    Returns:
+        True if the user is the Tutor or the Student and there
+        is a Subscription between them, False otherwise.
+    """
+    if not user.is_authenticated or user.pk not in (tutor_id, student_id):
+        return False
+    return await is_subscribed(tutor_id, student_id)
+
+
+async def is_subscribed(tutor_id: int, student_id: int) -> bool:
+    """Check whether there is a Subscription between a Tutor and a Student.
+
+    Args:
+        tutor_id: Primary key of the Tutor's Profile.
+        student_id: Primary key of the Student's Profile.
+
+    Returns:
+        The cached or newly looked up information.
+    """
+    key = _get_key(tutor_id, student_id)
+    subscribed = await cache.aget(key)
+    if subscribed is None:
+        subscribed = await Subscription.objects.filter(
+            tutor_id=tutor_id, student_id=student_id
+        ).aexists()
+        await cache.aset(key, subscribed, MEMBERSHIP_TIMEOUT)
+    return subscribed
+
+
+def invalidate_membership(tutor_id: int, student_id: int) -> None:
+    """Delete the cached information about a Subscription between a Tutor and a Student."""
+    cache.delete(_get_key(tutor_id, student_id))
+
+
+def get_user_conversations(profile_id: int) -> list[Conversation]:
+    """Get Conversations with every chat partner of a user, creating the missing ones.
+
+    Args:
+        profile_id: Primary key of the user's Profile.
+
+    Returns:
+        Conversations of the Tutor-Student pairs with a Subscription,
+        which the user is a part of.
+    """
+    pairs = set(
+        Subscription.objects.filter(Q(tutor_id=profile_id) | Q(student_id=profile_id))
+        .values_list("tutor_id", "student_id")
+        .distinct()
+    )
+    Conversation.objects.bulk_create(
+        [
+            Conversation(tutor_id=tutor_id, student_id=student_id)
+            for tutor_id, student_id in pairs
+        ],
+        ignore_conflicts=True,
+    )
+    return [
+        conversation
+        for conversation in Conversation.objects.filter(
+            Q(tutor_id=profile_id) | Q(student_id=profile_id)
+        )
+        if (conversation.tutor_id, conversation.student_id) in pairs
+    ]
+
+
+def _get_key(tutor_id: int, student_id: int) -> str:
+    """Get the cache key of the information about a Subscription between a pair."""
+    return f"{_KEY_PREFIX}:{tutor_id}:{student_id}"
@@ -0,0 +1,206 @@
+"""Write-behind buffer persisting chat messages in batches."""
+import asyncio
+from logging import getLogger
+from typing import Optional
+from weakref import WeakKeyDictionary
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .models import ChatMessage, generate_message_id
+from .read_markers import count_unread
+
+LOGGER = getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 50
+# Number of IDs a message is saved with before it is dropped.
+MAX_ID_ATTEMPTS = 3
+
+
+class MessageBuffer:
+    """Collect chat messages and save them with a single query per batch.
+
+    Messages are added to the buffer without waiting for the database
+    and saved with `bulk_create` once `batch_size` of them have been
+    collected or `flush_interval` milliseconds after the first of them
+    was added, whichever comes first. Batches are saved one at a time,
+    in the order the messages were added in. A batch that could not be
+    saved because of a database error is put back in front of the
+    buffer and retried after another flush interval.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: int) -> None:
+        """Create an empty buffer.
+
+        Args:
+            batch_size: Number of messages triggering a flush.
+            flush_interval: Maximal number of milliseconds a message
+                            waits in the buffer before being saved.
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.saved_count = 0
+        self._messages: list[ChatMessage] = []
+        self._saving: list[ChatMessage] = []
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        """Number of messages waiting to be saved."""
+        return len(self._messages)
+
+    def pending(self, conversation_id: int) -> list[ChatMessage]:
+        """Get messages of a conversation that might have not been saved yet.
+
+        Messages of the batch that is currently being saved are included.
+
+        Args:
+            conversation_id: ID of the Conversation.
+
+        Returns:
+            The conversation's buffered messages, oldest first.
+        """
+        return [
+            message
+            for message in self._saving + self._messages
+            if message.conversation_id == conversation_id
+        ]
+
+    async def add(self, message: ChatMessage) -> None:
+        """Add an unsaved message to the buffer.
+
+        The call only waits for the database when the buffer gets full.
+
+        Args:
+            message: ChatMessage model instance with its ID already set.
+        """
+        self._messages.append(message)
+        if len(self._messages) >= self.batch_size:
+            await self.flush()
+        else:
+            self._schedule_flush()
+
+    async def flush(self) -> None:
+        """Save every message added to the buffer so far."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        async with self._lock:
+            batch, self._messages = self._messages, []
+            if not batch:
+                return
+            self._saving = batch
+            try:
+                saved_count = await database_sync_to_async(_save_messages)(batch)
+            except asyncio.CancelledError:
+                self._messages[:0] = batch
+                raise
+            except Exception:
+                LOGGER.exception(
+                    "Failed to save a batch of %(count)s chat messages, retrying later.",
+                    {"count": len(batch)},
+                )
+                self._messages[:0] = batch
+                self._schedule_flush()
+            else:
+                self.saved_count += saved_count
+            finally:
+                self._saving = []
+
+    def _schedule_flush(self) -> None:
+        """Flush the buffer once its flush interval passes, unless already scheduled."""
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.flush_interval / 1000, self._flush_in_background
+            )
+
+    def _flush_in_background(self) -> None:
+        """Flush the buffer without waiting for the flush to finish."""
+        self._timer = None
+        task = asyncio.ensure_future(self.flush())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+
+def _save_messages(messages: list[ChatMessage]) -> int:
+    """Save a batch of messages, skipping the ones that violate constraints.
+
+    The batch is inserted with a single query. Only if that fails
+    because of an integrity error, e.g. a message of a conversation
+    deleted in the meantime, the messages are inserted one by one.
+    Messages whose IDs collide with IDs generated by another process
+    (see `chat.models.generate_message_id`) are saved under new IDs,
+    while the others violating constraints are dropped.
+    The unread counters of the recipients of the saved messages are
+    incremented afterwards, see `chat.read_markers.count_unread`.
+
+    Args:
+        messages: Unsaved ChatMessage model instances.
+
+    Returns:
+        Number of saved messages.
+    """
+    try:
+        with transaction.atomic():
+            ChatMessage.objects.bulk_create(messages)
+            count_unread(messages)
+        return len(messages)
+    except IntegrityError:
+        saved_count = 0
+        for message in messages:
+            for _ in range(MAX_ID_ATTEMPTS):
+                try:
+                    with transaction.atomic():
+                        message.save(force_insert=True)
+                        count_unread([message])
+                    saved_count += 1
+                    break
+                except IntegrityError:
+                    if not ChatMessage.objects.filter(pk=message.pk).exists():
+                        LOGGER.exception(
+                            "Dropped a chat message with ID %(id)s.",
+                            {"id": message.pk},
+                        )
+                        break
+                    previous_id, message.pk = message.pk, generate_message_id()
+                    LOGGER.warning(
+                        "Chat message ID %(previous_id)s is already taken, "
+                        "saving the message with ID %(id)s.",
+                        {"previous_id": previous_id, "id": message.pk},
+                    )
+            else:
+                LOGGER.error(
+                    "Dropped a chat message with ID %(id)s.", {"id": message.pk}
+                )
+        return saved_count
+
+
+_buffers: "WeakKeyDictionary[asyncio.AbstractEventLoop, MessageBuffer]" = (
+    WeakKeyDictionary()
+)
+
+
+def get_message_buffer() -> MessageBuffer:
+    """Get the message buffer shared by the consumers of the running event loop.
+
+    Sharing the buffer between every connection served by a process
+    makes the batches bigger than they would be with a buffer per
+    connection. The batch size and flush interval are read from the
+    `CHAT_MESSAGE_BATCH_SIZE` and `CHAT_MESSAGE_FLUSH_INTERVAL` (in
+    milliseconds) settings.
+
+    Returns:
+        The MessageBuffer of the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _buffers:
+        _buffers[loop] = MessageBuffer(
+            batch_size=getattr(settings, "CHAT_MESSAGE_BATCH_SIZE", DEFAULT_BATCH_SIZE),
+            flush_interval=getattr(
+                settings, "CHAT_MESSAGE_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL
+            ),
+        )
+    return _buffers[loop]
@@ -1,54 +1,679 @@
 # chat/consumers.py
-import json
-from typing import Any
+import asyncio
+from collections import deque
+from contextlib import suppress
+from time import monotonic
+from typing import Any, Optional
+from urllib.parse import parse_qs
 
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
 
+from .authorization import get_user_conversations, is_participant
+from .buffer import get_message_buffer
+from .history import (
+    get_history_page,
+    get_messages_after,
+    parse_message_id,
+    serialize_message,
+)
+from .limits import TokenBucket, counters, get_connection_bucket, get_user_bucket
+from .models import ChatMessage, Conversation
+from .presence import (
+    connect_user,
+    disconnect_user,
+    get_typing_interval,
+    heartbeat,
+    may_broadcast_typing,
+)
+from .protocol import JSON_PROTOCOL, InvalidFrame, negotiate
+from .read_markers import mark_read
 
-class NewChatConsumer(AsyncWebsocketConsumer):
+DEFAULT_COALESCE_INTERVAL = 5
+DEFAULT_COALESCE_MAX_FRAMES = 100
+DEFAULT_OUTBOX_SIZE = 256
+
+# Types of events broadcast to the groups, which are coalesced or dropped
+# when the client falls behind, unlike the responses to its own requests.
+BROADCAST_EVENTS = {"message", "presence", "typing"}
+# Types of events superseded by the next event of the same user in the conversation.
+COALESCED_EVENTS = {"presence", "typing"}
+EVENT_KEYS = ("conversation", "user_id")
+
+
+def get_coalesce_interval() -> float:
+    """Get the number of seconds objects wait to be sent in a single frame."""
+    return getattr(settings, "CHAT_COALESCE_INTERVAL", DEFAULT_COALESCE_INTERVAL) / 1000
+
+
+def get_coalesce_max_frames() -> int:
+    """Get the maximal number of objects sent in a single frame."""
+    return getattr(settings, "CHAT_COALESCE_MAX_FRAMES", DEFAULT_COALESCE_MAX_FRAMES)
+
+
+def get_outbox_size() -> int:
+    """Get the number of objects waiting to be sent over which events are dropped."""
+    return getattr(settings, "CHAT_OUTBOX_SIZE", DEFAULT_OUTBOX_SIZE)
+
+
+class ChatConsumerBase(AsyncWebsocketConsumer):
+    """Base of the consumers relaying and saving chat messages.
+
+    Every object sent to the client has the `type` of the event and
+    the ID of the `conversation` it belongs to. Objects are encoded with
+    the protocol negotiated when the connection is accepted, see
+    `chat.protocol`.
+    """
+
+    protocol = JSON_PROTOCOL
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Create a consumer with no objects waiting to be sent."""
+        super().__init__(*args, **kwargs)
+        self._outbox: deque[dict[str, Any]] = deque()
+        self._outbox_full = asyncio.Event()
+        self._writer: Optional[asyncio.Future] = None
+        # IDs of the conversations whose events were dropped.
+        self._resync: set[int] = set()
+        self._bucket = get_connection_bucket()
+        self._user_bucket: Optional[TokenBucket] = None
+        self._throttled = False
+        self._present = False
+        # Times of the last typing indicators sent by the user, by the conversation's ID.
+        self._typing: dict[int, float] = {}
+
+    async def __call__(self, scope, receive, send) -> None:
+        """Serve the connection and save the buffered messages once it ends.
+
+        The buffer is flushed even if the consumer gets cancelled,
+        e.g. when the server shuts down, so no sent message is lost.
+        """
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._stop_writing()
+            await get_message_buffer().flush()
+
+    @property
+    def user(self) -> Any:
+        """User of the connection, authenticated by the AuthMiddlewareStack."""
+        return self.scope.get("user") or AnonymousUser()
+
+    async def post_message(self, conversation: Conversation, text: str) -> None:
+        """Forward a message to everyone in the conversation's group.
+
+        The message is added to the buffer of messages waiting to be saved
+        in the database instead of being saved right away. The sender is
+        always the user of the connection, regardless of what the client
+        claims, so no database query is needed to authorize the message.
+
+        Args:
+            conversation: Conversation the message is sent in.
+            text: Text of the message.
+        """
+        chat_message = ChatMessage(
+            conversation=conversation, sender_id=self.user.pk, text=text
+        )
+        await get_message_buffer().add(chat_message)
+
+        await self.channel_layer.group_send(
+            conversation.group_name,
+            {"type": "chat_message", **serialize_message(chat_message)},
+        )
+
+    def get_conversations(self) -> list[Conversation]:
+        """Get the conversations whose groups the connection has joined."""
+        return []
+
+    async def join_presence(self) -> None:
+        """Count the connection towards the user's presence.
+
+        The other participants of the user's conversations are told
+        that the user is online unless the user was online already.
+        """
+        self._present = True
+        if await connect_user(self.user.pk, self.channel_name):
+            await self.broadcast_presence(online=True)
+
+    async def leave_presence(self) -> None:
+        """Stop counting the closed connection towards the user's presence."""
+        if not self._present:
+            return
+        self._present = False
+        if await disconnect_user(self.user.pk, self.channel_name):
+            await self.broadcast_presence(online=False)
+
+    async def heartbeat(self) -> None:
+        """Keep the user online, for the `heartbeat` command."""
+        if self._present and await heartbeat(self.user.pk, self.channel_name):
+            await self.broadcast_presence(online=True)
+
+    async def broadcast_presence(self, online: bool) -> None:
+        """Tell everyone in the user's conversations that the user's presence changed."""
+        for conversation in self.get_conversations():
+            await self.channel_layer.group_send(
+                conversation.group_name,
+                {
+                    "type": "chat_presence",
+                    "conversation": conversation.pk,
+                    "user_id": self.user.pk,
+                    "online": online,
+                },
+            )
+
+    async def post_typing(self, conversation: Conversation) -> None:
+        """Tell everyone in the conversation that the user is typing, for the `typing` command.
+
+        Clients may report every keystroke, as at most one indicator per
+        `CHAT_TYPING_INTERVAL` seconds is broadcast for every user and
+        conversation. Indicators are first throttled by the connection
+        and then by the shared cache, so that the cache is not queried
+        on every keystroke either.
+
+        Args:
+            conversation: Conversation the user is typing in.
+        """
+        now = monotonic()
+        if (
+            now - self._typing.get(conversation.pk, -float("inf"))
+            < get_typing_interval()
+        ):
+            return
+        self._typing[conversation.pk] = now
+        if await may_broadcast_typing(self.user.pk, conversation.pk):
+            await self.channel_layer.group_send(
+                conversation.group_name,
+                {
+                    "type": "chat_typing",
+                    "conversation": conversation.pk,
+                    "user_id": self.user.pk,
+                },
+            )
+
+    async def read_messages(self, conversation: Conversation, message_id: Any) -> None:
+        """Mark the messages of a conversation as read by the user, for the `read` command.
+
+        Args:
+            conversation: Conversation whose messages were read.
+            message_id: ID of the last message read by the user.
+        """
+        message_id = parse_message_id(message_id)
+        if message_id is None:
+            await self.send_error("Invalid message ID.", code="invalid_request")
+            return
+        await database_sync_to_async(mark_read)(
+            conversation.pk, self.user.pk, message_id
+        )
+
+    async def send_history(
+        self, conversation: Conversation, after: Optional[int] = None
+    ) -> None:
+        """Send the latest messages of a conversation in a single frame.
+
+        Clients that have already received some messages can pass the ID
+        of the last of them to only receive the ones they have missed,
+        unless they have missed more than a page of them. The `reset`
+        value of the frame tells whether the messages replace the ones
+        received so far.
+
+        Args:
+            conversation: Conversation whose messages are sent.
+            after: ID of the last message received by the client, if any.
+        """
+        pending = get_message_buffer().pending(conversation.pk)
+        if after is not None:
+            messages = await database_sync_to_async(get_messages_after)(
+                conversation.pk, after, pending=pending
+            )
+            if messages is not None:
+                await self.send_frame(
+                    {
+                        "type": "history",
+                        "conversation": conversation.pk,
+                        "messages": messages,
+                        "reset": False,
+                    }
+                )
+                return
+        page = await database_sync_to_async(get_history_page)(
+            conversation.pk, pending=pending
+        )
+        await self.send_frame(
+            {
+                "type": "history",
+                "conversation": conversation.pk,
+                "messages": page.messages,
+                "has_more": page.has_more,
+                "reset": True,
+            }
+        )
+
+    async def send_older_messages(
+        self, conversation: Conversation, before: Any
+    ) -> None:
+        """Send the page of messages sent before a given one, for the `load_older` command.
+
+        Args:
+            conversation: Conversation whose messages are sent.
+            before: ID of the oldest message received by the client.
+        """
+        before = parse_message_id(before)
+        if before is None:
+            await self.send_error("Invalid cursor.", code="invalid_request")
+            return
+        page = await database_sync_to_async(get_history_page)(
+            conversation.pk,
+            before=before,
+            pending=get_message_buffer().pending(conversation.pk),
+        )
+        await self.send_frame(
+            {
+                "type": "older",
+                "conversation": conversation.pk,
+                "messages": page.messages,
+                "has_more": page.has_more,
+            }
+        )
+
+    async def send_error(self, error: str, code: str, **details: Any) -> None:
+        """Tell the client that its request could not be handled.
+
+        Args:
+            error: Human-readable description of the error.
+            code: Machine-readable code of the error.
+            details: Additional values of the error frame.
+        """
+        await self.send_frame(
+            {"type": "error", "code": code, "error": error, **details}
+        )
+
+    async def send_frame(self, content: dict[str, Any]) -> None:
+        """Queue an object to be sent to the client with the connection's protocol.
+
+        Objects are sent by a separate task, so that a client which does
+        not keep up with its events does not hold up the consumer. Once
+        there are `CHAT_OUTBOX_SIZE` objects waiting to be sent, events
+        broadcast to the client's groups are coalesced with the waiting
+        events of the same kind or dropped, while responses to the
+        client's own requests, which are limited by the rate limits, are
+        always queued. After dropping an event of a conversation, further
+        messages of the conversation are dropped as well until a `resync`
+        frame is queued, telling the client to subscribe to the
+        conversation again with the ID of the last message it received.
+
+        Objects sent to clients using a coalescing protocol are sent
+        `CHAT_COALESCE_INTERVAL` milliseconds after the first of them
+        together in a single frame, or as soon as there are
+        `CHAT_COALESCE_MAX_FRAMES` of them, so that a burst of events
+        costs a single encoding and a single write to the socket.
+
+        Args:
+            content: Object sent to the client.
+        """
+        if content["type"] in BROADCAST_EVENTS and (
+            content["conversation"] in self._resync
+            or len(self._outbox) >= get_outbox_size()
+        ):
+            self._discard(content)
+        else:
+            self._outbox.append(content)
+        if self._writer is None:
+            self._writer = asyncio.ensure_future(self._write_frames())
+        elif len(self._outbox) >= get_coalesce_max_frames():
+            self._outbox_full.set()
+
+    def _discard(self, content: dict[str, Any]) -> None:
+        """Coalesce or drop an event that does not fit in the outbox.
+
+        Args:
+            content: Event broadcast to the client's groups.
+        """
+        if content["type"] in COALESCED_EVENTS:
+            for index, queued in enumerate(self._outbox):
+                if all(
+                    queued.get(key) == content[key] for key in ("type", *EVENT_KEYS)
+                ):
+                    self._outbox[index] = content
+                    counters.coalesced += 1
+                    return
+        counters.dropped += 1
+        # Typing indicators are only shown for a few seconds, so missing one is fine.
+        if content["type"] != "typing":
+            self._resync.add(content["conversation"])
+
+    async def _write_frames(self) -> None:
+        """Send the queued objects until none are left."""
+        try:
+            while self._outbox:
+                if self.protocol.coalesces:
+                    if len(self._outbox) < get_coalesce_max_frames():
+                        self._outbox_full.clear()
+                        with suppress(asyncio.TimeoutError):
+                            await asyncio.wait_for(
+                                self._outbox_full.wait(), get_coalesce_interval()
+                            )
+                    count = min(len(self._outbox), get_coalesce_max_frames())
+                else:
+                    count = 1
+                frames = [self._outbox.popleft() for _ in range(count)]
+                await self.send(**self.protocol.encode(frames))
+                if self._resync and len(self._outbox) < get_outbox_size():
+                    self._outbox.extend(
+                        {"type": "resync", "conversation": conversation_id}
+                        for conversation_id in sorted(self._resync)
+                    )
+                    self._resync.clear()
+        finally:
+            self._writer = None
+
+    def _stop_writing(self) -> None:
+        """Drop the objects that were about to be sent before the connection closed."""
+        if self._writer is not None:
+            self._writer.cancel()
+            self._writer = None
+        self._outbox.clear()
+        self._resync.clear()
+
+    async def accept(
+        self, subprotocol: Optional[str] = None, headers: Any = None
+    ) -> None:
+        """Accept the connection with the best protocol offered by the client."""
+        if subprotocol is None:
+            self.protocol = negotiate(self.scope.get("subprotocols", []))
+            subprotocol = self.protocol.subprotocol
+        await super().accept(subprotocol, headers)
+
+    async def websocket_disconnect(self, message: dict[str, Any]) -> None:
+        """Stop sending objects to the closed connection and leave the presence."""
+        self._stop_writing()
+        await self.leave_presence()
+        await super().websocket_disconnect(message)
+
+    async def receive(
+        self, text_data: Optional[str] = None, bytes_data: Optional[bytes] = None
+    ) -> None:
+        """Decode a frame received from the client and handle the request in it.
+
+        Frames over the rate limits of the connection or the user, see
+        `chat.limits`, are rejected. Only the first of the consecutive
+        rejected frames is answered with a `throttled` error, telling
+        the client how many seconds to wait before sending another one.
+
+        Args:
+            text_data: A string containing the request's payload, for text frames.
+            bytes_data: Bytes containing the request's payload, for binary frames.
+        """
+        if self._user_bucket is None:
+            self._user_bucket = get_user_bucket(self.user.pk)
+        if not (self._bucket.consume() and self._user_bucket.consume()):
+            counters.throttled += 1
+            if not self._throttled:
+                self._throttled = True
+                await self.send_error(
+                    "Too many requests.",
+                    code="throttled",
+                    retry_after=max(
+                        self._bucket.get_wait_time(),
+                        self._user_bucket.get_wait_time(),
+                    ),
+                )
+            return
+        self._throttled = False
+        try:
+            request = self.protocol.decode(text_data, bytes_data)
+        except InvalidFrame as error:
+            await self.send_error(str(error), code="invalid_frame")
+            return
+        if request.get("command") == "heartbeat":
+            await self.heartbeat()
+            return
+        await self.handle_request(request)
+
+    async def handle_request(self, request: dict[str, Any]) -> None:
+        """Handle a decoded request of the client.
+
+        Args:
+            request: Object sent by the client.
+        """
+        raise NotImplementedError
+
+    async def chat_message(self, event: dict[str, Any]) -> None:
+        """Send a request to everyone in the group.
+
+        The method accepts a dictionary with values to be sent
+        to everyone in the group, parses it to a string format
+        and send the request out.
+        """
+        # Send message to WebSocket
+        await self.send_frame(
+            {
+                "type": "message",
+                "conversation": event["conversation"],
+                "id": event["id"],
+                "created": event["created"],
+                "message": event["message"],
+                "user_id": event["user_id"],
+            }
+        )
+
+    async def chat_presence(self, event: dict[str, Any]) -> None:
+        """Tell the client that a participant of a conversation went online or offline."""
+        if event["user_id"] != self.user.pk:
+            await self.send_frame(
+                {
+                    "type": "presence",
+                    "conversation": event["conversation"],
+                    "user_id": event["user_id"],
+                    "online": event["online"],
+                }
+            )
+
+    async def chat_typing(self, event: dict[str, Any]) -> None:
+        """Tell the client that a participant of a conversation is typing."""
+        if event["user_id"] != self.user.pk:
+            await self.send_frame(
+                {
+                    "type": "typing",
+                    "conversation": event["conversation"],
+                    "user_id": event["user_id"],
+                }
+            )
+
+
+class NewChatConsumer(ChatConsumerBase):
     """COnsumer for handling incoming requests sent via WebSockets"""
 
     async def connect(self) -> None:
-        """Invoked once when the client connects to the Consumer."""
-        self.tutor_id = self.scope["url_route"]["kwargs"]["tutor_id"]
-        self.student_id = self.scope["url_route"]["kwargs"]["student_id"]
+        """Invoked once when the client connects to the Consumer.
 
-        self.group_name = f"chat_{self.tutor_id}_to_{self.student_id}"
+        Only the Tutor and the Student of the conversation can connect
+        and only if there is a Subscription between them. Right after
+        accepting the connection, the latest page of the conversation's
+        history is sent, see `send_history`. Clients reconnecting after
+        having received some messages can pass the ID of the last of
+        them in the `after` query parameter.
+        """
+        self.tutor_id = int(self.scope["url_route"]["kwargs"]["tutor_id"])
+        self.student_id = int(self.scope["url_route"]["kwargs"]["student_id"])
+
+        if not await is_participant(self.user, self.tutor_id, self.student_id):
+            await self.close()
+            return
+        self.conversation, _ = await Conversation.objects.aget_or_create(
+            tutor_id=self.tutor_id, student_id=self.student_id
+        )
+        self.group_name = self.conversation.group_name
 
         await self.channel_layer.group_add(self.group_name, self.channel_name)
 
         await self.accept()
+        await self.join_presence()
+        await self.send_history(self.conversation, after=self._get_last_seen_id())
 
     async def disconnect(self, _close_code) -> None:
         """Invoked when the connection is closed."""
-        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
-    async def receive(self, text_data: str) -> None:
+    async def handle_request(self, request: dict[str, Any]) -> None:
         """Handle receiving requests.
 
-        The method parses the request's body and invokes appropriate methods
-        for forwarding the message to everyone in the group.
+        The method handles the same commands as the UserChatConsumer,
+        without the conversation's ID, or forwards the message to
+        everyone in the group.
 
         Args:
-            text_data: A string containing the request's payload.
+            request: Object sent by the client.
         """
-        text_data_json = json.loads(text_data)
-        message = text_data_json["message"]
-        user_id = text_data_json["user_id"]
+        if request.get("command") == "load_older":
+            await self.send_older_messages(self.conversation, request.get("before"))
+        elif request.get("command") == "subscribe":
+            await self.send_history(
+                self.conversation, after=parse_message_id(request.get("after"))
+            )
+        elif request.get("command") == "typing":
+            await self.post_typing(self.conversation)
+        elif request.get("command") == "read":
+            await self.read_messages(self.conversation, request.get("message"))
+        elif isinstance(request.get("message"), str):
+            await self.post_message(self.conversation, request["message"])
+        else:
+            await self.send_error("Invalid request.", code="invalid_request")
 
-        await self.channel_layer.group_send(
-            self.group_name, {"type": "chat_message", "message": message, "user_id": user_id}
+    def get_conversations(self) -> list[Conversation]:
+        """Get the conversation of the connection."""
+        return [self.conversation] if hasattr(self, "conversation") else []
+
+    def _get_last_seen_id(self) -> Optional[int]:
+        """Get the ID passed in the `after` query parameter, if valid."""
+        after = parse_qs(self.scope.get("query_string", b"").decode()).get(
+            "after", [""]
+        )[0]
+        return parse_message_id(after)
+
+
+class UserChatConsumer(ChatConsumerBase):
+    """Consumer multiplexing every conversation of a user over a single connection.
+
+    On connecting, the consumer joins the groups of every conversation
+    of the user and sends the list of them in a `conversations` frame.
+    Clients send commands as objects with the `conversation` ID:
+    `subscribe` (with an optional `after` message ID) joins the group of
+    a conversation, e.g. one started after connecting, and sends its
+    history, `unsubscribe` leaves the group, `load_older` (with the
+    `before` message ID) sends a page of older messages, `typing` tells
+    the other participant that the user is typing, `read` (with the
+    `message` ID) marks the messages up to the given one as read and
+    objects without a command but with a `message` send the message.
+    The `heartbeat` command, without a conversation, keeps the user
+    online.
+    """
+
+    async def connect(self) -> None:
+        """Join the groups of the user's conversations and accept the connection."""
+        if not self.user.is_authenticated:
+            await self.close()
+            return
+        conversations = await database_sync_to_async(get_user_conversations)(
+            self.user.pk
         )
+        self.conversations = {
+            conversation.pk: conversation for conversation in conversations
+        }
+        for conversation in conversations:
+            await self.channel_layer.group_add(
+                conversation.group_name, self.channel_name
+            )
 
-    async def chat_message(self, event: dict[str, Any]) -> None:
-        """Send a request to everyone in the group.
+        await self.accept()
+        await self.join_presence()
+        await self.send_frame(
+            {
+                "type": "conversations",
+                "conversations": [
+                    {
+                        "id": conversation.pk,
+                        "tutor_id": conversation.tutor_id,
+                        "student_id": conversation.student_id,
+                    }
+                    for conversation in conversations
+                ],
+            }
+        )
 
-        The method accepts a dictionary with values to be sent
-        to everyone in the group, parses it to a string format
-        and send the request out.
+    async def disconnect(self, _close_code) -> None:
+        """Leave the groups of every subscribed conversation."""
+        for conversation in getattr(self, "conversations", {}).values():
+            await self.channel_layer.group_discard(
+                conversation.group_name, self.channel_name
+            )
+
+    async def handle_request(self, request: dict[str, Any]) -> None:
+        """Route a request to the conversation it is sent to.
+
+        Args:
+            request: Object sent by the client.
         """
-        message = event["message"]
-        user_id = event["user_id"]
+        conversation_id = request.get("conversation")
+        command = request.get("command")
+        if not isinstance(conversation_id, int) or isinstance(conversation_id, bool):
+            await self.send_error("Invalid request.", code="invalid_request")
+            return
+        if command == "subscribe":
+            await self.subscribe(conversation_id, request.get("after"))
+            return
+        if command == "unsubscribe":
+            conversation = self.conversations.pop(conversation_id, None)
+            if conversation is not None:
+                await self.channel_layer.group_discard(
+                    conversation.group_name, self.channel_name
+                )
+            return
+        conversation = self.conversations.get(conversation_id)
+        if conversation is None:
+            await self.send_error(
+                "Not subscribed to the conversation.", code="not_subscribed"
+            )
+        elif command == "load_older":
+            await self.send_older_messages(conversation, request.get("before"))
+        elif command == "typing":
+            await self.post_typing(conversation)
+        elif command == "read":
+            await self.read_messages(conversation, request.get("message"))
+        elif command is None and isinstance(request.get("message"), str):
+            await self.post_message(conversation, request["message"])
+        else:
+            await self.send_error("Invalid request.", code="invalid_request")
 
-        # Send message to WebSocket
-        await self.send(text_data=json.dumps({"message": message, "user_id": user_id}))
+    def get_conversations(self) -> list[Conversation]:
+        """Get the subscribed conversations."""
+        return list(getattr(self, "conversations", {}).values())
+
+    async def subscribe(self, conversation_id: Any, after: Any) -> None:
+        """Join the group of a conversation and send its history.
+
+        Args:
+            conversation_id: ID of the Conversation.
+            after: ID of the last message of the conversation received
+                    by the client, if any.
+        """
+        conversation = self.conversations.get(conversation_id)
+        if conversation is None:
+            conversation = await Conversation.objects.filter(
+                pk=conversation_id
+            ).afirst()
+            if conversation is not None and await is_participant(
+                self.user, conversation.tutor_id, conversation.student_id
+            ):
+                self.conversations[conversation.pk] = conversation
+                await self.channel_layer.group_add(
+                    conversation.group_name, self.channel_name
+                )
+            else:
+                conversation = None
+        if conversation is None:
+            await self.send_error("Conversation not found.", code="not_found")
+            return
+        await self.send_history(conversation, after=parse_message_id(after))
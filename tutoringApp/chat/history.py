@@ -0,0 +1,155 @@
+"""Pages of conversations' history, fetched backwards with message ID cursors.
+
+Message IDs grow with the time the messages were sent in, see
+`chat.models.generate_message_id`, so the ID of the oldest message a
+client has received is the cursor pointing at the page of messages
+sent before it, and the ID of the newest one is the cursor pointing
+at the messages the client has missed. Every page is fetched with a
+single query over the (conversation, id) index, regardless of how far
+back in the history it is.
+
+Message IDs take 64 bits, more than JavaScript numbers can represent
+exactly, so they are sent to the clients as strings and read back
+from either strings or integers, see `parse_message_id`.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
+
+from django.conf import settings
+
+from .models import ChatMessage
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+@dataclass
+class HistoryPage:
+    """Page of messages of a conversation.
+
+    Attributes:
+        messages: Serialized messages, oldest first, see `serialize_message`.
+        has_more: Boolean information about whether there are older
+                    messages than the ones on the page.
+    """
+
+    messages: list[dict[str, Any]] = field(default_factory=list)
+    has_more: bool = False
+
+
+def get_page_size() -> int:
+    """Get the default number of messages on a page, the `CHAT_HISTORY_PAGE_SIZE` setting."""
+    return getattr(settings, "CHAT_HISTORY_PAGE_SIZE", DEFAULT_PAGE_SIZE)
+
+
+def serialize_message(message: ChatMessage) -> dict[str, Any]:
+    """Get the representation of a message sent to the clients.
+
+    Args:
+        message: ChatMessage model instance, saved or not.
+
+    Returns:
+        A dictionary with the message's ID (as a string), the ID of its Conversation,
+        creation time in ISO format, text and the ID of the sending User.
+    """
+    return {
+        "conversation": message.conversation_id,
+        "id": str(message.pk),
+        "created": message.created.isoformat(),
+        "message": message.text,
+        "user_id": message.sender_id,
+    }
+
+
+def parse_message_id(value: Any) -> Optional[int]:
+    """Read a message ID sent by a client.
+
+    Only ASCII digits are accepted in strings, and the ID has to fit
+    in the signed 64-bit column the messages' IDs are stored in.
+
+    Args:
+        value: The ID as a string of digits or an integer.
+
+    Returns:
+        The ID, or None if the value is not a valid ID.
+    """
+    if isinstance(value, str) and value.isascii() and value.isdigit():
+        value = int(value)
+    if isinstance(value, int) and not isinstance(value, bool) and 0 <= value < 2**63:
+        return value
+    return None
+
+
+def get_history_page(
+    conversation_id: int,
+    before: Optional[int] = None,
+    limit: Optional[int] = None,
+    pending: Iterable[ChatMessage] = (),
+) -> HistoryPage:
+    """Get the latest messages of a conversation sent before a given message.
+
+    Args:
+        conversation_id: ID of the Conversation.
+        before: ID of the message the page ends before, the page
+                with the latest messages is returned if omitted.
+        limit: Maximal number of messages on the page, the default
+                page size if omitted.
+        pending: Messages of the conversation that might have not
+                been saved yet, see `chat.buffer.MessageBuffer.pending`.
+
+    Returns:
+        The HistoryPage with the messages.
+    """
+    limit = limit or get_page_size()
+    messages = ChatMessage.objects.filter(conversation_id=conversation_id)
+    if before is not None:
+        messages = messages.filter(id__lt=before)
+        pending = [message for message in pending if message.pk < before]
+    newest_first = _merge(messages.order_by("-id")[: limit + 1], pending, reverse=True)
+    return HistoryPage(
+        messages=[
+            serialize_message(message) for message in reversed(newest_first[:limit])
+        ],
+        has_more=len(newest_first) > limit,
+    )
+
+
+def get_messages_after(
+    conversation_id: int,
+    after: int,
+    limit: Optional[int] = None,
+    pending: Iterable[ChatMessage] = (),
+) -> Optional[list[dict[str, Any]]]:
+    """Get the messages of a conversation sent after a given message.
+
+    Args:
+        conversation_id: ID of the Conversation.
+        after: ID of the last message received by the client.
+        limit: Maximal number of returned messages, the default page
+                size if omitted.
+        pending: Messages of the conversation that might have not
+                been saved yet, see `chat.buffer.MessageBuffer.pending`.
+
+    Returns:
+        Serialized messages, oldest first, or None if more than
+        `limit` messages have been sent after the given one.
+    """
+    limit = limit or get_page_size()
+    messages = ChatMessage.objects.filter(conversation_id=conversation_id, id__gt=after)
+    oldest_first = _merge(
+        messages.order_by("id")[: limit + 1],
+        [message for message in pending if message.pk > after],
+        reverse=False,
+    )
+    if len(oldest_first) > limit:
+        return None
+    return [serialize_message(message) for message in oldest_first]
+
+
+def _merge(
+    saved: Iterable[ChatMessage], pending: Iterable[ChatMessage], reverse: bool
+) -> list[ChatMessage]:
+    """Merge saved and pending messages, skipping the pending ones saved in the meantime."""
+    messages = {message.pk: message for message in pending}
+    messages.update((message.pk, message) for message in saved)
+    return sorted(messages.values(), key=lambda message: message.pk, reverse=reverse)
@@ -0,0 +1,118 @@
+"""Rate limits of chat clients and counters of the frames they cost.
+
+Every frame received from a client takes a token from the bucket of its
+connection and from the bucket of its user, shared by every connection
+of the user served by the process. Frames arriving when either bucket
+is empty are rejected, see `chat.consumers.ChatConsumerBase.receive`,
+so that a single client cannot flood the channel layer with messages
+sent to its groups.
+
+The counters of rejected (throttled), dropped and coalesced frames are
+kept per process and can be read with `get_counters`, e.g. through the
+`chat:counters` API endpoint, to size the deployment.
+"""
+from dataclasses import asdict, dataclass
+from time import monotonic
+from typing import Optional
+from weakref import WeakValueDictionary
+
+from django.conf import settings
+
+DEFAULT_CONNECTION_RATE = 10
+DEFAULT_CONNECTION_BURST = 20
+DEFAULT_USER_RATE = 20
+DEFAULT_USER_BURST = 40
+
+
+class TokenBucket:
+    """Token bucket refilled at a constant rate up to its capacity.
+
+    Attributes:
+        rate: Number of tokens added every second.
+        capacity: Maximal number of tokens, i.e. the size of allowed bursts.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """Create a full bucket."""
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = monotonic()
+
+    def consume(self) -> bool:
+        """Take a token from the bucket.
+
+        Returns:
+            True if there was a token to take, False if the bucket is empty.
+        """
+        now = monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def get_wait_time(self) -> float:
+        """Get the number of seconds until the next token is added."""
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+
+@dataclass
+class FrameCounters:
+    """Numbers of frames not handled as usual since the process started.
+
+    Attributes:
+        throttled: Frames received from clients over their rate limits.
+        dropped: Events not sent to clients that fell behind.
+        coalesced: Events replaced by newer events of the same kind
+                    while waiting to be sent to clients that fell behind.
+    """
+
+    throttled: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+
+
+counters = FrameCounters()
+
+_user_buckets: "WeakValueDictionary[int, TokenBucket]" = WeakValueDictionary()
+
+
+def get_connection_bucket() -> TokenBucket:
+    """Create the bucket of a new connection.
+
+    Its rate and capacity are read from the `CHAT_CONNECTION_RATE`
+    (frames per second) and `CHAT_CONNECTION_BURST` settings.
+    """
+    return TokenBucket(
+        getattr(settings, "CHAT_CONNECTION_RATE", DEFAULT_CONNECTION_RATE),
+        getattr(settings, "CHAT_CONNECTION_BURST", DEFAULT_CONNECTION_BURST),
+    )
+
+
+def get_user_bucket(user_id: int) -> TokenBucket:
+    """Get the bucket shared by every connection of a user.
+
+    The bucket exists for as long as any connection of the user
+    keeps a reference to it. Its rate and capacity are read from the
+    `CHAT_USER_RATE` (frames per second) and `CHAT_USER_BURST` settings.
+
+    Args:
+        user_id: Primary key of the user.
+    """
+    bucket: Optional[TokenBucket] = _user_buckets.get(user_id)
+    if bucket is None:
+        bucket = TokenBucket(
+            getattr(settings, "CHAT_USER_RATE", DEFAULT_USER_RATE),
+            getattr(settings, "CHAT_USER_BURST", DEFAULT_USER_BURST),
+        )
+        _user_buckets[user_id] = bucket
+    return bucket
+
+
+def get_counters() -> dict[str, int]:
+    """Get the counters of throttled, dropped and coalesced frames of the process."""
+    return asdict(counters)
@@ -0,0 +1,190 @@
+"""Load test comparing the resource use of per-conversation and per-user chat connections."""
+import asyncio
+import json
+import tracemalloc
+from time import perf_counter
+from typing import Any
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.management.base import BaseCommand, CommandParser
+from django.test import override_settings
+
+from chat.models import Conversation
+from chat.routing import websocket_urlpatterns
+from utils.benchmarking import (
+    create_chat_pairs,
+    delete_chat_pairs,
+    get_chat_benchmark_settings,
+)
+
+PAIR = "pair"
+USER = "user"
+
+
+class Command(BaseCommand):
+    """Connect every Tutor and Student to their chats and send a message in each of them.
+
+    With the `pair` routing every user opens a connection to the
+    NewChatConsumer for each of their conversations, like the chat
+    windows did before connections were multiplexed, while with the
+    `user` routing every user opens a single connection to the
+    UserChatConsumer. For both, the command reports the number of
+    connections and channel layer group memberships, the time of
+    connecting everyone, the memory allocated while connecting and the
+    time of delivering a message sent by every Student to both sides of
+    the conversation. The in-memory channel layer is used and the
+    created objects are deleted afterwards.
+    """
+
+    help = "Compare the resource use of per-conversation and per-user chat connections."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add options of the load test."""
+        parser.add_argument(
+            "--tutors",
+            type=int,
+            default=20,
+            help="Number of Tutors.",
+        )
+        parser.add_argument(
+            "--students-per-tutor",
+            type=int,
+            default=10,
+            help="Number of Students chatting with every Tutor.",
+        )
+        parser.add_argument(
+            "--routing",
+            nargs="+",
+            choices=[PAIR, USER],
+            default=[PAIR, USER],
+            help="Routings of the connections that will be load tested.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Print the results as JSON instead of a table.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Run the load test for every routing and print the results."""
+        conversations = create_chat_pairs(
+            "benchmark_connections", options["tutors"], options["students_per_tutor"]
+        )
+        try:
+            with override_settings(**get_chat_benchmark_settings()):
+                results = [
+                    {
+                        "routing": routing,
+                        **async_to_sync(self._load_test)(routing, conversations),
+                    }
+                    for routing in options["routing"]
+                ]
+        finally:
+            delete_chat_pairs(conversations)
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f"{'routing':>8} {'connections':>12} {'groups':>7} {'connect [s]':>12} "
+            f"{'memory [kB]':>12} {'deliver [s]':>12}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result['routing']:>8} {result['connections']:>12} "
+                f"{result['group_memberships']:>7} {result['connect_seconds']:>12.3f} "
+                f"{result['memory_kb']:>12.1f} {result['deliver_seconds']:>12.3f}"
+            )
+
+    async def _load_test(
+        self, routing: str, conversations: list[Conversation]
+    ) -> dict[str, Any]:
+        """Connect everyone with a given routing and send a message in every conversation.
+
+        Args:
+            routing: Either `pair` or `user`.
+            conversations: Conversations of the Tutors and Students.
+
+        Returns:
+            A dictionary with the measurements.
+        """
+        application = URLRouter(websocket_urlpatterns)
+        channel_layer = get_channel_layer()
+        # Connections of every conversation's Student and Tutor, by the conversation's ID.
+        senders: dict[int, WebsocketCommunicator] = {}
+        receivers: dict[int, WebsocketCommunicator] = {}
+        communicators = []
+
+        async def connect(path: str, user: Any) -> WebsocketCommunicator:
+            communicator = WebsocketCommunicator(application, path)
+            communicator.scope["user"] = user
+            await communicator.connect()
+            await communicator.receive_from()
+            communicators.append(communicator)
+            return communicator
+
+        tracemalloc.start()
+        start = perf_counter()
+        if routing == PAIR:
+            for conversation in conversations:
+                path = f"/ws/chat/{conversation.tutor_id}/{conversation.student_id}/"
+                senders[conversation.pk] = await connect(
+                    path, conversation.student.user
+                )
+                receivers[conversation.pk] = await connect(
+                    path, conversation.tutor.user
+                )
+        else:
+            tutors = {}
+            for conversation in conversations:
+                if conversation.tutor_id not in tutors:
+                    tutors[conversation.tutor_id] = await connect(
+                        "/ws/chat/", conversation.tutor.user
+                    )
+                senders[conversation.pk] = await connect(
+                    "/ws/chat/", conversation.student.user
+                )
+                receivers[conversation.pk] = tutors[conversation.tutor_id]
+        connect_seconds = perf_counter() - start
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = perf_counter()
+        for conversation in conversations:
+            await senders[conversation.pk].send_to(
+                text_data=json.dumps({"conversation": conversation.pk, "message": "Hi"})
+            )
+
+        async def receive_message(communicator: WebsocketCommunicator) -> None:
+            # Skips the presence of users who connected after the communicator.
+            while (await communicator.receive_json_from(timeout=30))[
+                "type"
+            ] != "message":
+                pass
+
+        await asyncio.gather(
+            *(
+                receive_message(communicator)
+                for conversation in conversations
+                for communicator in (
+                    senders[conversation.pk],
+                    receivers[conversation.pk],
+                )
+            )
+        )
+        deliver_seconds = perf_counter() - start
+
+        group_memberships = sum(
+            len(channels) for channels in channel_layer.groups.values()
+        )
+        for communicator in communicators:
+            await communicator.disconnect()
+        return {
+            "connections": len(communicators),
+            "group_memberships": group_memberships,
+            "connect_seconds": connect_seconds,
+            "memory_kb": memory / 1024,
+            "deliver_seconds": deliver_seconds,
+        }
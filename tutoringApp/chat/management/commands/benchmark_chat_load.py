@@ -0,0 +1,329 @@
+"""Load test of the number of concurrent conversations a single server process sustains."""
+import asyncio
+import json
+import tracemalloc
+from statistics import median
+from time import perf_counter
+from typing import Any, Optional
+
+import msgpack
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.management.base import BaseCommand, CommandParser
+from django.test import override_settings
+
+from chat.limits import get_counters
+from chat.models import Conversation
+from chat.protocol import MSGPACK_SUBPROTOCOL
+from chat.routing import websocket_urlpatterns
+from utils.benchmarking import (
+    create_chat_pairs,
+    delete_chat_pairs,
+    get_chat_benchmark_settings,
+)
+
+JSON = "json"
+MSGPACK = "msgpack"
+SUBPROTOCOLS = {JSON: None, MSGPACK: [MSGPACK_SUBPROTOCOL]}
+
+
+class Command(BaseCommand):
+    """Keep many Tutors and Students connected and chatting at given rates.
+
+    Every Tutor chats with a single Student and both of them connect to
+    the UserChatConsumer, like the chat window does. Once everyone is
+    connected, the Students and the Tutors take turns sending messages
+    in every conversation at each of the given rates, spread evenly
+    over time, for the given number of seconds. Every message carries
+    the time it was sent at, so the other participant's connection can
+    measure its delivery latency.
+
+    The command reports the time of connecting everyone and the memory
+    allocated per connection, and, for every rate, the number of sent
+    and delivered messages, the achieved throughput, the median and
+    99th percentile of the delivery latency and the numbers of frames
+    throttled, dropped and coalesced by the consumers. The in-memory
+    channel layer stands in for Redis, messages are saved in the
+    database as usual and the created objects are deleted afterwards.
+    The simulated clients share the process and its event loop with the
+    consumers, so the results underestimate what a worker sustains when
+    serving real clients, but are comparable between releases.
+    """
+
+    help = "Load test the chat with many concurrent conversations."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add options of the load test."""
+        parser.add_argument(
+            "--pairs",
+            type=int,
+            default=1000,
+            help="Number of chatting Tutors and Students.",
+        )
+        parser.add_argument(
+            "--rates",
+            nargs="+",
+            type=float,
+            default=[0.1, 0.5, 1.0],
+            help="Messages sent per second in every conversation, one run for each.",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=10.0,
+            help="Number of seconds messages are sent for at every rate.",
+        )
+        parser.add_argument(
+            "--drain-timeout",
+            type=float,
+            default=30.0,
+            help="Number of seconds to wait for the remaining messages after sending them.",
+        )
+        parser.add_argument(
+            "--protocol",
+            choices=[JSON, MSGPACK],
+            default=JSON,
+            help="Protocol of every connection.",
+        )
+        parser.add_argument(
+            "--keep-limits",
+            action="store_true",
+            help="Keep the configured rate limits and outbox sizes instead of lifting them.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Print the results as JSON instead of a table.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Run the load test and print the results."""
+        conversations = create_chat_pairs("benchmark_load", options["pairs"], 1)
+        # Every channel has to fit the messages of its conversation sent
+        # at the highest rate, as messages sent to full channels are dropped.
+        overrides = get_chat_benchmark_settings(
+            capacity=max(100, int(max(options["rates"]) * options["duration"]) * 2)
+        )
+        if options["keep_limits"]:
+            overrides = {"CHANNEL_LAYERS": overrides["CHANNEL_LAYERS"]}
+        try:
+            with override_settings(**overrides):
+                results = {
+                    "pairs": options["pairs"],
+                    "protocol": options["protocol"],
+                    "duration": options["duration"],
+                    "limits": options["keep_limits"],
+                    **async_to_sync(self._load_test)(
+                        conversations,
+                        options["rates"],
+                        options["duration"],
+                        options["drain_timeout"],
+                        SUBPROTOCOLS[options["protocol"]],
+                    ),
+                }
+        finally:
+            delete_chat_pairs(conversations)
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f"{results['connections']} connections in "
+            f"{results['connect_seconds']:.3f} s, "
+            f"{results['memory_per_connection_kb']:.1f} kB per connection"
+        )
+        self.stdout.write(
+            f"{'rate':>6} {'sent':>8} {'delivered':>10} {'messages/s':>11} "
+            f"{'p50 [ms]':>9} {'p99 [ms]':>9} {'throttled':>10} {'dropped':>8} "
+            f"{'coalesced':>10}"
+        )
+        for run in results["runs"]:
+            self.stdout.write(
+                f"{run['rate']:>6} {run['sent']:>8} {run['delivered']:>10} "
+                f"{run['messages_per_second']:>11.1f} "
+                f"{self._format_ms(run['p50_ms']):>9} "
+                f"{self._format_ms(run['p99_ms']):>9} {run['throttled']:>10} "
+                f"{run['dropped']:>8} {run['coalesced']:>10}"
+            )
+
+    @staticmethod
+    def _format_ms(value: Optional[float]) -> str:
+        """Format a latency which is missing if no message was delivered."""
+        return "-" if value is None else f"{value:.2f}"
+
+    async def _load_test(
+        self,
+        conversations: list[Conversation],
+        rates: list[float],
+        duration: float,
+        drain_timeout: float,
+        subprotocols: Optional[list[str]],
+    ) -> dict[str, Any]:
+        """Connect everyone and chat in every conversation at each of the rates.
+
+        Args:
+            conversations: Conversations of the Tutors and Students.
+            rates: Messages sent per second in every conversation.
+            duration: Number of seconds messages are sent for at every rate.
+            drain_timeout: Number of seconds to wait for the remaining
+                            messages after sending them.
+            subprotocols: Subprotocols offered by every connection.
+
+        Returns:
+            A dictionary with the measurements of connecting and of every rate.
+        """
+        application = URLRouter(websocket_urlpatterns)
+        # Delivery latencies in seconds of the messages received in the current run.
+        latencies: list[float] = []
+
+        async def connect(user: Any) -> WebsocketCommunicator:
+            communicator = WebsocketCommunicator(
+                application, "/ws/chat/", subprotocols=subprotocols
+            )
+            communicator.scope["user"] = user
+            await communicator.connect()
+            await communicator.receive_output()
+            return communicator
+
+        async def receive(communicator: WebsocketCommunicator, user_id: int) -> None:
+            # Runs until cancelled, as receiving with a timeout closes the connection.
+            while True:
+                frame = await communicator.receive_output(timeout=None)
+                received = perf_counter()
+                if frame.get("bytes") is not None:
+                    objects = msgpack.unpackb(frame["bytes"])
+                else:
+                    objects = [json.loads(frame["text"])]
+                for content in objects:
+                    # Skips presence changes and the echoes of the user's own messages.
+                    if content["type"] == "message" and content["user_id"] != user_id:
+                        latencies.append(received - float(content["message"]))
+
+        tracemalloc.start()
+        start = perf_counter()
+        # Connections of every conversation's Student and Tutor.
+        pairs = [
+            (
+                (
+                    await connect(conversation.student.user),
+                    conversation.student.user_id,
+                ),
+                (await connect(conversation.tutor.user), conversation.tutor.user_id),
+            )
+            for conversation in conversations
+        ]
+        connect_seconds = perf_counter() - start
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        communicators = [communicator for pair in pairs for communicator, _ in pair]
+
+        receivers = [
+            asyncio.ensure_future(receive(communicator, user_id))
+            for pair in pairs
+            for communicator, user_id in pair
+        ]
+        try:
+            runs = []
+            for rate in rates:
+                latencies.clear()
+                counters = get_counters()
+                run = await self._run(
+                    conversations, pairs, rate, duration, drain_timeout, latencies
+                )
+                runs.append(
+                    {
+                        "rate": rate,
+                        **run,
+                        **{
+                            name: value - counters[name]
+                            for name, value in get_counters().items()
+                        },
+                    }
+                )
+        finally:
+            for receiver in receivers:
+                receiver.cancel()
+            await asyncio.gather(*receivers, return_exceptions=True)
+            for communicator in communicators:
+                await communicator.disconnect()
+        return {
+            "connections": len(communicators),
+            "connect_seconds": connect_seconds,
+            "memory_per_connection_kb": memory / 1024 / len(communicators),
+            "runs": runs,
+        }
+
+    async def _run(
+        self,
+        conversations: list[Conversation],
+        pairs: list[tuple[tuple[WebsocketCommunicator, int], ...]],
+        rate: float,
+        duration: float,
+        drain_timeout: float,
+        latencies: list[float],
+    ) -> dict[str, Any]:
+        """Chat in every conversation at a given rate and wait for the messages.
+
+        Args:
+            conversations: Conversations of the Tutors and Students.
+            pairs: Connections of the Students and the Tutors with the
+                    IDs of their users, in the order of the conversations.
+            rate: Messages sent per second in every conversation.
+            duration: Number of seconds messages are sent for.
+            drain_timeout: Number of seconds to wait for the remaining
+                            messages after sending them.
+            latencies: List the receiving connections append the delivery
+                        latencies of the messages to.
+
+        Returns:
+            A dictionary with the measurements.
+        """
+        interval = 1 / rate
+        start = perf_counter()
+
+        async def chat(index: int, conversation: Conversation) -> int:
+            # Conversations start at evenly spread offsets, so that messages
+            # are not sent in bursts.
+            sent = 0
+            send_time = start + interval * index / len(conversations)
+            while send_time < start + duration:
+                await asyncio.sleep(send_time - perf_counter())
+                communicator, _ = pairs[index][sent % 2]
+                request = {
+                    "conversation": conversation.pk,
+                    "message": repr(perf_counter()),
+                }
+                if communicator.scope["subprotocols"]:
+                    await communicator.send_to(bytes_data=msgpack.packb(request))
+                else:
+                    await communicator.send_to(text_data=json.dumps(request))
+                sent += 1
+                send_time += interval
+            return sent
+
+        sent = sum(
+            await asyncio.gather(
+                *(
+                    chat(index, conversation)
+                    for index, conversation in enumerate(conversations)
+                )
+            )
+        )
+        deadline = perf_counter() + drain_timeout
+        while len(latencies) < sent and perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+        seconds = perf_counter() - start
+
+        delivered = sorted(latencies)
+        return {
+            "sent": sent,
+            "delivered": len(delivered),
+            "seconds": seconds,
+            "messages_per_second": len(delivered) / seconds,
+            "p50_ms": median(delivered) * 1000 if delivered else None,
+            "p99_ms": (
+                delivered[min(len(delivered) - 1, int(len(delivered) * 0.99))] * 1000
+                if delivered
+                else None
+            ),
+        }
@@ -0,0 +1,178 @@
+"""Benchmark of the sustained throughput of sending and saving chat messages."""
+import asyncio
+import json
+from time import perf_counter
+from typing import Any
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.management.base import BaseCommand, CommandParser
+from django.test import override_settings
+
+from chat.models import ChatMessage, Conversation
+from chat.routing import websocket_urlpatterns
+from utils.benchmarking import (
+    create_chat_pairs,
+    delete_chat_pairs,
+    get_chat_benchmark_settings,
+)
+
+
+class Command(BaseCommand):
+    """Measure how many chat messages per second are relayed and saved.
+
+    Every Tutor-Student pair sends its share of the messages through
+    its own connection to the chat consumer, concurrently with the
+    other pairs, and waits for every message to come back from the
+    channel layer. The time is measured until every message has also
+    been saved in the database. The benchmark is repeated for every
+    batch size of the message buffer, so the batched saving can be
+    compared with saving every message with a separate INSERT (batch
+    size of 1). The in-memory channel layer is used. Messages are saved
+    outside of any transaction, like in the running application, so
+    the created objects are deleted after every run instead of being
+    rolled back.
+    """
+
+    help = "Benchmark the throughput of sending and saving chat messages."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add options of the benchmark."""
+        parser.add_argument(
+            "--batch-sizes",
+            nargs="+",
+            type=int,
+            default=[1, 10, 100],
+            help="Batch sizes of the message buffer that will be benchmarked.",
+        )
+        parser.add_argument(
+            "--flush-interval",
+            type=int,
+            default=50,
+            help="Flush interval of the message buffer in milliseconds.",
+        )
+        parser.add_argument(
+            "--connections",
+            type=int,
+            default=20,
+            help="Number of Tutor-Student pairs chatting at the same time.",
+        )
+        parser.add_argument(
+            "--messages",
+            type=int,
+            default=5000,
+            help="Total number of sent messages.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Print the results as JSON instead of a table.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Run the benchmark for every batch size and print the results."""
+        results = [
+            self._benchmark_batch_size(
+                batch_size=batch_size,
+                flush_interval=options["flush_interval"],
+                connections=options["connections"],
+                messages=options["messages"],
+            )
+            for batch_size in options["batch_sizes"]
+        ]
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f"{'batch size':>10} {'messages':>9} {'seconds':>8} {'messages/s':>11}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result['batch_size']:>10} {result['messages']:>9} "
+                f"{result['seconds']:>8.3f} {result['messages_per_second']:>11.1f}"
+            )
+
+    def _benchmark_batch_size(
+        self, batch_size: int, flush_interval: int, connections: int, messages: int
+    ) -> dict[str, Any]:
+        """Send the messages with a given batch size of the message buffer.
+
+        Args:
+            batch_size: Number of messages saved with a single query.
+            flush_interval: Flush interval of the buffer in milliseconds.
+            connections: Number of concurrently chatting pairs.
+            messages: Total number of sent messages.
+
+        Returns:
+            A dictionary with the number of sent messages, the total time
+            in seconds and the number of messages sent per second.
+        """
+        per_connection = messages // connections
+        conversations = create_chat_pairs(
+            f"benchmark_chat_{batch_size}", tutors=connections, students_per_tutor=1
+        )
+        try:
+            with override_settings(
+                **get_chat_benchmark_settings(),
+                CHAT_MESSAGE_BATCH_SIZE=batch_size,
+                CHAT_MESSAGE_FLUSH_INTERVAL=flush_interval,
+            ):
+                seconds = async_to_sync(self._chat)(conversations, per_connection)
+            saved = ChatMessage.objects.filter(conversation__in=conversations).count()
+        finally:
+            delete_chat_pairs(conversations)
+        if saved != per_connection * connections:
+            self.stderr.write(
+                f"Only {saved} of {per_connection * connections} messages saved."
+            )
+        return {
+            "batch_size": batch_size,
+            "messages": per_connection * connections,
+            "seconds": seconds,
+            "messages_per_second": per_connection * connections / seconds,
+        }
+
+    async def _chat(
+        self, conversations: list[Conversation], per_connection: int
+    ) -> float:
+        """Send messages through a connection of every conversation at the same time.
+
+        Args:
+            conversations: Conversations of the chatting pairs.
+            per_connection: Number of messages sent through every connection.
+
+        Returns:
+            Number of seconds until every message was received and saved.
+        """
+        application = URLRouter(websocket_urlpatterns)
+        communicators = []
+        for conversation in conversations:
+            communicator = WebsocketCommunicator(
+                application,
+                f"/ws/chat/{conversation.tutor_id}/{conversation.student_id}/",
+            )
+            communicator.scope["user"] = conversation.student.user
+            await communicator.connect()
+            await communicator.receive_from()
+            communicators.append(communicator)
+
+        async def send(
+            communicator: WebsocketCommunicator, conversation: Conversation
+        ) -> None:
+            for number in range(per_connection):
+                await communicator.send_to(
+                    text_data=json.dumps({"message": f"Message {number}"})
+                )
+                await communicator.receive_from()
+
+        start = perf_counter()
+        await asyncio.gather(
+            *(
+                send(communicator, conversation)
+                for communicator, conversation in zip(communicators, conversations)
+            )
+        )
+        for communicator in communicators:
+            await communicator.disconnect()
+        return perf_counter() - start
@@ -0,0 +1,176 @@
+"""Benchmark comparing the JSON and the coalescing msgpack protocols of chat connections."""
+import json
+from time import perf_counter
+from typing import Any, Optional
+
+import msgpack
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.management.base import BaseCommand, CommandParser
+from django.test import override_settings
+
+from chat.models import Conversation
+from chat.protocol import MSGPACK_SUBPROTOCOL
+from chat.routing import websocket_urlpatterns
+from utils.benchmarking import (
+    create_chat_pairs,
+    delete_chat_pairs,
+    get_chat_benchmark_settings,
+)
+
+JSON = "json"
+MSGPACK = "msgpack"
+SUBPROTOCOLS = {JSON: None, MSGPACK: [MSGPACK_SUBPROTOCOL]}
+
+
+class Command(BaseCommand):
+    """Send bursts of messages to a Tutor chatting with many Students.
+
+    Every Student sends a burst of messages over their own JSON connection
+    and all of them are received by the Tutor over a single connection
+    using the compared protocol. For every protocol, the command reports
+    the number of frames written to the Tutor's socket, their total size,
+    the time of delivering every message and the resulting throughput.
+    The in-memory channel layer is used and the created objects are
+    deleted afterwards.
+    """
+
+    help = "Compare the JSON and the msgpack protocols of chat connections."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add options of the benchmark."""
+        parser.add_argument(
+            "--students",
+            type=int,
+            default=20,
+            help="Number of Students chatting with the Tutor.",
+        )
+        parser.add_argument(
+            "--burst",
+            type=int,
+            default=50,
+            help="Number of messages sent by every Student in a burst.",
+        )
+        parser.add_argument(
+            "--coalesce-interval",
+            type=int,
+            default=None,
+            help="Overrides the CHAT_COALESCE_INTERVAL setting (in milliseconds).",
+        )
+        parser.add_argument(
+            "--protocols",
+            nargs="+",
+            choices=[JSON, MSGPACK],
+            default=[JSON, MSGPACK],
+            help="Protocols that will be benchmarked.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Print the results as JSON instead of a table.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Run the benchmark for every protocol and print the results."""
+        conversations = create_chat_pairs("benchmark_protocol", 1, options["students"])
+        # The Tutor's channel has to fit every message of the bursts,
+        # as messages sent to groups with full channels are dropped.
+        overrides = get_chat_benchmark_settings(
+            capacity=options["students"] * options["burst"]
+        )
+        if options["coalesce_interval"] is not None:
+            overrides["CHAT_COALESCE_INTERVAL"] = options["coalesce_interval"]
+        try:
+            with override_settings(**overrides):
+                results = [
+                    {
+                        "protocol": protocol,
+                        **async_to_sync(self._benchmark)(
+                            SUBPROTOCOLS[protocol], conversations, options["burst"]
+                        ),
+                    }
+                    for protocol in options["protocols"]
+                ]
+        finally:
+            delete_chat_pairs(conversations)
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f"{'protocol':>8} {'messages':>9} {'frames':>7} {'bytes':>9} "
+            f"{'seconds':>8} {'messages/s':>11}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result['protocol']:>8} {result['messages']:>9} "
+                f"{result['frames']:>7} {result['bytes']:>9} "
+                f"{result['seconds']:>8.3f} {result['messages_per_second']:>11.1f}"
+            )
+
+    async def _benchmark(
+        self,
+        subprotocols: Optional[list[str]],
+        conversations: list[Conversation],
+        burst: int,
+    ) -> dict[str, Any]:
+        """Deliver bursts of messages of every Student to the Tutor's connection.
+
+        Args:
+            subprotocols: Subprotocols offered by the Tutor's connection.
+            conversations: Conversations of the Tutor with the Students.
+            burst: Number of messages sent by every Student.
+
+        Returns:
+            A dictionary with the measurements.
+        """
+        application = URLRouter(websocket_urlpatterns)
+
+        async def connect(
+            user: Any, subprotocols: Optional[list[str]] = None
+        ) -> WebsocketCommunicator:
+            communicator = WebsocketCommunicator(
+                application, "/ws/chat/", subprotocols=subprotocols
+            )
+            communicator.scope["user"] = user
+            await communicator.connect()
+            await communicator.receive_output()
+            return communicator
+
+        # Students connect first, so that the Tutor does not receive their presence.
+        students = {
+            conversation.pk: await connect(conversation.student.user)
+            for conversation in conversations
+        }
+        tutor = await connect(conversations[0].tutor.user, subprotocols)
+
+        messages = len(conversations) * burst
+        frames = size = received = 0
+        start = perf_counter()
+        for index in range(burst):
+            for conversation_id, student in students.items():
+                await student.send_to(
+                    text_data=json.dumps(
+                        {"conversation": conversation_id, "message": f"Hi {index}"}
+                    )
+                )
+        while received < messages:
+            frame = await tutor.receive_output(timeout=30)
+            frames += 1
+            if frame.get("bytes") is not None:
+                size += len(frame["bytes"])
+                received += len(msgpack.unpackb(frame["bytes"]))
+            else:
+                size += len(frame["text"].encode())
+                received += 1
+        seconds = perf_counter() - start
+
+        for communicator in (tutor, *students.values()):
+            await communicator.disconnect()
+        return {
+            "messages": messages,
+            "frames": frames,
+            "bytes": size,
+            "seconds": seconds,
+            "messages_per_second": messages / seconds,
+        }
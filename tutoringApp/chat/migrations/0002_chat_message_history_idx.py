@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("chat", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="chatmessage",
+            index=models.Index(
+                fields=["conversation", "id"], name="chat_message_history_idx"
+            ),
+        ),
+    ]
@@ -1,3 +1,177 @@
+import os
+import threading
+from time import time_ns
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
 from django.db import models
+from django.utils.timezone import now
+
+from profiles.models import Profile
+
+# Number of bits of a message ID taken by its parts, see `generate_message_id`.
+WORKER_BITS = 8
+SEQUENCE_BITS = 12
+
+
+def _get_worker_id() -> int:
+    """Get the ID of the current process used in the IDs of its messages.
+
+    The ID is configured with the `CHAT_WORKER_ID` setting, which has to
+    be unique among the processes serving the chat. Without it, the ID
+    is derived from the process ID, so IDs of messages generated by
+    different processes may collide, see `chat.buffer`.
+
+    Returns:
+        A number that fits in `WORKER_BITS` bits.
+    """
+    worker_id = getattr(settings, "CHAT_WORKER_ID", None)
+    if worker_id is None:
+        return os.getpid() % (1 << WORKER_BITS)
+    if not 0 <= worker_id < 1 << WORKER_BITS:
+        raise ImproperlyConfigured(
+            f"CHAT_WORKER_ID has to be between 0 and {(1 << WORKER_BITS) - 1}."
+        )
+    return worker_id
+
+
+_id_lock = threading.Lock()
+_last_timestamp = 0
+_sequence = 0
+_worker_id = _get_worker_id()
+
+
+def generate_message_id() -> int:
+    """Generate an ID of a new ChatMessage before it is saved.
+
+    Messages are persisted in batches a while after they get sent
+    out to the participants of a conversation, so their IDs have
+    to be known without inserting them. The IDs consist of the
+    number of milliseconds since the epoch, the ID of the generating
+    process and a sequence number within the millisecond. IDs
+    generated by one process are always increasing and IDs generated
+    by different processes are ordered by the time of their creation,
+    up to a millisecond, which makes them usable as cursors of the
+    conversations' history.
+
+    Returns:
+        A new, unique message ID.
+    """
+    global _last_timestamp, _sequence
+    with _id_lock:
+        timestamp = max(time_ns() // 1_000_000, _last_timestamp)
+        if timestamp == _last_timestamp:
+            _sequence = (_sequence + 1) % (1 << SEQUENCE_BITS)
+            if not _sequence:
+                # The sequence overflowed, borrow the next millisecond.
+                timestamp += 1
+        else:
+            _sequence = 0
+        _last_timestamp = timestamp
+        return (
+            (timestamp << (WORKER_BITS + SEQUENCE_BITS))
+            | (_worker_id << SEQUENCE_BITS)
+            | _sequence
+        )
+
+
+class Conversation(models.Model):
+    """Implementation of the Conversation model.
+
+    The Conversation groups messages exchanged
+    between a Tutor and a Student in the chat.
+    """
+
+    tutor = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="conversation_tutor"
+    )
+    student = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="conversation_student"
+    )
+    created = models.DateTimeField(default=now)
+
+    def __str__(self) -> str:
+        """String representation of the class."""
+        return f"Conversation between Tutor with ID {self.tutor_id} and Student with ID {self.student_id}."
+
+    @property
+    def group_name(self) -> str:
+        """Name of the channel layer group of the conversation's participants."""
+        return f"chat_{self.tutor_id}_to_{self.student_id}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tutor", "student"],
+                name="unique_tutor_student_conversation",
+            )
+        ]
+
+
+class ChatMessage(models.Model):
+    """Implementation of the ChatMessage model.
+
+    Messages are created by the chat's consumers and
+    saved in batches, see `chat.buffer.MessageBuffer`.
+    """
+
+    id = models.BigIntegerField(
+        primary_key=True, default=generate_message_id, editable=False
+    )
+    conversation = models.ForeignKey(
+        Conversation, on_delete=models.CASCADE, related_name="messages"
+    )
+    sender = models.ForeignKey(User, on_delete=models.CASCADE)
+    text = models.TextField()
+    created = models.DateTimeField(default=now)
+
+    def __str__(self) -> str:
+        """String representation of the class."""
+        return f"Message with ID {self.pk} sent by User with ID {self.sender_id}."
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["conversation", "created"],
+                name="chat_message_conversation_idx",
+            ),
+            models.Index(
+                fields=["conversation", "id"],
+                name="chat_message_history_idx",
+            ),
+        ]
+
+
+class ReadMarker(models.Model):
+    """Implementation of the ReadMarker model.
+
+    Every participant of a conversation has a marker with the ID
+    of the last message they have read and the number of messages
+    of the other participant they have not read yet. The number is
+    incremented when messages are saved and recalculated when the
+    user reads them, see `chat.read_markers`, so that unread messages
+    are never counted when listing conversations.
+    """
+
+    conversation = models.ForeignKey(
+        Conversation, on_delete=models.CASCADE, related_name="read_markers"
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    last_read_id = models.BigIntegerField(default=0)
+    unread_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        """String representation of the class."""
+        return (
+            f"Read marker of User with ID {self.user_id} "
+            f"in Conversation with ID {self.conversation_id}."
+        )
 
-# Create your models here.
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["conversation", "user"],
+                name="unique_conversation_user_read_marker",
+            )
+        ]
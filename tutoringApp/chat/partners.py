@@ -0,0 +1,70 @@
+"""Lists of users' chat partners with the state of their conversations."""
+from django.db.models import F, OuterRef, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce, Substr
+
+from profiles.models import Profile
+
+from .models import ChatMessage, Conversation, ReadMarker
+
+PREVIEW_LENGTH = 50
+
+
+def get_chat_partners(profile_id: int, student: bool) -> QuerySet:
+    """Get the chat partners of a user with a single query.
+
+    Every Profile is annotated with the ID of the `conversation` with
+    the user (None if it has not been started yet), the time and the
+    beginning of the text of the last message (`last_message_created`
+    and `last_message_preview`) and the number of the partner's messages
+    the user has not read yet (`unread_count`), which is read from the
+    user's ReadMarker rather than counted. Partners with the most recent
+    messages come first.
+
+    Args:
+        profile_id: Primary key of the user's Profile.
+        student: Whether the user is a Student, whose partners are
+                    Tutors, or a Tutor, whose partners are Students.
+
+    Returns:
+        A queryset of Profiles of Tutors or Students with a Subscription
+        with the user, with their users selected.
+    """
+    if student:
+        partners = Profile.objects.filter(subscription_tutor__student_id=profile_id)
+        conversations = Conversation.objects.filter(
+            tutor_id=OuterRef("pk"), student_id=profile_id
+        )
+    else:
+        partners = Profile.objects.filter(subscription_student__tutor_id=profile_id)
+        conversations = Conversation.objects.filter(
+            tutor_id=profile_id, student_id=OuterRef("pk")
+        )
+    last_messages = ChatMessage.objects.filter(
+        conversation_id=OuterRef("conversation")
+    ).order_by("-id")
+    return (
+        partners.select_related("user")
+        .distinct()
+        .annotate(conversation=Subquery(conversations.values("pk")[:1]))
+        .annotate(
+            last_message_created=Subquery(last_messages.values("created")[:1]),
+            last_message_preview=Subquery(
+                last_messages.annotate(
+                    preview=Substr("text", 1, PREVIEW_LENGTH)
+                ).values("preview")[:1]
+            ),
+            unread_count=Coalesce(
+                Subquery(
+                    ReadMarker.objects.filter(
+                        conversation_id=OuterRef("conversation"), user_id=profile_id
+                    ).values("unread_count")[:1]
+                ),
+                Value(0),
+            ),
+        )
+        .order_by(
+            F("last_message_created").desc(nulls_last=True),
+            "user__last_name",
+            "user__first_name",
+        )
+    )
@@ -0,0 +1,203 @@
+"""Presence of users in the chat and throttling of typing indicators.
+
+A user is online as long as the entry of any of the user's open chat
+connections exists in the shared cache. Every connection writes only
+its own entry, which expires `CHAT_PRESENCE_TIMEOUT` seconds after the
+connection's last heartbeat, so users whose connections were dropped
+without closing, e.g. when a server crashed, eventually go offline as
+well. Unlike a shared counter, which file-based caches cannot update
+atomically, no update of another connection can be lost this way.
+
+The presence entry of a user only lists the names of the connections,
+so they can be looked up. Connections opening or closing at the same
+time may overwrite each other's changes of the list, in which case
+the next heartbeat of the lost connection adds it back. Connections
+only broadcast changes of the state, i.e. when the first connection of
+a user opens or the last one closes, rather than every heartbeat.
+
+Typing indicators are throttled per user and conversation with entries
+living for `CHAT_TYPING_INTERVAL` seconds, so at most one of them is
+broadcast per interval regardless of how many keystrokes are reported.
+"""
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from subscriptions.models import Subscription
+
+DEFAULT_PRESENCE_TIMEOUT = 30
+DEFAULT_TYPING_INTERVAL = 3
+
+_PRESENCE_KEY_PREFIX = "chat:presence"
+_TYPING_KEY_PREFIX = "chat:typing"
+
+
+def get_presence_timeout() -> int:
+    """Get the number of seconds users stay online after their last heartbeat."""
+    return getattr(settings, "CHAT_PRESENCE_TIMEOUT", DEFAULT_PRESENCE_TIMEOUT)
+
+
+def get_typing_interval() -> float:
+    """Get the minimal number of seconds between broadcast typing indicators of a user."""
+    return getattr(settings, "CHAT_TYPING_INTERVAL", DEFAULT_TYPING_INTERVAL)
+
+
+async def connect_user(user_id: int, connection: str) -> bool:
+    """Add a new connection of a user to the user's presence.
+
+    The connection's entry is written before the other connections are
+    looked up, so of two connections opening and closing at the same
+    time at least one of them sees the other one.
+
+    Args:
+        user_id: Primary key of the user.
+        connection: Name of the connection's channel.
+
+    Returns:
+        True if the user has just come online, False if the user
+        already had another connection.
+    """
+    timeout = get_presence_timeout()
+    await cache.aset(_get_connection_key(user_id, connection), True, timeout)
+    connections = await _aget_live_connections(user_id)
+    await cache.aset(_get_presence_key(user_id), connections | {connection}, timeout)
+    return not connections - {connection}
+
+
+async def disconnect_user(user_id: int, connection: str) -> bool:
+    """Remove a closed connection of a user from the user's presence.
+
+    Args:
+        user_id: Primary key of the user.
+        connection: Name of the connection's channel.
+
+    Returns:
+        True if the user has just gone offline, False if the
+        user still has other connections.
+    """
+    await cache.adelete(_get_connection_key(user_id, connection))
+    connections = await _aget_live_connections(user_id)
+    if connections:
+        await cache.aset(
+            _get_presence_key(user_id), connections, get_presence_timeout()
+        )
+        return False
+    await cache.adelete(_get_presence_key(user_id))
+    return True
+
+
+async def heartbeat(user_id: int, connection: str) -> bool:
+    """Keep a connected user online for another `CHAT_PRESENCE_TIMEOUT` seconds.
+
+    Connections lost from the user's entry by concurrent updates or
+    expired in the meantime are added back.
+
+    Args:
+        user_id: Primary key of the user.
+        connection: Name of the connection's channel.
+
+    Returns:
+        True if the user had no other live connection and has come
+        back online, False if the user was online all along.
+    """
+    timeout = get_presence_timeout()
+    key = _get_presence_key(user_id)
+    if connection in await cache.aget(key, ()) and await cache.atouch(
+        _get_connection_key(user_id, connection), timeout
+    ):
+        await cache.atouch(key, timeout)
+        return False
+    return await connect_user(user_id, connection)
+
+
+async def may_broadcast_typing(user_id: int, conversation_id: int) -> bool:
+    """Check whether a typing indicator of a user should be broadcast.
+
+    Args:
+        user_id: Primary key of the typing user.
+        conversation_id: ID of the Conversation the user types in.
+
+    Returns:
+        True for the first indicator of the user in the conversation
+        in `CHAT_TYPING_INTERVAL` seconds, False for the following ones.
+    """
+    return await cache.aadd(
+        f"{_TYPING_KEY_PREFIX}:{user_id}:{conversation_id}", True, get_typing_interval()
+    )
+
+
+def get_presence(user_ids: Iterable[int]) -> dict[int, bool]:
+    """Check which of the given users are online, with two cache lookups.
+
+    Args:
+        user_ids: Primary keys of the users.
+
+    Returns:
+        Dictionary mapping every given primary key to the user's presence.
+    """
+    user_ids = list(user_ids)
+    entries = cache.get_many([_get_presence_key(user_id) for user_id in user_ids])
+    connection_keys = {
+        user_id: [
+            _get_connection_key(user_id, connection)
+            for connection in entries.get(_get_presence_key(user_id), ())
+        ]
+        for user_id in user_ids
+    }
+    live = cache.get_many([key for keys in connection_keys.values() for key in keys])
+    return {
+        user_id: any(key in live for key in connection_keys[user_id])
+        for user_id in user_ids
+    }
+
+
+def get_partner_ids(profile_id: int) -> set[int]:
+    """Get the primary keys of every chat partner of a user, with a single query.
+
+    Args:
+        profile_id: Primary key of the user's Profile.
+
+    Returns:
+        Primary keys of the Profiles of the Tutors and the Students
+        who have a Subscription with the user.
+    """
+    return {
+        tutor_id if student_id == profile_id else student_id
+        for tutor_id, student_id in Subscription.objects.filter(
+            Q(tutor_id=profile_id) | Q(student_id=profile_id)
+        )
+        .values_list("tutor_id", "student_id")
+        .distinct()
+    }
+
+
+def _get_presence_key(user_id: int) -> str:
+    """Get the cache key of the presence entry of a user."""
+    return f"{_PRESENCE_KEY_PREFIX}:{user_id}"
+
+
+def _get_connection_key(user_id: int, connection: str) -> str:
+    """Get the cache key of the entry of a single connection of a user."""
+    return f"{_PRESENCE_KEY_PREFIX}:{user_id}:{connection}"
+
+
+async def _aget_live_connections(user_id: int) -> set[str]:
+    """Get the names of the connections of a user whose entries have not expired.
+
+    Args:
+        user_id: Primary key of the user.
+
+    Returns:
+        Names of the channels of the user's live connections.
+    """
+    connections = await cache.aget(_get_presence_key(user_id), ())
+    live = await cache.aget_many(
+        [_get_connection_key(user_id, connection) for connection in connections]
+    )
+    return {
+        connection
+        for connection in connections
+        if _get_connection_key(user_id, connection) in live
+    }
@@ -0,0 +1,111 @@
+"""Wire protocols of the chat's websocket connections.
+
+Clients not asking for any websocket subprotocol exchange one JSON
+object per text frame. Clients offering the `chat.msgpack.v1`
+subprotocol send msgpack-encoded objects in binary frames and receive
+binary frames with msgpack-encoded arrays of objects, as events sent to
+the same connection within a few milliseconds are coalesced into a
+single frame, see `chat.consumers.ChatConsumerBase.send_frame`.
+"""
+import json
+from typing import Any, Iterable, Optional, Union
+
+import msgpack
+
+MSGPACK_SUBPROTOCOL = "chat.msgpack.v1"
+
+
+class InvalidFrame(ValueError):
+    """Raised when a frame received from a client cannot be decoded."""
+
+
+class JsonProtocol:
+    """Protocol of text frames with a single JSON object each."""
+
+    subprotocol: Optional[str] = None
+    coalesces = False
+
+    def encode(self, frames: list[dict[str, Any]]) -> dict[str, Any]:
+        """Encode a frame sent to the client.
+
+        Args:
+            frames: A list with the single object sent in the frame.
+
+        Returns:
+            Keyword arguments of the consumer's `send` method.
+        """
+        (frame,) = frames
+        return {"text_data": json.dumps(frame)}
+
+    def decode(
+        self, text_data: Optional[str], bytes_data: Optional[bytes]
+    ) -> dict[str, Any]:
+        """Decode a frame received from the client.
+
+        Raises:
+            InvalidFrame: In case that the frame is not a JSON object.
+        """
+        try:
+            frame = json.loads(text_data if text_data is not None else bytes_data)
+        except ValueError as error:
+            raise InvalidFrame("Invalid JSON.") from error
+        if not isinstance(frame, dict):
+            raise InvalidFrame("Frames must be objects.")
+        return frame
+
+
+class MsgpackProtocol:
+    """Protocol of binary msgpack frames, coalescing objects sent to the client."""
+
+    subprotocol: Optional[str] = MSGPACK_SUBPROTOCOL
+    coalesces = True
+
+    def encode(self, frames: list[dict[str, Any]]) -> dict[str, Any]:
+        """Encode objects sent to the client in a single frame.
+
+        Args:
+            frames: Objects sent in the frame, in order.
+
+        Returns:
+            Keyword arguments of the consumer's `send` method.
+        """
+        return {"bytes_data": msgpack.packb(frames)}
+
+    def decode(
+        self, text_data: Optional[str], bytes_data: Optional[bytes]
+    ) -> dict[str, Any]:
+        """Decode a frame received from the client.
+
+        Raises:
+            InvalidFrame: In case that the frame is not a msgpack-encoded map.
+        """
+        if bytes_data is None:
+            raise InvalidFrame("Frames must be binary.")
+        try:
+            frame = msgpack.unpackb(bytes_data)
+        except ValueError as error:
+            raise InvalidFrame("Invalid msgpack.") from error
+        if not isinstance(frame, dict):
+            raise InvalidFrame("Frames must be maps.")
+        return frame
+
+
+JSON_PROTOCOL = JsonProtocol()
+PROTOCOLS = {MSGPACK_SUBPROTOCOL: MsgpackProtocol()}
+
+
+def negotiate(subprotocols: Iterable[str]) -> Union[JsonProtocol, MsgpackProtocol]:
+    """Choose the protocol of a connection.
+
+    Args:
+        subprotocols: Websocket subprotocols offered by the client,
+                        in the order of its preference.
+
+    Returns:
+        The first supported protocol offered by the client,
+        or the JSON protocol if none of them is supported.
+    """
+    for subprotocol in subprotocols:
+        if subprotocol in PROTOCOLS:
+            return PROTOCOLS[subprotocol]
+    return JSON_PROTOCOL
@@ -0,0 +1,84 @@
+"""Incremental counters of the messages users have not read yet.
+
+The `ReadMarker` of a user in a conversation is updated in two places:
+whenever a batch of messages is saved, the markers of the recipients
+are incremented with a single UPDATE per conversation, counting the
+batch's messages sent after their last read one, and whenever a
+user reads messages, the counter is recalculated from the messages sent
+after the last read one, using the index on the conversation and the
+message ID. Messages are only counted as unread if they were sent after
+the recipient's last read message, because buffered messages may be
+read before they are saved.
+"""
+from collections import defaultdict
+from typing import Iterable
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import ChatMessage, ReadMarker
+
+
+def count_unread(messages: Iterable[ChatMessage]) -> None:
+    """Increment the unread counters of the recipients of saved messages.
+
+    Args:
+        messages: Saved ChatMessage model instances with their conversations.
+    """
+    message_ids = defaultdict(list)
+    for message in messages:
+        conversation = message.conversation
+        recipient_id = (
+            conversation.tutor_id
+            if message.sender_id == conversation.student_id
+            else conversation.student_id
+        )
+        message_ids[(conversation.pk, recipient_id)].append(message.pk)
+    if not message_ids:
+        return
+    ReadMarker.objects.bulk_create(
+        [
+            ReadMarker(conversation_id=conversation_id, user_id=user_id)
+            for conversation_id, user_id in message_ids
+        ],
+        ignore_conflicts=True,
+    )
+    for (conversation_id, user_id), ids in message_ids.items():
+        saved = (
+            ChatMessage.objects.filter(id__in=ids, id__gt=OuterRef("last_read_id"))
+            .order_by()
+            .values("conversation")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        ReadMarker.objects.filter(
+            conversation_id=conversation_id, user_id=user_id, last_read_id__lt=max(ids)
+        ).update(unread_count=F("unread_count") + Subquery(saved))
+
+
+def mark_read(conversation_id: int, user_id: int, message_id: int) -> None:
+    """Mark the messages of a conversation up to a given one as read by a user.
+
+    Markers never move backwards, so marking an older message as read
+    does nothing.
+
+    Args:
+        conversation_id: ID of the Conversation.
+        user_id: Primary key of the reading user.
+        message_id: ID of the last message read by the user.
+    """
+    ReadMarker.objects.get_or_create(conversation_id=conversation_id, user_id=user_id)
+    unread = (
+        ChatMessage.objects.filter(conversation_id=conversation_id, id__gt=message_id)
+        .exclude(sender_id=user_id)
+        .order_by()
+        .values("conversation")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    ReadMarker.objects.filter(
+        conversation_id=conversation_id, user_id=user_id, last_read_id__lt=message_id
+    ).update(
+        last_read_id=message_id,
+        unread_count=Coalesce(Subquery(unread), Value(0)),
+    )
@@ -3,5 +3,6 @@ from django.urls import re_path
 from . import consumers
 
 websocket_urlpatterns = [
-    re_path(r"ws/chat/(?P<tutor_id>\d+)/(?P<student_id>\d+)/$", consumers.NewChatConsumer.as_asgi())
+    re_path(r"ws/chat/(?P<tutor_id>\d+)/(?P<student_id>\d+)/$", consumers.NewChatConsumer.as_asgi()),
+    re_path(r"ws/chat/$", consumers.UserChatConsumer.as_asgi()),
 ]
@@ -0,0 +1,17 @@
+"""Signal handlers keeping the cached authorization of chat participants up to date."""
+from typing import Any
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from chat.authorization import invalidate_membership
+from subscriptions.models import Subscription
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def invalidate_cached_membership(
+    sender: type, instance: Subscription, **kwargs: Any
+) -> None:
+    """Forget whether the Tutor and the Student of a changed Subscription can chat."""
+    invalidate_membership(instance.tutor_id, instance.student_id)
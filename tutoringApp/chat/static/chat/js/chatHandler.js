@@ -3,6 +3,14 @@ class chatHandler {
     static messageSendBtn = document.querySelector("div#chat-right_bottom-main-message-send-btn")
 
     static messagesMainDiv = document.querySelector("div.chat-right_bottom-main-chat")
+    static statusSpan = document.querySelector("span#chat-right_bottom-header-status")
+
+    // Heartbeats keep the user online, the server forgets users 30 seconds after the last one.
+    static heartbeatInterval = 10000
+    // Typing indicators are shown for as long as the server throttles the following ones.
+    static typingTimeout = 3000
+    // Read messages are reported at most once a second.
+    static readDelay = 1000
 
     static getMessageDiv(text, sender = true) {
         `<div class="chat-right_bottom-main-chat-message">
@@ -16,7 +24,7 @@ class chatHandler {
         const messageTextDiv = document.createElement("div")
         const classToAdd = sender ? "chat-right_bottom-main-chat-message-text_sender" : "chat-right_bottom-main-chat-message-text_receiver"
         messageTextDiv.setAttribute("class", `chat-right_bottom-main-chat-message-text ${classToAdd}`)
-        messageTextDiv.innerHTML = text
+        messageTextDiv.textContent = text
 
         messageDiv.appendChild(messageTextDiv)
 
@@ -24,36 +32,214 @@ class chatHandler {
     }
 
     constructor() {
-        this.tutor_id = JSON.parse(document.getElementById('tutor_id').textContent);
-        this.student_id = JSON.parse(document.getElementById('student_id').textContent);
+        this.conversation_id = JSON.parse(document.getElementById('conversation_id').textContent);
         this.current_user_id = JSON.parse(document.getElementById('current_user_id').textContent)
+        this.partner_id = JSON.parse(document.getElementById('partner_id').textContent)
+        this.presence_url = JSON.parse(document.getElementById('presence_url').textContent)
+
+        // Message IDs are sent as strings, as they do not fit in JavaScript numbers, and compared as BigInts.
+        this.oldestMessageId = null
+        this.newestMessageId = null
+        this.hasOlderMessages = false
+        this.loadingOlderMessages = false
+
+        this.partnerOnline = false
+        this.partnerTypingTimeout = null
+        this.lastTypingSent = 0
+        this.lastReadSent = null
+        this.readTimeout = null
+        // Live messages are ignored until the history requested after a resync arrives.
+        this.resyncing = false
+        this.throttledUntil = 0
+
+        this.connect()
+        setInterval(this.sendHeartbeat.bind(this), chatHandler.heartbeatInterval)
+
+        chatHandler.messagesMainDiv.addEventListener("scroll", this.messagesScrollHandler.bind(this))
+        chatHandler.messageSendBtn.addEventListener("click", this.messageSendBtnClickHandler.bind(this))
+        chatHandler.chatTextArea.addEventListener("input", this.chatTextAreaInputHandler.bind(this))
+        document.addEventListener("visibilitychange", this.scheduleRead.bind(this))
+    }
 
+    scheduleRead() {
+        if (this.readTimeout !== null || document.visibilityState !== "visible") {
+            return
+        }
+        this.readTimeout = setTimeout(() => {
+            this.readTimeout = null
+            if (this.chatSocket.readyState !== WebSocket.OPEN || this.newestMessageId === null || (this.lastReadSent !== null && BigInt(this.newestMessageId) <= BigInt(this.lastReadSent))) {
+                return
+            }
+            this.lastReadSent = this.newestMessageId
+            this.chatSocket.send(JSON.stringify({
+                "command": "read",
+                "conversation": this.conversation_id,
+                "message": this.newestMessageId
+            }));
+        }, chatHandler.readDelay)
+    }
+
+    fetchPresence() {
+        fetch(this.presence_url)
+            .then(response => response.json())
+            .then(data => {
+                this.partnerOnline = Boolean(data.presence[this.partner_id])
+                this.updateStatus()
+            })
+    }
+
+    updateStatus() {
+        if (this.partnerTypingTimeout !== null) {
+            chatHandler.statusSpan.textContent = "typing..."
+        } else {
+            chatHandler.statusSpan.textContent = this.partnerOnline ? "online" : "offline"
+        }
+    }
+
+    showPartnerTyping() {
+        clearTimeout(this.partnerTypingTimeout)
+        this.partnerTypingTimeout = setTimeout(() => {
+            this.partnerTypingTimeout = null
+            this.updateStatus()
+        }, chatHandler.typingTimeout)
+        this.updateStatus()
+    }
+
+    sendHeartbeat() {
+        if (this.chatSocket.readyState === WebSocket.OPEN) {
+            this.chatSocket.send(JSON.stringify({"command": "heartbeat"}))
+        }
+    }
+
+    connect() {
+        // A single socket carries every conversation of the user, frames are routed by conversation ID.
         this.chatSocket = new WebSocket(
             'ws://'
             + window.location.host
             + '/ws/chat/'
-            + this.tutor_id
-            + '/'
-            + this.student_id 
-            + '/'
         );
 
+        this.chatSocket.addEventListener("open", (e) => {
+            this.resync()
+        })
+
         this.chatSocket.addEventListener("message", (e) => {
-            const data = JSON.parse(e.data);            
-            const messageDiv = chatHandler.getMessageDiv(data.message, data.user_id == this.current_user_id)
-            chatHandler.messagesMainDiv.appendChild(messageDiv)
+            const data = JSON.parse(e.data);
+            if (data.type === "error" && data.code === "throttled") {
+                this.throttledUntil = Date.now() + data.retry_after * 1000
+                return
+            }
+            if (data.conversation !== this.conversation_id) {
+                return
+            }
+            if (data.type === "resync") {
+                // The server dropped events of the conversation because the client fell behind.
+                this.resync()
+            } else if (data.type === "history") {
+                this.resyncing = false
+                if (data.reset) {
+                    chatHandler.messagesMainDiv.replaceChildren()
+                    this.oldestMessageId = null
+                    this.newestMessageId = null
+                    this.hasOlderMessages = data.has_more
+                }
+                data.messages.forEach(message => this.appendMessage(message))
+                this.scheduleRead()
+            } else if (data.type === "older") {
+                this.prependMessages(data.messages)
+                this.hasOlderMessages = data.has_more
+                this.loadingOlderMessages = false
+            } else if (data.type === "message" && !this.resyncing) {
+                this.appendMessage(data)
+                this.scheduleRead()
+                if (data.user_id == this.partner_id && this.partnerTypingTimeout !== null) {
+                    clearTimeout(this.partnerTypingTimeout)
+                    this.partnerTypingTimeout = null
+                    this.updateStatus()
+                }
+            } else if (data.type === "presence" && data.user_id == this.partner_id) {
+                this.partnerOnline = data.online
+                this.updateStatus()
+            } else if (data.type === "typing" && data.user_id == this.partner_id) {
+                this.showPartnerTyping()
+            }
         })
 
-        this.chatSocket.addEventListener("close", e => console.error('Chat socket closed unexpectedly'))
+        this.chatSocket.addEventListener("close", e => {
+            console.error('Chat socket closed unexpectedly')
+            setTimeout(this.connect.bind(this), 1000)
+        })
+    }
 
-        chatHandler.messageSendBtn.addEventListener("click", this.messageSendBtnClickHandler.bind(this))
+    resync() {
+        // Only the messages sent after the last one received are asked for.
+        this.resyncing = true
+        this.chatSocket.send(JSON.stringify({
+            "command": "subscribe",
+            "conversation": this.conversation_id,
+            "after": this.newestMessageId
+        }));
+        // Presence changes may have been missed while disconnected or falling behind.
+        this.fetchPresence()
+    }
+
+    appendMessage(message) {
+        if (this.newestMessageId !== null && BigInt(message.id) <= BigInt(this.newestMessageId)) {
+            return
+        }
+        const messageDiv = chatHandler.getMessageDiv(message.message, message.user_id == this.current_user_id)
+        chatHandler.messagesMainDiv.appendChild(messageDiv)
+        this.newestMessageId = message.id
+        if (this.oldestMessageId === null) {
+            this.oldestMessageId = message.id
+        }
+    }
+
+    prependMessages(messages) {
+        const previousHeight = chatHandler.messagesMainDiv.scrollHeight
+        messages.slice().reverse().forEach(message => {
+            const messageDiv = chatHandler.getMessageDiv(message.message, message.user_id == this.current_user_id)
+            chatHandler.messagesMainDiv.prepend(messageDiv)
+        })
+        if (messages.length) {
+            this.oldestMessageId = messages[0].id
+        }
+        chatHandler.messagesMainDiv.scrollTop += chatHandler.messagesMainDiv.scrollHeight - previousHeight
+    }
+
+    messagesScrollHandler(e) {
+        if (chatHandler.messagesMainDiv.scrollTop > 0 || !this.hasOlderMessages || this.loadingOlderMessages) {
+            return
+        }
+        this.loadingOlderMessages = true
+        this.chatSocket.send(JSON.stringify({
+            "command": "load_older",
+            "conversation": this.conversation_id,
+            "before": this.oldestMessageId
+        }));
+    }
+
+    chatTextAreaInputHandler(e) {
+        // The server throttles typing indicators as well, this only spares the socket.
+        if (this.chatSocket.readyState !== WebSocket.OPEN || Date.now() - this.lastTypingSent < chatHandler.typingTimeout) {
+            return
+        }
+        this.lastTypingSent = Date.now()
+        this.chatSocket.send(JSON.stringify({
+            "command": "typing",
+            "conversation": this.conversation_id
+        }));
     }
 
     messageSendBtnClickHandler(e) {
+        // Messages sent while throttled would be rejected, so they are kept in the text area.
+        if (Date.now() < this.throttledUntil) {
+            return
+        }
         const message = chatHandler.chatTextArea.value
         this.chatSocket.send(JSON.stringify({
-            "message": message,
-            "user_id": this.current_user_id
+            "conversation": this.conversation_id,
+            "message": message
         }));
         chatHandler.chatTextArea.value = ''
     }
@@ -0,0 +1,237 @@
+"""Tests for the authorization and multiplexing of chat connections."""
+import json
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from chat.models import Conversation
+from chat.routing import websocket_urlpatterns
+from chat.views.chat import _get_conversation
+from profiles.models import Profile
+from subscriptions.models import Subscription
+from tutors.models import Subject
+from utils.testing import TestCaseProfileUtils
+from utils.testing.settings import IN_MEMORY_CHANNEL_LAYERS, LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class TestChatConsumers(TestCaseProfileUtils):
+    """Tests for the NewChatConsumer and the UserChatConsumer."""
+
+    def setUp(self):
+        """Subscribe two Students to a Tutor."""
+        cache.clear()
+        self._register_user("tutor1", student=False)
+        self._register_user("student1")
+        self._register_user("student2")
+        self._register_user("student3")
+        profiles = Profile.objects.select_related("user")
+        self.tutor = profiles.get(user__username="tutor1")
+        self.student1 = profiles.get(user__username="student1")
+        self.student2 = profiles.get(user__username="student2")
+        self.student3 = profiles.get(user__username="student3")
+        self.subscription = Subscription.objects.create(
+            tutor=self.tutor, student=self.student1, subject=Subject.objects.get(pk=1)
+        )
+        Subscription.objects.create(
+            tutor=self.tutor, student=self.student2, subject=Subject.objects.get(pk=1)
+        )
+
+    def _communicator(self, path, profile):
+        """Create a communicator connecting as the user of a Profile."""
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), path)
+        communicator.scope["user"] = profile.user
+        return communicator
+
+    def _connects(self, tutor, student, profile):
+        """Check whether a user can connect to the conversation of a pair."""
+
+        async def connect():
+            communicator = self._communicator(
+                f"/ws/chat/{tutor.pk}/{student.pk}/", profile
+            )
+            connected, _ = await communicator.connect()
+            await communicator.disconnect()
+            return connected
+
+        return async_to_sync(connect)()
+
+    def test_participants_of_subscribed_pair_connect(self):
+        self.assertTrue(self._connects(self.tutor, self.student1, self.student1))
+        self.assertTrue(self._connects(self.tutor, self.student1, self.tutor))
+
+    def test_other_users_rejected(self):
+        self.assertFalse(self._connects(self.tutor, self.student1, self.student2))
+
+    def test_pair_without_subscription_rejected(self):
+        self.assertFalse(self._connects(self.tutor, self.student3, self.student3))
+
+    def test_membership_cached_between_connections(self):
+        self._connects(self.tutor, self.student1, self.student1)
+
+        with CaptureQueriesContext(connection) as queries:
+            self._connects(self.tutor, self.student1, self.student1)
+
+        self.assertFalse(
+            any(Subscription._meta.db_table in query["sql"] for query in queries)
+        )
+
+    def test_deleted_subscription_invalidates_cached_membership(self):
+        self._connects(self.tutor, self.student1, self.student1)
+
+        self.subscription.delete()
+
+        self.assertFalse(self._connects(self.tutor, self.student1, self.student1))
+
+    def test_sender_taken_from_connection(self):
+        async def chat():
+            communicator = self._communicator(
+                f"/ws/chat/{self.tutor.pk}/{self.student1.pk}/", self.student1
+            )
+            await communicator.connect()
+            await communicator.receive_json_from()
+            await communicator.send_to(
+                text_data=json.dumps({"message": "Hi", "user_id": self.tutor.user_id})
+            )
+            frame = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return frame
+
+        self.assertEqual(async_to_sync(chat)()["user_id"], self.student1.user_id)
+
+    def test_single_connection_receives_every_conversation(self):
+        async def chat():
+            tutor = self._communicator("/ws/chat/", self.tutor)
+            await tutor.connect()
+            conversations = await tutor.receive_json_from()
+            student1 = self._communicator("/ws/chat/", self.student1)
+            await student1.connect()
+            (conversation1,) = (await student1.receive_json_from())["conversations"]
+            student2 = self._communicator(
+                f"/ws/chat/{self.tutor.pk}/{self.student2.pk}/", self.student2
+            )
+            await student2.connect()
+            await student2.receive_json_from()
+            await student1.send_to(
+                text_data=json.dumps(
+                    {"conversation": conversation1["id"], "message": "Hi 1"}
+                )
+            )
+            await student2.send_to(text_data=json.dumps({"message": "Hi 2"}))
+            received = []
+            while len(received) < 2:
+                frame = await tutor.receive_json_from()
+                if frame["type"] == "message":
+                    received.append(frame)
+            for communicator in (tutor, student1, student2):
+                await communicator.disconnect()
+            return conversations, received
+
+        conversations, received = async_to_sync(chat)()
+
+        conversation_ids = {
+            conversation.student_id: conversation.pk
+            for conversation in Conversation.objects.all()
+        }
+        self.assertEqual(
+            sorted(
+                conversation["id"] for conversation in conversations["conversations"]
+            ),
+            sorted(conversation_ids.values()),
+        )
+        self.assertEqual(
+            sorted((frame["conversation"], frame["message"]) for frame in received),
+            [
+                (conversation_ids[self.student1.pk], "Hi 1"),
+                (conversation_ids[self.student2.pk], "Hi 2"),
+            ],
+        )
+
+    def test_unsubscribed_conversation_not_received(self):
+        async def chat():
+            tutor = self._communicator("/ws/chat/", self.tutor)
+            await tutor.connect()
+            conversations = (await tutor.receive_json_from())["conversations"]
+            await tutor.send_to(
+                text_data=json.dumps(
+                    {"command": "unsubscribe", "conversation": conversations[0]["id"]}
+                )
+            )
+            await tutor.send_to(
+                text_data=json.dumps(
+                    {"conversation": conversations[0]["id"], "message": "Hi"}
+                )
+            )
+            error = await tutor.receive_json_from()
+            await tutor.send_to(
+                text_data=json.dumps(
+                    {"command": "subscribe", "conversation": conversations[0]["id"]}
+                )
+            )
+            history = await tutor.receive_json_from()
+            await tutor.disconnect()
+            return error, history
+
+        error, history = async_to_sync(chat)()
+
+        self.assertEqual(error["type"], "error")
+        self.assertEqual(history["type"], "history")
+
+    def test_subscribing_to_foreign_conversation_refused(self):
+        conversation = Conversation.objects.create(
+            tutor=self.tutor, student=self.student1
+        )
+
+        async def subscribe():
+            student2 = self._communicator("/ws/chat/", self.student2)
+            await student2.connect()
+            await student2.receive_json_from()
+            await student2.send_to(
+                text_data=json.dumps(
+                    {"command": "subscribe", "conversation": conversation.pk}
+                )
+            )
+            frame = await student2.receive_json_from()
+            await student2.disconnect()
+            return frame
+
+        self.assertEqual(async_to_sync(subscribe)()["type"], "error")
+
+    def test_request_with_invalid_conversation_refused(self):
+        async def send():
+            communicator = self._communicator("/ws/chat/", self.student1)
+            await communicator.connect()
+            await communicator.receive_json_from()
+            frames = []
+            for conversation in ([1], {"id": 1}, "1"):
+                await communicator.send_to(
+                    text_data=json.dumps(
+                        {"conversation": conversation, "message": "Hi"}
+                    )
+                )
+                frames.append(await communicator.receive_json_from())
+            await communicator.disconnect()
+            return frames
+
+        self.assertEqual(
+            [frame["code"] for frame in async_to_sync(send)()],
+            ["invalid_request"] * 3,
+        )
+
+    def test_chat_window_of_pair_without_subscription_creates_no_conversation(self):
+        self.assertIsNone(_get_conversation(self.tutor.pk, self.student3.pk))
+        self.assertFalse(Conversation.objects.exists())
+
+    def test_chat_window_of_subscribed_pair_creates_conversation(self):
+        conversation = _get_conversation(self.tutor.pk, self.student1.pk)
+
+        self.assertEqual(
+            (conversation.tutor_id, conversation.student_id),
+            (self.tutor.pk, self.student1.pk),
+        )
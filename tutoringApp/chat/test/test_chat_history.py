@@ -0,0 +1,202 @@
+"""Tests for paging through conversations' history."""
+import json
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.test import override_settings
+from django.urls import reverse
+
+from chat.history import get_history_page, get_messages_after, parse_message_id
+from chat.models import ChatMessage, Conversation
+from chat.routing import websocket_urlpatterns
+from profiles.models import Profile
+from subscriptions.models import Subscription
+from tutors.models import Subject
+from utils.testing import TestCaseProfileUtils
+from utils.testing.settings import IN_MEMORY_CHANNEL_LAYERS, LOCMEM_CACHES
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS,
+    CHAT_HISTORY_PAGE_SIZE=3,
+)
+class TestChatHistory(TestCaseProfileUtils):
+    """Tests for the history endpoint and the history frames of the NewChatConsumer."""
+
+    def setUp(self):
+        """Create a Conversation with 5 messages."""
+        self._register_user("tutor1", student=False)
+        self._register_user("student1")
+        self._register_user("student2")
+        self.tutor = Profile.objects.select_related("user").get(user__username="tutor1")
+        self.student = Profile.objects.select_related("user").get(
+            user__username="student1"
+        )
+        Subscription.objects.create(
+            tutor=self.tutor, student=self.student, subject=Subject.objects.get(pk=1)
+        )
+        self.conversation = Conversation.objects.create(
+            tutor=self.tutor, student=self.student
+        )
+        self.messages = ChatMessage.objects.bulk_create(
+            ChatMessage(
+                conversation=self.conversation,
+                sender_id=self.student.user_id,
+                text=f"Message {number}",
+            )
+            for number in range(5)
+        )
+        self.ids = [message.pk for message in self.messages]
+
+    def _communicator(self, query=""):
+        """Create a communicator connecting the Student to the conversation."""
+        communicator = WebsocketCommunicator(
+            URLRouter(websocket_urlpatterns),
+            f"/ws/chat/{self.tutor.pk}/{self.student.pk}/{query}",
+        )
+        communicator.scope["user"] = self.student.user
+        return communicator
+
+    def test_latest_page_returned(self):
+        page = get_history_page(self.conversation.pk)
+
+        self.assertEqual(
+            [int(message["id"]) for message in page.messages], self.ids[2:]
+        )
+        self.assertTrue(page.has_more)
+
+    def test_older_page_returned_for_cursor(self):
+        page = get_history_page(self.conversation.pk, before=self.ids[2])
+
+        self.assertEqual(
+            [int(message["id"]) for message in page.messages], self.ids[:2]
+        )
+        self.assertFalse(page.has_more)
+
+    def test_pending_messages_merged_into_page(self):
+        pending = ChatMessage(
+            conversation=self.conversation, sender_id=self.tutor.user_id, text="Pending"
+        )
+
+        page = get_history_page(
+            self.conversation.pk, pending=[pending, self.messages[4]]
+        )
+
+        self.assertEqual(
+            [int(message["id"]) for message in page.messages],
+            [self.ids[3], self.ids[4], pending.pk],
+        )
+
+    def test_missed_messages_returned(self):
+        self.assertEqual(
+            [
+                int(message["id"])
+                for message in get_messages_after(self.conversation.pk, self.ids[2])
+            ],
+            self.ids[3:],
+        )
+        self.assertIsNone(get_messages_after(self.conversation.pk, self.ids[0]))
+
+    def test_history_endpoint_pages_backwards(self):
+        self._login_user("tutor1")
+        url = reverse(
+            "chat:history",
+            kwargs={"tutor_id": self.tutor.pk, "student_id": self.student.pk},
+        )
+
+        response = self.client.get(url, {"before": self.ids[4], "limit": 2})
+
+        self.assertEqual(
+            [message["message"] for message in response.json()["messages"]],
+            ["Message 2", "Message 3"],
+        )
+        self.assertTrue(response.json()["has_more"])
+
+    def test_invalid_message_ids_rejected(self):
+        for value in ("\u00b2", "-1", "1.5", str(2**63), 2**63, True, None):
+            with self.subTest(value=value):
+                self.assertIsNone(parse_message_id(value))
+        self.assertEqual(parse_message_id(str(2**63 - 1)), 2**63 - 1)
+
+    def test_history_endpoint_rejects_invalid_cursor(self):
+        self._login_user("tutor1")
+        url = reverse(
+            "chat:history",
+            kwargs={"tutor_id": self.tutor.pk, "student_id": self.student.pk},
+        )
+
+        for before in ("\u00b2", "99999999999999999999"):
+            with self.subTest(before=before):
+                self.assertEqual(
+                    self.client.get(url, {"before": before}).status_code, 400
+                )
+
+    def test_history_endpoint_forbidden_for_other_users(self):
+        self._login_user("student2")
+
+        response = self.client.get(
+            reverse(
+                "chat:history",
+                kwargs={"tutor_id": self.tutor.pk, "student_id": self.student.pk},
+            )
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_latest_page_sent_on_connect_and_older_on_command(self):
+        async def chat():
+            communicator = self._communicator()
+            await communicator.connect()
+            history = await communicator.receive_json_from()
+            await communicator.send_to(
+                text_data=json.dumps(
+                    {"command": "load_older", "before": history["messages"][0]["id"]}
+                )
+            )
+            older = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return history, older
+
+        history, older = async_to_sync(chat)()
+
+        self.assertEqual(history["type"], "history")
+        self.assertTrue(history["reset"])
+        self.assertEqual(
+            [int(message["id"]) for message in history["messages"]], self.ids[2:]
+        )
+        self.assertEqual(older["type"], "older")
+        self.assertEqual(
+            [int(message["id"]) for message in older["messages"]], self.ids[:2]
+        )
+
+    def test_client_with_invalid_last_seen_message_gets_latest_page(self):
+        async def reconnect():
+            communicator = self._communicator("?after=%C2%B2")
+            await communicator.connect()
+            history = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return history
+
+        history = async_to_sync(reconnect)()
+
+        self.assertTrue(history["reset"])
+        self.assertEqual(
+            [int(message["id"]) for message in history["messages"]], self.ids[2:]
+        )
+
+    def test_reconnecting_client_resumes_from_last_seen_message(self):
+        async def reconnect():
+            communicator = self._communicator(f"?after={self.ids[3]}")
+            await communicator.connect()
+            history = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return history
+
+        history = async_to_sync(reconnect)()
+
+        self.assertFalse(history["reset"])
+        self.assertEqual(
+            [int(message["id"]) for message in history["messages"]], [self.ids[4]]
+        )
@@ -0,0 +1,152 @@
+"""Tests for the rate limits of chat clients and the outbox of slow clients."""
+import asyncio
+import json
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from chat.consumers import UserChatConsumer
+from chat.limits import TokenBucket, counters
+from chat.routing import websocket_urlpatterns
+from profiles.models import Profile
+from utils.testing import TestCaseProfileUtils
+from utils.testing.settings import IN_MEMORY_CHANNEL_LAYERS, LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES, CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class TestChatLimits(TestCaseProfileUtils):
+    """Tests for throttling clients, dropping their events and reading the counters."""
+
+    def setUp(self):
+        """Register a Student."""
+        cache.clear()
+        self._register_user("student1")
+        self.student = Profile.objects.select_related("user").get(
+            user__username="student1"
+        )
+
+    async def _connect(self):
+        """Connect the Student to the Student's chat.
+
+        Returns:
+            The communicator, after receiving the list of conversations.
+        """
+        communicator = WebsocketCommunicator(
+            URLRouter(websocket_urlpatterns), "/ws/chat/"
+        )
+        communicator.scope["user"] = self.student.user
+        await communicator.connect()
+        await communicator.receive_json_from()
+        return communicator
+
+    async def _send_requests(self, communicator, count):
+        """Send requests answered with an error and receive the answers.
+
+        Returns:
+            Codes of the received errors.
+        """
+        for _ in range(count):
+            await communicator.send_to(text_data=json.dumps({"conversation": 0}))
+        codes = []
+        while not await communicator.receive_nothing():
+            codes.append((await communicator.receive_json_from())["code"])
+        return codes
+
+    def test_bucket_refused_once_empty(self):
+        bucket = TokenBucket(rate=0.001, capacity=2)
+
+        self.assertEqual(
+            [bucket.consume() for _ in range(3)],
+            [True, True, False],
+        )
+        self.assertGreater(bucket.get_wait_time(), 0)
+
+    @override_settings(CHAT_CONNECTION_RATE=0.001, CHAT_CONNECTION_BURST=2)
+    def test_throttled_error_sent_once(self):
+        throttled = counters.throttled
+
+        async def chat():
+            communicator = await self._connect()
+            codes = await self._send_requests(communicator, 4)
+            await communicator.disconnect()
+            return codes
+
+        self.assertEqual(
+            async_to_sync(chat)(), ["not_subscribed", "not_subscribed", "throttled"]
+        )
+        self.assertEqual(counters.throttled - throttled, 2)
+
+    @override_settings(CHAT_USER_RATE=0.001, CHAT_USER_BURST=2)
+    def test_user_limit_shared_by_connections(self):
+        async def chat():
+            first, second = await self._connect(), await self._connect()
+            codes = [
+                await self._send_requests(first, 2),
+                await self._send_requests(second, 1),
+            ]
+            for communicator in (first, second):
+                await communicator.disconnect()
+            return codes
+
+        self.assertEqual(
+            async_to_sync(chat)(), [["not_subscribed", "not_subscribed"], ["throttled"]]
+        )
+
+    @override_settings(CHAT_OUTBOX_SIZE=2)
+    def test_events_of_slow_client_coalesced_or_dropped(self):
+        dropped, coalesced = counters.dropped, counters.coalesced
+        consumer = UserChatConsumer()
+        sent = []
+        writable = asyncio.Event()
+
+        async def send(text_data=None, bytes_data=None, close=False):
+            await writable.wait()
+            sent.append(json.loads(text_data))
+
+        consumer.send = send
+
+        async def chat():
+            for event in (
+                {"type": "presence", "conversation": 1, "user_id": 2, "online": True},
+                {"type": "message", "conversation": 1, "id": "1", "user_id": 2},
+                {"type": "presence", "conversation": 1, "user_id": 2, "online": False},
+                {"type": "message", "conversation": 1, "id": "2", "user_id": 2},
+                {"type": "message", "conversation": 1, "id": "3", "user_id": 2},
+                {"type": "typing", "conversation": 3, "user_id": 4},
+            ):
+                await consumer.send_frame(event)
+            writer = consumer._writer
+            writable.set()
+            await writer
+
+        async_to_sync(chat)()
+
+        self.assertEqual(
+            [(frame["type"], frame.get("id"), frame.get("online")) for frame in sent],
+            [
+                ("presence", None, False),
+                ("message", "1", None),
+                ("resync", None, None),
+            ],
+        )
+        self.assertEqual(sent[-1]["conversation"], 1)
+        self.assertEqual(
+            (counters.dropped - dropped, counters.coalesced - coalesced), (3, 1)
+        )
+
+    def test_counters_returned_to_staff(self):
+        User.objects.filter(pk=self.student.user_id).update(is_staff=True)
+
+        response = self.client.get(reverse("chat:counters"))
+
+        self.assertEqual(set(response.json()), {"throttled", "dropped", "coalesced"})
+
+    def test_counters_forbidden_for_other_users(self):
+        response = self.client.get(reverse("chat:counters"))
+
+        self.assertEqual(response.status_code, 403)
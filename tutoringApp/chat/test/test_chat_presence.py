@@ -0,0 +1,196 @@
+"""Tests for the presence and the typing indicators of chat users."""
+import json
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from chat.presence import connect_user, disconnect_user, get_presence, heartbeat
+from chat.routing import websocket_urlpatterns
+from profiles.models import Profile
+from subscriptions.models import Subscription
+from tutors.models import Subject
+from utils.testing import TestCaseProfileUtils
+from utils.testing.settings import IN_MEMORY_CHANNEL_LAYERS, LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES, CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class TestChatPresence(TestCaseProfileUtils):
+    """Tests for broadcasting presence and typing indicators and for the presence endpoint."""
+
+    def setUp(self):
+        """Subscribe two Students to a Tutor."""
+        cache.clear()
+        self._register_user("tutor1", student=False)
+        self._register_user("student1")
+        self._register_user("student2")
+        profiles = Profile.objects.select_related("user")
+        self.tutor = profiles.get(user__username="tutor1")
+        self.student1 = profiles.get(user__username="student1")
+        self.student2 = profiles.get(user__username="student2")
+        for student in (self.student1, self.student2):
+            Subscription.objects.create(
+                tutor=self.tutor, student=student, subject=Subject.objects.get(pk=1)
+            )
+
+    async def _connect(self, profile):
+        """Connect the user of a Profile to the user's chat.
+
+        Returns:
+            The communicator and the list of the user's conversations.
+        """
+        communicator = WebsocketCommunicator(
+            URLRouter(websocket_urlpatterns), "/ws/chat/"
+        )
+        communicator.scope["user"] = profile.user
+        await communicator.connect()
+        frame = await communicator.receive_json_from()
+        return communicator, frame["conversations"]
+
+    def test_connections_tracked(self):
+        async def connect():
+            return [
+                await connect_user(self.student1.pk, "first"),
+                await connect_user(self.student1.pk, "second"),
+                await disconnect_user(self.student1.pk, "first"),
+                get_presence([self.student1.pk, self.student2.pk]),
+                await disconnect_user(self.student1.pk, "second"),
+            ]
+
+        self.assertEqual(
+            async_to_sync(connect)(),
+            [
+                True,
+                False,
+                False,
+                {self.student1.pk: True, self.student2.pk: False},
+                True,
+            ],
+        )
+
+    def test_only_changes_of_presence_broadcast(self):
+        async def chat():
+            tutor, _ = await self._connect(self.tutor)
+            student, _ = await self._connect(self.student1)
+            online = await tutor.receive_json_from()
+            second_student, _ = await self._connect(self.student1)
+            await second_student.disconnect()
+            nothing = await tutor.receive_nothing()
+            await student.disconnect()
+            offline = await tutor.receive_json_from()
+            await tutor.disconnect()
+            return online, nothing, offline
+
+        online, nothing, offline = async_to_sync(chat)()
+
+        self.assertEqual(
+            (online["type"], online["user_id"], online["online"]),
+            ("presence", self.student1.pk, True),
+        )
+        self.assertTrue(nothing)
+        self.assertEqual(
+            (offline["type"], offline["user_id"], offline["online"]),
+            ("presence", self.student1.pk, False),
+        )
+
+    def test_expired_presence_restored_by_heartbeat(self):
+        async def chat():
+            student, _ = await self._connect(self.student1)
+            tutor, _ = await self._connect(self.tutor)
+            await cache.adelete(f"chat:presence:{self.student1.pk}")
+            await student.send_to(text_data=json.dumps({"command": "heartbeat"}))
+            online = await tutor.receive_json_from()
+            await student.send_to(text_data=json.dumps({"command": "heartbeat"}))
+            nothing = await tutor.receive_nothing()
+            for communicator in (tutor, student):
+                await communicator.disconnect()
+            return online, nothing
+
+        online, nothing = async_to_sync(chat)()
+
+        self.assertEqual((online["type"], online["online"]), ("presence", True))
+        self.assertTrue(nothing)
+
+    def test_expired_connection_not_kept_online(self):
+        async def connect():
+            await connect_user(self.student1.pk, "dropped")
+            # The connection's entry expires after its server crashed.
+            await cache.adelete(f"chat:presence:{self.student1.pk}:dropped")
+            offline = get_presence([self.student1.pk])
+            return offline, await connect_user(self.student1.pk, "new")
+
+        self.assertEqual(async_to_sync(connect)(), ({self.student1.pk: False}, True))
+
+    def test_lost_connection_added_back_by_heartbeat(self):
+        async def connect():
+            await connect_user(self.student1.pk, "first")
+            await connect_user(self.student1.pk, "second")
+            # A concurrent update overwrote the list with only the first connection.
+            await cache.aset(f"chat:presence:{self.student1.pk}", {"first"})
+            await disconnect_user(self.student1.pk, "first")
+            lost = get_presence([self.student1.pk])
+            online = await heartbeat(self.student1.pk, "second")
+            return lost, online, get_presence([self.student1.pk])
+
+        self.assertEqual(
+            async_to_sync(connect)(),
+            ({self.student1.pk: False}, True, {self.student1.pk: True}),
+        )
+
+    def test_typing_throttled_per_user(self):
+        async def chat():
+            student, (conversation,) = await self._connect(self.student1)
+            second_student, _ = await self._connect(self.student1)
+            tutor, _ = await self._connect(self.tutor)
+            for communicator in (student, student, second_student):
+                await communicator.send_to(
+                    text_data=json.dumps(
+                        {"command": "typing", "conversation": conversation["id"]}
+                    )
+                )
+            typing = await tutor.receive_json_from()
+            nothing = await tutor.receive_nothing()
+            for communicator in (tutor, student, second_student):
+                await communicator.disconnect()
+            return conversation, typing, nothing
+
+        conversation, typing, nothing = async_to_sync(chat)()
+
+        self.assertEqual(
+            typing,
+            {
+                "type": "typing",
+                "conversation": conversation["id"],
+                "user_id": self.student1.pk,
+            },
+        )
+        self.assertTrue(nothing)
+
+    def test_presence_of_partners_returned(self):
+        async def connect():
+            await connect_user(self.student1.pk, "first")
+
+        async_to_sync(connect)()
+        self._login_user("tutor1")
+
+        response = self.client.get(reverse("chat:presence"))
+
+        self.assertEqual(
+            response.json(),
+            {
+                "presence": {
+                    str(self.student1.pk): True,
+                    str(self.student2.pk): False,
+                }
+            },
+        )
+
+    def test_presence_requires_login(self):
+        self.client.logout()
+
+        response = self.client.get(reverse("chat:presence"))
+
+        self.assertEqual(response.status_code, 403)
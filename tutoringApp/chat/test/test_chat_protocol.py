@@ -0,0 +1,187 @@
+"""Tests for the negotiation and the encodings of chat protocols."""
+import json
+
+import msgpack
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from chat.protocol import JSON_PROTOCOL, MSGPACK_SUBPROTOCOL, negotiate
+from chat.routing import websocket_urlpatterns
+from profiles.models import Profile
+from subscriptions.models import Subscription
+from tutors.models import Subject
+from utils.testing import TestCaseProfileUtils
+from utils.testing.settings import IN_MEMORY_CHANNEL_LAYERS, LOCMEM_CACHES
+
+
+class TestNegotiate(SimpleTestCase):
+    """Tests for choosing the protocol of a connection."""
+
+    def test_json_without_subprotocols(self):
+        self.assertIs(negotiate([]), JSON_PROTOCOL)
+
+    def test_unknown_subprotocols_ignored(self):
+        self.assertIs(negotiate(["chat.unknown", "graphql-ws"]), JSON_PROTOCOL)
+
+    def test_first_supported_subprotocol_chosen(self):
+        self.assertEqual(
+            negotiate(["chat.unknown", MSGPACK_SUBPROTOCOL]).subprotocol,
+            MSGPACK_SUBPROTOCOL,
+        )
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS,
+    CHAT_COALESCE_INTERVAL=100,
+    CHAT_COALESCE_MAX_FRAMES=100,
+)
+class TestChatProtocol(TestCaseProfileUtils):
+    """Tests for the msgpack protocol of the chat consumers."""
+
+    def setUp(self):
+        """Subscribe a Student to a Tutor."""
+        cache.clear()
+        self._register_user("tutor1", student=False)
+        self._register_user("student1")
+        profiles = Profile.objects.select_related("user")
+        self.tutor = profiles.get(user__username="tutor1")
+        self.student = profiles.get(user__username="student1")
+        Subscription.objects.create(
+            tutor=self.tutor, student=self.student, subject=Subject.objects.get(pk=1)
+        )
+
+    def _communicator(self, profile, subprotocols=None):
+        """Create a communicator connecting to the user's chat as the user of a Profile."""
+        communicator = WebsocketCommunicator(
+            URLRouter(websocket_urlpatterns), "/ws/chat/", subprotocols=subprotocols
+        )
+        communicator.scope["user"] = profile.user
+        return communicator
+
+    def _send_burst(self, messages):
+        """Send messages from a JSON connection and receive them over a msgpack one.
+
+        Returns:
+            The frames received over the msgpack connection, decoded.
+        """
+
+        async def chat():
+            # The Student connects first, so that the Tutor does not receive
+            # the presence of the Student together with the messages.
+            student = self._communicator(self.student)
+            await student.connect()
+            (conversation,) = (await student.receive_json_from())["conversations"]
+            tutor = self._communicator(self.tutor, [MSGPACK_SUBPROTOCOL])
+            await tutor.connect()
+            frames = [msgpack.unpackb(await tutor.receive_from())]
+            for message in messages:
+                await student.send_to(
+                    text_data=json.dumps(
+                        {"conversation": conversation["id"], "message": message}
+                    )
+                )
+            received = 0
+            while received < len(messages):
+                frames.append(msgpack.unpackb(await tutor.receive_from()))
+                received += len(frames[-1])
+            for communicator in (tutor, student):
+                await communicator.disconnect()
+            return frames
+
+        return async_to_sync(chat)()
+
+    def test_msgpack_subprotocol_accepted(self):
+        async def connect():
+            communicator = self._communicator(
+                self.student, ["chat.unknown", MSGPACK_SUBPROTOCOL]
+            )
+            _, subprotocol = await communicator.connect()
+            frame = await communicator.receive_output()
+            await communicator.disconnect()
+            return subprotocol, frame
+
+        subprotocol, frame = async_to_sync(connect)()
+
+        self.assertEqual(subprotocol, MSGPACK_SUBPROTOCOL)
+        (conversations,) = msgpack.unpackb(frame["bytes"])
+        self.assertEqual(conversations["type"], "conversations")
+
+    def test_burst_coalesced_into_single_frame(self):
+        frames = self._send_burst(["Hi 1", "Hi 2", "Hi 3"])
+
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(
+            [message["message"] for message in frames[1]], ["Hi 1", "Hi 2", "Hi 3"]
+        )
+
+    @override_settings(CHAT_COALESCE_MAX_FRAMES=2)
+    def test_full_frame_sent_right_away(self):
+        frames = self._send_burst(["Hi 1", "Hi 2", "Hi 3", "Hi 4"])
+
+        self.assertEqual([len(frame) for frame in frames[1:]], [2, 2])
+
+    def test_msgpack_requests_handled(self):
+        async def chat():
+            student = self._communicator(self.student, [MSGPACK_SUBPROTOCOL])
+            await student.connect()
+            (conversations,) = msgpack.unpackb(await student.receive_from())
+            (conversation,) = conversations["conversations"]
+            await student.send_to(
+                bytes_data=msgpack.packb(
+                    {"conversation": conversation["id"], "message": "Hi"}
+                )
+            )
+            (frame,) = msgpack.unpackb(await student.receive_from())
+            await student.disconnect()
+            return frame
+
+        frame = async_to_sync(chat)()
+
+        self.assertEqual(frame["type"], "message")
+        self.assertEqual(frame["message"], "Hi")
+        self.assertEqual(frame["user_id"], self.student.user_id)
+
+    def test_invalid_frames_answered_with_errors(self):
+        async def chat():
+            student = self._communicator(self.student, [MSGPACK_SUBPROTOCOL])
+            await student.connect()
+            await student.receive_from()
+            await student.send_to(bytes_data=b"\xc1")
+            await student.send_to(text_data="{}")
+            await student.send_to(bytes_data=msgpack.packb([1, 2]))
+            errors = []
+            while len(errors) < 3:
+                errors.extend(msgpack.unpackb(await student.receive_from()))
+            await student.disconnect()
+            return errors
+
+        errors = async_to_sync(chat)()
+
+        self.assertEqual([error["type"] for error in errors], ["error"] * 3)
+
+    def test_json_connection_sends_frame_per_event(self):
+        async def chat():
+            student = self._communicator(self.student)
+            _, subprotocol = await student.connect()
+            (conversation,) = (await student.receive_json_from())["conversations"]
+            await student.send_to(text_data="not JSON")
+            error = await student.receive_json_from()
+            for message in ("Hi 1", "Hi 2"):
+                await student.send_to(
+                    text_data=json.dumps(
+                        {"conversation": conversation["id"], "message": message}
+                    )
+                )
+            frames = [await student.receive_json_from() for _ in range(2)]
+            await student.disconnect()
+            return subprotocol, error, frames
+
+        subprotocol, error, frames = async_to_sync(chat)()
+
+        self.assertIsNone(subprotocol)
+        self.assertEqual(error["type"], "error")
+        self.assertEqual([frame["message"] for frame in frames], ["Hi 1", "Hi 2"])
@@ -0,0 +1,168 @@
+"""Tests for persisting chat messages through the write-behind buffer."""
+import asyncio
+import json
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from chat.buffer import MessageBuffer
+from chat.models import ChatMessage, Conversation, _get_worker_id, generate_message_id
+from chat.routing import websocket_urlpatterns
+from profiles.models import Profile
+from subscriptions.models import Subscription
+from tutors.models import Subject
+from utils.testing import TestCaseProfileUtils
+from utils.testing.settings import IN_MEMORY_CHANNEL_LAYERS
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class TestMessageBuffer(TestCaseProfileUtils):
+    """Tests for saving messages sent through the NewChatConsumer."""
+
+    def setUp(self):
+        """Create a Tutor and a Student with a Conversation between them."""
+        self._register_user("tutor1", student=False)
+        self._register_user("student1")
+        self.tutor = Profile.objects.select_related("user").get(user__username="tutor1")
+        self.student = Profile.objects.select_related("user").get(
+            user__username="student1"
+        )
+        Subscription.objects.create(
+            tutor=self.tutor, student=self.student, subject=Subject.objects.get(pk=1)
+        )
+        self.conversation = Conversation.objects.create(
+            tutor=self.tutor, student=self.student
+        )
+
+    def _message(self, text):
+        """Create an unsaved message sent by the Student."""
+        return ChatMessage(
+            conversation=self.conversation, sender_id=self.student.user_id, text=text
+        )
+
+    def test_full_batch_saved_with_single_insert(self):
+        async def add_messages(buffer):
+            for number in range(3):
+                await buffer.add(self._message(f"Message {number}"))
+
+        buffer = MessageBuffer(batch_size=3, flush_interval=60_000)
+
+        with CaptureQueriesContext(connection) as queries:
+            async_to_sync(add_messages)(buffer)
+
+        self.assertEqual(
+            len(
+                [
+                    query
+                    for query in queries
+                    if query["sql"].startswith(
+                        f'INSERT INTO "{ChatMessage._meta.db_table}"'
+                    )
+                ]
+            ),
+            1,
+        )
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(
+            list(ChatMessage.objects.order_by("pk").values_list("text", flat=True)),
+            ["Message 0", "Message 1", "Message 2"],
+        )
+
+    def test_messages_saved_after_flush_interval(self):
+        async def add_message_and_wait(buffer):
+            await buffer.add(self._message("Message"))
+            saved_before_interval = buffer.saved_count
+            await asyncio.sleep(0.05)
+            return saved_before_interval
+
+        buffer = MessageBuffer(batch_size=100, flush_interval=10)
+
+        saved_before_interval = async_to_sync(add_message_and_wait)(buffer)
+
+        self.assertEqual(saved_before_interval, 0)
+        self.assertEqual(buffer.saved_count, 1)
+        self.assertTrue(ChatMessage.objects.filter(text="Message").exists())
+
+    def test_pending_messages_of_conversation_returned(self):
+        async def add_message(buffer):
+            await buffer.add(self._message("Message"))
+
+        buffer = MessageBuffer(batch_size=100, flush_interval=60_000)
+        async_to_sync(add_message)(buffer)
+
+        self.assertEqual(
+            [message.text for message in buffer.pending(self.conversation.pk)],
+            ["Message"],
+        )
+        self.assertEqual(buffer.pending(self.conversation.pk + 1), [])
+
+    def test_message_with_colliding_id_saved_with_new_id(self):
+        async def add_messages(buffer):
+            for message in messages:
+                await buffer.add(message)
+
+        taken = self._message("Message of another process")
+        taken.save()
+        messages = [self._message("Message 0"), self._message("Message 1")]
+        messages[0].pk = taken.pk
+        buffer = MessageBuffer(batch_size=2, flush_interval=60_000)
+
+        with self.assertLogs("chat.buffer", "WARNING"):
+            async_to_sync(add_messages)(buffer)
+
+        self.assertEqual(buffer.saved_count, 2)
+        self.assertEqual(ChatMessage.objects.count(), 3)
+        self.assertEqual(ChatMessage.objects.get(pk=taken.pk).text, taken.text)
+
+    @override_settings(CHAT_WORKER_ID=256)
+    def test_worker_id_out_of_range_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            _get_worker_id()
+
+    def test_message_ids_increasing(self):
+        ids = [generate_message_id() for _ in range(10_000)]
+
+        self.assertEqual(ids, sorted(set(ids)))
+
+    def test_sent_messages_saved_when_connection_closes(self):
+        async def chat():
+            communicator = WebsocketCommunicator(
+                URLRouter(websocket_urlpatterns),
+                f"/ws/chat/{self.tutor.pk}/{self.student.pk}/",
+            )
+            communicator.scope["user"] = self.student.user
+            connected, _ = await communicator.connect()
+            await communicator.receive_json_from()
+            for number in range(5):
+                await communicator.send_to(
+                    text_data=json.dumps(
+                        {
+                            "message": f"Message {number}",
+                            "user_id": self.student.user_id,
+                        }
+                    )
+                )
+            received = [await communicator.receive_json_from() for _ in range(5)]
+            await communicator.disconnect()
+            return connected, received
+
+        with self.settings(CHAT_MESSAGE_FLUSH_INTERVAL=60_000):
+            connected, received = async_to_sync(chat)()
+
+        self.assertTrue(connected)
+        self.assertEqual(
+            list(
+                self.conversation.messages.order_by("pk").values_list(
+                    "pk", "text", "sender"
+                )
+            ),
+            [
+                (int(frame["id"]), frame["message"], frame["user_id"])
+                for frame in received
+            ],
+        )
@@ -0,0 +1,164 @@
+"""Tests for the unread counters and the lists of chat partners."""
+import json
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.test import override_settings
+
+from chat.buffer import MessageBuffer
+from chat.models import ChatMessage, Conversation, ReadMarker
+from chat.partners import get_chat_partners
+from chat.read_markers import mark_read
+from chat.routing import websocket_urlpatterns
+from profiles.models import Profile
+from subscriptions.models import Subscription
+from tutors.models import Subject
+from utils.testing import TestCaseProfileUtils
+from utils.testing.settings import IN_MEMORY_CHANNEL_LAYERS
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class TestReadMarkers(TestCaseProfileUtils):
+    """Tests for maintaining ReadMarkers and listing partners with their counters."""
+
+    def setUp(self):
+        """Subscribe two Students to a Tutor and start a Conversation with the first one."""
+        self._register_user("tutor1", student=False)
+        self._register_user("student1")
+        self._register_user("student2")
+        profiles = Profile.objects.select_related("user")
+        self.tutor = profiles.get(user__username="tutor1")
+        self.student1 = profiles.get(user__username="student1")
+        self.student2 = profiles.get(user__username="student2")
+        for student, subject_pk in (
+            (self.student1, 1),
+            (self.student1, 2),
+            (self.student2, 1),
+        ):
+            Subscription.objects.create(
+                tutor=self.tutor,
+                student=student,
+                subject=Subject.objects.get(pk=subject_pk),
+            )
+        self.conversation = Conversation.objects.create(
+            tutor=self.tutor, student=self.student1
+        )
+
+    def _save(self, *messages):
+        """Save messages through the message buffer."""
+        buffer = MessageBuffer(batch_size=len(messages), flush_interval=1000)
+
+        async def add_messages():
+            for message in messages:
+                await buffer.add(message)
+
+        async_to_sync(add_messages)()
+
+    def _message(self, sender, text):
+        """Create an unsaved message of the Conversation."""
+        return ChatMessage(
+            conversation=self.conversation, sender_id=sender.user_id, text=text
+        )
+
+    def _unread_count(self, profile):
+        """Get the unread counter of a participant of the Conversation."""
+        return ReadMarker.objects.get(
+            conversation=self.conversation, user_id=profile.user_id
+        ).unread_count
+
+    def test_saved_messages_counted_for_recipient(self):
+        self._save(
+            self._message(self.student1, "Hi 1"),
+            self._message(self.student1, "Hi 2"),
+            self._message(self.tutor, "Hi 3"),
+        )
+
+        self.assertEqual(self._unread_count(self.tutor), 2)
+        self.assertEqual(self._unread_count(self.student1), 1)
+
+    def test_large_batch_counted_for_recipient(self):
+        messages = [
+            self._message(self.student1, f"Hi {number}") for number in range(150)
+        ]
+        mark_read(self.conversation.pk, self.tutor.user_id, messages[29].pk)
+
+        self._save(*messages)
+
+        self.assertEqual(ChatMessage.objects.count(), 150)
+        self.assertEqual(self._unread_count(self.tutor), 120)
+
+    def test_counter_recalculated_when_read(self):
+        messages = [self._message(self.student1, f"Hi {number}") for number in range(3)]
+        self._save(*messages)
+
+        mark_read(self.conversation.pk, self.tutor.user_id, messages[1].pk)
+
+        self.assertEqual(self._unread_count(self.tutor), 1)
+
+    def test_marker_never_moves_backwards(self):
+        messages = [self._message(self.student1, f"Hi {number}") for number in range(3)]
+        self._save(*messages)
+        mark_read(self.conversation.pk, self.tutor.user_id, messages[2].pk)
+
+        mark_read(self.conversation.pk, self.tutor.user_id, messages[0].pk)
+
+        self.assertEqual(self._unread_count(self.tutor), 0)
+
+    def test_messages_read_before_being_saved_not_counted(self):
+        read, unread = (
+            self._message(self.student1, "Hi 1"),
+            self._message(self.student1, "Hi 2"),
+        )
+        mark_read(self.conversation.pk, self.tutor.user_id, read.pk)
+
+        self._save(read, unread)
+
+        self.assertEqual(self._unread_count(self.tutor), 1)
+
+    def test_partners_listed_with_single_query(self):
+        self._save(
+            self._message(self.student1, "Hi 1"),
+            self._message(self.student1, "Hi 2"),
+        )
+
+        with self.assertNumQueries(1):
+            partners = [
+                (
+                    partner.user.username,
+                    partner.conversation,
+                    partner.last_message_preview,
+                    partner.unread_count,
+                )
+                for partner in get_chat_partners(self.tutor.pk, student=False)
+            ]
+
+        self.assertEqual(
+            partners,
+            [
+                ("student1", self.conversation.pk, "Hi 2", 2),
+                ("student2", None, None, 0),
+            ],
+        )
+
+    def test_read_command_marks_messages_read(self):
+        message = self._message(self.student1, "Hi")
+        self._save(message)
+
+        async def read():
+            communicator = WebsocketCommunicator(
+                URLRouter(websocket_urlpatterns),
+                f"/ws/chat/{self.tutor.pk}/{self.student1.pk}/",
+            )
+            communicator.scope["user"] = self.tutor.user
+            await communicator.connect()
+            await communicator.receive_json_from()
+            await communicator.send_to(
+                text_data=json.dumps({"command": "read", "message": message.pk})
+            )
+            await communicator.receive_nothing()
+            await communicator.disconnect()
+
+        async_to_sync(read)()
+
+        self.assertEqual(self._unread_count(self.tutor), 0)
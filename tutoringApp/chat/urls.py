@@ -8,4 +8,7 @@ urlpatterns = [
     path("tutor/<int:tutor_id>/<int:student_id>/", view=views.TutorChatWindowView.as_view(), name="tutor_chat_window"),
     path("student/<int:student_id>/", view=views.StudentChatView.as_view(), name="student_chat"),
     path("student/<int:tutor_id>/<int:student_id>/", view=views.StudentChatWindowView.as_view(), name="student_chat_window"),
+    path("api/history/<int:tutor_id>/<int:student_id>/", view=views.ChatHistoryAPIView.as_view(), name="history"),
+    path("api/presence/", view=views.ChatPresenceAPIView.as_view(), name="presence"),
+    path("api/counters/", view=views.ChatCountersAPIView.as_view(), name="counters"),
 ]
\ No newline at end of file
@@ -1,9 +1,15 @@
 """Views for the chat app."""
 from .chat import StudentChatView, TutorChatView, StudentChatWindowView, TutorChatWindowView
+from .counters_api import ChatCountersAPIView
+from .history_api import ChatHistoryAPIView
+from .presence_api import ChatPresenceAPIView
 
 __all__ = [
     "StudentChatView",
     "TutorChatView",
     "StudentChatWindowView",
     "TutorChatWindowView",
-] 
\ No newline at end of file
+    "ChatHistoryAPIView",
+    "ChatPresenceAPIView",
+    "ChatCountersAPIView",
+]
@@ -1,12 +1,15 @@
 """Views for chat-related functionalities."""
-from typing import Any
+from typing import Any, Optional
 
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import QuerySet
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import render
 from django.urls import reverse
 from django.views.generic.list import ListView
 
+from chat.models import Conversation
+from chat.partners import get_chat_partners
 from profiles.forms import AccountType
 from profiles.models import Profile
 from subscriptions.models import Subscription
@@ -47,18 +50,13 @@ class StudentChatView(ListView, LoginRequiredMixin):
             )
         return super().get(request, *args, **kwargs)
 
-    def get_queryset(self) -> list[Profile]:
-        """Fetch a list of Tutors that the given Student is 'subscribed' to."""
-        return list(
-            set(
-                [
-                    subscription.tutor
-                    for subscription in Subscription.objects.filter(
-                        student__pk=self.kwargs["student_id"]
-                    )
-                ]
-            )
-        )
+    def get_queryset(self) -> QuerySet:
+        """Fetch a list of Tutors that the given Student is 'subscribed' to.
+
+        The Tutors are fetched together with the state of their
+        conversations with the Student, see `get_chat_partners`.
+        """
+        return get_chat_partners(self.kwargs["student_id"], student=True)
 
 
 class TutorChatView(ListView, LoginRequiredMixin):
@@ -96,18 +94,13 @@ class TutorChatView(ListView, LoginRequiredMixin):
             )
         return super().get(request, *args, **kwargs)
 
-    def get_queryset(self) -> list[Profile]:
-        """Fetch a list of Students that are 'subscribed' to the given Tutor."""
-        return list(
-            set(
-                [
-                    subscription.student
-                    for subscription in Subscription.objects.filter(
-                        tutor__pk=self.kwargs["tutor_id"]
-                    )
-                ]
-            )
-        )
+    def get_queryset(self) -> QuerySet:
+        """Fetch a list of Students that are 'subscribed' to the given Tutor.
+
+        The Students are fetched together with the state of their
+        conversations with the Tutor, see `get_chat_partners`.
+        """
+        return get_chat_partners(self.kwargs["tutor_id"], student=False)
 
 
 class StudentChatWindowView(StudentChatView):
@@ -116,9 +109,12 @@ class StudentChatWindowView(StudentChatView):
     template_name = "chat\chat_student_window.html"
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
-        """Add name of the receiving Tutor to the context."""
+        """Add name of the receiving Tutor and the Conversation to the context."""
         context = super().get_context_data(**kwargs)
-        context["tutor"] = Profile.objects.get(pk=self.kwargs["tutor_id"])
+        context["tutor"] = _get_partner(context["profiles"], self.kwargs["tutor_id"])
+        context["conversation"] = _get_conversation(
+            self.kwargs["tutor_id"], self.kwargs["student_id"]
+        )
         return context
 
     def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
@@ -143,9 +139,14 @@ class TutorChatWindowView(TutorChatView):
     template_name = "chat\chat_tutor_window.html"
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
-        """Add name of the receiving Student to the context."""
+        """Add name of the receiving Student and the Conversation to the context."""
         context = super().get_context_data(**kwargs)
-        context["student"] = Profile.objects.get(pk=self.kwargs["student_id"])
+        context["student"] = _get_partner(
+            context["profiles"], self.kwargs["student_id"]
+        )
+        context["conversation"] = _get_conversation(
+            self.kwargs["tutor_id"], self.kwargs["student_id"]
+        )
         return context
 
     def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
@@ -162,3 +163,41 @@ class TutorChatWindowView(TutorChatView):
                 },
             )
         return super().get(request, *args, **kwargs)
+
+
+def _get_partner(partners: QuerySet, profile_id: int) -> Profile:
+    """Get the Profile of the chat partner from the already listed partners.
+
+    Args:
+        partners: Chat partners of the user, see `get_chat_partners`.
+        profile_id: Primary key of the partner's Profile.
+
+    Returns:
+        The listed Profile, or the Profile fetched from the database
+        if the user has no Subscription with the partner.
+    """
+    for partner in partners:
+        if partner.pk == profile_id:
+            return partner
+    return Profile.objects.select_related("user").get(pk=profile_id)
+
+
+def _get_conversation(tutor_id: int, student_id: int) -> Optional[Conversation]:
+    """Get the Conversation of a Tutor and a Student.
+
+    The Conversation is only created if there is a Subscription between
+    them, as only then they are allowed to chat with each other.
+
+    Args:
+        tutor_id: Primary key of the Tutor's Profile.
+        student_id: Primary key of the Student's Profile.
+
+    Returns:
+        The Conversation, or None if the pair has none and cannot chat.
+    """
+    if Subscription.objects.filter(tutor_id=tutor_id, student_id=student_id).exists():
+        conversation, _ = Conversation.objects.get_or_create(
+            tutor_id=tutor_id, student_id=student_id
+        )
+        return conversation
+    return Conversation.objects.filter(tutor_id=tutor_id, student_id=student_id).first()
@@ -0,0 +1,29 @@
+"""API endpoint for reading the counters of throttled and dropped chat frames."""
+from django.http import HttpRequest
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from chat.limits import get_counters
+
+
+class ChatCountersAPIView(APIView):
+    """API for monitoring how often chat clients hit the limits."""
+
+    def get(self, request: HttpRequest) -> Response:
+        """Return the counters of throttled, dropped and coalesced frames.
+
+        The counters are kept by every server process separately,
+        so the response describes the process serving the request.
+
+        Args:
+            request: Instance of the HttpRequest class containing
+                    every information about the request sent to the
+                    server.
+        Returns:
+            Instance of the `Response` class with an appropraite
+            status code and or the counters, only for staff members.
+        """
+        if not request.user.is_staff:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        return Response(get_counters())
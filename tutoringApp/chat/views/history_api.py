@@ -0,0 +1,65 @@
+"""API endpoint for fetching pages of conversations' history."""
+from django.http import HttpRequest
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from chat.history import (
+    MAX_PAGE_SIZE,
+    HistoryPage,
+    get_history_page,
+    get_page_size,
+    parse_message_id,
+)
+from chat.models import Conversation
+
+
+class ChatHistoryAPIView(APIView):
+    """API for paging backwards through the messages of a conversation."""
+
+    def get(self, request: HttpRequest, tutor_id: int, student_id: int) -> Response:
+        """Return the latest messages of the conversation sent before a given one.
+
+        Only the Tutor and the Student of the conversation can
+        read its history. Messages that have been sent, but not
+        saved in the database yet, are not returned.
+
+        Args:
+            request: Instance of the HttpRequest class containing
+                    every information about the request sent to the
+                    server, including the `before` (ID of the message
+                    the page ends before, the latest messages are returned
+                    if omitted) and `limit` (maximum number of messages)
+                    parameters.
+            tutor_id: Primary key of the Tutor's Profile.
+            student_id: Primary key of the Student's Profile.
+        Returns:
+            Instance of the `Response` class with an appropraite
+            status code and or the messages, oldest first, together
+            with the information about whether there are older ones.
+        """
+        if not request.user.is_authenticated or request.user.pk not in (
+            tutor_id,
+            student_id,
+        ):
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        before = (
+            parse_message_id(request.GET["before"]) if "before" in request.GET else None
+        )
+        if "before" in request.GET and before is None:
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.GET.get("limit", get_page_size()))
+        except ValueError:
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        if not 0 < limit <= MAX_PAGE_SIZE:
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        conversation = Conversation.objects.filter(
+            tutor_id=tutor_id, student_id=student_id
+        ).first()
+        page = (
+            get_history_page(conversation.pk, before=before, limit=limit)
+            if conversation is not None
+            else HistoryPage()
+        )
+        return Response({"messages": page.messages, "has_more": page.has_more})
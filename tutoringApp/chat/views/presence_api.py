@@ -0,0 +1,32 @@
+"""API endpoint for fetching the presence of users' chat partners."""
+from django.http import HttpRequest
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from chat.presence import get_partner_ids, get_presence
+
+
+class ChatPresenceAPIView(APIView):
+    """API for checking which of the user's chat partners are online."""
+
+    def get(self, request: HttpRequest) -> Response:
+        """Return the presence of every Tutor or Student the user can chat with.
+
+        The partners listed by the StudentChatView and the TutorChatView
+        are fetched with a single query and their presence is looked up
+        with two cache lookups, one for the users and one for their
+        connections, regardless of their number.
+
+        Args:
+            request: Instance of the HttpRequest class containing
+                    every information about the request sent to the
+                    server.
+        Returns:
+            Instance of the `Response` class with an appropraite
+            status code and or the presence of every partner,
+            by the primary key of the partner's Profile.
+        """
+        if not request.user.is_authenticated:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        return Response({"presence": get_presence(get_partner_ids(request.user.pk))})
@@ -0,0 +1,179 @@
+"""Booking single sessions under Tutors' Availability.
+
+Every check needed to book a session is run against a single
+Availability object, fetched once together with its Service and
+Tutor. Creating the Booking happens inside one transaction in
+which the Availability row is locked, so that two Students
+booking the same time slot at once cannot both succeed and the
+Lesson is never created without its Booking. Reasons for refusing
+a booking are reported with the exceptions defined below.
+"""
+from time import sleep
+from typing import Optional
+
+from django.db import IntegrityError, OperationalError, transaction
+
+from lessons.models import Booking, Lesson
+from profiles.models import Profile
+from tutors.models import Availability
+
+
+class BookingError(Exception):
+    """Base class of errors preventing a session from being booked.
+
+    Attributes:
+        message: Description of the error, displayed to the user.
+        status: HTTP status code of the response informing about the error.
+        availability: Availability object the booking was attempted under,
+                        if it exists.
+    """
+
+    message = "The session cannot be booked."
+    status = 403
+
+    def __init__(self, availability: Optional[Availability] = None) -> None:
+        """Intialization of a BookingError class instance.
+
+        Args:
+            availability: Availability object the booking
+                        was attempted under, if it exists.
+        """
+        super().__init__(self.message)
+        self.availability = availability
+
+
+class UserIsTutorError(BookingError):
+    """Raised when a Tutor attempts to book a session."""
+
+    message = "Tutors are not allowed to book sessions with other tutors."
+
+
+class AvailabilityDoesNotExistError(BookingError):
+    """Raised when the booked Availability object does not exist."""
+
+    message = "Availability object with provided primary key does not exist."
+    status = 404
+
+
+class AvailabilityAlreadyBookedError(BookingError):
+    """Raised when the booked Availability object already has a Booking."""
+
+    message = "Booking related to Availability with provided ID already exists."
+    status = 404
+
+
+class AvailabilityOutdatedError(BookingError):
+    """Raised when the booked Availability object lies in the past."""
+
+    message = "Availability is outdated. Please choose another available time slot."
+
+
+class AvailabilityLockedError(BookingError):
+    """Raised when the booked Availability object stays locked by other bookings."""
+
+    message = "The time slot is being booked by someone else. Please try again."
+    status = 409
+
+
+LOCK_ATTEMPTS = 5
+LOCK_RETRY_DELAY = 0.05
+
+
+def get_bookable_availability(
+    student: Profile, availability_id: int, lock: bool = False
+) -> Availability:
+    """Fetch an Availability object and ensure a Student can book it.
+
+    The Availability object is fetched together with its Service,
+    Tutor and Tutor's User with a single query, which is followed
+    by a query checking whether the object has already been booked.
+
+    Args:
+        student: Profile of the user booking the session.
+        availability_id: Primary key of the booked Availability object.
+        lock: Boolean information about whether the Availability
+                row should be locked until the end of the current
+                transaction.
+
+    Raises:
+        UserIsTutorError: If the profile belongs to a Tutor.
+        AvailabilityDoesNotExistError: If the Availability object
+                                        does not exist.
+        AvailabilityAlreadyBookedError: If the Availability object
+                                        already has a Booking.
+        AvailabilityOutdatedError: If the Availability object
+                                    lies in the past.
+
+    Returns:
+        The bookable Availability object.
+    """
+    if not student.is_student():
+        raise UserIsTutorError()
+    availabilities = Availability.objects.select_related("service__tutor__user")
+    if lock:
+        availabilities = availabilities.select_for_update(of=("self",))
+    try:
+        availability = availabilities.get(pk=availability_id)
+    except Availability.DoesNotExist:
+        raise AvailabilityDoesNotExistError()
+    if Booking.objects.filter(availability=availability).exists():
+        raise AvailabilityAlreadyBookedError(availability)
+    if availability.is_outdated:
+        raise AvailabilityOutdatedError(availability)
+    return availability
+
+
+def book_availability(student: Profile, availability_id: int) -> Booking:
+    """Book a session under an Availability object.
+
+    The checks from `get_bookable_availability` are run with
+    the Availability row locked, after which the Lesson and the
+    Booking objects are created in the same transaction. On databases
+    without row-level locks, a concurrent Booking is caught by the
+    unique constraint on the Booking's Availability instead, while
+    transactions failing to acquire the database's lock are retried
+    a couple of times.
+
+    Args:
+        student: Profile of the Student booking the session.
+        availability_id: Primary key of the booked Availability object.
+
+    Raises:
+        BookingError: If the session cannot be booked, see
+                    `get_bookable_availability` for the subclasses.
+        AvailabilityLockedError: If the lock could not be acquired.
+
+    Returns:
+        The newly created Booking object.
+    """
+    for attempt in range(1, LOCK_ATTEMPTS + 1):
+        try:
+            return _create_booking(student, availability_id)
+        except OperationalError as error:
+            if "lock" not in str(error):
+                raise
+            sleep(LOCK_RETRY_DELAY * attempt)
+    raise AvailabilityLockedError()
+
+
+def _create_booking(student: Profile, availability_id: int) -> Booking:
+    """Create the Lesson and the Booking in a single transaction."""
+    try:
+        with transaction.atomic():
+            availability = get_bookable_availability(
+                student, availability_id, lock=True
+            )
+            lesson = Lesson.objects.create(date=availability.start)
+            return Booking.objects.create(
+                lesson_info=lesson, student=student, availability=availability
+            )
+    except IntegrityError:
+        # Only a Booking created concurrently under the same Availability
+        # violates the unique constraint, other errors are not refusals.
+        if not Booking.objects.filter(availability_id=availability_id).exists():
+            raise
+        raise AvailabilityAlreadyBookedError(
+            Availability.objects.select_related("service")
+            .filter(pk=availability_id)
+            .first()
+        )
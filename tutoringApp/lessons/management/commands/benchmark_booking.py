@@ -0,0 +1,69 @@
+"""Benchmark of booking a session for growing number of existing Bookings."""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterator
+
+from django.core.management.base import CommandError
+
+from lessons.booking import book_availability
+from lessons.models import Booking, Lesson
+from tutors.models import Availability, Subject
+from utils.benchmarking import BenchmarkCommand, create_default_service, create_profile
+
+
+class Command(BenchmarkCommand):
+    """Measure latency of the happy path of booking a session.
+
+    For every dataset size a Tutor with that many already booked
+    Availability objects is created, together with enough open time
+    slots for every timed run. Each run books a different open slot
+    with `book_availability`, which creates the Lesson and the Booking
+    in a single transaction. The latency and query count are expected
+    to stay flat as the number of Bookings grows.
+    """
+
+    help = "Benchmark booking a session for growing number of existing Bookings."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Ensure every timed run has its own open time slot."""
+        if options["repeat"] < 1:
+            raise CommandError("At least one timed run is required.")
+        self.repeat = options["repeat"]
+        super().handle(*args, **options)
+
+    def set_up(self, size: int) -> dict[str, Any]:
+        """Create a Tutor with `size` booked and enough open Availability objects."""
+        tutor = create_profile(f"benchmark_tutor_{size}")
+        student = create_profile(f"benchmark_student_{size}", student=True)
+        subject = Subject.objects.create(name="Benchmark subject", category=0)
+        service = create_default_service(tutor=tutor, subject=subject)
+        first_start = datetime.now(tz=timezone.utc) + timedelta(days=1)
+        availabilities = Availability.objects.bulk_create(
+            [
+                Availability(
+                    service=service,
+                    start=first_start + timedelta(hours=i),
+                    end=first_start + timedelta(hours=i + 1),
+                )
+                for i in range(size + self.repeat + 1)
+            ]
+        )
+        lessons = Lesson.objects.bulk_create(
+            [Lesson(date=availability.start) for availability in availabilities[:size]]
+        )
+        Booking.objects.bulk_create(
+            [
+                Booking(lesson_info=lesson, student=student, availability=availability)
+                for lesson, availability in zip(lessons, availabilities[:size])
+            ]
+        )
+        return {
+            "student": student,
+            "open_availability_ids": iter(
+                availability.pk for availability in availabilities[size:]
+            ),
+        }
+
+    def run_once(self, context: dict[str, Any]) -> None:
+        """Book the next open Availability object."""
+        open_availability_ids: Iterator[int] = context["open_availability_ids"]
+        book_availability(context["student"], next(open_availability_ids))
@@ -0,0 +1,86 @@
+"""Tests for the keyset pagination of booked sessions displayed to a Student."""
+from django.urls import reverse
+
+from lessons.models import Booking
+from profiles.models import Profile
+from tutors.models import Availability
+from utils.testing import TestCaseBookingeUtils
+
+
+class TestBookingDisplayPagination(TestCaseBookingeUtils):
+    """Tests for the keyset pagination of the BookingsDisplay4Student view."""
+
+    def setUp(self):
+        """Book every Availability for a single Student."""
+        super().setUp()
+        self._register_user("student1")
+        student = Profile.objects.get(user__username="student1")
+        for availability in Availability.objects.all():
+            self._create_booking_object(availability=availability, student=student)
+        self.ordered_bookings = list(
+            Booking.objects.order_by("-availability__start", "pk")
+        )
+
+    def _get_page(self, query=""):
+        """Get the page of Bookings displayed for a given query string."""
+        response = self.client.get(
+            f"{reverse('lessons:booking_display_student')}?{query}"
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.context["page_obj"]
+
+    def test_next_cursors_lead_through_every_booking_in_order(self):
+        page = self._get_page()
+        bookings, numbers = list(page), [page.number]
+        while page.has_next():
+            page = self._get_page(page.next_query)
+            bookings.extend(page)
+            numbers.append(page.number)
+
+        self.assertEqual(bookings, self.ordered_bookings)
+        self.assertEqual(numbers, [1, 2, 3])
+        self.assertEqual((page.total, page.num_pages), (12, 3))
+
+    def test_previous_cursor_leads_back_to_previous_page(self):
+        first_page = self._get_page()
+        second_page = self._get_page(first_page.next_query)
+
+        page = self._get_page(second_page.previous_query)
+
+        self.assertEqual(list(page), list(first_page))
+        self.assertEqual(page.number, 1)
+        self.assertFalse(page.has_previous())
+
+    def test_last_page_holds_the_earliest_bookings(self):
+        page = self._get_page(self._get_page().last_query)
+
+        self.assertEqual(list(page), self.ordered_bookings[-5:])
+        self.assertEqual(page.number, 3)
+        self.assertFalse(page.has_next())
+        self.assertTrue(page.has_previous())
+
+    def test_cursor_stable_when_bookings_before_it_are_deleted(self):
+        first_page = self._get_page()
+        first_page[0].delete()
+
+        page = self._get_page(first_page.next_query)
+
+        self.assertEqual(list(page), self.ordered_bookings[5:10])
+
+    def test_filters_preserved_in_cursor_links(self):
+        page = self._get_page("profile=1")
+
+        self.assertIn("profile=1", page.next_query)
+        self.assertEqual(page.first_query, "profile=1")
+        self.assertTrue(
+            all(booking.availability.service.tutor.pk == 1 for booking in page)
+        )
+
+    def test_invalid_cursor_page_not_found(self):
+        cursor = self._get_page().next_cursor
+
+        response = self.client.get(
+            f"{reverse('lessons:booking_display_student')}?cursor={cursor}x"
+        )
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,160 @@
+"""Tests for the booking service and its behavior under concurrent requests."""
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from django.db import IntegrityError, connection
+from django.test import TransactionTestCase
+from freezegun import freeze_time
+
+from lessons.booking import (
+    AvailabilityAlreadyBookedError,
+    AvailabilityDoesNotExistError,
+    AvailabilityLockedError,
+    AvailabilityOutdatedError,
+    BookingError,
+    UserIsTutorError,
+    book_availability,
+    get_bookable_availability,
+)
+from lessons.models import Booking, Lesson
+from profiles.models import Profile
+from tutors.models import Availability, Service, Subject
+from utils.benchmarking import create_default_service, create_profile
+from utils.testing import TestCaseServiceUtils
+
+NOW = "2023-12-13 07:59:00"
+
+
+class TestBookingService(TestCaseServiceUtils):
+    """Tests for the checks and the outcome of booking a session."""
+
+    def setUp(self):
+        """Create a Tutor with an Availability object and a Student."""
+        self._register_user("tutor1", student=False)
+        self.tutor = Profile.objects.get(user__username="tutor1")
+        self._create_service_objects(profile=self.tutor)
+        self.availability = self._create_availiability_object(
+            service=Service.objects.get(pk=1),
+            start=datetime(2023, 12, 20, 8, 0, tzinfo=timezone.utc),
+        )
+        self._register_user("student1")
+        self.student = Profile.objects.get(user__username="student1")
+
+    @freeze_time(NOW)
+    def test_booking_and_lesson_created(self):
+        booking = book_availability(self.student, self.availability.pk)
+
+        self.assertEqual(booking.student, self.student)
+        self.assertEqual(booking.availability, self.availability)
+        self.assertEqual(booking.lesson_info.date, self.availability.start)
+
+    @freeze_time(NOW)
+    def test_availability_fetched_with_tutor_in_two_queries(self):
+        with self.assertNumQueries(2):
+            availability = get_bookable_availability(self.student, self.availability.pk)
+            availability.service.tutor.user.username
+
+    @freeze_time(NOW)
+    def test_tutor_booking_error_raised(self):
+        with self.assertRaises(UserIsTutorError):
+            book_availability(self.tutor, self.availability.pk)
+
+    @freeze_time(NOW)
+    def test_missing_availability_error_raised(self):
+        with self.assertRaises(AvailabilityDoesNotExistError) as context:
+            book_availability(self.student, 100)
+
+        self.assertIsNone(context.exception.availability)
+        self.assertEqual(context.exception.status, 404)
+
+    @freeze_time(NOW)
+    def test_booked_availability_error_raised_nothing_created(self):
+        book_availability(self.student, self.availability.pk)
+
+        with self.assertRaises(AvailabilityAlreadyBookedError) as context:
+            book_availability(self.student, self.availability.pk)
+
+        self.assertEqual(context.exception.availability, self.availability)
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(Lesson.objects.count(), 1)
+
+    @freeze_time(NOW)
+    def test_concurrent_booking_caught_by_constraint_error_raised(self):
+        book_availability(self.student, self.availability.pk)
+
+        # The checks miss the other Booking, as on databases without row locks.
+        with patch("lessons.booking.get_bookable_availability") as get_bookable:
+            get_bookable.return_value = self.availability
+            with self.assertRaises(AvailabilityAlreadyBookedError) as context:
+                book_availability(self.student, self.availability.pk)
+
+        self.assertEqual(context.exception.availability, self.availability)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    @freeze_time(NOW)
+    def test_other_integrity_error_not_reported_as_booked(self):
+        with patch.object(
+            Booking.objects, "create", side_effect=IntegrityError("NOT NULL")
+        ):
+            with self.assertRaises(IntegrityError):
+                book_availability(self.student, self.availability.pk)
+
+        self.assertEqual(Lesson.objects.count(), 0)
+
+    @freeze_time("2023-12-21 07:59:00")
+    def test_outdated_availability_error_raised(self):
+        with self.assertRaises(AvailabilityOutdatedError):
+            book_availability(self.student, self.availability.pk)
+
+        self.assertEqual(Lesson.objects.count(), 0)
+
+
+class TestConcurrentBooking(TransactionTestCase):
+    """Stress test of many Students booking the same time slot at once."""
+
+    NUMBER_OF_STUDENTS = 16
+
+    def setUp(self):
+        """Create a Tutor with a single Availability object and many Students."""
+        tutor = create_profile("tutor1")
+        subject = Subject.objects.create(name="Math", category=2)
+        service = create_default_service(tutor=tutor, subject=subject)
+        start = datetime.now(tz=timezone.utc) + timedelta(days=1)
+        self.availability = Availability.objects.create(service=service, start=start)
+        self.students = [
+            create_profile(f"student{i}", student=True)
+            for i in range(self.NUMBER_OF_STUDENTS)
+        ]
+
+    def test_only_one_of_concurrent_bookings_succeeds(self):
+        barrier = threading.Barrier(self.NUMBER_OF_STUDENTS)
+        outcomes = []
+
+        def book(student: Profile) -> None:
+            try:
+                barrier.wait()
+                book_availability(student, self.availability.pk)
+                outcomes.append("booked")
+            except BookingError as error:
+                outcomes.append(type(error))
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=book, args=(student,)) for student in self.students
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(outcomes), self.NUMBER_OF_STUDENTS)
+        self.assertEqual(outcomes.count("booked"), 1)
+        self.assertEqual(
+            outcomes.count(AvailabilityAlreadyBookedError)
+            + outcomes.count(AvailabilityLockedError),
+            self.NUMBER_OF_STUDENTS - 1,
+        )
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(Lesson.objects.count(), 1)
@@ -11,13 +11,16 @@ from django.views.generic.list import ListView
 from lessons.models import Booking
 from profiles.models import Profile
 from tutors.models import Service
+from utils.pagination import KeysetPaginationMixin
 
 
-class BookingsDisplay(ListView, LoginRequiredMixin):
-    """Display booking objects."""
+class BookingsDisplay(KeysetPaginationMixin, ListView, LoginRequiredMixin):
+    """Display booking objects, starting from the latest ones."""
 
     model = Booking
     paginate_by = 5
+    keyset_ordering = ("-availability__start", "pk")
+    count_limit = 1000
 
     def _get_date_filters(self) -> list[Q]:
         """Return date filters for the Booking object list.
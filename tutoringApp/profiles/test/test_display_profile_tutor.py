@@ -1,6 +1,8 @@
 """Tests for display of Tutor's profile."""
 from datetime import datetime, timezone
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from freezegun import freeze_time
 from parameterized import parameterized
@@ -572,3 +574,55 @@ class TestDisplayTutorProfile(TestCaseServiceUtils):
                                                     </div>""",
             html=True,
         )
+
+    @parameterized.expand([True, False])
+    @freeze_time("2024-01-02 07:59:00")
+    def test_weeks_spanning_year_end_correctly_rendered(self, is_student):
+        self._register_user("tutor1", student=False)
+        tutor = Profile.objects.get(pk=1)
+        self._create_service_objects(profile=tutor)
+
+        if is_student:
+            self._register_user("student1")
+            self.client.login(username="student1", password="haslo123")
+
+        res = self.client.get(reverse("profiles:tutor_display", kwargs={"pk": 1}))
+
+        self.assertEqual(
+            list(res.context["week_days_dates"]["previous"].values()),
+            [f"{day}. Dec" for day in range(25, 32)],
+        )
+        self.assertEqual(
+            list(res.context["week_days_dates"]["current"].values()),
+            [f"0{day}. Jan" for day in range(1, 8)],
+        )
+        self.assertEqual(
+            list(res.context["week_days_dates"]["next"].values()),
+            [f"0{day}. Jan" if day < 10 else f"{day}. Jan" for day in range(8, 15)],
+        )
+
+    @freeze_time(NOW)
+    def test_number_of_queries_independent_of_number_of_services(self):
+        self._register_user("tutor1", student=False)
+        tutor = Profile.objects.get(pk=1)
+        self._create_service_objects(profile=tutor)
+        self._create_availiability_object(
+            service=Service.objects.get(pk=1),
+            start=datetime(2023, 12, 14, 7, 0, tzinfo=timezone.utc),
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("profiles:tutor_display", kwargs={"pk": 1}))
+        queries_for_default_services = len(queries)
+
+        for subject_pk in (3, 4):
+            service = self._create_service_object(profile=tutor, subject_pk=subject_pk)
+            self._create_availiability_object(
+                service=service,
+                start=datetime(2023, 12, 14 + subject_pk, 7, 0, tzinfo=timezone.utc),
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("profiles:tutor_display", kwargs={"pk": 1}))
+
+        self.assertEqual(len(queries), queries_for_default_services)
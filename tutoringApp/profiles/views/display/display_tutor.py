@@ -1,20 +1,23 @@
 """Views for displaying Tutors' profile information."""
 from collections import OrderedDict
-from datetime import datetime
-from typing import Any, Literal
+from datetime import date
+from typing import Any
 
 from django.conf import settings
 from django.db.models.query import QuerySet
 from django.http import HttpRequest, HttpResponse
-from pandas import Timestamp, date_range
+from django.utils.timezone import localdate
 
 from profiles.forms import AccountType
 from profiles.models import ProfileLanguageList
 from subscriptions.models import Review, ServiceSubscriptionList
-from tutors.models import Availability, Service
+from tutors.models import Service
+from tutors.schedule import ScheduledSlot, get_cached_week_schedule, get_week_days
 
 from .display import DisplayProfileView
 
+WEEK_OFFSETS = OrderedDict([("previous", -1), ("current", 0), ("next", 1)])
+
 
 class DisplayTutorProfileView(DisplayProfileView):
     """Display Students' profile information."""
@@ -23,9 +26,16 @@ class DisplayTutorProfileView(DisplayProfileView):
         """Add info about Service and ProfileLanguageList objects related to given Tutor."""
         context = super().get_context_data(**kwargs)
 
-        context["language_data"] = ProfileLanguageList.objects.filter(profile=self.get_object())
+        self.today = localdate()
+
+        context["language_data"] = ProfileLanguageList.objects.filter(profile=self.object)
 
-        context["service_data"] = Service.objects.filter(tutor=self.get_object())
+        context["service_data"] = list(
+            Service.objects.filter(tutor=self.object).select_related("subject")
+        )
+        self.default_services = [
+            service for service in context["service_data"] if service.is_default
+        ]
 
         context["currency"] = settings.CURRENCY
 
@@ -50,17 +60,15 @@ class DisplayTutorProfileView(DisplayProfileView):
 
         context["availabilites"] = self._get_availabilites()
 
-        context["current_week"] = self._get_dates_for_week(self._get_week_days("current"))
+        context["current_week"] = self._get_dates_for_week(get_week_days(self.today))
 
         context["week_days_dates"] = self._get_week_days_dates()
 
-        context["default_services"] = Service.objects.filter(tutor=self.get_object()).filter(
-            is_default=True
-        )
+        context["default_services"] = self.default_services
 
         context["first_service"] = context["default_services"][0]
-        context["current_month"] = datetime.now().month
-        context["current_year"] = datetime.now().year
+        context["current_month"] = self.today.month
+        context["current_year"] = self.today.year
         context["reviews"] = self._get_reviews()
 
         return context
@@ -87,84 +95,43 @@ class DisplayTutorProfileView(DisplayProfileView):
             else super().get(request, *args, **kwargs)
         )
 
-    @staticmethod
-    def _get_week_days(week: Literal["previous", "current", "next"]) -> list[Timestamp]:
-        """Get days of past, next or current week.
+    def _get_availabilites(self) -> dict[Service, dict[str, list[list[ScheduledSlot]]]]:
+        """Get availiablity for the previous, current and next week.
 
-        Args:
-            week: String flag indicating the week
-                for which dates of days should be
-                returned.
+        The method fetches every open Availability object related
+        to a default Service (Service with `1` as the value of
+        `number_of_hours` field) for the displayed weeks with a single
+        query, see `tutors.schedule.get_week_schedule`. The result is
+        cached per Tutor until any of the Tutor's Availability, Booking
+        or Service objects changes.
 
         Returns:
-            A list containing pandas's Timestamp,
-            each representing different day of
-            the past, previous or next week.
+            A dictionary with keys being Service objects (related to
+            the currently displayed tutor) and the values being dictionaries
+            with the week flags (previous, current or next) as keys and
+            lists storing 7 lists as values, each with `ScheduledSlot`
+            objects of open time slots on different days of the given week.
         """
-        week_offset_mapping = {"previous": -1, "current": 0, "next": 1}
-        date_now = datetime.now()
-        date_start = f"{date_now.year}-W{date_now.isocalendar().week + week_offset_mapping[week]}-1"
-        date_end = f"{date_now.year}-W{date_now.isocalendar().week + week_offset_mapping[week]}-0"
-        return date_range(
-            start=datetime.strptime(date_start, "%Y-W%W-%w"),
-            end=datetime.strptime(date_end, "%Y-W%W-%w"),
+        schedule = get_cached_week_schedule(
+            self.object.pk,
+            self.default_services,
+            self.today,
+            list(WEEK_OFFSETS.values()),
         )
-
-    def _get_availabilites(self) -> dict[Service, list[QuerySet]]:
-        """Get availiablity for the current week.
-
-        The method fetches every Availability object
-        related to a default Service (Service with `1` as the
-        value of `number_of_hours` field) for the current week.
-
-        Returns:
-            A dictionary with keys being Service objects' PKs
-            (Service objects are related to the currently displayed
-            tutor) and the values of lists storing 7 QuerySets,
-            each with `Availability` objects defined for different
-            days of the current week.
-        """
-        services = Service.objects.filter(tutor=self.get_object()).filter(is_default=True)
-        availabilites = {}
-        for service in services:
-            availabilites_service = {}
-            for week in ["previous", "current", "next"]:
-                availabilites_service.update(
-                    {
-                        week: [
-                            Availability.objects.filter(service=service).filter(
-                                start__year=date.year,
-                                start__month=date.month,
-                                start__day=date.day,
-                                booking__pk=None,
-                            )
-                            for date in self._get_week_days(week)
-                        ]
-                    }
-                )
-            availabilites.update({service: availabilites_service})
-        return availabilites
-
-    def _get_current_dates(self) -> dict[str,]:
-        """Return dates to be rendered in the template.
-
-        Returns:
-            A dictionary with keys being names of days of week
-            and values being th actual dates of these days.
-        """
-        week = {}
-        current_week = self._get_week_days("current")
-        for day in current_week:
-            week.update({day.date().strftime("%a"): day.date().strftime("%d. %b")})
-        return week
+        return {
+            service: OrderedDict(
+                (week, weeks[week_offset]) for week, week_offset in WEEK_OFFSETS.items()
+            )
+            for service, weeks in schedule.items()
+        }
 
     @staticmethod
-    def _get_dates_for_week(week_range: list[Timestamp]) -> dict[str, str]:
+    def _get_dates_for_week(week_days: list[date]) -> dict[str, str]:
         """Return dates to be rendered in the template.
 
         Args:
-            week_range: A list with Timestaps representing
-                        dates of days in a given week.
+            week_days: A list with dates of days
+                        in a given week.
 
         Returns:
             A dictionary with keys being names of days of week
@@ -172,8 +139,8 @@ class DisplayTutorProfileView(DisplayProfileView):
             a given week.
         """
         week = {}
-        for day in week_range:
-            week.update({day.date().strftime("%a"): day.date().strftime("%d. %b")})
+        for day in week_days:
+            week.update({day.strftime("%a"): day.strftime("%d. %b")})
         return week
 
     def _get_week_days_dates(self) -> dict[str, dict[str, str]]:
@@ -189,8 +156,10 @@ class DisplayTutorProfileView(DisplayProfileView):
             dates of these days from a given week.
         """
         week_days_dates = OrderedDict()
-        for week in ["previous", "current", "next"]:
-            week_days_dates.update({week: self._get_dates_for_week(self._get_week_days(week))})
+        for week, week_offset in WEEK_OFFSETS.items():
+            week_days_dates.update(
+                {week: self._get_dates_for_week(get_week_days(self.today, week_offset))}
+            )
         return week_days_dates
 
     def _get_reviews(self) -> QuerySet[Review]:
@@ -204,4 +173,4 @@ class DisplayTutorProfileView(DisplayProfileView):
             A QuerySet with Reviews of Subscriptions
             related to the given Tutor.
         """
-        return Review.objects.filter(subscription__tutor=self.get_object())
+        return Review.objects.filter(subscription__tutor=self.object)
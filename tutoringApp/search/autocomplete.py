@@ -0,0 +1,326 @@
+"""In-memory prefix index of users' names used for autocompletion.
+
+Every process keeps its own NamePrefixIndex, loaded from the database
+with a single query the first time it is used. Afterwards, lookups only
+run binary searches on sorted lists and never touch the database.
+
+Changes of Profiles and Users are applied to the index of the process
+that made them by signal handlers (see `search.signals`), once the
+transaction is committed. Since other processes do not receive these
+signals, every change also bumps a generation counter in the shared
+cache and is stored there under its generation. Other processes compare
+the counter with the generation of their index (at most once per
+`GENERATION_CHECK_INTERVAL` seconds) and apply the changes they missed.
+The index is only reloaded when some of these changes are no longer in
+the cache or there are too many of them. Generations are only unique
+with cache backends whose `incr` is atomic, such as Redis or Memcached.
+"""
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from time import monotonic
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+
+from profiles.forms import AccountType
+from profiles.models import Profile
+
+GENERATION_KEY = "name_prefix_index_generation"
+GENERATION_CHECK_INTERVAL = 1.0
+CHANGE_TIMEOUT = 60 * 60
+MAX_APPLIED_CHANGES = 1000
+
+# Letters that do not decompose into a base letter and a diacritic.
+TRANSLITERATION = str.maketrans(
+    {"ł": "l", "đ": "d", "ø": "o", "ß": "ss", "æ": "ae", "œ": "oe"}
+)
+
+
+@dataclass(frozen=True)
+class NameChange:
+    """Change of a Profile published to every process.
+
+    Attributes:
+        profile_id: Primary key of the changed Profile.
+        first_name: First name of the Profile's User.
+        last_name: Last name of the Profile's User.
+        account_type: Type of the Profile, None if the Profile was removed.
+    """
+
+    profile_id: int
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    account_type: Optional[AccountType] = None
+
+
+@dataclass(frozen=True)
+class NameMatch:
+    """Profile whose name matched an autocompleted prefix."""
+
+    id: int
+    name: str
+
+
+def normalize(text: str) -> str:
+    """Lowercase a text and strip diacritics from it.
+
+    Args:
+        text: The normalized text.
+
+    Returns:
+        The text in the form stored in the index.
+    """
+    decomposed = unicodedata.normalize(
+        "NFKD", text.strip().lower().translate(TRANSLITERATION)
+    )
+    return " ".join(
+        "".join(char for char in decomposed if not unicodedata.combining(char)).split()
+    )
+
+
+class NamePrefixIndex:
+    """Sorted arrays of normalized names, one for every account type.
+
+    Every Profile is stored under two keys, "first last" and
+    "last first", so that typing either of the names finds it.
+    Entries with the same key are ordered by the Profile's primary key.
+    """
+
+    def __init__(self) -> None:
+        """Intialization of an empty NamePrefixIndex class instance."""
+        self._lock = threading.Lock()
+        self._entries = {account_type: [] for account_type in AccountType}
+        self._names = {}
+        self.generation = None
+        self._checked = 0.0
+
+    @property
+    def loaded(self) -> bool:
+        """Boolean information about whether the index has been loaded."""
+        return self.generation is not None
+
+    def load(self) -> None:
+        """Load names of every Profile with a single query."""
+        generation = get_generation()
+        entries = {account_type: [] for account_type in AccountType}
+        names = {}
+        for (
+            profile_id,
+            first_name,
+            last_name,
+            teaching_since,
+        ) in Profile.objects.values_list(
+            "pk", "user__first_name", "user__last_name", "teaching_since"
+        ).iterator():
+            account_type = (
+                AccountType.STUDENT if teaching_since is None else AccountType.TUTOR
+            )
+            names[profile_id] = (account_type, first_name, last_name)
+            entries[account_type].extend(self._keys(profile_id, first_name, last_name))
+        for account_entries in entries.values():
+            account_entries.sort()
+        with self._lock:
+            self._entries = entries
+            self._names = names
+            self.generation = generation
+            self._checked = monotonic()
+
+    def ensure_current(self) -> None:
+        """Bring the index up to date with the changes published in the shared cache.
+
+        The index is loaded if it is missing, or if the changes it
+        missed cannot be applied one by one.
+        """
+        if not self.loaded:
+            self.load()
+            return
+        if monotonic() - self._checked < GENERATION_CHECK_INTERVAL:
+            return
+        self._checked = monotonic()
+        generation = get_generation()
+        if generation != self.generation and not self._apply_published(generation):
+            self.load()
+
+    def search(
+        self, prefix: str, account_type: AccountType, limit: int = 10
+    ) -> list[NameMatch]:
+        """Find Profiles whose first or last name starts with a prefix.
+
+        Args:
+            prefix: Beginning of the searched name, e.g. "jan kow".
+            account_type: Type of the searched Profiles.
+            limit: Maximum number of returned Profiles.
+
+        Returns:
+            A list with at most `limit` matches, ordered alphabetically.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        entries = self._entries[account_type]
+        matches = {}
+        position = bisect_left(entries, (prefix,))
+        while position < len(entries) and len(matches) < limit:
+            key, profile_id = entries[position]
+            if not key.startswith(prefix):
+                break
+            if profile_id not in matches:
+                _, first_name, last_name = self._names[profile_id]
+                matches[profile_id] = NameMatch(profile_id, f"{first_name} {last_name}")
+            position += 1
+        return list(matches.values())
+
+    def update(
+        self,
+        profile_id: int,
+        first_name: str,
+        last_name: str,
+        account_type: AccountType,
+    ) -> None:
+        """Add a Profile to the index or replace its previous entries.
+
+        Args:
+            profile_id: Primary key of the Profile.
+            first_name: First name of the Profile's User.
+            last_name: Last name of the Profile's User.
+            account_type: Type of the Profile.
+        """
+        with self._lock:
+            self._remove(profile_id)
+            self._names[profile_id] = (account_type, first_name, last_name)
+            for entry in self._keys(profile_id, first_name, last_name):
+                insort(self._entries[account_type], entry)
+
+    def remove(self, profile_id: int) -> None:
+        """Remove a Profile from the index.
+
+        Args:
+            profile_id: Primary key of the Profile.
+        """
+        with self._lock:
+            self._remove(profile_id)
+
+    def apply(self, change: NameChange) -> None:
+        """Apply a change of a Profile to the index.
+
+        Args:
+            change: The applied change.
+        """
+        if change.account_type is None:
+            self.remove(change.profile_id)
+        else:
+            self.update(
+                change.profile_id,
+                change.first_name,
+                change.last_name,
+                change.account_type,
+            )
+
+    def advance(self, generation: int) -> None:
+        """Mark the index as current after applying the change of a given generation.
+
+        Args:
+            generation: Generation returned by `bump_generation`
+                        for the change applied to the index.
+        """
+        with self._lock:
+            if self.generation == generation - 1:
+                self.generation = generation
+
+    def _apply_published(self, generation: int) -> bool:
+        """Apply the changes published after the index's generation.
+
+        Args:
+            generation: The current generation of the shared cache.
+
+        Returns:
+            Boolean information about whether every missed change
+            has been applied, the index is left unchanged otherwise.
+        """
+        current = self.generation
+        if not current < generation <= current + MAX_APPLIED_CHANGES:
+            return False
+        keys = [
+            _get_change_key(applied) for applied in range(current + 1, generation + 1)
+        ]
+        changes = cache.get_many(keys)
+        if len(changes) != len(keys):
+            return False
+        for key in keys:
+            self.apply(changes[key])
+        with self._lock:
+            self.generation = max(self.generation, generation)
+        return True
+
+    def _remove(self, profile_id: int) -> None:
+        """Remove entries of a Profile, the lock must be held by the caller."""
+        if profile_id not in self._names:
+            return
+        account_type, first_name, last_name = self._names.pop(profile_id)
+        entries = self._entries[account_type]
+        for entry in self._keys(profile_id, first_name, last_name):
+            position = bisect_left(entries, entry)
+            if position < len(entries) and entries[position] == entry:
+                del entries[position]
+
+    @staticmethod
+    def _keys(
+        profile_id: int, first_name: str, last_name: str
+    ) -> Iterable[tuple[str, int]]:
+        """Create the index entries of a Profile."""
+        return {
+            (normalize(f"{first_name} {last_name}"), profile_id),
+            (normalize(f"{last_name} {first_name}"), profile_id),
+        }
+
+
+name_index = NamePrefixIndex()
+
+
+def get_generation() -> int:
+    """Get the generation of the names shared by every process."""
+    return cache.get_or_set(GENERATION_KEY, 0, None)
+
+
+def _get_change_key(generation: int) -> str:
+    """Get the cache key of the change published with a given generation."""
+    return f"name_prefix_index_change:{generation}"
+
+
+def bump_generation() -> int:
+    """Inform other processes that their indexes are outdated.
+
+    Returns:
+        The new generation.
+    """
+    try:
+        return cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, None)
+        return 1
+
+
+def publish_change(
+    profile_id: int,
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    account_type: Optional[AccountType] = None,
+) -> None:
+    """Apply a change of a Profile to the index of the current process and publish it.
+
+    Args:
+        profile_id: Primary key of the changed Profile.
+        first_name: First name of the Profile's User.
+        last_name: Last name of the Profile's User.
+        account_type: Type of the Profile, the Profile is
+                        removed from the index if not provided.
+    """
+    change = NameChange(profile_id, first_name, last_name, account_type)
+    generation = bump_generation()
+    cache.set(_get_change_key(generation), change, CHANGE_TIMEOUT)
+    if not name_index.loaded:
+        return
+    name_index.apply(change)
+    name_index.advance(generation)
@@ -0,0 +1,158 @@
+"""Building the denormalized search documents of Tutors.
+
+A TutorSearchDocument holds everything needed to search for a Tutor
+and display them in the search results, along with TutorSearchSubject
+objects of the Subjects the Tutor teaches. Documents are refreshed by
+signal handlers (see `search.signals`) whenever a Tutor's Profile,
+User, Services or Reviews change, and can be rebuilt from scratch
+with the `rebuild_search_documents` management command. The full-text
+index of the configured backend (see `search.fulltext`) is updated
+together with the documents.
+"""
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Avg, Count, Min, OuterRef, QuerySet, Subquery
+
+from profiles.models import Profile
+from search.fulltext import get_fulltext_backend
+from search.models import TutorSearchDocument, TutorSearchSubject
+from search.result_cache import invalidate_search_results
+from subscriptions.models import Review
+from tutors.models import Service
+
+
+def refresh_search_documents(tutor_ids: Iterable[int]) -> None:
+    """Recalculate the search documents of given Tutors.
+
+    Documents of Tutors that no longer exist (or whose
+    profiles do not belong to Tutors) are removed.
+
+    Args:
+        tutor_ids: Primary keys of Tutors whose documents are refreshed.
+    """
+    tutor_ids = set(tutor_ids)
+    if not tutor_ids:
+        return
+    documents, subjects = _build_documents(tutor_ids)
+    with transaction.atomic():
+        TutorSearchDocument.objects.filter(tutor_id__in=tutor_ids).delete()
+        TutorSearchDocument.objects.bulk_create(documents)
+        TutorSearchSubject.objects.bulk_create(subjects)
+        get_fulltext_backend().update(tutor_ids)
+
+
+def rebuild_search_documents(tutor_ids: Optional[Iterable[int]] = None) -> int:
+    """Recalculate the search documents from scratch.
+
+    Documents may be rebuilt after changes that did not send any signals
+    (e.g. bulk inserts), so every cached page of search results is
+    invalidated as well.
+
+    Args:
+        tutor_ids: Primary keys of Tutors whose documents are rebuilt,
+                    every Tutor's document is rebuilt if not provided.
+
+    Returns:
+        Number of the stored TutorSearchDocument objects.
+    """
+    documents, subjects = _build_documents(tutor_ids)
+    existing = TutorSearchDocument.objects.all()
+    if tutor_ids is not None:
+        existing = existing.filter(tutor_id__in=tutor_ids)
+    with transaction.atomic():
+        existing.delete()
+        TutorSearchDocument.objects.bulk_create(documents, batch_size=1000)
+        TutorSearchSubject.objects.bulk_create(subjects, batch_size=1000)
+        get_fulltext_backend().rebuild(tutor_ids)
+        invalidate_search_results()
+    return len(documents)
+
+
+def _build_documents(
+    tutor_ids: Optional[Iterable[int]] = None,
+) -> tuple[list[TutorSearchDocument], list[TutorSearchSubject]]:
+    """Create unsaved search documents and their Subjects with two queries, regardless of the number of Tutors."""
+    tutors = Profile.objects.filter(teaching_since__isnull=False)
+    services = Service.objects.all()
+    if tutor_ids is not None:
+        tutors = tutors.filter(pk__in=tutor_ids)
+        services = services.filter(tutor_id__in=tutor_ids)
+
+    subjects = defaultdict(dict)
+    for tutor_id, subject_id, subject_name in services.values_list(
+        "tutor_id", "subject_id", "subject__name"
+    ).iterator():
+        subjects[tutor_id][subject_id] = subject_name
+
+    documents = []
+    taught_subjects = []
+    for (
+        tutor_id,
+        first_name,
+        last_name,
+        city,
+        min_price,
+        average_price,
+        average_rating,
+        review_count,
+    ) in (
+        _annotate_aggregates(tutors)
+        .values_list(
+            "pk",
+            "user__first_name",
+            "user__last_name",
+            "city",
+            "min_price",
+            "average_price",
+            "average_rating",
+            "review_count",
+        )
+        .iterator()
+    ):
+        tutor_subjects = subjects[tutor_id]
+        documents.append(
+            TutorSearchDocument(
+                tutor_id=tutor_id,
+                first_name=first_name.lower(),
+                last_name=last_name.lower(),
+                city=city.lower(),
+                subjects=sorted(set(tutor_subjects.values())),
+                min_price=min_price,
+                average_price=int(average_price) if average_price is not None else None,
+                average_rating=average_rating,
+                review_count=review_count or 0,
+            )
+        )
+        taught_subjects.extend(
+            TutorSearchSubject(document_id=tutor_id, subject_id=subject_id)
+            for subject_id in sorted(tutor_subjects)
+        )
+    return documents, taught_subjects
+
+
+def _annotate_aggregates(tutors: QuerySet[Profile]) -> QuerySet[Profile]:
+    """Annotate Tutors with aggregates of their Services and Reviews.
+
+    The aggregates are calculated with separate subqueries, since joining
+    both Services and Reviews at once would multiply the aggregated rows.
+    """
+    services = Service.objects.filter(tutor=OuterRef("pk")).order_by().values("tutor")
+    reviews = (
+        Review.objects.filter(subscription__tutor=OuterRef("pk"))
+        .order_by()
+        .values("subscription__tutor")
+    )
+    return tutors.annotate(
+        min_price=Subquery(
+            services.annotate(value=Min("price_per_hour")).values("value")
+        ),
+        average_price=Subquery(
+            services.annotate(value=Avg("price_per_hour")).values("value")
+        ),
+        average_rating=Subquery(
+            reviews.annotate(value=Avg("star_rating")).values("value")
+        ),
+        review_count=Subquery(reviews.annotate(value=Count("pk")).values("value")),
+    )
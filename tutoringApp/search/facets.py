@@ -0,0 +1,215 @@
+"""Facets of Students' search results.
+
+Search results can be narrowed down by four facets: the Subject and
+the Subject category taught by the Tutors, the bucket of their lowest
+price per hour and the bucket of their average rating. Numbers of
+Tutors for every value of every facet are counted with conditional
+aggregates of a single query over the search documents. Every facet
+is counted with the filters of the other facets applied, but not with
+its own, so that the counts tell how many Tutors would be found after
+selecting a given value instead of the currently selected one.
+"""
+from dataclasses import dataclass
+from typing import Iterable, Mapping, Optional
+
+from django.conf import settings
+from django.db.models import Count, Q, QuerySet
+
+from search.models import TutorSearchDocument, TutorSearchSubject
+from tutors.models import Subject
+
+SUBJECT = "subject"
+CATEGORY = "category"
+PRICE = "price"
+RATING = "rating"
+FACETS = (SUBJECT, CATEGORY, PRICE, RATING)
+
+PRICE_BUCKETS = ((None, 50), (50, 100), (100, 150), (150, 200), (200, None))
+MIN_RATINGS = (4, 3, 2, 1)
+
+
+@dataclass(frozen=True)
+class FacetValue:
+    """Value of a facet with the number of Tutors it would find.
+
+    Attributes:
+        value: Value of the facet's query parameter.
+        label: Displayed name of the value.
+        count: Number of Tutors found after selecting the value.
+        selected: Boolean information about whether the value is currently selected.
+    """
+
+    value: str
+    label: str
+    count: int
+    selected: bool
+
+
+def get_selection(params: Mapping[str, str]) -> dict[str, str]:
+    """Get values of the facets selected in the query parameters.
+
+    Args:
+        params: Query parameters of the search request.
+
+    Returns:
+        Values of the selected facets, by the facets' names.
+    """
+    return {
+        facet: params[facet].strip()
+        for facet in FACETS
+        if params.get(facet, "").strip()
+    }
+
+
+def get_facet_filters(selection: Mapping[str, str]) -> dict[str, Q]:
+    """Create filters of the search documents for the selected facets' values.
+
+    Args:
+        selection: Values of the selected facets, see `get_selection`.
+
+    Returns:
+        Filters of the selected facets, by the facets' names. Unknown
+        values of the price and rating facets are ignored.
+    """
+    filters = {}
+    if SUBJECT in selection:
+        filters[SUBJECT] = _category_filter(
+            [int(selection[SUBJECT])] if _is_integer(selection[SUBJECT]) else []
+        )
+    if CATEGORY in selection:
+        filters[CATEGORY] = _category_filter(
+            Subject.objects.filter(category=selection[CATEGORY]).values_list(
+                "pk", flat=True
+            )
+            if _is_integer(selection[CATEGORY])
+            else []
+        )
+    buckets = {_price_bucket_value(bucket): bucket for bucket in PRICE_BUCKETS}
+    if selection.get(PRICE) in buckets:
+        filters[PRICE] = _price_filter(*buckets[selection[PRICE]])
+    if selection.get(RATING) in {str(rating) for rating in MIN_RATINGS}:
+        filters[RATING] = Q(average_rating__gte=int(selection[RATING]))
+    return filters
+
+
+def compute_facets(
+    documents: QuerySet[TutorSearchDocument], selection: Mapping[str, str]
+) -> dict[str, list[FacetValue]]:
+    """Count Tutors for every value of every facet with a single query.
+
+    Args:
+        documents: Search documents matching the search,
+                    without the filters of the facets.
+        selection: Values of the selected facets, see `get_selection`.
+
+    Returns:
+        Values of the facets with non-zero counts (or currently
+        selected), by the facets' names.
+    """
+    subjects = list(
+        Subject.objects.order_by("name").values_list("pk", "name", "category")
+    )
+    categories = dict(Subject.SUBJECT_CATEGORY_CHOICES)
+    filters = get_facet_filters(selection)
+    values = {
+        SUBJECT: [(str(pk), name, _subject_filter(pk)) for pk, name, _ in subjects],
+        CATEGORY: [
+            (
+                str(category),
+                label,
+                _category_filter(
+                    pk
+                    for pk, _, subject_category in subjects
+                    if subject_category == category
+                ),
+            )
+            for category, label in categories.items()
+        ],
+        PRICE: [
+            (
+                _price_bucket_value(bucket),
+                _price_bucket_label(bucket),
+                _price_filter(*bucket),
+            )
+            for bucket in PRICE_BUCKETS
+        ],
+        RATING: [
+            (str(rating), f"{rating}+ stars", Q(average_rating__gte=rating))
+            for rating in MIN_RATINGS
+        ],
+    }
+    aggregates = {}
+    for facet, facet_values in values.items():
+        other_filters = Q()
+        for other_facet, other_filter in filters.items():
+            if other_facet != facet:
+                other_filters &= other_filter
+        for value, _, value_filter in facet_values:
+            aggregates[f"{facet}_{value}"] = Count(
+                "pk", filter=value_filter & other_filters
+            )
+    counts = documents.order_by().aggregate(**aggregates)
+    return {
+        facet: [
+            FacetValue(
+                value=value,
+                label=label,
+                count=counts[f"{facet}_{value}"],
+                selected=selection.get(facet) == value,
+            )
+            for value, label, _ in facet_values
+            if counts[f"{facet}_{value}"] or selection.get(facet) == value
+        ]
+        for facet, facet_values in values.items()
+    }
+
+
+def _subject_filter(subject_id: int) -> Q:
+    """Create a filter of documents of Tutors teaching a given Subject."""
+    return _category_filter([subject_id])
+
+
+def _category_filter(subject_ids: Iterable[int]) -> Q:
+    """Create a filter of documents of Tutors teaching any of given Subjects.
+
+    The documents are looked up in the index of TutorSearchSubject objects.
+    """
+    subject_ids = list(subject_ids)
+    if not subject_ids:
+        return Q(pk__in=[])
+    return Q(
+        pk__in=TutorSearchSubject.objects.filter(subject_id__in=subject_ids).values(
+            "document_id"
+        )
+    )
+
+
+def _is_integer(value: str) -> bool:
+    """Check if a query parameter's value can be compared with an integer column."""
+    return value.isascii() and value.isdigit() and int(value) < 2**63
+
+
+def _price_filter(lowest: Optional[int], highest: Optional[int]) -> Q:
+    """Create a filter of documents with the lowest price within a bucket."""
+    condition = Q(min_price__isnull=False)
+    if lowest is not None:
+        condition &= Q(min_price__gte=lowest)
+    if highest is not None:
+        condition &= Q(min_price__lt=highest)
+    return condition
+
+
+def _price_bucket_value(bucket: tuple[Optional[int], Optional[int]]) -> str:
+    """Get the query parameter value of a price bucket, e.g. "50-100"."""
+    lowest, highest = bucket
+    return f"{lowest if lowest is not None else ''}-{highest if highest is not None else ''}"
+
+
+def _price_bucket_label(bucket: tuple[Optional[int], Optional[int]]) -> str:
+    """Get the displayed name of a price bucket."""
+    lowest, highest = bucket
+    if lowest is None:
+        return f"Under {highest} {settings.CURRENCY}/hour"
+    if highest is None:
+        return f"{lowest} {settings.CURRENCY}/hour and more"
+    return f"{lowest}-{highest} {settings.CURRENCY}/hour"
@@ -0,0 +1,13 @@
+"""Full-text search over Tutors' search documents.
+
+The engine used for full-text search depends on the database, so it is
+provided by a backend class selected with the `SEARCH_FULLTEXT_BACKEND`
+setting. Every backend implements the interface of `FullTextBackend`.
+"""
+from .base import FullTextBackend, get_fulltext_backend, parse_query
+
+__all__ = [
+    "FullTextBackend",
+    "get_fulltext_backend",
+    "parse_query",
+]
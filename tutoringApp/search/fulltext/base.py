@@ -0,0 +1,85 @@
+"""Interface of the full-text search backends."""
+import re
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db.models.query import QuerySet
+from django.utils.module_loading import import_string
+
+from search.models import TutorSearchDocument
+
+DEFAULT_BACKEND = "search.fulltext.sqlite.SQLiteFullTextBackend"
+
+TERM_PATTERN = re.compile(r"\w+")
+
+
+class FullTextBackend:
+    """Base class of full-text search backends.
+
+    A backend maintains a full-text index of Tutors' names, descriptions,
+    cities and names of the Subjects they teach, and uses it to filter
+    and rank querysets of TutorSearchDocument objects. The index is
+    updated incrementally together with the search documents, see
+    `search.documents`.
+    """
+
+    def update(self, tutor_ids: Iterable[int]) -> None:
+        """Reindex given Tutors based on their current search documents.
+
+        Tutors without a search document are removed from the index.
+
+        Args:
+            tutor_ids: Primary keys of the reindexed Tutors.
+        """
+        raise NotImplementedError
+
+    def rebuild(self, tutor_ids: Optional[Iterable[int]] = None) -> None:
+        """Reindex Tutors from scratch.
+
+        Args:
+            tutor_ids: Primary keys of the reindexed Tutors,
+                        every Tutor is reindexed if not provided.
+        """
+        raise NotImplementedError
+
+    def search(
+        self, documents: QuerySet[TutorSearchDocument], terms: list[str]
+    ) -> QuerySet[TutorSearchDocument]:
+        """Filter search documents matching every term and order them by relevance.
+
+        Every term matches words it is a prefix of, so that results
+        are found while the user is still typing.
+
+        Args:
+            documents: QuerySet of the searched documents.
+            terms: Lowercased terms returned by `parse_query`.
+
+        Returns:
+            A QuerySet with the matching documents, ordered
+            from the most relevant and annotated with `rank`.
+        """
+        raise NotImplementedError
+
+
+def parse_query(query: str) -> list[str]:
+    """Split a query entered by the user into searchable terms.
+
+    Only word characters are kept, so the query's syntax
+    never reaches the underlying full-text engine.
+
+    Args:
+        query: The raw query.
+
+    Returns:
+        A list of lowercased terms, empty if the query has none.
+    """
+    return [term.lower() for term in TERM_PATTERN.findall(query)]
+
+
+@lru_cache
+def get_fulltext_backend() -> FullTextBackend:
+    """Get an instance of the backend configured with the `SEARCH_FULLTEXT_BACKEND` setting."""
+    return import_string(
+        getattr(settings, "SEARCH_FULLTEXT_BACKEND", DEFAULT_BACKEND)
+    )()
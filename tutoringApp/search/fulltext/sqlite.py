@@ -0,0 +1,107 @@
+"""Full-text search backend using the FTS5 extension of SQLite."""
+from typing import Iterable, Optional
+
+from django.db import connection, transaction
+from django.db.backends.utils import CursorWrapper
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+from django.db.models.query import QuerySet
+
+from search.models import TutorSearchDocument
+
+from .base import FullTextBackend
+
+TABLE = "search_tutorfulltext"
+CHUNK_SIZE = 500
+
+
+class SQLiteFullTextBackend(FullTextBackend):
+    """Full-text search with an FTS5 virtual table.
+
+    The table (created by the migrations of the app) holds a row for
+    every Tutor, with the Tutor's primary key as the row id. Results are
+    ranked with the BM25 function, with matches in names weighing the
+    most and matches in descriptions the least. Indexes of 2 and 3
+    character prefixes make prefix queries as fast as whole word ones.
+    """
+
+    COLUMN_WEIGHTS = {"name": 10.0, "subjects": 5.0, "city": 2.0, "description": 1.0}
+
+    def update(self, tutor_ids: Iterable[int]) -> None:
+        """Reindex given Tutors based on their current search documents."""
+        tutor_ids = list(set(tutor_ids))
+        with transaction.atomic(), connection.cursor() as cursor:
+            for i in range(0, len(tutor_ids), CHUNK_SIZE):
+                chunk = tutor_ids[i : i + CHUNK_SIZE]
+                cursor.execute(
+                    f"DELETE FROM {TABLE} WHERE rowid IN ({', '.join(['%s'] * len(chunk))})",
+                    chunk,
+                )
+            self._insert(
+                cursor, TutorSearchDocument.objects.filter(tutor_id__in=tutor_ids)
+            )
+
+    def rebuild(self, tutor_ids: Optional[Iterable[int]] = None) -> None:
+        """Reindex Tutors from scratch."""
+        if tutor_ids is not None:
+            self.update(tutor_ids)
+            return
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE}")
+            self._insert(cursor, TutorSearchDocument.objects.all())
+
+    def search(
+        self, documents: QuerySet[TutorSearchDocument], terms: list[str]
+    ) -> QuerySet[TutorSearchDocument]:
+        """Filter search documents matching every term and order them by relevance.
+
+        The full-text table is joined with the documents, so the index
+        is searched and every match is ranked only once. Django's ORM
+        cannot express joins with virtual tables, hence `extra`. The rank
+        is an annotation, so that it can be filtered by (e.g. by the keyset
+        pagination of the search results).
+        """
+        match = " ".join(f'"{term}"*' for term in terms)
+        weights = ", ".join(str(weight) for weight in self.COLUMN_WEIGHTS.values())
+        return (
+            documents.extra(
+                tables=[TABLE],
+                where=[
+                    f'{TABLE}.rowid = "{TutorSearchDocument._meta.db_table}"."tutor_id"',
+                    f"{TABLE} MATCH %s",
+                ],
+                params=[match],
+            )
+            .annotate(
+                rank=RawSQL(f"bm25({TABLE}, {weights})", [], output_field=FloatField())
+            )
+            .order_by("rank", "tutor_id")
+        )
+
+    def _insert(
+        self, cursor: CursorWrapper, documents: QuerySet[TutorSearchDocument]
+    ) -> None:
+        """Add rows of given search documents to the full-text index."""
+        cursor.executemany(
+            f"INSERT INTO {TABLE} (rowid, {', '.join(self.COLUMN_WEIGHTS)}) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            [
+                (
+                    tutor_id,
+                    f"{first_name} {last_name}",
+                    " ".join(subjects),
+                    city,
+                    description,
+                )
+                for tutor_id, first_name, last_name, subjects, city, description in (
+                    documents.values_list(
+                        "tutor_id",
+                        "first_name",
+                        "last_name",
+                        "subjects",
+                        "city",
+                        "tutor__description",
+                    ).iterator()
+                )
+            ],
+        )
@@ -0,0 +1,32 @@
+"""Benchmark of autocompleting names for growing number of Tutors."""
+from typing import Any
+
+from profiles.forms import AccountType
+from search.autocomplete import NamePrefixIndex
+from utils.benchmarking import BenchmarkCommand, bulk_create_tutors
+
+
+class Command(BenchmarkCommand):
+    """Measure latency of looking up a name prefix in the in-memory index.
+
+    For every dataset size that many Tutors are created and loaded into
+    a new NamePrefixIndex. Every run looks up the 10 first Tutors whose
+    names start with a common prefix, which is expected to take well under
+    a millisecond without any database queries, regardless of the number
+    of Tutors.
+    """
+
+    help = "Benchmark autocompleting names for growing number of Tutors."
+    default_sizes = [1000, 10000, 100000]
+    default_repeat = 1000
+
+    def set_up(self, size: int) -> NamePrefixIndex:
+        """Create `size` Tutors and load their names into a new index."""
+        bulk_create_tutors(f"benchmark_tutor_{size}", size)
+        index = NamePrefixIndex()
+        index.load()
+        return index
+
+    def run_once(self, context: NamePrefixIndex) -> None:
+        """Look up Tutors whose names start with a common prefix."""
+        context.search("kowal", AccountType.TUTOR, limit=10)
@@ -0,0 +1,73 @@
+"""Benchmark of searching Tutors by a query for growing number of Tutors."""
+from typing import Any
+
+from django.core.management.base import CommandParser
+from django.db.models.functions import Lower
+
+from profiles.models import Profile
+from search.documents import rebuild_search_documents
+from search.fulltext import get_fulltext_backend, parse_query
+from search.models import TutorSearchDocument
+from utils.benchmarking import BenchmarkCommand, bulk_create_tutors
+
+PAGE_SIZE = 10
+
+
+class Command(BenchmarkCommand):
+    """Compare the full-text search with substring matching of lowercased names.
+
+    For every dataset size that many Tutors are created. Every run
+    fetches the first page of Tutors matching the query together with
+    the number of all matches, which is what the paginated search results
+    page needs. The `contains` engine filters Profiles by `Lower()`
+    annotations of their Users' names, while the `fulltext` engine uses
+    the configured full-text backend on the search documents.
+    """
+
+    help = "Benchmark searching Tutors by a query for growing number of Tutors."
+    default_sizes = [1000, 10000, 100000]
+    default_repeat = 20
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add options selecting the search engine and the query."""
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--engine",
+            choices=["fulltext", "contains"],
+            default="fulltext",
+            help="Search implementation that is benchmarked.",
+        )
+        parser.add_argument(
+            "--query",
+            default="kowal",
+            help="Searched fragment of the Tutors' last names.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Remember the selected engine and query."""
+        self.engine = options["engine"]
+        self.query = options["query"]
+        super().handle(*args, **options)
+
+    def set_up(self, size: int) -> None:
+        """Create `size` Tutors with their search documents."""
+        bulk_create_tutors(f"benchmark_tutor_{size}", size)
+        rebuild_search_documents()
+
+    def run_once(self, context: None) -> None:
+        """Fetch the first page of the matching Tutors and count all of them."""
+        if self.engine == "fulltext":
+            results = get_fulltext_backend().search(
+                TutorSearchDocument.objects.all(), parse_query(self.query)
+            )
+        else:
+            results = (
+                Profile.objects.annotate(last_name_lower=Lower("user__last_name"))
+                .filter(
+                    teaching_since__isnull=False, last_name_lower__contains=self.query
+                )
+                .order_by("pk")
+                .distinct()
+            )
+        list(results[:PAGE_SIZE])
+        results.count()
@@ -0,0 +1,90 @@
+"""Benchmark of fetching deep pages of Students' search results."""
+from typing import Any
+
+from django.core.management.base import CommandParser
+from django.core.paginator import Paginator
+from django.test import RequestFactory
+
+from search.documents import rebuild_search_documents
+from search.views import StudentSearchResultsView
+from utils.benchmarking import BenchmarkCommand, bulk_create_tutors, create_profile
+from utils.pagination import Cursor
+
+
+class Command(BenchmarkCommand):
+    """Compare the keyset pagination of search results with offset pagination.
+
+    Dataset sizes are interpreted as numbers of the fetched pages, while
+    the number of Tutors stays the same for every page, so the latency
+    of page 1 can be compared with the latency of page 1000. The `keyset`
+    paginator of the search results view fetches the page with a cursor
+    pointing at it, the `offset` paginator fetches the same page with
+    Django's Paginator, which counts every result and skips the previous
+    pages.
+    """
+
+    help = "Benchmark fetching deep pages of Students' search results."
+    default_sizes = [1, 10, 100, 1000]
+    default_repeat = 20
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add options selecting the paginator and the number of Tutors."""
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--paginator",
+            choices=["keyset", "offset"],
+            default="keyset",
+            help="Pagination implementation that is benchmarked.",
+        )
+        parser.add_argument(
+            "--tutors",
+            type=int,
+            default=20000,
+            help="Number of Tutors in the search results.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Remember the selected paginator and number of Tutors."""
+        self.paginator = options["paginator"]
+        self.tutors = options["tutors"]
+        super().handle(*args, **options)
+
+    def set_up(self, size: int) -> dict[str, Any]:
+        """Create the Tutors and a cursor pointing at the page with number `size`."""
+        student = create_profile(f"benchmark_student_{size}", student=True)
+        bulk_create_tutors(f"benchmark_tutor_{size}", self.tutors)
+        rebuild_search_documents()
+        request = RequestFactory().get("/search/student")
+        request.user = student.user
+        request.session = {}
+        view = StudentSearchResultsView()
+        view.setup(request)
+        queryset = view.get_queryset()
+        paginator = view.get_paginator(queryset, view.paginate_by)
+        cursor = None
+        if size > 1:
+            last_on_previous_page = queryset.order_by("tutor_id")[
+                (size - 1) * view.paginate_by - 1
+            ]
+            cursor = paginator.encode_cursor(
+                Cursor(key=[last_on_previous_page.tutor_id], number=size)
+            )
+        return {
+            "queryset": queryset,
+            "paginator": paginator,
+            "cursor": cursor,
+            "page": size,
+        }
+
+    def run_once(self, context: dict[str, Any]) -> None:
+        """Fetch the page of the search results together with the number of pages."""
+        if self.paginator == "keyset":
+            page = context["paginator"].page(context["cursor"])
+            list(page.object_list)
+            page.num_pages
+        else:
+            page = Paginator(
+                context["queryset"], StudentSearchResultsView.paginate_by
+            ).page(context["page"])
+            list(page.object_list)
+            page.paginator.num_pages
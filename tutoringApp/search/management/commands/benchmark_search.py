@@ -0,0 +1,68 @@
+"""Benchmark of the Students' search results page for growing number of Tutors."""
+from typing import Any
+
+from django.test import RequestFactory
+
+from search.documents import rebuild_search_documents
+from search.views import StudentSearchResultsView
+from subscriptions.models import Review, Subscription
+from tutors.models import Service, Subject
+from utils.benchmarking import BenchmarkCommand, bulk_create_tutors, create_profile
+
+
+class Command(BenchmarkCommand):
+    """Measure latency of rendering the first page of Students' search results.
+
+    For every dataset size that many Tutors are created, each offering
+    Services in two Subjects and reviewed by a Student. Every run renders
+    the first page of the results filtered by one of the Subjects. The
+    objects are bulk created, so their search documents are rebuilt
+    once the whole dataset exists. The latency and query count are
+    expected to stay flat as the number of Tutors grows.
+    """
+
+    help = "Benchmark the Students' search results page for growing number of Tutors."
+
+    def set_up(self, size: int) -> dict[str, Any]:
+        """Create `size` Tutors with Services, Reviews and search documents."""
+        student = create_profile(f"benchmark_student_{size}", student=True)
+        subjects = [
+            Subject.objects.create(name=f"Benchmark subject {i}", category=0)
+            for i in range(2)
+        ]
+        tutors = bulk_create_tutors(f"benchmark_tutor_{size}", size)
+        Service.objects.bulk_create(
+            [
+                Service(
+                    tutor=tutor,
+                    subject=subject,
+                    number_of_hours=1,
+                    price_per_hour=100 + 10 * i,
+                    session_length=60,
+                    is_default=True,
+                )
+                for tutor in tutors
+                for i, subject in enumerate(subjects)
+            ]
+        )
+        subscriptions = Subscription.objects.bulk_create(
+            [
+                Subscription(tutor=tutor, student=student, subject=subjects[0])
+                for tutor in tutors
+            ]
+        )
+        Review.objects.bulk_create(
+            [
+                Review(subscription=subscription, star_rating=4.5, text="Review text.")
+                for subscription in subscriptions
+            ]
+        )
+        rebuild_search_documents()
+        request = RequestFactory().get("/search/student", {"subject": subjects[0].pk})
+        request.user = student.user
+        request.session = {}
+        return {"request": request}
+
+    def run_once(self, context: dict[str, Any]) -> None:
+        """Render the first page of the search results."""
+        StudentSearchResultsView.as_view()(context["request"]).render()
@@ -0,0 +1,29 @@
+"""Rebuild search documents of Tutors from their Profiles, Services and Reviews."""
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from search.documents import rebuild_search_documents
+
+
+class Command(BaseCommand):
+    """Recalculate TutorSearchDocument objects from scratch."""
+
+    help = (
+        "Rebuild search documents of Tutors from their Profiles, Services and Reviews."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add the option of limiting the rebuild to given Tutors."""
+        parser.add_argument(
+            "--tutor",
+            type=int,
+            action="append",
+            dest="tutor_ids",
+            help="Primary key of a Tutor whose document is rebuilt, can be repeated.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Rebuild the documents and report their number."""
+        stored = rebuild_search_documents(tutor_ids=options["tutor_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {stored} search documents."))
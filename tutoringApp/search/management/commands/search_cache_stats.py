@@ -0,0 +1,32 @@
+"""Report the hit rate of the cache of Students' search results."""
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from search.result_cache import get_statistics, reset_statistics
+
+
+class Command(BaseCommand):
+    """Print the numbers of hits and misses of the search results cache."""
+
+    help = "Report the hit rate of the cache of Students' search results."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add the option of resetting the counters."""
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the counters after reporting them.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Report the counters and optionally reset them."""
+        statistics = get_statistics()
+        hit_rate = statistics["hit_rate"]
+        self.stdout.write(
+            f"Hits: {statistics['hits']}, misses: {statistics['misses']}, hit rate: "
+            + (f"{hit_rate:.1%}" if hit_rate is not None else "n/a")
+        )
+        if options["reset"]:
+            reset_statistics()
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
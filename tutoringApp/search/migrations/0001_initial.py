@@ -0,0 +1,138 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:29
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_tutor_search_documents(apps, schema_editor):
+    """Create search documents of already existing Tutors."""
+    Profile = apps.get_model("profiles", "Profile")
+    Service = apps.get_model("tutors", "Service")
+    Review = apps.get_model("subscriptions", "Review")
+    TutorSearchDocument = apps.get_model("search", "TutorSearchDocument")
+    services = defaultdict(list)
+    for tutor_id, subject_id, subject_name, price in Service.objects.values_list(
+        "tutor_id", "subject_id", "subject__name", "price_per_hour"
+    ).iterator():
+        services[tutor_id].append((subject_id, subject_name, price))
+    ratings = defaultdict(list)
+    for tutor_id, star_rating in Review.objects.values_list(
+        "subscription__tutor_id", "star_rating"
+    ).iterator():
+        ratings[tutor_id].append(star_rating)
+    documents = []
+    for tutor_id, first_name, last_name, city in (
+        Profile.objects.filter(teaching_since__isnull=False)
+        .values_list("pk", "user__first_name", "user__last_name", "city")
+        .iterator()
+    ):
+        tutor_services = services[tutor_id]
+        prices = [price for _, _, price in tutor_services]
+        tutor_ratings = ratings[tutor_id]
+        documents.append(
+            TutorSearchDocument(
+                tutor_id=tutor_id,
+                first_name=first_name.lower(),
+                last_name=last_name.lower(),
+                city=city.lower(),
+                subject_ids=","
+                + "".join(
+                    f"{subject_id},"
+                    for subject_id in sorted(
+                        {subject_id for subject_id, _, _ in tutor_services}
+                    )
+                ),
+                subjects=sorted(
+                    {subject_name for _, subject_name, _ in tutor_services}
+                ),
+                min_price=min(prices) if prices else None,
+                average_price=sum(prices) // len(prices) if prices else None,
+                average_rating=sum(tutor_ratings) / len(tutor_ratings)
+                if tutor_ratings
+                else None,
+                review_count=len(tutor_ratings),
+            )
+        )
+    TutorSearchDocument.objects.bulk_create(documents, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("profiles", "0001_initial"),
+        ("subscriptions", "0001_initial"),
+        ("tutors", "0005_archivedavailability"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TutorSearchDocument",
+            fields=[
+                (
+                    "tutor",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_document",
+                        serialize=False,
+                        to="profiles.profile",
+                    ),
+                ),
+                (
+                    "first_name",
+                    models.CharField(
+                        db_index=True,
+                        help_text="Lowercased first name of the Tutor.",
+                        max_length=150,
+                    ),
+                ),
+                (
+                    "last_name",
+                    models.CharField(
+                        db_index=True,
+                        help_text="Lowercased last name of the Tutor.",
+                        max_length=150,
+                    ),
+                ),
+                (
+                    "city",
+                    models.CharField(
+                        db_index=True,
+                        help_text="Lowercased city of the Tutor.",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "subject_ids",
+                    models.CharField(
+                        default=",",
+                        help_text="Primary keys of the Subjects taught by the Tutor, surrounded by and separated with commas, e.g. `,1,5,`.",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "subjects",
+                    models.JSONField(
+                        default=list,
+                        help_text="Sorted names of the Subjects taught by the Tutor.",
+                    ),
+                ),
+                ("min_price", models.PositiveIntegerField(null=True)),
+                (
+                    "average_price",
+                    models.PositiveIntegerField(
+                        help_text="Average price per hour, rounded down.", null=True
+                    ),
+                ),
+                ("average_rating", models.FloatField(null=True)),
+                ("review_count", models.PositiveIntegerField(default=0)),
+                ("updated", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(
+            populate_tutor_search_documents, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations
+
+COLUMNS = ("name", "subjects", "city", "description")
+
+
+def create_fulltext_table(apps, schema_editor):
+    """Create and fill the FTS5 table used by the SQLite full-text backend."""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    TutorSearchDocument = apps.get_model("search", "TutorSearchDocument")
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE search_tutorfulltext USING fts5("
+        f"{', '.join(COLUMNS)}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO search_tutorfulltext (rowid, {', '.join(COLUMNS)}) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            [
+                (
+                    tutor_id,
+                    f"{first_name} {last_name}",
+                    " ".join(subjects),
+                    city,
+                    description,
+                )
+                for tutor_id, first_name, last_name, subjects, city, description in (
+                    TutorSearchDocument.objects.values_list(
+                        "tutor_id",
+                        "first_name",
+                        "last_name",
+                        "subjects",
+                        "city",
+                        "tutor__description",
+                    ).iterator()
+                )
+            ],
+        )
+
+
+def drop_fulltext_table(apps, schema_editor):
+    """Drop the FTS5 table used by the SQLite full-text backend."""
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE search_tutorfulltext")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("search", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_table, drop_fulltext_table),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_tutor_search_subjects(apps, schema_editor):
+    """Move the Subjects of existing search documents to the new table."""
+    TutorSearchDocument = apps.get_model("search", "TutorSearchDocument")
+    TutorSearchSubject = apps.get_model("search", "TutorSearchSubject")
+    Subject = apps.get_model("tutors", "Subject")
+    existing_subjects = set(Subject.objects.values_list("pk", flat=True))
+    TutorSearchSubject.objects.bulk_create(
+        [
+            TutorSearchSubject(document_id=tutor_id, subject_id=int(subject_id))
+            for tutor_id, subject_ids in TutorSearchDocument.objects.values_list(
+                "tutor_id", "subject_ids"
+            ).iterator()
+            for subject_id in subject_ids.split(",")
+            if subject_id and int(subject_id) in existing_subjects
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tutors", "0006_availability_time_idx"),
+        ("search", "0002_tutorfulltext"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TutorSearchSubject",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "document",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="taught_subjects",
+                        to="search.tutorsearchdocument",
+                    ),
+                ),
+                (
+                    "subject",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="tutors.subject",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="tutorsearchsubject",
+            constraint=models.UniqueConstraint(
+                fields=("subject", "document"), name="unique_tutor_search_subject"
+            ),
+        ),
+        migrations.RunPython(populate_tutor_search_subjects, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="tutorsearchdocument",
+            name="subject_ids",
+        ),
+    ]
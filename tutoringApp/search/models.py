@@ -1,3 +1,72 @@
 from django.db import models
 
-# Create your models here.
+from profiles.models import Profile
+from tutors.models import Subject
+
+
+class TutorSearchDocument(models.Model):
+    """Store denormalized data of a Tutor used when searching for Tutors.
+
+    Every Tutor has a single document holding everything the
+    search filters by and displays, so that searching comes down to
+    scanning one table instead of joining Profile, User, Service and
+    Review objects. Subjects taught by the Tutor are stored in a
+    separate, indexed table (see `TutorSearchSubject`). Documents are
+    kept up to date by the functions from the `search.documents`
+    module, which also provide the means of rebuilding them from scratch.
+    """
+
+    tutor = models.OneToOneField(
+        Profile,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_document",
+    )
+    first_name = models.CharField(
+        max_length=150, db_index=True, help_text="Lowercased first name of the Tutor."
+    )
+    last_name = models.CharField(
+        max_length=150, db_index=True, help_text="Lowercased last name of the Tutor."
+    )
+    city = models.CharField(
+        max_length=100, db_index=True, help_text="Lowercased city of the Tutor."
+    )
+    subjects = models.JSONField(
+        default=list, help_text="Sorted names of the Subjects taught by the Tutor."
+    )
+    min_price = models.PositiveIntegerField(null=True)
+    average_price = models.PositiveIntegerField(
+        null=True, help_text="Average price per hour, rounded down."
+    )
+    average_rating = models.FloatField(null=True)
+    review_count = models.PositiveIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        """String representation fo the model's instance."""
+        return f"Search document of tutor with id {self.tutor_id}"
+
+
+class TutorSearchSubject(models.Model):
+    """Store a Subject taught by the Tutor of a search document.
+
+    The unique index on the Subject and the document lets the search
+    find the documents of a Subject's Tutors without scanning the
+    documents or reading this table's rows.
+    """
+
+    document = models.ForeignKey(
+        TutorSearchDocument, on_delete=models.CASCADE, related_name="taught_subjects"
+    )
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, db_index=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["subject", "document"], name="unique_tutor_search_subject"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """String representation fo the model's instance."""
+        return f"Subject with id {self.subject_id} of tutor with id {self.document_id}"
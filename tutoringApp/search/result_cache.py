@@ -0,0 +1,262 @@
+"""Cache of the pages of Students' search results.
+
+A cached page holds the primary keys of the Tutors found on it,
+in order, together with their aggregates and the cursors of the
+page, stored under a key derived from the normalized query parameters
+of the search. A page served from the cache only needs the Profiles
+of the cached Tutors to be fetched. Facets of the search (see
+`search.facets`) are cached the same way, once for every page.
+
+Every key contains the global search generation, a counter kept in
+the cache and incremented whenever a Profile, User, Service or Review
+changes (see `search.signals`), which makes every previously cached
+page unreachable at once. A missing (e.g. evicted) counter starts from
+the current time, so that it never returns to an earlier generation. Hits and misses of the cache are counted,
+see the `search_cache_stats` management command.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from time import time_ns
+from typing import Any, Callable, Mapping, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+from profiles.models import Profile
+from search.facets import FacetValue, get_selection
+from search.fulltext import parse_query
+from search.models import TutorSearchDocument
+from utils.pagination import Cursor
+
+GENERATION_KEY = "search_results_generation"
+HITS_KEY = "search_results_hits"
+MISSES_KEY = "search_results_misses"
+RESULTS_TIMEOUT = 60 * 10
+
+AGGREGATE_FIELDS = (
+    "min_price",
+    "average_price",
+    "average_rating",
+    "review_count",
+    "subjects",
+)
+
+
+@dataclass(frozen=True)
+class CachedResults:
+    """Page of search results stored in the cache.
+
+    Attributes:
+        tutor_ids: Primary keys of the Tutors on the page, in order.
+        aggregates: Aggregates of every Tutor on the page, by the Tutor's primary key.
+        cursor: Cursor of the page.
+        next_cursor: Cursor of the next page, None if it is the last page.
+        previous_cursor: Cursor of the previous page, None if it is the first page.
+    """
+
+    tutor_ids: list[int]
+    aggregates: dict[int, dict[str, Any]]
+    cursor: Cursor
+    next_cursor: Optional[Cursor]
+    previous_cursor: Optional[Cursor]
+
+    @classmethod
+    def from_documents(
+        cls,
+        documents: list[TutorSearchDocument],
+        cursor: Cursor,
+        next_cursor: Optional[Cursor],
+        previous_cursor: Optional[Cursor],
+    ) -> "CachedResults":
+        """Create the cached page from the search documents displayed on it.
+
+        Args:
+            documents: Search documents on the page, in order.
+            cursor: Cursor of the page.
+            next_cursor: Cursor of the next page.
+            previous_cursor: Cursor of the previous page.
+
+        Returns:
+            The page to be cached.
+        """
+        return cls(
+            tutor_ids=[document.tutor_id for document in documents],
+            aggregates={
+                document.tutor_id: {
+                    field: getattr(document, field) for field in AGGREGATE_FIELDS
+                }
+                for document in documents
+            },
+            cursor=cursor,
+            next_cursor=next_cursor,
+            previous_cursor=previous_cursor,
+        )
+
+    def hydrate(self) -> list[TutorSearchDocument]:
+        """Recreate the search documents on the page with a single query.
+
+        The documents are not fetched, but created from the cached
+        aggregates and Profiles of the Tutors. Tutors deleted since the
+        page was cached are skipped.
+
+        Returns:
+            Unsaved search documents with their Tutors' Profiles and Users, in order.
+        """
+        profiles = Profile.objects.select_related("user").in_bulk(self.tutor_ids)
+        return [
+            TutorSearchDocument(tutor=profiles[tutor_id], **self.aggregates[tutor_id])
+            for tutor_id in self.tutor_ids
+            if tutor_id in profiles
+        ]
+
+
+def normalize_params(params: Mapping[str, str]) -> dict[str, Any]:
+    """Normalize the query parameters filtering a search.
+
+    Args:
+        params: Query parameters of the search request.
+
+    Returns:
+        Parameters affecting the results of the search, other than the
+        cursor, in a form that is the same for every request with
+        equivalent parameters.
+    """
+    return {
+        "first_name": params.get("first_name", "").strip().lower(),
+        "last_name": params.get("last_name", "").strip().lower(),
+        "q": " ".join(parse_query(params.get("q", ""))),
+        **get_selection(params),
+    }
+
+
+def get_cached_results(
+    params: Mapping[str, str], page_size: int
+) -> Optional[CachedResults]:
+    """Get a cached page of search results, counting the hit or the miss.
+
+    Args:
+        params: Query parameters of the search request.
+        page_size: Number of results on a page.
+
+    Returns:
+        The cached page, None if it is not in the cache.
+    """
+    results = cache.get(_get_results_key(params, page_size))
+    _increment(HITS_KEY if results is not None else MISSES_KEY)
+    return results
+
+
+def cache_results(
+    params: Mapping[str, str], page_size: int, results: CachedResults
+) -> None:
+    """Store a page of search results in the cache.
+
+    Args:
+        params: Query parameters of the search request.
+        page_size: Number of results on a page.
+        results: The stored page.
+    """
+    cache.set(_get_results_key(params, page_size), results, RESULTS_TIMEOUT)
+
+
+def get_cached_facets(
+    params: Mapping[str, str], compute: Callable[[], dict[str, list[FacetValue]]]
+) -> dict[str, list[FacetValue]]:
+    """Get cached facets of a search, computing them if needed.
+
+    Facets are shared by every page of the search results.
+
+    Args:
+        params: Query parameters of the search request.
+        compute: Function counting the facets, see `search.facets`.
+
+    Returns:
+        The cached or newly computed facets.
+    """
+    key = _get_key("search_facets", normalize_params(params))
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute()
+        cache.set(key, facets, RESULTS_TIMEOUT)
+    return facets
+
+
+def invalidate_search_results() -> None:
+    """Make every cached page of search results outdated.
+
+    The generation is incremented immediately, so the changes are
+    visible within the current transaction, and once more after
+    the transaction is committed, so that a page cached by another
+    request from the not yet committed data is discarded.
+    """
+    _bump_generation()
+    transaction.on_commit(_bump_generation)
+
+
+def get_generation() -> int:
+    """Get the current search generation, starting it if it is missing."""
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, time_ns() // 1000, None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def get_statistics() -> dict[str, Any]:
+    """Get the numbers of hits and misses of the cache.
+
+    Returns:
+        A dictionary with the number of hits, misses
+        and the hit rate (None if there were no lookups).
+    """
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / (hits + misses) if hits + misses else None,
+    }
+
+
+def reset_statistics() -> None:
+    """Reset the numbers of hits and misses of the cache."""
+    cache.delete_many([HITS_KEY, MISSES_KEY])
+
+
+def _get_results_key(params: Mapping[str, str], page_size: int) -> str:
+    """Create the cache key of a page of search results."""
+    return _get_key(
+        "search_results",
+        {
+            **normalize_params(params),
+            "cursor": params.get("cursor", ""),
+            "page_size": page_size,
+        },
+    )
+
+
+def _get_key(prefix: str, normalized_params: dict[str, Any]) -> str:
+    """Create a cache key of normalized parameters for the current generation."""
+    digest = hashlib.sha256(
+        json.dumps(normalized_params, sort_keys=True).encode()
+    ).hexdigest()
+    return f"{prefix}:{get_generation()}:{digest}"
+
+
+def _bump_generation() -> None:
+    """Increment the search generation."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        get_generation()
+        cache.incr(GENERATION_KEY)
+
+
+def _increment(key: str) -> None:
+    """Increment a counter stored in the cache, creating it if needed."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
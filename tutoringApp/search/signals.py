@@ -0,0 +1,136 @@
+"""Signal handlers keeping the search documents, cached results and the name index up to date."""
+from functools import partial
+from typing import Any, Optional
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Model
+from django.db.models.query import QuerySet
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from profiles.forms import AccountType
+from profiles.models import Profile
+from search.autocomplete import publish_change
+from search.documents import refresh_search_documents
+from search.result_cache import invalidate_search_results
+from subscriptions.models import Review
+from tutors.models import Service
+
+# Fields whose values are stored in the name index, by the models they belong to.
+NAME_INDEX_FIELDS = {User: ("first_name", "last_name"), Profile: ("teaching_since",)}
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=User)
+def refresh_profile_search_document(
+    sender: type,
+    instance: Model,
+    update_fields: Optional[frozenset[str]] = None,
+    **kwargs: Any,
+) -> None:
+    """Refresh the search document of a Tutor whose Profile or User changed.
+
+    Users' logins, which only update the time of the last login, are
+    skipped, as are Students, who never have search documents.
+    """
+    if sender is User and update_fields == frozenset({"last_login"}):
+        return
+    try:
+        profile = instance if isinstance(instance, Profile) else instance.profile
+    except Profile.DoesNotExist:
+        return
+    if not profile.is_student():
+        refresh_search_documents([profile.pk])
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def refresh_related_search_document(
+    sender: type, instance: Model, origin: Optional[Any] = None, **kwargs: Any
+) -> None:
+    """Refresh the search document of a Tutor whose Services or Reviews changed.
+
+    Objects deleted together with the Tutor's Profile or User are
+    skipped, as the document is deleted along with them and refreshing
+    it in the middle of the cascade would create it again. When Profiles
+    or Users are deleted in bulk, the document is refreshed only after
+    the deletion is committed.
+    """
+    tutor_id = (
+        instance.tutor_id
+        if isinstance(instance, Service)
+        else instance.subscription.tutor_id
+    )
+    if isinstance(origin, QuerySet) and origin.model in (Profile, User):
+        transaction.on_commit(lambda: refresh_search_documents([tutor_id]))
+    elif not (isinstance(origin, (Profile, User)) and origin.pk == tutor_id):
+        refresh_search_documents([tutor_id])
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_cached_search_results(
+    sender: type, update_fields: Optional[frozenset[str]] = None, **kwargs: Any
+) -> None:
+    """Make every cached page of search results outdated.
+
+    Users' logins, which only update the time of the last login, are skipped.
+    """
+    if sender is User and update_fields == frozenset({"last_login"}):
+        return
+    invalidate_search_results()
+
+
+@receiver(post_init, sender=Profile)
+@receiver(post_init, sender=User)
+def remember_name_index_values(sender: type, instance: Model, **kwargs: Any) -> None:
+    """Remember the values stored in the name index of a loaded Profile or User."""
+    instance._name_index_values = _get_name_index_values(sender, instance)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=User)
+def update_name_index(
+    sender: type, instance: Model, created: bool = False, **kwargs: Any
+) -> None:
+    """Apply the changed name or account type to the name index once it is committed.
+
+    Saves that change neither of them, such as Users' logins, are skipped,
+    so that other processes do not have to apply them to their indexes.
+    """
+    values = _get_name_index_values(sender, instance)
+    if not created and values == getattr(instance, "_name_index_values", None):
+        return
+    instance._name_index_values = values
+    try:
+        profile = instance if isinstance(instance, Profile) else instance.profile
+    except Profile.DoesNotExist:
+        return
+    transaction.on_commit(
+        partial(
+            publish_change,
+            profile.pk,
+            profile.user.first_name,
+            profile.user.last_name,
+            AccountType.STUDENT if profile.is_student() else AccountType.TUTOR,
+        )
+    )
+
+
+@receiver(post_delete, sender=Profile)
+def remove_from_name_index(sender: type, instance: Profile, **kwargs: Any) -> None:
+    """Remove a deleted Profile from the name index once the deletion is committed."""
+    transaction.on_commit(partial(publish_change, instance.pk))
+
+
+def _get_name_index_values(sender: type, instance: Model) -> tuple:
+    """Get values of a Profile's or User's fields that are stored in the name index."""
+    return tuple(instance.__dict__.get(field) for field in NAME_INDEX_FIELDS[sender])
@@ -0,0 +1,152 @@
+"""Tests for autocompleting names with the in-memory prefix index."""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from profiles.forms import AccountType
+from profiles.models import Profile
+from search.autocomplete import (
+    NamePrefixIndex,
+    _get_change_key,
+    get_generation,
+    name_index,
+)
+from utils.testing import TestCaseUserUtils
+from utils.testing.settings import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestNameAutocomplete(TestCaseUserUtils):
+    """Tests for the NamePrefixIndex and the autocomplete endpoint."""
+
+    def setUp(self):
+        """Create Students and Tutors with distinct names."""
+        cache.clear()
+        self._register_user("tutor1", student=False)
+        self._register_user("tutor2", student=False)
+        self._register_user("student1")
+        self._rename("tutor1", "Łukasz", "Nowak")
+        self._rename("tutor2", "Anna", "Nowakowska")
+        self._rename("student1", "Anna", "Kowalska")
+        name_index.load()
+
+    @staticmethod
+    def _rename(username, first_name, last_name):
+        """Change names of a User."""
+        user = User.objects.get(username=username)
+        user.first_name = first_name
+        user.last_name = last_name
+        user.save()
+
+    def _suggest(self, **params):
+        """Get names suggested by the autocomplete endpoint."""
+        response = self.client.get(reverse("search:autocomplete"), params)
+        return [result["name"] for result in response.json()["results"]]
+
+    def test_first_and_last_name_prefixes_matched_without_queries(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [match.name for match in name_index.search("NOWAK", AccountType.TUTOR)],
+                ["Łukasz Nowak", "Anna Nowakowska"],
+            )
+            self.assertEqual(
+                [match.name for match in name_index.search("luk", AccountType.TUTOR)],
+                ["Łukasz Nowak"],
+            )
+            self.assertEqual(
+                [
+                    match.name
+                    for match in name_index.search("anna n", AccountType.TUTOR)
+                ],
+                ["Anna Nowakowska"],
+            )
+
+    def test_results_filtered_by_account_type_and_limited(self):
+        self.assertEqual(
+            [match.id for match in name_index.search("anna", AccountType.STUDENT)],
+            [Profile.objects.get(user__username="student1").pk],
+        )
+        self.assertEqual(len(name_index.search("nowak", AccountType.TUTOR, limit=1)), 1)
+
+    def test_index_updated_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._rename("tutor1", "Jan", "Kowalski")
+
+        self.assertEqual(
+            [match.name for match in name_index.search("nowak", AccountType.TUTOR)],
+            ["Anna Nowakowska"],
+        )
+        self.assertEqual(
+            [match.name for match in name_index.search("kowalski", AccountType.TUTOR)],
+            ["Jan Kowalski"],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.get(username="tutor1").delete()
+
+        self.assertEqual(name_index.search("jan", AccountType.TUTOR), [])
+
+    def test_changes_applied_by_other_process_without_queries(self):
+        other_index = NamePrefixIndex()
+        other_index.load()
+        with self.captureOnCommitCallbacks(execute=True):
+            self._rename("tutor1", "Jan", "Kowalski")
+
+        other_index._checked = 0
+        with self.assertNumQueries(0):
+            other_index.ensure_current()
+
+        self.assertEqual(
+            [match.name for match in other_index.search("jan", AccountType.TUTOR)],
+            ["Jan Kowalski"],
+        )
+        self.assertEqual(other_index.generation, get_generation())
+
+    def test_index_of_other_process_reloaded_when_changes_expired(self):
+        other_index = NamePrefixIndex()
+        other_index.load()
+        with self.captureOnCommitCallbacks(execute=True):
+            self._rename("tutor1", "Jan", "Kowalski")
+        cache.delete(_get_change_key(get_generation()))
+
+        other_index._checked = 0
+        other_index.ensure_current()
+
+        self.assertEqual(
+            [match.name for match in other_index.search("jan", AccountType.TUTOR)],
+            ["Jan Kowalski"],
+        )
+
+    def test_saves_not_changing_names_not_published(self):
+        generation = get_generation()
+        user = User.objects.get(username="tutor1")
+        user.last_login = user.date_joined
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save(update_fields=["last_login"])
+            user.email = "tutor1@example.com"
+            user.save()
+            Profile.objects.get(user=user).save()
+
+        self.assertEqual(get_generation(), generation)
+
+    def test_endpoint_returns_suggestions(self):
+        self._login_user("student1")
+
+        self.assertEqual(self._suggest(q="now"), ["Łukasz Nowak", "Anna Nowakowska"])
+        self.assertEqual(
+            self._suggest(q="ann", account_type="student"), ["Anna Kowalska"]
+        )
+
+    def test_endpoint_rejects_invalid_requests(self):
+        url = reverse("search:autocomplete")
+        self.client.logout()
+        self.assertEqual(self.client.get(url, {"q": "now"}).status_code, 403)
+
+        self._login_user("student1")
+
+        self.assertEqual(
+            self.client.get(url, {"account_type": "admin"}).status_code, 400
+        )
+        self.assertEqual(self.client.get(url, {"limit": 0}).status_code, 400)
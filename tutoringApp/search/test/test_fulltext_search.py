@@ -0,0 +1,71 @@
+"""Tests for the full-text search of Tutors."""
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from profiles.models import Profile
+from search.fulltext import parse_query
+from search.views import StudentSearchResultsView
+from tutors.models import Service
+from utils.testing import TestCaseSubscriptionUtils
+
+
+class TestFullTextSearch(TestCaseSubscriptionUtils):
+    """Tests for the `q` parameter of the StudentSearchResultsView."""
+
+    def setUp(self):
+        """Create Tutors with distinct names, descriptions and cities."""
+        super().setUp()
+        self.tutor1 = Profile.objects.get(user__username="tutor1")
+        self.tutor2 = Profile.objects.get(user__username="tutor2")
+        user = User.objects.get(username="tutor1")
+        user.last_name = "Oppenheimer"
+        user.save()
+        self.tutor1.refresh_from_db()
+        self.tutor1.city = "Kraków"
+        self.tutor1.save()
+        self.tutor2.description = "Oppenheimer's biggest fan, teaching since forever."
+        self.tutor2.save()
+        self._create_service_objects(profile=self.tutor2)
+        self._login_user("student1")
+
+    def _search(self, **params):
+        """Get Tutors displayed on the search results page."""
+        response = self.client.get(reverse("search:for_student"), params)
+        return [document.tutor for document in response.context["page_obj"]]
+
+    def test_query_parsed_into_plain_terms(self):
+        self.assertEqual(
+            parse_query('Jan "OR" Kowal*ski'), ["jan", "or", "kowal", "ski"]
+        )
+        self.assertEqual(parse_query('"*()'), [])
+
+    def test_matches_in_names_ranked_above_descriptions(self):
+        self.assertEqual(self._search(q="oppenheimer"), [self.tutor1, self.tutor2])
+
+    def test_prefix_and_diacritics_matched(self):
+        self.assertEqual(self._search(q="krako"), [self.tutor1])
+        self.assertEqual(self._search(q="opp fan"), [self.tutor2])
+
+    def test_query_combined_with_subject_filter(self):
+        Service.objects.filter(tutor=self.tutor1, subject_id=2).delete()
+
+        self.assertEqual(self._search(q="english"), [self.tutor2])
+        self.assertEqual(self._search(q="math", subject=2), [self.tutor2])
+
+    def test_query_without_terms_ignored(self):
+        self.assertEqual(self._search(q='"*'), [self.tutor1, self.tutor2])
+
+    def test_ranked_results_paginated_by_rank(self):
+        with patch.object(StudentSearchResultsView, "paginate_by", 1):
+            first_page = self.client.get(
+                reverse("search:for_student"), {"q": "oppenheimer"}
+            ).context["page_obj"]
+            second_page = self.client.get(
+                f"{reverse('search:for_student')}?{first_page.next_query}"
+            ).context["page_obj"]
+
+        self.assertEqual([document.tutor for document in first_page], [self.tutor1])
+        self.assertEqual([document.tutor for document in second_page], [self.tutor2])
+        self.assertFalse(second_page.has_next())
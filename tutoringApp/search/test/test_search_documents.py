@@ -0,0 +1,121 @@
+"""Tests for keeping the search documents of Tutors up to date."""
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+
+from profiles.models import Profile
+from search.models import TutorSearchDocument, TutorSearchSubject
+from subscriptions.models import Review
+from tutors.models import Service, Subject
+from utils.testing import TestCaseSubscriptionUtils
+
+
+class TestSearchDocuments(TestCaseSubscriptionUtils):
+    """Tests for the signal handlers and the rebuild command of search documents."""
+
+    def setUp(self):
+        """Create Tutors with Services."""
+        super().setUp()
+        self.tutor = Profile.objects.get(user__username="tutor1")
+        self.student = Profile.objects.get(user__username="student1")
+
+    def _get_document(self):
+        """Fetch the search document of the Tutor."""
+        return TutorSearchDocument.objects.get(tutor=self.tutor)
+
+    def _get_subject_ids(self):
+        """Fetch primary keys of the Subjects stored for the Tutor's search document."""
+        return list(
+            TutorSearchSubject.objects.filter(document_id=self.tutor.pk)
+            .order_by("subject_id")
+            .values_list("subject_id", flat=True)
+        )
+
+    def test_documents_created_only_for_tutors(self):
+        self.assertEqual(
+            set(
+                TutorSearchDocument.objects.values_list(
+                    "tutor__user__username", flat=True
+                )
+            ),
+            {"tutor1", "tutor2"},
+        )
+        document = self._get_document()
+        self.assertEqual(document.first_name, "tutor1's first name")
+        self.assertEqual(self._get_subject_ids(), [1, 2])
+        self.assertEqual((document.min_price, document.average_price), (80, 100))
+
+    def test_document_updated_on_user_and_profile_change(self):
+        user = User.objects.get(username="tutor1")
+        user.last_name = "Kowalski"
+        user.save()
+        self.tutor.refresh_from_db()
+        self.tutor.city = "Warszawa"
+        self.tutor.save()
+
+        document = self._get_document()
+        self.assertEqual((document.last_name, document.city), ("kowalski", "warszawa"))
+
+    def test_document_updated_on_service_change(self):
+        Service.objects.filter(tutor=self.tutor, subject_id=2).delete()
+        self.assertEqual(self._get_subject_ids(), [1])
+
+        Service.objects.create(
+            tutor=self.tutor,
+            subject=Subject.objects.get(pk=3),
+            number_of_hours=1,
+            price_per_hour=40,
+            is_default=True,
+        )
+        document = self._get_document()
+        self.assertEqual(self._get_subject_ids(), [1, 3])
+        self.assertEqual(document.min_price, 40)
+
+    def test_document_updated_on_review_change(self):
+        review = Review.objects.create(
+            subscription=self._create_subscription_object(
+                tutor=self.tutor,
+                student=self.student,
+                subject=Subject.objects.get(pk=1),
+            ),
+            star_rating=4,
+            text="Review text.",
+        )
+        document = self._get_document()
+        self.assertEqual((document.average_rating, document.review_count), (4, 1))
+
+        review.delete()
+        document = self._get_document()
+        self.assertEqual((document.average_rating, document.review_count), (None, 0))
+
+    def test_document_not_refreshed_on_login_or_student_change(self):
+        user = User.objects.get(username="tutor1")
+        user.last_login = user.date_joined
+
+        with patch("search.signals.refresh_search_documents") as refresh:
+            user.save(update_fields=["last_login"])
+            self.student.save()
+
+        refresh.assert_not_called()
+
+    def test_document_removed_with_tutor(self):
+        User.objects.get(username="tutor1").delete()
+
+        self.assertFalse(
+            TutorSearchDocument.objects.filter(tutor_id=self.tutor.pk).exists()
+        )
+
+    def test_rebuild_command_restores_documents(self):
+        TutorSearchDocument.objects.all().delete()
+
+        call_command("rebuild_search_documents", stdout=StringIO())
+
+        self.assertEqual(TutorSearchDocument.objects.count(), 2)
+        self.assertEqual(
+            self._get_document().subjects,
+            sorted(
+                Subject.objects.filter(pk__in=[1, 2]).values_list("name", flat=True)
+            ),
+        )
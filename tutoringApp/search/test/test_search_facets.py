@@ -0,0 +1,111 @@
+"""Tests for the facets of Students' search results."""
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from profiles.models import Profile
+from search import facets
+from search.models import TutorSearchDocument
+from subscriptions.models import Review
+from tutors.models import Service, Subject
+from utils.testing import TestCaseSubscriptionUtils
+from utils.testing.settings import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestSearchFacets(TestCaseSubscriptionUtils):
+    """Tests for the facets displayed by the StudentSearchResultsView."""
+
+    def setUp(self):
+        """Create Tutors teaching different Subjects for different prices."""
+        cache.clear()
+        super().setUp()
+        self.tutor1 = Profile.objects.get(user__username="tutor1")
+        self.tutor2 = Profile.objects.get(user__username="tutor2")
+        self._create_service_objects(profile=self.tutor2)
+        self._register_user("tutor3", student=False)
+        self.tutor3 = Profile.objects.get(user__username="tutor3")
+        Service.objects.create(
+            tutor=self.tutor3,
+            subject=Subject.objects.get(name="Physics"),
+            number_of_hours=1,
+            price_per_hour=40,
+            session_length=60,
+            is_default=True,
+        )
+        Review.objects.create(
+            subscription=self._create_subscription_object(
+                tutor=self.tutor1,
+                student=Profile.objects.get(user__username="student1"),
+                subject=Subject.objects.get(pk=1),
+            ),
+            star_rating=4.5,
+            text="Review text.",
+        )
+        self._login_user("student1")
+
+    def _get(self, **params):
+        """Get the displayed search results and counts of the facets' values."""
+        response = self.client.get(reverse("search:for_student"), params)
+        counts = {
+            title: {value.label: value.count for value, _ in values}
+            for title, values in response.context["facets"]
+        }
+        return [document.tutor for document in response.context["page_obj"]], counts
+
+    def test_facet_values_counted(self):
+        _, counts = self._get()
+
+        self.assertEqual(counts["Subject"], {"English": 2, "Math": 2, "Physics": 1})
+        self.assertEqual(counts["Category"], {"Languages": 2, "Science": 1, "Maths": 2})
+        self.assertEqual(counts["Price"], {"Under 50 $/hour": 1, "50-100 $/hour": 2})
+        self.assertEqual(
+            counts["Rating"],
+            {"4+ stars": 1, "3+ stars": 1, "2+ stars": 1, "1+ stars": 1},
+        )
+
+    def test_selected_facet_narrows_results_and_other_facets(self):
+        results, counts = self._get(price="-50")
+
+        self.assertEqual(results, [self.tutor3])
+        self.assertEqual(counts["Subject"], {"Physics": 1})
+        self.assertEqual(counts["Price"], {"Under 50 $/hour": 1, "50-100 $/hour": 2})
+
+    def test_category_facet_filters_results(self):
+        results, _ = self._get(category=1)
+
+        self.assertEqual(results, [self.tutor3])
+
+    def test_facets_counted_with_single_query_over_documents(self):
+        with CaptureQueriesContext(connection) as queries:
+            facets.compute_facets(TutorSearchDocument.objects.all(), {"rating": "4"})
+
+        self.assertEqual(
+            len(
+                [
+                    query
+                    for query in queries
+                    if TutorSearchDocument._meta.db_table in query["sql"]
+                ]
+            ),
+            1,
+        )
+
+    def test_facets_cached_per_query(self):
+        with patch(
+            "search.views.student.compute_facets", wraps=facets.compute_facets
+        ) as compute_facets:
+            self._get(subject=1)
+            self._get(subject=1)
+            self._get(subject=2)
+
+        self.assertEqual(compute_facets.call_count, 2)
+
+    def test_facets_counted_for_full_text_query(self):
+        _, counts = self._get(q="tutor3")
+
+        self.assertEqual(counts["Subject"], {"Physics": 1})
@@ -0,0 +1,87 @@
+"""Tests for searching Tutors free in a given time window."""
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from freezegun import freeze_time
+
+from profiles.models import Profile
+from tutors.models import Availability
+from utils.testing import TestCaseBookingeUtils
+from utils.testing.settings import LOCMEM_CACHES
+
+NOW = "2023-12-13 07:59:00+00:00"
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+@freeze_time(NOW)
+class TestSearchFreeWindow(TestCaseBookingeUtils):
+    """Tests for the `free_from` and `free_to` parameters of the StudentSearchResultsView."""
+
+    def setUp(self):
+        """Create Tutors' Availability objects and log in as a Student."""
+        cache.clear()
+        super().setUp()
+        self.tutor1 = Profile.objects.get(user__username="tutor1")
+        self.tutor2 = Profile.objects.get(user__username="tutor2")
+        self._register_user("student1")
+        self.student = Profile.objects.get(user__username="student1")
+
+    def _search(self, free_from, free_to, **params):
+        """Get Tutors free in a time window with the starts of their next free slots."""
+        response = self.client.get(
+            reverse("search:for_student"),
+            {"free_from": free_from, "free_to": free_to, **params},
+        )
+        return [
+            (document.tutor, document.next_free_slot)
+            for document in response.context["page_obj"]
+        ]
+
+    def test_tutors_with_free_slot_in_window_found(self):
+        self.assertEqual(
+            self._search("2023-12-15T07:00", "2023-12-15T12:00"),
+            [(self.tutor1, datetime(2023, 12, 15, 8, 0, tzinfo=timezone.utc))],
+        )
+
+    def test_slots_overlapping_window_boundaries_found(self):
+        results = self._search("2023-12-14T09:30", "2023-12-14T09:45")
+
+        self.assertEqual([tutor for tutor, _ in results], [self.tutor1, self.tutor2])
+
+    def test_booked_slots_skipped(self):
+        self._search("2023-12-14T08:00", "2023-12-14T12:00")
+        first_slot = Availability.objects.get(
+            service__tutor=self.tutor1,
+            start=datetime(2023, 12, 14, 9, 0, tzinfo=timezone.utc),
+        )
+        self._create_booking_object(availability=first_slot, student=self.student)
+
+        results = dict(self._search("2023-12-14T08:00", "2023-12-14T12:00"))
+
+        self.assertEqual(
+            results[self.tutor1], datetime(2023, 12, 14, 10, 0, tzinfo=timezone.utc)
+        )
+        self.assertEqual(
+            results[self.tutor2], datetime(2023, 12, 14, 9, 0, tzinfo=timezone.utc)
+        )
+
+    def test_slots_of_other_subjects_skipped(self):
+        self.assertEqual(
+            self._search("2023-12-14T08:00", "2023-12-14T12:00", subject=2), []
+        )
+        self.assertEqual(
+            len(self._search("2023-12-14T08:00", "2023-12-14T12:00", subject=1)), 2
+        )
+
+    def test_past_slots_skipped(self):
+        self.assertEqual(self._search("2023-12-10T00:00", "2023-12-13T00:00"), [])
+
+    def test_invalid_window_ignored(self):
+        response = self.client.get(
+            reverse("search:for_student"),
+            {"free_from": "2023-12-15T12:00", "free_to": "soon"},
+        )
+
+        self.assertEqual(len(response.context["page_obj"]), 2)
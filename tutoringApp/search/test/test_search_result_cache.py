@@ -0,0 +1,80 @@
+"""Tests for the cache of Students' search results."""
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from profiles.models import Profile
+from search.models import TutorSearchDocument
+from search.result_cache import get_generation, get_statistics
+from subscriptions.models import Review
+from tutors.models import Subject
+from utils.testing import TestCaseSubscriptionUtils
+from utils.testing.settings import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestSearchResultCache(TestCaseSubscriptionUtils):
+    """Tests for the search results cache of the StudentSearchResultsView."""
+
+    def setUp(self):
+        """Create Tutors with Services and log in as a Student."""
+        cache.clear()
+        super().setUp()
+        self.tutor1 = Profile.objects.get(user__username="tutor1")
+        self.tutor2 = Profile.objects.get(user__username="tutor2")
+        self._create_service_objects(profile=self.tutor2)
+        self._login_user("student1")
+
+    def _get_results(self, **params):
+        """Get the search documents displayed on the search results page."""
+        response = self.client.get(reverse("search:for_student"), params)
+        return list(response.context["page_obj"])
+
+    def test_cached_page_hydrated_without_querying_documents(self):
+        self._get_results(subject=1)
+
+        with CaptureQueriesContext(connection) as queries:
+            results = self._get_results(subject=1)
+
+        self.assertEqual(
+            [result.tutor for result in results], [self.tutor1, self.tutor2]
+        )
+        self.assertEqual(results[0].min_price, 80)
+        self.assertFalse(
+            any(TutorSearchDocument._meta.db_table in query["sql"] for query in queries)
+        )
+        self.assertEqual(get_statistics(), {"hits": 1, "misses": 1, "hit_rate": 0.5})
+
+    def test_equivalent_parameters_share_cached_page(self):
+        self._get_results(first_name="TUTOR2 ")
+
+        (result,) = self._get_results(first_name="tutor2")
+
+        self.assertEqual(result.tutor, self.tutor2)
+        self.assertEqual(get_statistics()["hits"], 1)
+
+    def test_review_invalidates_cached_pages(self):
+        self._get_results()
+        Review.objects.create(
+            subscription=self._create_subscription_object(
+                tutor=self.tutor1,
+                student=Profile.objects.get(user__username="student1"),
+                subject=Subject.objects.get(pk=1),
+            ),
+            star_rating=4.5,
+            text="Review text.",
+        )
+
+        tutor1, _ = self._get_results()
+
+        self.assertEqual(tutor1.average_rating, 4.5)
+        self.assertEqual(get_statistics()["hits"], 0)
+
+    def test_login_does_not_invalidate_cached_pages(self):
+        generation = get_generation()
+
+        self._login_user("student1")
+
+        self.assertEqual(get_generation(), generation)
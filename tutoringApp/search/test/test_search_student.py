@@ -0,0 +1,82 @@
+"""Tests for the search results displayed to Students."""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from profiles.models import Profile
+from subscriptions.models import Review
+from tutors.models import Subject
+from utils.testing import TestCaseSubscriptionUtils
+
+
+class TestStudentSearchResults(TestCaseSubscriptionUtils):
+    """Tests for the StudentSearchResultsView."""
+
+    def setUp(self):
+        """Create Tutors with Services and log in as a Student."""
+        super().setUp()
+        self.tutor1 = Profile.objects.get(user__username="tutor1")
+        self.tutor2 = Profile.objects.get(user__username="tutor2")
+        self._create_service_objects(profile=self.tutor2)
+        Review.objects.create(
+            subscription=self._create_subscription_object(
+                tutor=self.tutor1,
+                student=Profile.objects.get(user__username="student1"),
+                subject=Subject.objects.get(pk=1),
+            ),
+            star_rating=4.5,
+            text="Review text.",
+        )
+        self._login_user("student1")
+
+    def _get_results(self, **params):
+        """Get the search documents displayed on the search results page."""
+        response = self.client.get(reverse("search:for_student"), params)
+        return list(response.context["page_obj"])
+
+    def test_aggregates_attached_to_tutors(self):
+        tutor1, tutor2 = self._get_results()
+
+        self.assertEqual(tutor1.tutor, self.tutor1)
+        self.assertEqual(tutor1.min_price, 80)
+        self.assertEqual(tutor1.average_price, 100)
+        self.assertEqual(tutor1.average_rating, 4.5)
+        self.assertEqual(
+            tutor1.subjects,
+            sorted(
+                Subject.objects.filter(pk__in=[1, 2]).values_list("name", flat=True)
+            ),
+        )
+        self.assertIsNone(tutor2.average_rating)
+
+    def test_results_filtered_by_name(self):
+        (result,) = self._get_results(first_name="TUTOR2")
+
+        self.assertEqual(result.tutor, self.tutor2)
+
+    def test_results_filtered_by_part_of_name(self):
+        (result,) = self._get_results(first_name="utor2")
+
+        self.assertEqual(result.tutor, self.tutor2)
+
+    def test_subject_filter_keeps_aggregates_over_every_service(self):
+        tutor1, _ = self._get_results(subject=1)
+
+        self.assertEqual(tutor1.average_price, 100)
+        self.assertEqual(len(tutor1.subjects), 2)
+
+    def test_number_of_queries_independent_of_number_of_tutors(self):
+        with CaptureQueriesContext(connection) as few_tutors_queries:
+            self._get_results()
+        for i in range(3, 15):
+            self._register_user(f"tutor{i}", student=False)
+            self._create_service_objects(
+                profile=Profile.objects.get(user__username=f"tutor{i}")
+            )
+        self._login_user("student1")
+
+        with CaptureQueriesContext(connection) as many_tutors_queries:
+            results = self._get_results()
+
+        self.assertEqual(len(results), 10)
+        self.assertEqual(len(few_tutors_queries), len(many_tutors_queries))
@@ -6,4 +6,9 @@ app_name = "search"
 urlpatterns = [
     path("student", view=views.StudentSearchResultsView.as_view(), name="for_student"),
     path("tutor", view=views.TutorSearchResultsView.as_view(), name="for_tutor"),
+    path(
+        "autocomplete",
+        view=views.NameAutocompleteAPIView.as_view(),
+        name="autocomplete",
+    ),
 ]
@@ -1,8 +1,10 @@
 """Views for the Search App."""
+from .autocomplete import NameAutocompleteAPIView
 from .student import StudentSearchResultsView
 from .tutor import TutorSearchResultsView
 
 __all__ = [
+    "NameAutocompleteAPIView",
     "StudentSearchResultsView",
     "TutorSearchResultsView",
 ]
@@ -0,0 +1,53 @@
+"""View for autocompleting names of Students and Tutors."""
+from django.http import HttpRequest
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from profiles.forms import AccountType
+from search.autocomplete import name_index
+
+MAX_LIMIT = 50
+
+
+class NameAutocompleteAPIView(APIView):
+    """API for suggesting Profiles whose names start with a typed prefix."""
+
+    def get(self, request: HttpRequest) -> Response:
+        """Return Profiles of given account type with names starting with the query.
+
+        The Profiles are looked up in the in-memory name index of the
+        process, see `search.autocomplete`, so answering the request does
+        not query the database once the index has been loaded.
+
+        Args:
+            request: Instance of the HttpRequest class containing
+                    every information about the request sent to the
+                    server, including the `q` (typed prefix), `account_type`
+                    (`student` or `tutor`, the default) and `limit` (maximum
+                    number of suggestions, 10 by default) parameters.
+        Returns:
+            Instance of the `Response` class with an appropraite
+            status code and or the list of suggested Profiles' primary
+            keys and full names.
+        """
+        if not request.user.is_authenticated:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        try:
+            account_type = AccountType[request.GET.get("account_type", "tutor").upper()]
+            limit = int(request.GET.get("limit", 10))
+        except (KeyError, ValueError):
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        if not 0 < limit <= MAX_LIMIT:
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        name_index.ensure_current()
+        return Response(
+            {
+                "results": [
+                    {"id": match.id, "name": match.name}
+                    for match in name_index.search(
+                        request.GET.get("q", ""), account_type, limit
+                    )
+                ]
+            }
+        )
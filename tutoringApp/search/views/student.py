@@ -1,27 +1,54 @@
 """View for generating search results for Students."""
-from math import floor
-from typing import Any, Optional
+from datetime import datetime
+from typing import Any, Optional, Sequence
 
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
-from django.db.models.functions import Lower
+from django.db.models import OuterRef, Subquery
 from django.db.models.query import QuerySet
 from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, make_aware
 from django.views.generic.list import ListView
 
 from profiles.forms import AccountType
-from profiles.models import Profile
-from subscriptions.models import Review
-from tutors.models import Service, Subject
+from search.facets import (
+    CATEGORY,
+    PRICE,
+    RATING,
+    SUBJECT,
+    FacetValue,
+    compute_facets,
+    get_facet_filters,
+    get_selection,
+)
+from search.fulltext import get_fulltext_backend, parse_query
+from search.models import TutorSearchDocument
+from search.result_cache import (
+    CachedResults,
+    cache_results,
+    get_cached_facets,
+    get_cached_results,
+)
+from tutors.models import Availability, Subject
+from utils.pagination import KeysetPage, KeysetPaginationMixin, KeysetPaginator
 
+FACET_TITLES = {
+    SUBJECT: "Subject",
+    CATEGORY: "Category",
+    PRICE: "Price",
+    RATING: "Rating",
+}
 
-class StudentSearchResultsView(ListView, LoginRequiredMixin):
+
+class StudentSearchResultsView(KeysetPaginationMixin, ListView, LoginRequiredMixin):
     """View for generating search results for Students."""
 
-    model = Profile
+    model = TutorSearchDocument
     paginate_by = 10
-    template_name = "search\student.html"
+    template_name = "search/student.html"
+    keyset_ordering = ("tutor_id",)
+    count_limit = 1000
 
     def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
         """Ensure that correct page for given account type is displayed.
@@ -36,54 +63,158 @@ class StudentSearchResultsView(ListView, LoginRequiredMixin):
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         """Add additional information to the context."""
-        profiles = self.get_queryset()
         context = super().get_context_data(**kwargs)
-
-        context["subjects"] = [self._get_subjects(profile) for profile in profiles]
-        context["average_prices"] = [self._get_average_price(profile) for profile in profiles]
         context["currency"] = settings.CURRENCY
         context["search_subject"] = (
             Subject.objects.get(pk=self.request.GET.get("subject", None))
             if self.request.GET.get("subject", None)
             else None
         )
-        context["average_ratings"] = [self._get_average_rating(profile) for profile in profiles]
+        context["facets"] = self._get_facets()
         return context
 
-    def get_queryset(self) -> QuerySet[Any]:
-        """Filter the search results based on query parameters."""
-        search_subject = self.request.GET.get("subject", None)
-        search_first_name = self.request.GET.get("first_name", None)
-        search_last_name = self.request.GET.get("last_name", None)
-        tutors = (
-            Profile.objects.annotate(
-                first_name_lower=Lower("user__first_name"), last_name_lower=Lower("user__last_name")
+    def paginate_queryset(
+        self, queryset: QuerySet[TutorSearchDocument], page_size: int
+    ) -> tuple[KeysetPaginator, KeysetPage, list[TutorSearchDocument], bool]:
+        """Serve the page of search results from the cache, caching it on a miss.
+
+        Only Profiles of the Tutors on a cached page are fetched,
+        see `search.result_cache`. Searches for Tutors free in a time
+        window are not cached, since they depend on Bookings.
+        """
+        if self._get_free_window() is not None:
+            return super().paginate_queryset(queryset, page_size)
+        cached = get_cached_results(self.request.GET, page_size)
+        if cached is None:
+            paginator, page, documents, is_paginated = super().paginate_queryset(
+                queryset, page_size
+            )
+            cache_results(
+                self.request.GET, page_size, CachedResults.from_documents(documents, *page.cursors)
             )
-            .filter(teaching_since__isnull=False)
-            .distinct()
+            return paginator, page, documents, is_paginated
+        paginator = self.get_paginator(queryset, page_size)
+        page = KeysetPage(
+            cached.hydrate(),
+            paginator,
+            cached.cursor,
+            cached.next_cursor,
+            cached.previous_cursor,
+            self.get_page_params(),
         )
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_keyset_ordering(self) -> Sequence[str]:
+        """Paginate full-text search results by their relevance."""
+        if parse_query(self.request.GET.get("q", "")):
+            return ("rank", "tutor_id")
+        return self.keyset_ordering
+
+    def get_queryset(self) -> QuerySet[TutorSearchDocument]:
+        """Filter the search results based on query parameters.
+
+        Only the denormalized search documents are filtered, see
+        `search.documents`, so the search never joins Profile, User,
+        Service and Review objects. Profiles and Users of the Tutors
+        are fetched together with the documents of the displayed page.
+        Results of a full-text query (the `q` parameter) are ordered
+        by relevance, see `search.fulltext`. The results are narrowed
+        down by the selected facets, see `search.facets`.
+        """
+        documents = self._get_unfaceted_queryset()
+        for facet_filter in get_facet_filters(get_selection(self.request.GET)).values():
+            documents = documents.filter(facet_filter)
+        return documents
+
+    def _get_unfaceted_queryset(self) -> QuerySet[TutorSearchDocument]:
+        """Filter the search results by names and the full-text query only."""
+        search_terms = parse_query(self.request.GET.get("q", ""))
+        search_first_name = self.request.GET.get("first_name", "").strip()
+        search_last_name = self.request.GET.get("last_name", "").strip()
+        documents = TutorSearchDocument.objects.select_related("tutor__user").order_by("tutor_id")
         if search_first_name:
-            tutors = tutors.filter(first_name_lower__contains=search_first_name.lower())
+            documents = documents.filter(first_name__contains=search_first_name.lower())
         if search_last_name:
-            tutors = tutors.filter(last_name_lower__contains=search_last_name.lower())
-        if search_subject:
-            tutors = tutors.filter(service__subject=search_subject)
-        return tutors
-
-    def _get_subjects(self, tutor: Profile) -> list[str]:
-        """Return an arrya with the names of Subjects taught by the given Tutor."""
-        return list(set([service.subject.name for service in Service.objects.filter(tutor=tutor)]))
-
-    def _get_average_price(self, tutor: Profile) -> int:
-        """Return average price of services offered by the given Tutor."""
-        services = Service.objects.filter(tutor=tutor)
-        return floor(sum([service.price_per_hour for service in services]) / len(services))
-
-    def _get_average_rating(self, tutor: Profile) -> Optional[float]:
-        """Return average rating of a given Tutor."""
-        reviews = Review.objects.filter(subscription__tutor=tutor)
-        return (
-            sum([review.star_rating for review in reviews]) / len(reviews)
-            if len(reviews) > 0
-            else None
+            documents = documents.filter(last_name__contains=search_last_name.lower())
+        if search_terms:
+            documents = get_fulltext_backend().search(documents, search_terms)
+        free_window = self._get_free_window()
+        if free_window is not None:
+            documents = self._filter_free(documents, *free_window)
+        return documents
+
+    def _filter_free(
+        self, documents: QuerySet[TutorSearchDocument], start: datetime, end: datetime
+    ) -> QuerySet[TutorSearchDocument]:
+        """Filter Tutors with an unbooked Availability overlapping a time window.
+
+        Only Availability objects of the searched Subject (if any) are
+        taken into account. The Tutors are found with a single range
+        query over Availability objects, see `AvailabilityQuerySet.free_between`,
+        and annotated with the start of their earliest free slot in the window.
+        """
+        free_slots = Availability.objects.free_between(start, end)
+        subject = self.request.GET.get(SUBJECT, "").strip()
+        if subject:
+            free_slots = (
+                free_slots.filter(service__subject_id=subject)
+                if subject.isdigit()
+                else free_slots.none()
+            )
+        return documents.filter(tutor_id__in=free_slots.values("service__tutor_id")).annotate(
+            next_free_slot=Subquery(
+                free_slots.filter(service__tutor_id=OuterRef("tutor_id"))
+                .order_by("start")
+                .values("start")[:1]
+            )
         )
+
+    def _get_free_window(self) -> Optional[tuple[datetime, datetime]]:
+        """Get the time window in which the searched Tutors have to be free.
+
+        Returns:
+            Start and end of the window passed in the `free_from` and
+            `free_to` query parameters, None if any of them is missing
+            or invalid, or the window is empty.
+        """
+        window = []
+        for param in ("free_from", "free_to"):
+            try:
+                moment = parse_datetime(self.request.GET.get(param, "").strip())
+            except ValueError:
+                moment = None
+            if moment is None:
+                return None
+            window.append(make_aware(moment) if is_naive(moment) else moment)
+        start, end = window
+        return (start, end) if start < end else None
+
+    def _get_facets(self) -> list[tuple[str, list[tuple[FacetValue, str]]]]:
+        """Get the facets of the search with query strings selecting their values.
+
+        Returns:
+            A list of the facets' titles and values, every value paired
+            with the query string of the search results after selecting
+            it (or clearing it, if it is already selected).
+        """
+        selection = get_selection(self.request.GET)
+        if self._get_free_window() is not None:
+            facets = compute_facets(self._get_unfaceted_queryset(), selection)
+        else:
+            facets = get_cached_facets(
+                self.request.GET,
+                lambda: compute_facets(self._get_unfaceted_queryset(), selection),
+            )
+        params = self.get_page_params()
+        facet_links = []
+        for facet, values in facets.items():
+            links = []
+            for value in values:
+                value_params = params.copy()
+                if value.selected:
+                    value_params.pop(facet, None)
+                else:
+                    value_params[facet] = value.value
+                links.append((value, value_params.urlencode()))
+            facet_links.append((FACET_TITLES[facet], links))
+        return facet_links
@@ -9,14 +9,17 @@ from django.views.generic.list import ListView
 
 from profiles.forms import AccountType
 from profiles.models import Profile
+from utils.pagination import KeysetPaginationMixin
 
 
-class TutorSearchResultsView(ListView, LoginRequiredMixin):
+class TutorSearchResultsView(KeysetPaginationMixin, ListView, LoginRequiredMixin):
     """View for generating search results for Tutors."""
 
     model = Profile
     paginate_by = 10
-    template_name = r"search\tutor.html"
+    template_name = "search/tutor.html"
+    keyset_ordering = ("pk",)
+    count_limit = 1000
 
     def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
         """Ensure that correct page for given account type is displayed.
@@ -34,11 +37,11 @@ class TutorSearchResultsView(ListView, LoginRequiredMixin):
         search_first_name = self.request.GET.get("first_name", None)
         search_last_name = self.request.GET.get("last_name", None)
         students = (
-            Profile.objects.annotate(
+            Profile.objects.select_related("user")
+            .annotate(
                 first_name_lower=Lower("user__first_name"), last_name_lower=Lower("user__last_name")
             )
             .filter(teaching_since__isnull=True)
-            .distinct()
         )
         if search_first_name:
             students = students.filter(first_name_lower__contains=search_first_name.lower())
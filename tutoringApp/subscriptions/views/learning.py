@@ -8,15 +8,17 @@ from django.http import HttpRequest
 from django.utils.timezone import now
 from django.views.generic.list import ListView
 
-from lessons.models import Lesson
 from subscriptions.models import Appointment, ServiceSubscriptionList, Subscription
+from utils.pagination import KeysetPaginationMixin
 
 
-class LearningView(ListView, LoginRequiredMixin):
+class LearningView(KeysetPaginationMixin, ListView, LoginRequiredMixin):
     """Display Lessons under a given Subscription."""
 
     model = Appointment
     paginate_by = 5
+    keyset_ordering = ("subscription_service_id", "pk")
+    count_limit = 1000
 
     def __init__(self, **kwargs: Any) -> None:
         super().__init__(**kwargs)
@@ -64,15 +66,11 @@ class LearningView(ListView, LoginRequiredMixin):
             of total hours purchased, calculated based on the
             fetched ServiceSubscriptionList objects.
         """
-        return self._calculate_hours_total() - len(self.get_queryset())
+        return self._calculate_hours_total() - self.get_queryset().count()
 
-    def get_queryset(self) -> QuerySet[Lesson]:
-        """Get only Lessons related to given Subscription."""
-        service_subscription_lists = ServiceSubscriptionList.objects.filter(
-            subscription=self.subscription,
-            service__tutor=self.subscription.tutor,
-        )
-        appointments = []
-        for service_subscription_list in service_subscription_lists:
-            appointments.extend(service_subscription_list.appointment_set.all())
-        return appointments
+    def get_queryset(self) -> QuerySet[Appointment]:
+        """Get only Appointments related to given Subscription."""
+        return Appointment.objects.filter(
+            subscription_service__subscription=self.subscription,
+            subscription_service__service__tutor=self.subscription.tutor,
+        ).select_related("lesson_info")
@@ -83,6 +83,9 @@ TEMPLATES = [
     },
 ]
 
+# The file-based backend's `add` and `incr` are not atomic across processes,
+# deployments running several workers should use Redis or Memcached instead
+# (see `tutors.schedule_cache`).
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
@@ -201,6 +204,8 @@ LOGGING = {
 
 CURRENCY = "$"
 
+SEARCH_FULLTEXT_BACKEND = "search.fulltext.sqlite.SQLiteFullTextBackend"
+
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels_redis.core.RedisChannelLayer",
@@ -210,6 +215,33 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Chat messages are saved in batches of up to CHAT_MESSAGE_BATCH_SIZE
+# messages, at most CHAT_MESSAGE_FLUSH_INTERVAL milliseconds after being sent.
+CHAT_MESSAGE_BATCH_SIZE = 100
+CHAT_MESSAGE_FLUSH_INTERVAL = 50
+# Number from 0 to 255 in IDs of chat messages, unique among the processes serving the chat
+# on every host. Defaults to the process ID, which may collide with another process' ID.
+CHAT_WORKER_ID = int(environ["CHAT_WORKER_ID"]) if "CHAT_WORKER_ID" in environ else None
+# Number of messages sent on connecting to a chat and on every "load older" request.
+CHAT_HISTORY_PAGE_SIZE = 50
+# Events sent to connections using the msgpack protocol within CHAT_COALESCE_INTERVAL
+# milliseconds are sent in a single frame of up to CHAT_COALESCE_MAX_FRAMES events.
+CHAT_COALESCE_INTERVAL = 5
+CHAT_COALESCE_MAX_FRAMES = 100
+# Users are online until CHAT_PRESENCE_TIMEOUT seconds after the last heartbeat of their
+# connections and their typing indicators are broadcast once per CHAT_TYPING_INTERVAL seconds.
+CHAT_PRESENCE_TIMEOUT = 30
+CHAT_TYPING_INTERVAL = 3
+# Every connection can send CHAT_CONNECTION_RATE frames per second in bursts of up to
+# CHAT_CONNECTION_BURST frames and every user CHAT_USER_RATE frames per second in bursts
+# of up to CHAT_USER_BURST frames, over all of their connections.
+CHAT_CONNECTION_RATE = 10
+CHAT_CONNECTION_BURST = 20
+CHAT_USER_RATE = 20
+CHAT_USER_BURST = 40
+# Events are dropped or coalesced for clients with CHAT_OUTBOX_SIZE frames waiting to be sent.
+CHAT_OUTBOX_SIZE = 256
+
 # Email settings for password reset.
 
 if DEBUG:
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TutorsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "tutors"
+
+    def ready(self) -> None:
+        """Connect signal handlers of the app."""
+        from tutors import signals  # noqa: F401
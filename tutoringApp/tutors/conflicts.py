@@ -0,0 +1,86 @@
+"""Detection of conflicting Availability time slots.
+
+Every Availability object stores both the start and the end
+of the session, so checking whether a new time slot conflicts
+with the slots a Tutor already has comes down to a single,
+indexed range-overlap query (see `AvailabilityQuerySet.overlapping`).
+The serializer, the model's validation and bulk creation of
+Availability objects all go through the functions defined here.
+"""
+from datetime import datetime
+from typing import Iterable, Optional, Union
+
+from profiles.models import Profile
+from tutors.models import Availability
+from tutors.time_range import TimeRange, TimeRangeSet
+
+
+def has_conflict(
+    tutor: Union[Profile, int],
+    start: datetime,
+    end: datetime,
+    exclude_pk: Optional[int] = None,
+) -> bool:
+    """Check if a time slot conflicts with any Availability of a Tutor.
+
+    Args:
+        tutor: Profile of the Tutor (or its primary key) whose
+                Availability objects are checked.
+        start: Start of the checked time slot.
+        end: End of the checked time slot.
+        exclude_pk: Primary key of an Availability object that
+                    should be left out of the check, used when
+                    an already saved object is validated.
+
+    Returns:
+        Boolean information about whether a conflicting
+        Availability object exists in the database.
+    """
+    availabilities = Availability.objects.overlapping(tutor, start, end)
+    if exclude_pk is not None:
+        availabilities = availabilities.exclude(pk=exclude_pk)
+    return availabilities.exists()
+
+
+def find_conflicting_time_ranges(
+    tutor: Union[Profile, int], time_ranges: Iterable[TimeRange]
+) -> list[TimeRange]:
+    """Find time ranges conflicting with each other or with existing Availability objects.
+
+    The function is meant for validating many time slots at once.
+    Instead of querying the database for every slot, Availability
+    objects spanning the whole checked period are fetched with
+    one query, after which the overlaps are found for all of the
+    checked slots at once with a `TimeRangeSet`.
+
+    Args:
+        tutor: Profile of the Tutor (or its primary key) whose
+                Availability objects are checked.
+        time_ranges: Time slots that are meant to be created.
+
+    Returns:
+        A list with the checked time ranges that overlap with
+        either an existing Availability object or another
+        checked time range, sorted by their start.
+    """
+    # Sorted the same way as the ranges of a TimeRangeSet.
+    time_ranges = sorted(
+        time_ranges, key=lambda time_range: (time_range.start, time_range.end)
+    )
+    if not time_ranges:
+        return []
+
+    checked = TimeRangeSet.from_time_ranges(time_ranges)
+    existing = TimeRangeSet.from_pairs(
+        Availability.objects.overlapping(
+            tutor,
+            time_ranges[0].start,
+            max(time_range.end for time_range in time_ranges),
+        ).values_list("start", "end")
+    )
+    conflicting = checked.overlaps(existing) | checked.overlaps_within()
+    return [
+        time_range
+        for time_range, is_conflicting in zip(time_ranges, conflicting)
+        if is_conflicting
+    ]
@@ -0,0 +1,47 @@
+"""Benchmark of the Availability conflict check for growing slot history."""
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from tutors.models import Availability, Service, Subject
+from tutors.serializers import AvailabilitySerializer
+from utils.benchmarking import BenchmarkCommand, create_default_service, create_profile
+
+
+class Command(BenchmarkCommand):
+    """Measure validation latency of a new Availability object.
+
+    For every dataset size a Tutor with that many historical,
+    hourly Availability objects is created and the time needed
+    to validate a new time slot with `AvailabilitySerializer`
+    is measured. Both the latency and the query count are
+    expected to stay flat as the history grows.
+    """
+
+    help = "Benchmark the Availability conflict check for growing slot history."
+
+    def set_up(self, size: int) -> dict[str, Any]:
+        """Create a Tutor with `size` past Availability objects."""
+        tutor = create_profile(f"benchmark_tutor_{size}")
+        subject = Subject.objects.create(name="Benchmark subject", category=0)
+        service = create_default_service(tutor=tutor, subject=subject)
+        history_start = datetime.now(tz=timezone.utc) - timedelta(hours=size + 1)
+        Availability.objects.bulk_create(
+            [
+                Availability(
+                    service=service,
+                    start=history_start + timedelta(hours=i),
+                    end=history_start + timedelta(hours=i + 1),
+                )
+                for i in range(size)
+            ]
+        )
+        return {
+            "service": service.pk,
+            "start": datetime.now(tz=timezone.utc) + timedelta(days=1),
+        }
+
+    def run_once(self, context: dict[str, Any]) -> None:
+        """Validate a new, non-conflicting Availability object."""
+        serializer = AvailabilitySerializer(data=context)
+        if not serializer.is_valid():
+            raise RuntimeError(serializer.errors)
@@ -0,0 +1,155 @@
+"""Remove outdated Availability objects that have never been booked."""
+from datetime import datetime, timedelta, timezone
+from time import perf_counter, sleep
+from typing import Any, Iterator
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+
+from tutors.models import ArchivedAvailability, Availability
+from tutors.schedule_cache import invalidate_schedule
+from tutors.signals import availability_signals_disabled
+
+
+class Command(BaseCommand):
+    """Delete or archive expired, unbooked Availability objects in batches.
+
+    The command is meant to be run on a schedule. Expired time slots
+    are streamed in batches ordered by their primary key and every batch
+    is removed in its own short transaction, so the table is never locked
+    for long. Availability objects that have been booked are kept, since
+    their Bookings and Lessons refer to them.
+    """
+
+    help = (
+        "Delete or archive outdated Availability objects that have never been booked."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add options controlling the retention period and batching."""
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=Availability.RETENTION_DAYS,
+            help="Only sessions that ended more than that many days ago are removed. "
+            "The default keeps the past weeks displayed on Tutors' profiles.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of Availability objects removed in one transaction.",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Number of seconds to wait between batches.",
+        )
+        parser.add_argument(
+            "--archive",
+            action="store_true",
+            help="Copy removed Availability objects to the archive table.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the number of Availability objects that would be removed.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Remove the expired Availability objects and report the throughput."""
+        cutoff = datetime.now(tz=timezone.utc) - timedelta(
+            days=options["older_than_days"]
+        )
+        started = perf_counter()
+        removed = 0
+        for batch in self._iterate_batches(cutoff, options["batch_size"]):
+            if options["dry_run"]:
+                removed += len(batch)
+                continue
+            removed += self._remove_batch(batch, options["archive"])
+            if options["pause"]:
+                sleep(options["pause"])
+        elapsed = perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'Would remove' if options['dry_run'] else 'Removed'} {removed} "
+                f"outdated Availability objects in {elapsed:.2f} s "
+                f"({removed / elapsed if elapsed else 0:.0f} rows/s)."
+            )
+        )
+
+    @staticmethod
+    def _iterate_batches(
+        cutoff: datetime, batch_size: int
+    ) -> Iterator[list[tuple[int, int, int, datetime, datetime]]]:
+        """Stream expired, unbooked Availability objects in batches.
+
+        Every batch is fetched with a separate query continuing
+        after the last primary key of the previous batch, so no
+        long-running cursor is kept open.
+
+        Args:
+            cutoff: Sessions that ended before this time are expired.
+            batch_size: Maximum number of rows in a batch.
+
+        Yields:
+            Lists of (primary key, Service's primary key, Tutor's
+            primary key, start, end) tuples.
+        """
+        last_pk = 0
+        while True:
+            batch = list(
+                Availability.objects.outdated(now=cutoff)
+                .filter(booking__isnull=True, pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", "service_id", "service__tutor_id", "start", "end")[
+                    :batch_size
+                ]
+            )
+            if not batch:
+                return
+            yield batch
+            last_pk = batch[-1][0]
+
+    @staticmethod
+    def _remove_batch(
+        batch: list[tuple[int, int, int, datetime, datetime]], archive: bool
+    ) -> int:
+        """Remove a batch of Availability objects in a single transaction.
+
+        The batch's objects which are still not booked are selected
+        again inside the transaction and locked, so that objects booked
+        in the meantime are neither archived nor deleted. Cached
+        schedules are invalidated once per Tutor instead of once
+        per removed Availability object.
+
+        Args:
+            batch: Rows yielded by `_iterate_batches`.
+            archive: Boolean information about whether the removed
+                    objects should be copied to the archive table.
+
+        Returns:
+            The number of removed Availability objects.
+        """
+        with transaction.atomic(), availability_signals_disabled():
+            unbooked = set(
+                Availability.objects.select_for_update(of=("self",))
+                .filter(pk__in=[pk for pk, *_ in batch], booking__isnull=True)
+                .values_list("pk", flat=True)
+            )
+            batch = [row for row in batch if row[0] in unbooked]
+            if archive:
+                ArchivedAvailability.objects.bulk_create(
+                    [
+                        ArchivedAvailability(
+                            service_id=service_id, start=start, end=end
+                        )
+                        for _, service_id, _, start, end in batch
+                    ]
+                )
+            Availability.objects.filter(pk__in=[pk for pk, *_ in batch]).delete()
+            for tutor_id in {tutor_id for _, _, tutor_id, _, _ in batch}:
+                invalidate_schedule(tutor_id)
+        return len(batch)
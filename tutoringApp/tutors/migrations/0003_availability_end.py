@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:20
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def populate_availability_end(apps, schema_editor):
+    """Calculate end times of already existing Availability objects."""
+    Availability = apps.get_model("tutors", "Availability")
+    availabilities = Availability.objects.select_related("service")
+    for availability in availabilities.iterator():
+        availability.end = availability.start + timedelta(
+            minutes=availability.service.session_length
+        )
+        availability.save(update_fields=["end"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tutors", "0002_service_only_default_services_with_1_session"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="availability",
+            name="end",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(populate_availability_end, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="availability",
+            name="end",
+            field=models.DateTimeField(
+                editable=False,
+                help_text="End time of the session, calculated based on the `start` field and the session length of the related Service.",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="availability",
+            index=models.Index(
+                fields=["service", "start", "end"],
+                name="availability_service_time_idx",
+            ),
+        ),
+    ]
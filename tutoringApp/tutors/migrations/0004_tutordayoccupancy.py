@@ -0,0 +1,97 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:11
+
+from datetime import datetime, timedelta, timezone
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+SLOT_LENGTH = timedelta(minutes=15)
+SLOTS_PER_DAY = 96
+
+
+def populate_tutor_day_occupancy(apps, schema_editor):
+    """Calculate occupancy bitmaps of already existing Availability objects."""
+    Availability = apps.get_model("tutors", "Availability")
+    TutorDayOccupancy = apps.get_model("tutors", "TutorDayOccupancy")
+    masks = {}
+    for tutor_id, start, end, booking_id in Availability.objects.values_list(
+        "service__tutor_id", "start", "end", "booking"
+    ).iterator():
+        start, end = start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+        day = start.date()
+        while datetime.combine(day, datetime.min.time(), timezone.utc) < end:
+            day_start = datetime.combine(day, datetime.min.time(), timezone.utc)
+            first = max(0, (start - day_start) // SLOT_LENGTH)
+            last = min(SLOTS_PER_DAY, -((day_start - end) // SLOT_LENGTH))
+            mask = (1 << last) - (1 << first)
+            day_masks = masks.setdefault((tutor_id, day), [0, 0])
+            day_masks[0] |= mask
+            if booking_id is not None:
+                day_masks[1] |= mask
+            day += timedelta(days=1)
+    TutorDayOccupancy.objects.bulk_create(
+        [
+            TutorDayOccupancy(
+                tutor_id=tutor_id,
+                day=day,
+                availability_mask=availability_mask.to_bytes(SLOTS_PER_DAY // 8, "big"),
+                booking_mask=booking_mask.to_bytes(SLOTS_PER_DAY // 8, "big"),
+            )
+            for (tutor_id, day), (availability_mask, booking_mask) in masks.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("lessons", "0001_initial"),
+        ("profiles", "0001_initial"),
+        ("tutors", "0003_availability_end"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TutorDayOccupancy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "availability_mask",
+                    models.BinaryField(
+                        help_text="Bitmap of the 15-minute slots covered by the Tutor's Availability objects.",
+                        max_length=12,
+                    ),
+                ),
+                (
+                    "booking_mask",
+                    models.BinaryField(
+                        help_text="Bitmap of the 15-minute slots covered by booked Availability objects.",
+                        max_length=12,
+                    ),
+                ),
+                (
+                    "tutor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="profiles.profile",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="tutordayoccupancy",
+            constraint=models.UniqueConstraint(
+                fields=("tutor", "day"), name="unique_tutor_day_occupancy"
+            ),
+        ),
+        migrations.RunPython(populate_tutor_day_occupancy, migrations.RunPython.noop),
+    ]
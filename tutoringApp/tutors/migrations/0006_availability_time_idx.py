@@ -0,0 +1,16 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tutors", "0005_archivedavailability"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="availability",
+            index=models.Index(fields=["start", "end"], name="availability_time_idx"),
+        ),
+    ]
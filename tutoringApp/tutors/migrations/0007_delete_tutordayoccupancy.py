@@ -0,0 +1,15 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:50
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tutors", "0006_availability_time_idx"),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name="TutorDayOccupancy",
+        ),
+    ]
@@ -1,9 +1,10 @@
 from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Union
 
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
-from django.db.models import Q
+from django.db.models import ExpressionWrapper, F, Q
 
 from profiles.models import Profile
 from tutors.time_range import TimeRange
@@ -49,6 +50,9 @@ class Service(models.Model):
     well as the duration of one session.
     """
 
+    MIN_SESSION_LENGTH = 30
+    MAX_SESSION_LENGTH = 180
+
     tutor = models.ForeignKey(Profile, on_delete=models.CASCADE)
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE)
     number_of_hours = models.PositiveIntegerField(
@@ -63,8 +67,8 @@ class Service(models.Model):
         default=60,
         help_text="Duration of one tutoring session in minutes",
         validators=[
-            MinValueValidator(30),
-            MaxValueValidator(180),
+            MinValueValidator(MIN_SESSION_LENGTH),
+            MaxValueValidator(MAX_SESSION_LENGTH),
             SessionLengthValidator,
         ],
     )
@@ -84,58 +88,191 @@ class Service(models.Model):
             ),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Load the Service and remember its session length."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_session_length = instance.__dict__.get("session_length")
+        return instance
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """Save the Service and keep end times of its Availability objects up to date.
+
+        Availability objects are only updated when the session length
+        changed since the Service was loaded. Services whose loaded
+        session length is unknown are treated as changed.
+        """
+        from tutors.schedule_cache import invalidate_schedule
+
+        resized = not self._state.adding and (
+            getattr(self, "_loaded_session_length", None) != self.session_length
+        )
+        super().save(*args, **kwargs)
+        self._loaded_session_length = self.session_length
+        if resized:
+            self.availability_set.update(
+                end=ExpressionWrapper(
+                    F("start") + timedelta(minutes=self.session_length),
+                    output_field=models.DateTimeField(),
+                )
+            )
+            invalidate_schedule(self.tutor_id)
+
     def __str__(self) -> str:
         """String representation fo the model's instance."""
         return f"{self.subject.name}, {self.number_of_hours} {'hour' if self.number_of_hours == 1 else 'hours'}"
 
 
+class AvailabilityQuerySet(models.QuerySet):
+    """QuerySet with methods for querying Availability objects by time."""
+
+    def overlapping(
+        self, tutor: Union[Profile, int], start: datetime, end: datetime
+    ) -> "AvailabilityQuerySet":
+        """Filter Availability objects of a Tutor overlapping with a given time slot.
+
+        Two time slots overlap when each of them starts before the
+        other one ends, so slots that only touch each other are not
+        in conflict. Since no session can be longer than the longest
+        allowed session length, the filter on the `start` field is
+        bounded from both sides, which keeps the query within the
+        (`service`, `start`) index regardless of how many historical
+        Availability objects the Tutor has.
+
+        Args:
+            tutor: Profile of the Tutor (or its primary key) whose
+                    Availability objects are filtered.
+            start: Start of the checked time slot.
+            end: End of the checked time slot.
+
+        Returns:
+            A QuerySet with the overlapping Availability objects.
+        """
+        return self.filter(
+            service__tutor=tutor,
+            start__gt=start - timedelta(minutes=Service.MAX_SESSION_LENGTH),
+            start__lt=end,
+            end__gt=start,
+        )
+
+    def free_between(
+        self, start: datetime, end: datetime, now: Optional[datetime] = None
+    ) -> "AvailabilityQuerySet":
+        """Filter unbooked Availability objects of any Tutor overlapping with a time window.
+
+        Like in `overlapping`, the filter on the `start` field is
+        bounded from both sides, so that the query is a range scan of
+        the (`start`, `end`) index. Sessions that have already started
+        cannot be booked, hence they are excluded.
+
+        Args:
+            start: Start of the time window.
+            end: End of the time window.
+            now: Point in time before which sessions are excluded,
+                    defaults to the current time.
+
+        Returns:
+            A QuerySet with the unbooked, overlapping Availability objects.
+        """
+        return self.filter(
+            start__gt=start - timedelta(minutes=Service.MAX_SESSION_LENGTH),
+            start__gte=now or datetime.now(tz=timezone.utc),
+            start__lt=end,
+            end__gt=start,
+            booking__isnull=True,
+        )
+
+    def outdated(self, now: Optional[datetime] = None) -> "AvailabilityQuerySet":
+        """Filter Availability objects whose sessions have already ended.
+
+        The query-level counterpart of the `Availability.is_outdated` property.
+
+        Args:
+            now: Point in time the Availability objects are compared
+                with, defaults to the current time.
+
+        Returns:
+            A QuerySet with the outdated Availability objects.
+        """
+        return self.filter(end__lt=now or datetime.now(tz=timezone.utc))
+
+    def not_outdated(
+        self, now: Optional[datetime] = None, retention_days: int = 0
+    ) -> "AvailabilityQuerySet":
+        """Exclude Availability objects whose sessions have already ended.
+
+        Outdated objects stay in the database until they are purged,
+        see the `purge_outdated_availability` command. Listings keep
+        the ones that ended within `Availability.RETENTION_DAYS` days,
+        which are displayed as closed, and exclude those waiting for
+        the purge, so that they look the same whether it has run or not.
+
+        Args:
+            now: Point in time the Availability objects are compared
+                with, defaults to the current time.
+            retention_days: Number of days before `now` within which
+                            ended objects are kept.
+
+        Returns:
+            A QuerySet without the outdated Availability objects.
+        """
+        cutoff = (now or datetime.now(tz=timezone.utc)) - timedelta(days=retention_days)
+        return self.filter(end__gte=cutoff)
+
+
 class Availability(models.Model):
     """Store Tutor's availability for given Service.
 
     Tutors are able to input their availability for
     different services by simply providing the start
     time. The end of the given session is calculated
-    based on the session length.
+    based on the session length and stored alongside
+    the start time, so that time-based queries do
+    not have to join the related Service.
     """
 
+    RETENTION_DAYS = 14
+
     service = models.ForeignKey(Service, on_delete=models.CASCADE)
     start = models.DateTimeField()
+    end = models.DateTimeField(
+        editable=False,
+        help_text="End time of the session, calculated based on the `start` field and the session length of the related Service.",
+    )
 
-    @property
-    def end(self) -> datetime:
-        """Return end time of an available session.
+    objects = AvailabilityQuerySet.as_manager()
 
-        Returns:
-            End time of a session calcualted based on
-            `start` field and the value of `session_length`
-            fields from the related `Service` object.
-        """
-        return self.start + timedelta(minutes=self.service.session_length)
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["service", "start", "end"],
+                name="availability_service_time_idx",
+            ),
+            models.Index(fields=["start", "end"], name="availability_time_idx"),
+        ]
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """Calculate the end time of the session before saving."""
+        self.end = self.start + timedelta(minutes=self.service.session_length)
+        return super().save(*args, **kwargs)
 
     @property
     def time_range(self) -> TimeRange:
         """Display the Availability object as TimeRange instance.
 
         Returns:
-            TimeRange instance created based on the start time
-            and session duration defined in the related `Service`
-            model instance.
+            TimeRange instance created based on the start
+            and end time of the session.
         """
-        return TimeRange.from_start_and_duration(
-            self.start, timedelta(minutes=self.service.session_length)
-        )
+        return TimeRange(self.start, self.end)
 
     def clean(self) -> None:
         """Ensure no new Availability objects can be created in an already taken time slot."""
-        availabilites = Availability.objects.filter(service__tutor=self.service.tutor)
-        start_time_range = TimeRange.from_start_and_duration(
-            self.start, timedelta(minutes=self.service.session_length)
-        )
-        if any(
-            [
-                (start_time_range in availability.time_range)
-                for availability in availabilites
-            ]
+        end = self.start + timedelta(minutes=self.service.session_length)
+        if (
+            Availability.objects.overlapping(self.service.tutor_id, self.start, end)
+            .exclude(pk=self.pk)
+            .exists()
         ):
             raise ValidationError(
                 "There is an Availability object with a conflicting time slot already in the database."
@@ -156,3 +293,22 @@ class Availability(models.Model):
     def __str__(self) -> str:
         """String representation fo the model's instance."""
         return f"Availability of {self.service.tutor.user.username} for {self.service.subject.name} sessions."
+
+
+class ArchivedAvailability(models.Model):
+    """Store outdated Availability objects that have never been booked.
+
+    Availability objects whose sessions ended without being booked are
+    moved here by the `purge_outdated_availability` management command,
+    keeping the Availability table limited to the time slots that
+    are still relevant.
+    """
+
+    service = models.ForeignKey(Service, on_delete=models.CASCADE)
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        """String representation fo the model's instance."""
+        return f"Archived availability of service with id {self.service_id} starting at {self.start}"
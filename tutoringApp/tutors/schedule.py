@@ -0,0 +1,184 @@
+"""Weekly schedules of Tutors' open time slots.
+
+Tutor's profile page displays open Availability objects of every
+default Service for a couple of consecutive weeks. Rather than
+querying the database for every (Service, day) cell, the whole
+displayed period is fetched with one query and the results are
+bucketed by Service and day in Python. Week boundaries are calculated
+with plain date arithmetic, so weeks spanning two years are handled
+the same way as any other week.
+
+The schedules displayed to visitors are additionally cached per Tutor
+in a serialized form, see `tutors.schedule_cache`.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, Sequence
+
+from django.utils.timezone import localtime, make_aware
+
+from tutors.models import Availability, Service
+from tutors.schedule_cache import get_cached_schedule
+
+DAYS_IN_WEEK = 7
+
+
+@dataclass(frozen=True)
+class ScheduledSlot:
+    """Open time slot of a cached schedule.
+
+    Carries the data of an Availability object needed to
+    display and book it, without being tied to the database.
+    """
+
+    id: int
+    start: datetime
+    end: datetime
+
+    @property
+    def is_outdated(self) -> bool:
+        """Check if the session has already ended, see `Availability.is_outdated`."""
+        return self.end < datetime.now(tz=timezone.utc)
+
+
+def get_week_start(day: date, week_offset: int = 0) -> date:
+    """Get the Monday of the week containing a given day.
+
+    Args:
+        day: Day belonging to the reference week.
+        week_offset: Number of weeks the returned Monday
+                    should be shifted by, negative values
+                    point to the past.
+
+    Returns:
+        Date of the Monday of the requested week.
+    """
+    return day - timedelta(days=day.weekday()) + timedelta(weeks=week_offset)
+
+
+def get_week_days(day: date, week_offset: int = 0) -> list[date]:
+    """Get dates of every day of the week containing a given day.
+
+    Args:
+        day: Day belonging to the reference week.
+        week_offset: Number of weeks the returned week should
+                    be shifted by, negative values point to the past.
+
+    Returns:
+        A list with 7 dates, from Monday to Sunday.
+    """
+    week_start = get_week_start(day, week_offset)
+    return [week_start + timedelta(days=i) for i in range(DAYS_IN_WEEK)]
+
+
+def get_week_schedule(
+    services: Iterable[Service], day: date, week_offsets: Sequence[int]
+) -> dict[Service, dict[int, list[list[Availability]]]]:
+    """Get open Availability objects of Services grouped by week and day.
+
+    Only Availability objects that have not been booked yet are
+    included. Every Availability object of the requested weeks is
+    fetched with a single query, regardless of the number of Services.
+
+    Args:
+        services: Services whose Availability objects are fetched.
+        day: Day belonging to the reference week.
+        week_offsets: Offsets (relative to the reference week)
+                    of the weeks included in the schedule, e.g.
+                    `(-1, 0, 1)` for the previous, current and
+                    next week.
+
+    Returns:
+        A dictionary with Service objects as keys (in the order
+        they were provided in) and dictionaries as values. Keys of
+        the latter are the week offsets and their values are lists of
+        7 lists (Monday to Sunday) with Availability objects sorted by
+        their start time.
+    """
+    services = list(services)
+    schedule = {
+        service: {
+            week_offset: [[] for _ in range(DAYS_IN_WEEK)]
+            for week_offset in week_offsets
+        }
+        for service in services
+    }
+    if not services or not week_offsets:
+        return schedule
+
+    first_day = get_week_start(day, min(week_offsets))
+    last_day = get_week_start(day, max(week_offsets) + 1)
+    availabilities = (
+        Availability.objects.not_outdated(retention_days=Availability.RETENTION_DAYS)
+        .filter(
+            service__in=services,
+            booking__isnull=True,
+            start__gte=make_aware(datetime.combine(first_day, time.min)),
+            start__lt=make_aware(datetime.combine(last_day, time.min)),
+        )
+        .select_related("service")
+        .order_by("start")
+    )
+
+    services_by_pk = {service.pk: service for service in services}
+    for availability in availabilities:
+        start_day = localtime(availability.start).date()
+        week_offset = min(week_offsets) + (start_day - first_day).days // DAYS_IN_WEEK
+        weeks = schedule[services_by_pk[availability.service_id]]
+        if week_offset in weeks:
+            weeks[week_offset][start_day.weekday()].append(availability)
+    return schedule
+
+
+def get_cached_week_schedule(
+    tutor_id: int, services: Iterable[Service], day: date, week_offsets: Sequence[int]
+) -> dict[Service, dict[int, list[list[ScheduledSlot]]]]:
+    """Get the week schedule of a Tutor's Services from the cache.
+
+    On a cache miss the schedule is built with `get_week_schedule`
+    and stored as plain (primary key, start, end) tuples, which are
+    turned into ScheduledSlot objects on every read.
+
+    Args:
+        tutor_id: Primary key of the Tutor the Services belong to.
+        services: Services whose open time slots are returned.
+        day: Day belonging to the reference week.
+        week_offsets: Offsets (relative to the reference week)
+                    of the weeks included in the schedule.
+
+    Returns:
+        A dictionary structured like the one returned by
+        `get_week_schedule`, with ScheduledSlot objects
+        instead of the Availability objects.
+    """
+    services = list(services)
+    week_offsets = list(week_offsets)
+    name = "week:{}:{}:{}".format(
+        get_week_start(day).isoformat(),
+        ",".join(str(week_offset) for week_offset in week_offsets),
+        ",".join(str(service.pk) for service in services),
+    )
+    serialized = get_cached_schedule(
+        tutor_id,
+        name,
+        lambda: {
+            service.pk: {
+                week_offset: [
+                    [
+                        (availability.pk, availability.start, availability.end)
+                        for availability in day_availabilites
+                    ]
+                    for day_availabilites in days
+                ]
+                for week_offset, days in weeks.items()
+            }
+            for service, weeks in get_week_schedule(services, day, week_offsets).items()
+        },
+    )
+    return {
+        service: {
+            week_offset: [[ScheduledSlot(*slot) for slot in slots] for slots in days]
+            for week_offset, days in serialized[service.pk].items()
+        }
+        for service in services
+    }
@@ -0,0 +1,148 @@
+"""Versioned per-Tutor cache of serialized schedules.
+
+Every cached schedule of a Tutor is stored under a key containing
+the Tutor's current schedule version, a random token kept in the
+cache as well. Changing any of the Tutor's Availability, Booking
+or Service objects replaces the token (see `tutors.signals`), which
+makes every previously cached schedule of the Tutor unreachable at once,
+without having to know which of them exist.
+
+After an invalidation, only the first request rebuilds a given
+schedule, while the concurrent ones wait for it to appear in the
+cache instead of running the same queries. Requests served by the
+same process are serialized with a lock of the process, while requests
+served by different processes rely on the cache's `add` being atomic.
+That holds for the Redis, Memcached and database backends, but not for
+the file-based backend, with which concurrent processes may still
+rebuild the same schedule, which only costs the repeated queries.
+"""
+from logging import getLogger
+from threading import Lock
+from time import sleep
+from typing import Callable, TypeVar
+from uuid import uuid4
+from weakref import WeakValueDictionary
+
+from django.core.cache import cache
+from django.db import transaction
+
+LOGGER = getLogger(__name__)
+
+SCHEDULE_TIMEOUT = 60 * 60
+REBUILD_LOCK_TIMEOUT = 10
+REBUILD_WAIT_ATTEMPTS = 20
+REBUILD_WAIT_DELAY = 0.05
+
+T = TypeVar("T")
+
+# Locks of the cache keys written by the current process, kept
+# only as long as any of its threads is using them.
+_process_locks: "WeakValueDictionary[str, Lock]" = WeakValueDictionary()
+_process_locks_guard = Lock()
+
+
+def get_schedule_version(tutor_id: int) -> str:
+    """Get the current version of a Tutor's cached schedules.
+
+    Args:
+        tutor_id: Primary key of the Tutor.
+
+    Returns:
+        The version token, created if the Tutor has none yet.
+    """
+    version_key = _get_version_key(tutor_id)
+    version = cache.get(version_key)
+    if version is None:
+        with _get_process_lock(version_key):
+            version = cache.get(version_key)
+            if version is None:
+                version = uuid4().hex
+                if not cache.add(version_key, version, None):
+                    version = cache.get(version_key, version)
+    return version
+
+
+def invalidate_schedule(tutor_id: int) -> None:
+    """Make every cached schedule of a Tutor outdated.
+
+    The version is replaced immediately, so the changes are
+    visible within the current transaction, and once more after
+    the transaction is committed, so that a schedule rebuilt by
+    another request from the not yet committed data is discarded.
+
+    Args:
+        tutor_id: Primary key of the Tutor.
+    """
+    _replace_version(tutor_id)
+    transaction.on_commit(lambda: _replace_version(tutor_id))
+
+
+def get_cached_schedule(tutor_id: int, name: str, build: Callable[[], T]) -> T:
+    """Get a cached schedule of a Tutor, rebuilding it if needed.
+
+    Args:
+        tutor_id: Primary key of the Tutor.
+        name: Name identifying the schedule among the Tutor's
+                cached schedules, e.g. the displayed period.
+        build: Function computing the schedule. The returned
+                value must be picklable and must not be None.
+
+    Returns:
+        The cached or newly built schedule.
+    """
+    key = f"tutor_schedule:{tutor_id}:{get_schedule_version(tutor_id)}:{name}"
+    schedule = cache.get(key)
+    if schedule is not None:
+        return schedule
+
+    lock_key = f"{key}:lock"
+    process_lock = _get_process_lock(lock_key)
+    if not process_lock.acquire(timeout=REBUILD_LOCK_TIMEOUT):
+        LOGGER.warning(
+            "Schedule %(key)s has not been rebuilt in time, building it again.",
+            {"key": key},
+        )
+        return build()
+    try:
+        schedule = cache.get(key)
+        if schedule is not None:
+            return schedule
+        if cache.add(lock_key, True, REBUILD_LOCK_TIMEOUT):
+            try:
+                schedule = build()
+                cache.set(key, schedule, SCHEDULE_TIMEOUT)
+            finally:
+                cache.delete(lock_key)
+            return schedule
+    finally:
+        process_lock.release()
+
+    for _ in range(REBUILD_WAIT_ATTEMPTS):
+        sleep(REBUILD_WAIT_DELAY)
+        schedule = cache.get(key)
+        if schedule is not None:
+            return schedule
+    LOGGER.warning(
+        "Schedule %(key)s has not been rebuilt in time, building it again.",
+        {"key": key},
+    )
+    return build()
+
+
+def _get_process_lock(key: str) -> Lock:
+    """Get the lock of the current process guarding writes of a cache key."""
+    with _process_locks_guard:
+        lock = _process_locks.get(key)
+        if lock is None:
+            lock = _process_locks[key] = Lock()
+        return lock
+
+
+def _get_version_key(tutor_id: int) -> str:
+    """Get the cache key of a Tutor's schedule version."""
+    return f"tutor_schedule_version:{tutor_id}"
+
+
+def _replace_version(tutor_id: int) -> None:
+    """Store a new, random version of a Tutor's cached schedules."""
+    cache.set(_get_version_key(tutor_id), uuid4().hex, None)
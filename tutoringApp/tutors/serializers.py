@@ -2,25 +2,16 @@
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
+from django.db import transaction
+from django.utils.timezone import make_aware
 from rest_framework import serializers
 
-from tutors.models import Availability
+from tutors.conflicts import find_conflicting_time_ranges, has_conflict
+from tutors.models import Availability, Service
+from tutors.schedule_cache import invalidate_schedule
 from tutors.time_range import TimeRange
 
 
-def time_slot_conflict(
-    first_start: datetime,
-    first_end: datetime,
-    second_start: datetime,
-    second_end: datetime,
-) -> bool:
-    """Check if the first time slot conflicts with the second one."""
-
-
-def get_end_time(start_time, sessions_duration) -> datetime:
-    """Calculate the end time."""
-
-
 class AvailabilitySerializer(serializers.ModelSerializer):
     """Serializer for the Availability model."""
 
@@ -31,12 +22,12 @@ class AvailabilitySerializer(serializers.ModelSerializer):
     def validate(self, data: dict[Any, Any]) -> dict[Any, Any]:
         """Check if given Tutor does not have conflicting sessions available.
 
-        The method fetches all Availability objects for a tutor
-        related to Service whose PK has been sent in the request
-        and checks if the provided time does not conflict with any
-        of the already existing Availability objects. An additional
-        check to ensure the entire session lies in the future is also
-        made.
+        The method checks if the provided time does not conflict
+        with any of the already existing Availability objects of the
+        tutor related to Service whose PK has been sent in the request.
+        Only the Availability objects lying in the provided time slot's
+        window are looked up in the database. An additional check to
+        ensure the entire session lies in the future is also made.
 
         Args:
             data: Dictionary of field values.
@@ -49,26 +40,143 @@ class AvailabilitySerializer(serializers.ModelSerializer):
         Returns:
             Initial dictionary of field values if no error was raised.
         """
-        availabilites = Availability.objects.filter(
-            service__tutor=data["service"].tutor
-        )
-        start_time_range = TimeRange.from_start_and_duration(
-            data["start"], timedelta(minutes=data["service"].session_length)
-        )
-        if any(
-            [
-                (start_time_range in availability.time_range)
-                for availability in availabilites
-            ]
+        end = data["start"] + timedelta(minutes=data["service"].session_length)
+        if has_conflict(
+            data["service"].tutor_id,
+            data["start"],
+            end,
+            exclude_pk=self.instance.pk if self.instance else None,
         ):
             raise serializers.ValidationError(
                 "There is an Availability object with a conflicting time slot already in the database."
             )
-        if (
-            data["start"] + timedelta(minutes=data["service"].session_length)
-        ) < datetime.now(tz=timezone.utc):
+        if end < datetime.now(tz=timezone.utc):
+            raise serializers.ValidationError(
+                "Given time slot falls in the past. Please input valid start time."
+            )
+
+        return data
+
+
+class AvailabilityRecurrenceSerializer(serializers.Serializer):
+    """Serializer for creating Availability objects based on a weekly pattern.
+
+    The pattern consists of days of the week and start times of
+    the sessions on each of these days, repeated every week between
+    the given dates (both inclusive). Every generated time slot is
+    validated at once and all of them are saved with a single
+    `bulk_create` call.
+    """
+
+    MAX_RECURRENCE_DAYS = 366
+
+    service = serializers.PrimaryKeyRelatedField(queryset=Service.objects.all())
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6),
+        allow_empty=False,
+        help_text="Days of the week, with 0 being Monday and 6 being Sunday.",
+    )
+    start_times = serializers.ListField(
+        child=serializers.TimeField(), allow_empty=False
+    )
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+    def validate(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Expand the weekly pattern and check the generated time slots.
+
+        Args:
+            data: Dictionary of field values.
+
+        Raises:
+            serializers.ValidationError when the date range is invalid,
+            when the pattern does not produce any time slot, when any
+            of the time slots falls in the past or when any of them
+            conflicts with another generated time slot or with an
+            Availability object already present in the database.
+
+        Returns:
+            Dictionary of field values with the list of generated
+            TimeRange instances under the `time_ranges` key.
+        """
+        if data["start_date"] > data["end_date"]:
+            raise serializers.ValidationError(
+                "The start date of the pattern must not be after its end date."
+            )
+        if (data["end_date"] - data["start_date"]).days >= self.MAX_RECURRENCE_DAYS:
+            raise serializers.ValidationError(
+                f"The pattern can not span more than {self.MAX_RECURRENCE_DAYS} days."
+            )
+
+        time_ranges = self._expand_pattern(data)
+        if not time_ranges:
+            raise serializers.ValidationError(
+                "The pattern does not produce any time slot in the given date range."
+            )
+        if time_ranges[0].end < datetime.now(tz=timezone.utc):
             raise serializers.ValidationError(
                 "Given time slot falls in the past. Please input valid start time."
             )
+        conflicts = find_conflicting_time_ranges(data["service"].tutor_id, time_ranges)
+        if conflicts:
+            raise serializers.ValidationError(
+                "There are time slots conflicting with each other or with Availability objects already in the database: "
+                + ", ".join(
+                    time_range.start.strftime(r"%Y-%m-%d %H:%M")
+                    for time_range in conflicts
+                )
+            )
 
+        data["time_ranges"] = time_ranges
         return data
+
+    def create(self, validated_data: dict[str, Any]) -> list[Availability]:
+        """Save every generated time slot in a single transaction.
+
+        Args:
+            validated_data: Dictionary of field values returned
+                            by the `validate` method.
+
+        Returns:
+            A list with the newly created Availability objects.
+        """
+        with transaction.atomic():
+            availabilities = Availability.objects.bulk_create(
+                [
+                    Availability(
+                        service=validated_data["service"],
+                        start=time_range.start,
+                        end=time_range.end,
+                    )
+                    for time_range in validated_data["time_ranges"]
+                ]
+            )
+            invalidate_schedule(validated_data["service"].tutor_id)
+        return availabilities
+
+    @staticmethod
+    def _expand_pattern(data: dict[str, Any]) -> list[TimeRange]:
+        """Generate time slots described by the weekly pattern.
+
+        Args:
+            data: Dictionary of field values.
+
+        Returns:
+            A list of TimeRange instances, sorted by their start,
+            one for every start time on every matching day.
+        """
+        duration = timedelta(minutes=data["service"].session_length)
+        weekdays = set(data["weekdays"])
+        start_times = sorted(set(data["start_times"]))
+        days = (
+            data["start_date"] + timedelta(days=offset)
+            for offset in range((data["end_date"] - data["start_date"]).days + 1)
+        )
+        return [
+            TimeRange.from_start_and_duration(
+                make_aware(datetime.combine(day, start_time)), duration
+            )
+            for day in days
+            if day.weekday() in weekdays
+            for start_time in start_times
+        ]
@@ -0,0 +1,77 @@
+"""Signal handlers keeping cached schedules of Tutors up to date."""
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Iterator
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from lessons.models import Booking
+from tutors.models import Availability, Service
+from tutors.schedule_cache import invalidate_schedule
+
+_state = threading.local()
+
+
+@contextmanager
+def availability_signals_disabled() -> Iterator[None]:
+    """Skip the signal handlers for changes made within the block.
+
+    Meant for bulk operations on many Availability objects, which
+    invalidate the cached schedules themselves instead of doing so
+    separately for every object.
+    """
+    previous = getattr(_state, "disabled", False)
+    _state.disabled = True
+    try:
+        yield
+    finally:
+        _state.disabled = previous
+
+
+def _skipped_when_disabled(handler: Callable[..., None]) -> Callable[..., None]:
+    """Make a signal handler do nothing within `availability_signals_disabled`."""
+
+    @wraps(handler)
+    def wrapper(*args: Any, **kwargs: Any) -> None:
+        if not getattr(_state, "disabled", False):
+            handler(*args, **kwargs)
+
+    return wrapper
+
+
+@receiver(pre_delete, sender=Availability)
+@receiver(pre_delete, sender=Booking)
+@_skipped_when_disabled
+def remember_deleted_tutor(sender: type, instance: Any, **kwargs: Any) -> None:
+    """Store the Tutor of an object before it is deleted.
+
+    Related objects of cascade deletions are gone by the time
+    `post_delete` is sent, so the Tutor whose cached schedules
+    are invalidated has to be looked up beforehand.
+    """
+    availability = (
+        instance if isinstance(instance, Availability) else instance.availability
+    )
+    instance._deleted_tutor_id = availability.service.tutor_id
+
+
+@receiver(post_save, sender=Availability)
+@receiver(post_save, sender=Booking)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Availability)
+@receiver(post_delete, sender=Booking)
+@receiver(post_delete, sender=Service)
+@_skipped_when_disabled
+def invalidate_cached_schedule(sender: type, instance: Any, **kwargs: Any) -> None:
+    """Invalidate cached schedules of the Tutor a changed object belongs to."""
+    if isinstance(instance, Service):
+        tutor_id = instance.tutor_id
+    elif hasattr(instance, "_deleted_tutor_id"):
+        tutor_id = instance._deleted_tutor_id
+    elif isinstance(instance, Booking):
+        tutor_id = instance.availability.service.tutor_id
+    else:
+        tutor_id = instance.service.tutor_id
+    invalidate_schedule(tutor_id)
@@ -74,6 +74,7 @@ class TestAvailabilityInputView(TestCaseServiceUtils):
 
         self.assertContains(res, "December")
 
+    @freeze_time(NOW)
     def test_availability_for_given_month_in_db_correctly_displayed(self):
         self._register_user("tutor1", student=False)
         tutor = Profile.objects.get(pk=1)
@@ -0,0 +1,229 @@
+"""Tests for detecting conflicting Availability time slots."""
+from datetime import datetime, timedelta, timezone
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from freezegun import freeze_time
+
+from profiles.models import Profile
+from tutors.conflicts import find_conflicting_time_ranges, has_conflict
+from tutors.models import Availability, Service
+from tutors.serializers import AvailabilitySerializer
+from tutors.time_range import TimeRange
+from utils.testing import TestCaseServiceUtils
+
+NOW = "2023-12-13 07:59:00"
+
+
+class TestAvailabilityConflicts(TestCaseServiceUtils):
+    """Tests for the conflict check shared by the serializer and the model."""
+
+    def setUp(self):
+        """Create a Tutor with default Services."""
+        self._register_user("tutor1", student=False)
+        self.tutor = Profile.objects.get(pk=1)
+        self._create_service_objects(profile=self.tutor)
+        self.service = Service.objects.get(pk=1)
+
+    def test_end_time_stored_on_save(self):
+        availability = self._create_availiability_object(
+            service=self.service,
+            start=datetime(2023, 12, 20, 7, 0, tzinfo=timezone.utc),
+        )
+
+        self.assertEqual(
+            Availability.objects.get(pk=availability.pk).end,
+            datetime(2023, 12, 20, 8, 0, tzinfo=timezone.utc),
+        )
+
+    def test_session_length_changed_end_time_updated(self):
+        availability = self._create_availiability_object(
+            service=self.service,
+            start=datetime(2023, 12, 20, 7, 0, tzinfo=timezone.utc),
+        )
+
+        self.service.session_length = 90
+        self.service.save()
+
+        self.assertEqual(
+            Availability.objects.get(pk=availability.pk).end,
+            datetime(2023, 12, 20, 8, 30, tzinfo=timezone.utc),
+        )
+
+    def test_price_changed_availability_not_updated(self):
+        self._create_availiability_object(
+            service=self.service,
+            start=datetime(2023, 12, 20, 7, 0, tzinfo=timezone.utc),
+        )
+        service = Service.objects.get(pk=self.service.pk)
+
+        service.price_per_hour += 10
+        with CaptureQueriesContext(connection) as context:
+            service.save()
+
+        self.assertFalse(
+            [
+                query
+                for query in context.captured_queries
+                if "tutors_availability" in query["sql"]
+            ]
+        )
+
+    def test_time_slot_containing_existing_one_conflict_detected(self):
+        self._create_availiability_object(
+            service=self.service,
+            start=datetime(2023, 12, 20, 7, 30, tzinfo=timezone.utc),
+        )
+
+        self.assertTrue(
+            has_conflict(
+                self.tutor,
+                datetime(2023, 12, 20, 7, 0, tzinfo=timezone.utc),
+                datetime(2023, 12, 20, 10, 0, tzinfo=timezone.utc),
+            )
+        )
+
+    def test_adjacent_time_slots_conflict_not_detected(self):
+        self._create_availiability_object(
+            service=self.service,
+            start=datetime(2023, 12, 20, 7, 0, tzinfo=timezone.utc),
+        )
+
+        self.assertFalse(
+            has_conflict(
+                self.tutor,
+                datetime(2023, 12, 20, 8, 0, tzinfo=timezone.utc),
+                datetime(2023, 12, 20, 9, 0, tzinfo=timezone.utc),
+            )
+        )
+        self.assertFalse(
+            has_conflict(
+                self.tutor,
+                datetime(2023, 12, 20, 6, 0, tzinfo=timezone.utc),
+                datetime(2023, 12, 20, 7, 0, tzinfo=timezone.utc),
+            )
+        )
+
+    def test_longest_session_starting_before_time_slot_conflict_detected(self):
+        service = self._create_service_object(
+            profile=self.tutor,
+            subject_pk=3,
+            session_length=Service.MAX_SESSION_LENGTH,
+        )
+        self._create_availiability_object(
+            service=service, start=datetime(2023, 12, 20, 7, 0, tzinfo=timezone.utc)
+        )
+
+        self.assertTrue(
+            has_conflict(
+                self.tutor,
+                datetime(2023, 12, 20, 9, 45, tzinfo=timezone.utc),
+                datetime(2023, 12, 20, 10, 45, tzinfo=timezone.utc),
+            )
+        )
+
+    def test_conflicting_availability_of_different_service_conflict_detected(self):
+        self._create_availiability_object(
+            service=Service.objects.get(pk=2),
+            start=datetime(2023, 12, 20, 7, 0, tzinfo=timezone.utc),
+        )
+
+        self.assertTrue(
+            has_conflict(
+                self.tutor,
+                datetime(2023, 12, 20, 7, 30, tzinfo=timezone.utc),
+                datetime(2023, 12, 20, 8, 30, tzinfo=timezone.utc),
+            )
+        )
+
+    def test_conflicting_availability_of_different_tutor_conflict_not_detected(self):
+        self._register_user("tutor2", student=False)
+        tutor2 = Profile.objects.get(pk=2)
+        service = self._create_service_object(profile=tutor2)
+        self._create_availiability_object(
+            service=service, start=datetime(2023, 12, 20, 7, 0, tzinfo=timezone.utc)
+        )
+
+        self.assertFalse(
+            has_conflict(
+                self.tutor,
+                datetime(2023, 12, 20, 7, 0, tzinfo=timezone.utc),
+                datetime(2023, 12, 20, 8, 0, tzinfo=timezone.utc),
+            )
+        )
+
+    def test_model_clean_conflicting_availability_error_raised(self):
+        self._create_availiability_object(
+            service=self.service,
+            start=datetime(2023, 12, 20, 7, 0, tzinfo=timezone.utc),
+        )
+        availability = Availability(
+            service=self.service,
+            start=datetime(2023, 12, 20, 7, 30, tzinfo=timezone.utc),
+        )
+
+        with self.assertRaises(ValidationError):
+            availability.clean()
+
+    def test_model_clean_saved_availability_not_conflicting_with_itself(self):
+        availability = self._create_availiability_object(
+            service=self.service,
+            start=datetime(2023, 12, 20, 7, 0, tzinfo=timezone.utc),
+        )
+
+        availability.clean()
+
+    @freeze_time(NOW)
+    def test_serializer_query_count_independent_of_slot_history(self):
+        data = {"service": 1, "start": "2023-12-20 07:00"}
+        with self.assertNumQueries(2):
+            AvailabilitySerializer(data=data).is_valid()
+
+        Availability.objects.bulk_create(
+            [
+                Availability(
+                    service=self.service,
+                    start=datetime(2023, 1, 1, tzinfo=timezone.utc)
+                    + timedelta(hours=i),
+                    end=datetime(2023, 1, 1, 1, tzinfo=timezone.utc)
+                    + timedelta(hours=i),
+                )
+                for i in range(200)
+            ]
+        )
+
+        with self.assertNumQueries(2):
+            AvailabilitySerializer(data=data).is_valid()
+
+    def test_bulk_check_conflicts_with_existing_availability_detected(self):
+        self._create_availiability_object(
+            service=self.service,
+            start=datetime(2023, 12, 20, 7, 0, tzinfo=timezone.utc),
+        )
+        conflicting = TimeRange.from_start_and_duration(
+            datetime(2023, 12, 20, 7, 30, tzinfo=timezone.utc), timedelta(hours=1)
+        )
+        free = TimeRange.from_start_and_duration(
+            datetime(2023, 12, 21, 7, 0, tzinfo=timezone.utc), timedelta(hours=1)
+        )
+
+        with self.assertNumQueries(1):
+            conflicts = find_conflicting_time_ranges(self.tutor, [free, conflicting])
+
+        self.assertEqual(conflicts, [conflicting])
+
+    def test_bulk_check_conflicts_between_checked_time_ranges_detected(self):
+        first = TimeRange.from_start_and_duration(
+            datetime(2023, 12, 20, 7, 0, tzinfo=timezone.utc), timedelta(hours=3)
+        )
+        second = TimeRange.from_start_and_duration(
+            datetime(2023, 12, 20, 8, 0, tzinfo=timezone.utc), timedelta(hours=1)
+        )
+        third = TimeRange.from_start_and_duration(
+            datetime(2023, 12, 20, 10, 0, tzinfo=timezone.utc), timedelta(hours=1)
+        )
+
+        conflicts = find_conflicting_time_ranges(self.tutor, [third, second, first])
+
+        self.assertEqual(conflicts, [first, second])
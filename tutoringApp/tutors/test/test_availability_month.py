@@ -0,0 +1,152 @@
+"""Tests for fetching the availability calendar of a given month."""
+from datetime import datetime, timezone
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from freezegun import freeze_time
+
+from profiles.models import Profile
+from tutors.models import Service
+from tutors.views.availability import get_calendar_grid, get_month_availabilites
+from utils.testing import TestCaseServiceUtils
+
+NOW = "2023-12-13 07:59:00"
+
+
+class TestAvailabilityMonth(TestCaseServiceUtils):
+    """Tests for the month view of the availability input page."""
+
+    def setUp(self):
+        """Register a Tutor with default Services."""
+        self._register_user("tutor1", student=False)
+        self._create_service_objects(profile=Profile.objects.get(pk=1))
+        self.service = Service.objects.get(pk=1)
+
+    def _count_page_queries(self) -> int:
+        """Return the number of queries issued when rendering December 2023."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(
+                reverse(
+                    "tutors:availability", kwargs={"pk": 1, "month": 12, "year": 2023}
+                )
+            )
+        return len(queries)
+
+    def test_number_of_queries_independent_of_days_with_availability(self):
+        self._create_availiability_object(
+            service=self.service,
+            start=datetime(2023, 12, 1, 7, 0, tzinfo=timezone.utc),
+        )
+        queries_for_one_day = self._count_page_queries()
+
+        for day in range(2, 32):
+            self._create_availiability_object(
+                service=self.service,
+                start=datetime(2023, 12, day, 7, 0, tzinfo=timezone.utc),
+            )
+
+        self.assertEqual(self._count_page_queries(), queries_for_one_day)
+
+    @freeze_time(NOW)
+    def test_availability_grouped_by_day_and_sorted(self):
+        self._create_availiability_object(
+            service=self.service,
+            start=datetime(2023, 12, 31, 23, 0, tzinfo=timezone.utc),
+        )
+        self._create_availiability_object(
+            service=self.service,
+            start=datetime(2023, 12, 1, 9, 0, tzinfo=timezone.utc),
+        )
+        self._create_availiability_object(
+            service=self.service,
+            start=datetime(2023, 12, 1, 7, 0, tzinfo=timezone.utc),
+        )
+        self._create_availiability_object(
+            service=self.service,
+            start=datetime(2024, 1, 1, 0, 0, tzinfo=timezone.utc),
+        )
+
+        with self.assertNumQueries(1):
+            availabilites = get_month_availabilites(self.service, 2023, 12)
+
+        self.assertEqual(len(availabilites), 31)
+        self.assertEqual(
+            [availability.start.hour for availability in availabilites[0]], [7, 9]
+        )
+        self.assertEqual(
+            [availability.start.hour for availability in availabilites[30]], [23]
+        )
+        self.assertEqual(sum(len(day) for day in availabilites), 3)
+
+    @freeze_time("2024-01-10 07:59:00")
+    def test_availability_waiting_for_purge_excluded(self):
+        self._create_availiability_object(
+            service=self.service,
+            start=datetime(2023, 12, 20, 7, 0, tzinfo=timezone.utc),
+        )
+        self._create_availiability_object(
+            service=self.service,
+            start=datetime(2023, 12, 30, 7, 0, tzinfo=timezone.utc),
+        )
+
+        availabilites = get_month_availabilites(self.service, 2023, 12)
+
+        self.assertEqual(
+            [availability.start.day for day in availabilites for availability in day],
+            [30],
+        )
+
+    def test_calendar_grid_memoized(self):
+        get_calendar_grid.cache_clear()
+
+        first_grid = get_calendar_grid(2023, 12)
+        second_grid = get_calendar_grid(2023, 12)
+
+        self.assertIs(first_grid, second_grid)
+        self.assertEqual(get_calendar_grid.cache_info().hits, 1)
+
+    @freeze_time(NOW)
+    def test_json_month_view_returns_grid_and_availability(self):
+        self._create_availiability_object(
+            service=self.service,
+            start=datetime(2023, 12, 17, 7, 0, tzinfo=timezone.utc),
+        )
+
+        res = self.client.get(
+            reverse(
+                "tutors:availability_month",
+                kwargs={"pk": 1, "month": 12, "year": 2023},
+            )
+        )
+
+        self.assertEqual(res.status_code, 200)
+        data = res.json()
+        self.assertEqual(data["month_name"], "December")
+        self.assertEqual(data["calendar_grid"][0], ["placeholder_0", "placeholder"])
+        self.assertEqual(len(data["availabilites"]), 31)
+        self.assertEqual(data["availabilites"][16][0]["start"], "2023-12-17T07:00:00Z")
+        self.assertEqual(data["availabilites"][16][0]["end"], "2023-12-17T08:00:00Z")
+
+    def test_json_month_view_service_of_different_tutor_forbidden(self):
+        self.client.logout()
+        self._register_user("tutor2", student=False)
+
+        res = self.client.get(
+            reverse(
+                "tutors:availability_month",
+                kwargs={"pk": 1, "month": 12, "year": 2023},
+            )
+        )
+
+        self.assertEqual(res.status_code, 403)
+
+    def test_json_month_view_incorrect_month_bad_request(self):
+        res = self.client.get(
+            reverse(
+                "tutors:availability_month",
+                kwargs={"pk": 1, "month": 13, "year": 2023},
+            )
+        )
+
+        self.assertEqual(res.status_code, 400)
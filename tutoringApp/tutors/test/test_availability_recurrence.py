@@ -0,0 +1,141 @@
+"""Tests for creating Availability objects based on a weekly pattern."""
+from datetime import datetime, timezone
+
+from django.urls import reverse
+from freezegun import freeze_time
+
+from profiles.models import Profile
+from tutors.models import Availability, Service
+from utils.testing import TestCaseServiceUtils
+
+NOW = "2023-12-13 07:59:00"
+
+
+class TestAvailabilityRecurrenceAPIView(TestCaseServiceUtils):
+    """Tests for the endpoint creating recurring Availability objects."""
+
+    def setUp(self):
+        """Register a Tutor with default Services."""
+        self._register_user("tutor1", student=False)
+        self._create_service_objects(profile=Profile.objects.get(pk=1))
+
+    def _post_pattern(self, **kwargs):
+        """Send a weekly pattern, overriding the defaults with provided values."""
+        data = {
+            "service": 1,
+            "weekdays": [0, 2],
+            "start_times": ["07:00", "09:00"],
+            "start_date": "2023-12-18",
+            "end_date": "2023-12-31",
+        }
+        data.update(kwargs)
+        return self.client.post(
+            reverse("tutors:availability_recurring_create"),
+            data=data,
+            content_type="application/json",
+        )
+
+    @freeze_time(NOW)
+    def test_pattern_sent_availability_objects_created(self):
+        res = self._post_pattern()
+
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(len(res.json()), 8)
+        self.assertEqual(
+            list(
+                Availability.objects.order_by("start").values_list("start", flat=True)
+            ),
+            [
+                datetime(2023, 12, 18, 7, 0, tzinfo=timezone.utc),
+                datetime(2023, 12, 18, 9, 0, tzinfo=timezone.utc),
+                datetime(2023, 12, 20, 7, 0, tzinfo=timezone.utc),
+                datetime(2023, 12, 20, 9, 0, tzinfo=timezone.utc),
+                datetime(2023, 12, 25, 7, 0, tzinfo=timezone.utc),
+                datetime(2023, 12, 25, 9, 0, tzinfo=timezone.utc),
+                datetime(2023, 12, 27, 7, 0, tzinfo=timezone.utc),
+                datetime(2023, 12, 27, 9, 0, tzinfo=timezone.utc),
+            ],
+        )
+
+    @freeze_time(NOW)
+    def test_pattern_sent_end_times_stored(self):
+        self._create_service_object(
+            profile=Profile.objects.get(pk=1), subject_pk=3, session_length=75
+        )
+
+        self._post_pattern(
+            service=5, weekdays=[0], start_times=["07:00"], end_date="2023-12-18"
+        )
+
+        self.assertEqual(
+            Availability.objects.get().end,
+            datetime(2023, 12, 18, 8, 15, tzinfo=timezone.utc),
+        )
+
+    @freeze_time(NOW)
+    def test_pattern_sent_number_of_queries_independent_of_slot_count(self):
+        with self.assertNumQueries(7):
+            self._post_pattern(end_date="2024-06-30")
+
+        self.assertEqual(Availability.objects.count(), 112)
+
+    @freeze_time(NOW)
+    def test_pattern_conflicting_with_existing_availability_nothing_created(self):
+        self._create_availiability_object(
+            service=Service.objects.get(pk=2),
+            start=datetime(2023, 12, 25, 9, 30, tzinfo=timezone.utc),
+        )
+
+        res = self._post_pattern()
+
+        self.assertEqual(res.status_code, 400)
+        self.assertContains(res, "2023-12-25 09:00", status_code=400)
+        self.assertEqual(Availability.objects.count(), 1)
+
+    @freeze_time(NOW)
+    def test_pattern_with_slots_conflicting_with_each_other_nothing_created(self):
+        res = self._post_pattern(start_times=["07:00", "07:30"])
+
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(Availability.objects.count(), 0)
+
+    @freeze_time(NOW)
+    def test_pattern_in_the_past_error_message_returned(self):
+        res = self._post_pattern(start_date="2023-12-01", end_date="2023-12-31")
+
+        self.assertContains(
+            res,
+            "Given time slot falls in the past. Please input valid start time.",
+            status_code=400,
+        )
+        self.assertEqual(Availability.objects.count(), 0)
+
+    @freeze_time(NOW)
+    def test_start_date_after_end_date_error_message_returned(self):
+        res = self._post_pattern(start_date="2023-12-31", end_date="2023-12-18")
+
+        self.assertContains(
+            res,
+            "The start date of the pattern must not be after its end date.",
+            status_code=400,
+        )
+
+    @freeze_time(NOW)
+    def test_pattern_without_matching_days_error_message_returned(self):
+        res = self._post_pattern(weekdays=[6], end_date="2023-12-18")
+
+        self.assertContains(
+            res,
+            "The pattern does not produce any time slot in the given date range.",
+            status_code=400,
+        )
+
+    @freeze_time(NOW)
+    def test_service_of_different_tutor_forbidden(self):
+        self.client.logout()
+        self._register_user("tutor2", student=False)
+
+        res = self._post_pattern()
+
+        self.assertEqual(res.status_code, 403)
+        self.assertEqual(Availability.objects.count(), 0)
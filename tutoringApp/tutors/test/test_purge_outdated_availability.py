@@ -0,0 +1,112 @@
+"""Tests for removing outdated Availability objects."""
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.core.management import call_command
+from freezegun import freeze_time
+
+from lessons.models import Booking, Lesson
+from tutors.management.commands.purge_outdated_availability import Command
+from profiles.models import Profile
+from tutors.models import ArchivedAvailability, Availability, Service
+from utils.testing import TestCaseServiceUtils
+
+NOW = "2023-12-31 07:59:00"
+
+
+class TestPurgeOutdatedAvailability(TestCaseServiceUtils):
+    """Tests for the command purging outdated Availability objects."""
+
+    def setUp(self):
+        """Create a Tutor with past, recent and future Availability objects."""
+        self._register_user("tutor1", student=False)
+        self._create_service_objects(profile=Profile.objects.get(pk=1))
+        service = Service.objects.get(pk=1)
+        for day in (1, 2, 3, 4):
+            self._create_availiability_object(
+                service=service,
+                start=datetime(2023, 12, day, 8, 0, tzinfo=timezone.utc),
+            )
+        self.recent = self._create_availiability_object(
+            service=service, start=datetime(2023, 12, 28, 8, 0, tzinfo=timezone.utc)
+        )
+        self.future = self._create_availiability_object(
+            service=service, start=datetime(2024, 1, 8, 8, 0, tzinfo=timezone.utc)
+        )
+        self.booked = Availability.objects.get(start__day=2)
+        self._register_user("student1")
+        Booking.objects.create(
+            student=Profile.objects.get(user__username="student1"),
+            lesson_info=Lesson.objects.create(date=self.booked.start),
+            availability=self.booked,
+        )
+
+    def _purge(self, *args: str) -> str:
+        """Run the command and return its output."""
+        out = StringIO()
+        call_command("purge_outdated_availability", *args, stdout=out)
+        return out.getvalue()
+
+    @freeze_time(NOW)
+    def test_expired_unbooked_availability_deleted_in_batches(self):
+        output = self._purge("--batch-size", "2")
+
+        self.assertIn("Removed 3 outdated Availability objects", output)
+        self.assertIn("rows/s", output)
+        self.assertQuerySetEqual(
+            Availability.objects.order_by("start"),
+            [self.booked, self.recent, self.future],
+        )
+        self.assertFalse(ArchivedAvailability.objects.exists())
+
+    @freeze_time(NOW)
+    def test_dry_run_nothing_deleted(self):
+        output = self._purge("--dry-run")
+
+        self.assertIn("Would remove 3 outdated Availability objects", output)
+        self.assertEqual(Availability.objects.count(), 6)
+
+    @freeze_time(NOW)
+    def test_archive_option_removed_availability_archived(self):
+        self._purge("--archive")
+
+        self.assertEqual(
+            list(
+                ArchivedAvailability.objects.order_by("start").values_list(
+                    "start__day", flat=True
+                )
+            ),
+            [1, 3, 4],
+        )
+
+    @freeze_time(NOW)
+    def test_retention_period_respected(self):
+        self._purge("--older-than-days", "0")
+
+        self.assertQuerySetEqual(
+            Availability.objects.order_by("start"), [self.booked, self.future]
+        )
+
+    @freeze_time(NOW)
+    def test_outdated_and_not_outdated_querysets(self):
+        self.assertEqual(Availability.objects.outdated().count(), 5)
+        self.assertQuerySetEqual(Availability.objects.not_outdated(), [self.future])
+        self.assertQuerySetEqual(
+            Availability.objects.not_outdated(retention_days=14).order_by("start"),
+            [self.recent, self.future],
+        )
+
+    @freeze_time(NOW)
+    def test_availability_booked_after_batch_fetched_kept_and_not_archived(self):
+        batch = next(Command._iterate_batches(datetime.now(tz=timezone.utc), 10))
+        Booking.objects.create(
+            student=Profile.objects.get(user__username="student1"),
+            lesson_info=Lesson.objects.create(date=self.future.start),
+            availability=Availability.objects.get(start__day=3),
+        )
+
+        removed = Command._remove_batch(batch, archive=True)
+
+        self.assertEqual(removed, len(batch) - 1)
+        self.assertTrue(Availability.objects.filter(start__day=3).exists())
+        self.assertFalse(ArchivedAvailability.objects.filter(start__day=3).exists())
@@ -0,0 +1,98 @@
+"""Tests for building weekly schedules of Tutors' open time slots."""
+from datetime import date, datetime, timezone
+
+from freezegun import freeze_time
+
+from lessons.models import Booking, Lesson
+from profiles.models import Profile
+from tutors.models import Service
+from tutors.schedule import get_week_days, get_week_schedule, get_week_start
+from utils.testing import TestCaseServiceUtils
+
+NOW = "2024-01-02 07:59:00"
+
+
+class TestWeekSchedule(TestCaseServiceUtils):
+    """Tests for grouping Availability objects by Service, week and day."""
+
+    def setUp(self):
+        """Create a Tutor with default Services."""
+        self._register_user("tutor1", student=False)
+        self.tutor = Profile.objects.get(pk=1)
+        self._create_service_objects(profile=self.tutor)
+        self.services = list(Service.objects.filter(is_default=True))
+
+    def test_week_start_across_year_end(self):
+        self.assertEqual(get_week_start(date(2024, 1, 3)), date(2024, 1, 1))
+        self.assertEqual(get_week_start(date(2024, 1, 3), -1), date(2023, 12, 25))
+        self.assertEqual(get_week_start(date(2021, 1, 1)), date(2020, 12, 28))
+        self.assertEqual(get_week_start(date(2020, 12, 31), 1), date(2021, 1, 4))
+
+    def test_week_days_from_monday_to_sunday(self):
+        self.assertEqual(
+            get_week_days(date(2023, 12, 31)),
+            [date(2023, 12, day) for day in range(25, 32)],
+        )
+
+    @freeze_time(NOW)
+    def test_availability_grouped_by_service_week_and_day(self):
+        first = self._create_availiability_object(
+            service=self.services[0],
+            start=datetime(2023, 12, 31, 9, 0, tzinfo=timezone.utc),
+        )
+        second = self._create_availiability_object(
+            service=self.services[0],
+            start=datetime(2024, 1, 1, 7, 0, tzinfo=timezone.utc),
+        )
+        third = self._create_availiability_object(
+            service=self.services[1],
+            start=datetime(2024, 1, 10, 7, 0, tzinfo=timezone.utc),
+        )
+
+        with self.assertNumQueries(1):
+            schedule = get_week_schedule(self.services, date(2024, 1, 2), (-1, 0, 1))
+
+        self.assertEqual(list(schedule), self.services)
+        self.assertEqual(schedule[self.services[0]][-1][6], [first])
+        self.assertEqual(schedule[self.services[0]][0][0], [second])
+        self.assertEqual(schedule[self.services[1]][1][2], [third])
+        self.assertEqual(
+            sum(
+                len(day)
+                for weeks in schedule.values()
+                for days in weeks.values()
+                for day in days
+            ),
+            3,
+        )
+
+    def test_booked_and_out_of_range_availability_excluded(self):
+        booked = self._create_availiability_object(
+            service=self.services[0],
+            start=datetime(2024, 1, 2, 7, 0, tzinfo=timezone.utc),
+        )
+        self._register_user("student1")
+        Booking.objects.create(
+            lesson_info=Lesson.objects.create(date=booked.start),
+            student=Profile.objects.get(user__username="student1"),
+            availability=booked,
+        )
+        self._create_availiability_object(
+            service=self.services[0],
+            start=datetime(2024, 1, 15, 0, 0, tzinfo=timezone.utc),
+        )
+        self._create_availiability_object(
+            service=self.services[0],
+            start=datetime(2023, 12, 24, 23, 0, tzinfo=timezone.utc),
+        )
+
+        schedule = get_week_schedule(self.services, date(2024, 1, 2), (-1, 0, 1))
+
+        self.assertFalse(
+            any(
+                day
+                for weeks in schedule.values()
+                for days in weeks.values()
+                for day in days
+            )
+        )
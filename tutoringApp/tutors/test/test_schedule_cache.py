@@ -0,0 +1,182 @@
+"""Tests for the versioned per-Tutor cache of schedules."""
+import threading
+from datetime import date, datetime, timedelta, timezone
+from tempfile import TemporaryDirectory
+from time import sleep
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.test import override_settings
+
+from lessons.models import Booking, Lesson
+from profiles.models import Profile
+from tutors.models import Service
+from tutors.schedule import ScheduledSlot, get_cached_week_schedule
+from tutors.schedule_cache import (
+    get_cached_schedule,
+    get_schedule_version,
+    invalidate_schedule,
+)
+from utils.testing import TestCaseServiceUtils
+from utils.testing.settings import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestScheduleCache(TestCaseServiceUtils):
+    """Tests for caching and invalidating Tutors' schedules."""
+
+    def setUp(self):
+        """Create a Tutor with default Services and an empty cache."""
+        cache.clear()
+        self._register_user("tutor1", student=False)
+        self.tutor = Profile.objects.get(pk=1)
+        self._create_service_objects(profile=self.tutor)
+        self.services = list(Service.objects.filter(is_default=True))
+        self.start = datetime.now(tz=timezone.utc).replace(
+            minute=0, second=0, microsecond=0
+        ) + timedelta(days=1)
+
+    def _get_schedule(self):
+        """Get the cached schedule of the current week."""
+        return get_cached_week_schedule(
+            self.tutor.pk, self.services, self.start.date(), (0,)
+        )
+
+    def _get_slots(self):
+        """Get every open time slot of the cached schedule."""
+        return [
+            slot
+            for weeks in self._get_schedule().values()
+            for days in weeks.values()
+            for slots in days
+            for slot in slots
+        ]
+
+    def test_cached_schedule_read_without_queries(self):
+        availability = self._create_availiability_object(
+            service=self.services[0], start=self.start
+        )
+        self._get_schedule()
+
+        with self.assertNumQueries(0):
+            schedule = self._get_schedule()
+
+        self.assertEqual(list(schedule), self.services)
+        self.assertEqual(
+            schedule[self.services[0]][0][self.start.weekday()],
+            [ScheduledSlot(availability.pk, availability.start, availability.end)],
+        )
+        self.assertFalse(
+            schedule[self.services[0]][0][self.start.weekday()][0].is_outdated
+        )
+
+    def test_schedule_invalidated_on_availability_save_and_delete(self):
+        self.assertEqual(self._get_slots(), [])
+
+        availability = self._create_availiability_object(
+            service=self.services[0], start=self.start
+        )
+        self.assertEqual([slot.id for slot in self._get_slots()], [availability.pk])
+
+        availability.delete()
+        self.assertEqual(self._get_slots(), [])
+
+    def test_schedule_invalidated_on_booking(self):
+        availability = self._create_availiability_object(
+            service=self.services[0], start=self.start
+        )
+        self.assertEqual(len(self._get_slots()), 1)
+
+        self._register_user("student1")
+        booking = Booking.objects.create(
+            student=Profile.objects.get(user__username="student1"),
+            lesson_info=Lesson.objects.create(date=availability.start),
+            availability=availability,
+        )
+        self.assertEqual(self._get_slots(), [])
+
+        booking.delete()
+        self.assertEqual(len(self._get_slots()), 1)
+
+    def test_schedule_invalidated_on_session_length_change(self):
+        self._create_availiability_object(service=self.services[0], start=self.start)
+        self.assertEqual(self._get_slots()[0].end, self.start + timedelta(hours=1))
+
+        self.services[0].session_length = 90
+        self.services[0].save()
+
+        self.assertEqual(self._get_slots()[0].end, self.start + timedelta(minutes=90))
+
+    def test_version_replaced_again_after_commit(self):
+        version = get_schedule_version(self.tutor.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_schedule(self.tutor.pk)
+            invalidated_version = get_schedule_version(self.tutor.pk)
+
+        self.assertNotEqual(invalidated_version, version)
+        self.assertNotEqual(get_schedule_version(self.tutor.pk), invalidated_version)
+
+    def test_waiting_request_reads_schedule_built_by_lock_holder(self):
+        key = f"tutor_schedule:1:{get_schedule_version(1)}:week"
+        cache.add(f"{key}:lock", True)
+
+        with patch(
+            "tutors.schedule_cache.sleep",
+            side_effect=lambda _: cache.set(key, "built elsewhere"),
+        ):
+            schedule = get_cached_schedule(1, "week", lambda: "built again")
+
+        self.assertEqual(schedule, "built elsewhere")
+
+    def test_concurrent_misses_rebuild_schedule_once(self):
+        builds = []
+        results = []
+
+        def build():
+            builds.append(None)
+            sleep(0.2)
+            return "schedule"
+
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(get_cached_schedule(1, "week", build))
+            )
+            for _ in range(8)
+        ]
+        has_key = FileBasedCache.has_key
+
+        def slow_has_key(*args, **kwargs):
+            result = has_key(*args, **kwargs)
+            sleep(0.05)
+            return result
+
+        # The file-based backend's `add` is not atomic, which the delay
+        # makes evident, so the process lock alone has to keep the threads
+        # from rebuilding the schedule.
+        with TemporaryDirectory() as location, override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": location,
+                }
+            }
+        ), patch.object(FileBasedCache, "has_key", slow_has_key):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(builds), 1)
+        self.assertEqual(results, ["schedule"] * 8)
+
+    def test_schedule_of_other_week_cached_separately(self):
+        self._create_availiability_object(service=self.services[0], start=self.start)
+        self._get_schedule()
+
+        schedule = get_cached_week_schedule(
+            self.tutor.pk, self.services, date(2000, 1, 3), (0,)
+        )
+
+        self.assertFalse(any(slots for slots in schedule[self.services[0]][0]))
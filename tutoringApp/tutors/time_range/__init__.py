@@ -1,3 +1,4 @@
 from .time_range import TimeRange
+from .time_range_set import TimeRangeSet
 
-__all__ = ["TimeRange"]
+__all__ = ["TimeRange", "TimeRangeSet"]
@@ -0,0 +1,143 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from .time_range import TimeRange
+from .time_range_set import TimeRangeSet
+
+
+def hours(*pairs: tuple[float, float]) -> TimeRangeSet:
+    """Create a TimeRangeSet from pairs of hours of the 1st of December 2023."""
+    day = datetime(2023, 12, 1)
+    return TimeRangeSet.from_pairs(
+        (day + timedelta(hours=start), day + timedelta(hours=end))
+        for start, end in pairs
+    )
+
+
+class TimeRangeSetTest(unittest.TestCase):
+    """Tests for the TimeRangeSet class and its methods."""
+
+    def test_ranges_sorted_and_converted_back_to_time_ranges(self):
+        time_range_set = hours((10, 11), (8, 9))
+
+        self.assertEqual(
+            [(time_range.start, time_range.end) for time_range in time_range_set],
+            [
+                (datetime(2023, 12, 1, 8, 0), datetime(2023, 12, 1, 9, 0)),
+                (datetime(2023, 12, 1, 10, 0), datetime(2023, 12, 1, 11, 0)),
+            ],
+        )
+
+    def test_aware_datetimes_preserved(self):
+        start = datetime(2023, 12, 1, 8, 0, 0, 15, tzinfo=timezone.utc)
+        time_range_set = TimeRangeSet.from_time_ranges(
+            [TimeRange.from_start_and_duration(start, timedelta(hours=1))]
+        )
+
+        self.assertEqual(next(iter(time_range_set)).start, start)
+
+    def test_range_ending_before_start_error_raised(self):
+        with self.assertRaises(ValueError):
+            hours((10, 9))
+
+    def test_overlapping_time_range_contained(self):
+        time_range_set = hours((8, 9), (12, 13))
+
+        self.assertIn(
+            TimeRange(datetime(2023, 12, 1, 8, 30), datetime(2023, 12, 1, 12, 30)),
+            time_range_set,
+        )
+        self.assertNotIn(
+            TimeRange(datetime(2023, 12, 1, 9, 0), datetime(2023, 12, 1, 12, 0)),
+            time_range_set,
+        )
+
+    def test_overlapping_ranges_selected(self):
+        time_range_set = hours((8, 9), (10, 11), (12, 13))
+
+        overlapping = time_range_set.overlapping(
+            TimeRange(datetime(2023, 12, 1, 8, 30), datetime(2023, 12, 1, 10, 30))
+        )
+
+        self.assertEqual(overlapping, hours((8, 9), (10, 11)))
+
+    def test_overlaps_with_other_set_detected(self):
+        time_range_set = hours((7, 8), (8, 9), (10, 11), (14, 15))
+        other = hours((8.5, 10), (9.5, 10.5), (15, 16))
+
+        np.testing.assert_array_equal(
+            time_range_set.overlaps(other), [False, True, True, False]
+        )
+
+    def test_overlaps_with_empty_set_not_detected(self):
+        np.testing.assert_array_equal(hours((7, 8)).overlaps(hours()), [False])
+
+    def test_overlaps_within_set_detected(self):
+        time_range_set = hours((8, 11), (9, 9.5), (10, 12), (12, 13), (14, 15))
+
+        np.testing.assert_array_equal(
+            time_range_set.overlaps_within(), [True, True, True, False, False]
+        )
+
+    def test_overlapping_and_adjacent_ranges_merged(self):
+        time_range_set = hours((8, 9), (8.5, 10), (10, 11), (9, 9.5), (12, 13))
+
+        self.assertEqual(time_range_set.merged(), hours((8, 11), (12, 13)))
+
+    def test_union_of_sets(self):
+        self.assertEqual(
+            hours((8, 9), (12, 13)).union(hours((8.5, 10), (14, 15))),
+            hours((8, 10), (12, 13), (14, 15)),
+        )
+
+    def test_subtraction_of_bookings_from_availability(self):
+        availability = hours((8, 12), (14, 16))
+        bookings = hours((9, 10), (11.5, 14.5), (15, 15.5))
+
+        self.assertEqual(
+            availability.subtract(bookings),
+            hours((8, 9), (10, 11.5), (14.5, 15), (15.5, 16)),
+        )
+
+    def test_subtraction_of_covering_set_empty(self):
+        self.assertEqual(len(hours((8, 9)).subtract(hours((7, 10)))), 0)
+        self.assertEqual(len(hours().subtract(hours((7, 10)))), 0)
+
+    def test_first_free_slot_found(self):
+        free = hours((8, 8.5), (9, 11), (12, 14))
+
+        self.assertEqual(
+            free.first_free_slot(timedelta(hours=1.5)).start,
+            datetime(2023, 12, 1, 9, 0),
+        )
+        self.assertEqual(
+            free.first_free_slot(
+                timedelta(hours=1), not_before=datetime(2023, 12, 1, 10, 30)
+            ).start,
+            datetime(2023, 12, 1, 12, 0),
+        )
+
+    def test_first_free_slot_not_found(self):
+        self.assertIsNone(hours((8, 9)).first_free_slot(timedelta(hours=2)))
+
+    def test_results_match_scalar_time_range_checks(self):
+        rng = np.random.default_rng(0)
+        starts = rng.integers(0, 200, 300) / 4
+        first = hours(*[(start, start + 1) for start in starts[:150]])
+        second = hours(*[(start, start + 0.75) for start in starts[150:]])
+
+        expected = [
+            any(
+                time_range.start < other.end and other.start < time_range.end
+                for other in second
+            )
+            for time_range in first
+        ]
+
+        np.testing.assert_array_equal(first.overlaps(second), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,289 @@
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from .time_range import TimeRange
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class TimeRangeSet:
+    """Implement vectorized operations on many time ranges at once.
+
+    The time ranges are stored as two sorted arrays of 64-bit
+    integers, holding the number of microseconds since the epoch
+    of the starts and the ends of the ranges. Operations on the set
+    are performed on the whole arrays with NumPy, instead of comparing
+    TimeRange instances one pair at a time.
+
+    Naive datetimes are treated as UTC and time ranges created
+    from a set holding them are naive as well.
+    """
+
+    def __init__(
+        self, starts: np.ndarray, ends: np.ndarray, naive: bool = False
+    ) -> None:
+        """Intialization of a TimeRangeSet class instance.
+
+        Args:
+            starts: Array with the starts of the ranges,
+                    in microseconds since the epoch.
+            ends: Array with the ends of the ranges,
+                    in microseconds since the epoch.
+            naive: Boolean information about whether
+                    datetimes created from the set should
+                    be naive.
+
+        Raises:
+            ValueError: If the arrays differ in length or any
+                        of the ranges ends before it starts.
+        """
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        if starts.shape != ends.shape:
+            raise ValueError("Starts and ends of the time ranges differ in length.")
+        if np.any(ends < starts):
+            raise ValueError("Time range must not end before it starts.")
+        order = np.lexsort((ends, starts))
+        self.starts = starts[order]
+        self.ends = ends[order]
+        self.naive = naive
+
+    @classmethod
+    def from_pairs(
+        cls: "TimeRangeSet", pairs: Iterable[tuple[datetime, datetime]]
+    ) -> "TimeRangeSet":
+        """Create class instance from pairs of start and end times.
+
+        The method is meant to be used with results of
+        `values_list("start", "end")` calls on QuerySets.
+
+        Args:
+            pairs: Iterable with tuples of datetimes indicating
+                    the start and the end of every time range.
+        """
+        pairs = list(pairs)
+        naive = bool(pairs) and pairs[0][0].tzinfo is None
+        return cls(
+            starts=[_to_epoch(start) for start, _ in pairs],
+            ends=[_to_epoch(end) for _, end in pairs],
+            naive=naive,
+        )
+
+    @classmethod
+    def from_time_ranges(
+        cls: "TimeRangeSet", time_ranges: Iterable[TimeRange]
+    ) -> "TimeRangeSet":
+        """Create class instance from TimeRange objects.
+
+        Args:
+            time_ranges: Iterable with TimeRange instances.
+        """
+        return cls.from_pairs(
+            (time_range.start, time_range.end) for time_range in time_ranges
+        )
+
+    def __len__(self) -> int:
+        """Number of time ranges in the set."""
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[TimeRange]:
+        """Iterate over the time ranges in the order of their start."""
+        for start, end in zip(self.starts, self.ends):
+            yield TimeRange(self._to_datetime(start), self._to_datetime(end))
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the time ranges of two sets."""
+        if not isinstance(other, TimeRangeSet):
+            return NotImplemented
+        return np.array_equal(self.starts, other.starts) and np.array_equal(
+            self.ends, other.ends
+        )
+
+    __hash__ = None
+
+    def __contains__(self, time_range: TimeRange) -> bool:
+        """Check if any time range of the set overlaps with a given TimeRange.
+
+        Args:
+            time_range: instance of the TimeRange class.
+
+        Returns:
+            Boolean information of whether the provided
+            TimeRange instance overlaps with at least one
+            time range from the set.
+        """
+        return bool(self._overlapping_mask(time_range).any())
+
+    def overlapping(self, time_range: TimeRange) -> "TimeRangeSet":
+        """Get time ranges of the set that overlap with a given TimeRange.
+
+        Args:
+            time_range: instance of the TimeRange class.
+
+        Returns:
+            A new TimeRangeSet with the overlapping time ranges.
+        """
+        mask = self._overlapping_mask(time_range)
+        return TimeRangeSet(self.starts[mask], self.ends[mask], self.naive)
+
+    def overlaps(self, other: "TimeRangeSet") -> np.ndarray:
+        """Check which time ranges of the set overlap with another set.
+
+        For every time range of the set, the first merged range of the
+        other set ending after its start is looked up with a binary search,
+        so checking `n` ranges against `m` ranges takes O((n + m) log m).
+
+        Args:
+            other: TimeRangeSet the ranges are checked against.
+
+        Returns:
+            Array of booleans, in the order of the set's ranges,
+            with `True` for every range overlapping with at least
+            one range of the other set.
+        """
+        other = other.merged()
+        indices = np.searchsorted(other.ends, self.starts, side="right")
+        found = indices < len(other)
+        overlapping = np.zeros(len(self), dtype=bool)
+        overlapping[found] = other.starts[indices[found]] < self.ends[found]
+        return overlapping
+
+    def overlaps_within(self) -> np.ndarray:
+        """Check which time ranges of the set overlap with another range of the set.
+
+        The ranges are sorted by their start, so a range overlaps with
+        an earlier one if it starts before the latest end of the ranges
+        preceding it, and with a later one if the next range starts
+        before it ends.
+
+        Returns:
+            Array of booleans, in the order of the set's ranges,
+            with `True` for every range overlapping with at least
+            one other range of the set.
+        """
+        overlapping = np.zeros(len(self), dtype=bool)
+        if len(self) < 2:
+            return overlapping
+        overlapping[1:] = self.starts[1:] < np.maximum.accumulate(self.ends)[:-1]
+        overlapping[:-1] |= self.starts[1:] < self.ends[:-1]
+        return overlapping
+
+    def merged(self) -> "TimeRangeSet":
+        """Merge overlapping and adjacent time ranges of the set.
+
+        Returns:
+            A new TimeRangeSet covering the same time with
+            the smallest possible number of disjoint ranges.
+        """
+        if len(self) == 0:
+            return self
+        latest_ends = np.maximum.accumulate(self.ends)
+        group_starts = np.flatnonzero(
+            np.concatenate(([True], self.starts[1:] > latest_ends[:-1]))
+        )
+        return TimeRangeSet(
+            self.starts[group_starts],
+            np.maximum.reduceat(self.ends, group_starts),
+            self.naive,
+        )
+
+    def union(self, other: "TimeRangeSet") -> "TimeRangeSet":
+        """Get time covered by either of the sets.
+
+        Args:
+            other: TimeRangeSet joined with the set.
+
+        Returns:
+            A new, merged TimeRangeSet.
+        """
+        return TimeRangeSet(
+            np.concatenate((self.starts, other.starts)),
+            np.concatenate((self.ends, other.ends)),
+            self.naive,
+        ).merged()
+
+    def subtract(self, other: "TimeRangeSet") -> "TimeRangeSet":
+        """Get time covered by the set but not by another set.
+
+        Used e.g. to find free time of a Tutor by subtracting booked
+        sessions from their availability. The boundaries of both sets
+        split the time into elementary intervals, each of which is
+        kept if it is covered by the set and not covered by the other one.
+
+        Args:
+            other: TimeRangeSet subtracted from the set.
+
+        Returns:
+            A new, merged TimeRangeSet.
+        """
+        minuend = self.merged()
+        subtrahend = other.merged()
+        boundaries = np.unique(
+            np.concatenate(
+                (minuend.starts, minuend.ends, subtrahend.starts, subtrahend.ends)
+            )
+        )
+        if len(boundaries) < 2:
+            return TimeRangeSet([], [], self.naive)
+        segment_starts = boundaries[:-1]
+        keep = minuend._covers(segment_starts) & ~subtrahend._covers(segment_starts)
+        return TimeRangeSet(
+            segment_starts[keep], boundaries[1:][keep], self.naive
+        ).merged()
+
+    def first_free_slot(
+        self, duration: timedelta, not_before: Optional[datetime] = None
+    ) -> Optional[TimeRange]:
+        """Find the earliest slot of a given length within the set.
+
+        Args:
+            duration: timedelta object representing the
+                        duration of the searched slot.
+            not_before: datetime object before which
+                        the slot must not start.
+
+        Returns:
+            TimeRange instance of the earliest slot fully contained
+            in the set's time, None if no such slot exists.
+        """
+        free = self.merged()
+        starts = free.starts
+        if not_before is not None:
+            starts = np.maximum(starts, _to_epoch(not_before))
+        fitting = np.flatnonzero(free.ends - starts >= _to_microseconds(duration))
+        if not len(fitting):
+            return None
+        return TimeRange.from_start_and_duration(
+            self._to_datetime(starts[fitting[0]]), duration
+        )
+
+    def _overlapping_mask(self, time_range: TimeRange) -> np.ndarray:
+        """Mark time ranges of the set overlapping with a given TimeRange."""
+        return (self.starts < _to_epoch(time_range.end)) & (
+            self.ends > _to_epoch(time_range.start)
+        )
+
+    def _covers(self, points: np.ndarray) -> np.ndarray:
+        """Mark points covered by the ranges of an already merged set."""
+        return np.searchsorted(self.starts, points, side="right") > np.searchsorted(
+            self.ends, points, side="right"
+        )
+
+    def _to_datetime(self, microseconds: int) -> datetime:
+        """Convert microseconds since the epoch to a datetime."""
+        value = _EPOCH + timedelta(microseconds=int(microseconds))
+        return value.replace(tzinfo=None) if self.naive else value
+
+
+def _to_epoch(value: datetime) -> int:
+    """Convert a datetime to microseconds since the epoch."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return _to_microseconds(value - _EPOCH)
+
+
+def _to_microseconds(value: timedelta) -> int:
+    """Convert a timedelta to microseconds."""
+    return (value.days * 86400 + value.seconds) * 1_000_000 + value.microseconds
@@ -21,6 +21,16 @@ api_endpoints = [
         view=views.AvailabilityAPIView.as_view(),
         name="availability_update",
     ),
+    path(
+        "availability/recurring/create",
+        view=views.AvailabilityRecurrenceAPIView.as_view(),
+        name="availability_recurring_create",
+    ),
+    path(
+        "availability/<int:pk>/<int:month>/<int:year>/json",
+        view=views.AvailabilityMonthAPIView.as_view(),
+        name="availability_month",
+    ),
 ]
 urlpatterns = [
     path(
@@ -1,10 +1,16 @@
 from .availability import AvailabilityInputView
-from .availability_api import AvailabilityAPIView
+from .availability_api import (
+    AvailabilityAPIView,
+    AvailabilityMonthAPIView,
+    AvailabilityRecurrenceAPIView,
+)
 from .services import ServiceConfigurationView, service_delete_view
 
 __all__ = [
     "AvailabilityInputView",
     "AvailabilityAPIView",
+    "AvailabilityMonthAPIView",
+    "AvailabilityRecurrenceAPIView",
     "ServiceConfigurationView",
     "service_delete_view",
 ]
@@ -1,174 +1,207 @@
 import calendar
 import datetime
 from collections import OrderedDict
+from functools import lru_cache
 from logging import getLogger
-from typing import Any
+from typing import Any, Optional
 
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.contrib.auth.models import User
 from django.db.models.query import QuerySet
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import render
 from django.urls import reverse
+from django.utils.timezone import localtime, make_aware
 from django.views.generic.detail import DetailView
 
-from profiles.models import Profile
 from tutors.models import Availability, Service
 
 LOGGER = getLogger(__name__)
 
 
-class AvailabilityInputView(DetailView, LoginRequiredMixin):
-    template_name = "tutors/availability_input.html"
-    model = Service
+@lru_cache(maxsize=128)
+def get_calendar_grid(year: int, month: int) -> OrderedDict[Any, str]:
+    """Return a dictionary used to render given month's grid.
 
-    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
-        context = super().get_context_data(**kwargs)
+    The grid depends only on the calendar, so the result is
+    memoized for every (year, month) pair. The returned dictionary
+    is shared between calls and must not be modified.
 
-        context["availabilites"] = self._get_availabilites()
+    Args:
+        year: Year of the rendered month.
+        month: Index of the rendered month.
 
-        context["services"] = Service.objects.filter(
-            tutor=self.get_object().tutor
-        ).filter(is_default=True)
+    Returns:
+        Dictionary with at most 42 elements, each referring to one cell
+        in a calendar grid.
+    """
+    calendar_grid_dict = OrderedDict()
 
-        context["calendar_grid"] = self._get_calendar_grid()
+    month_calendar = calendar.monthcalendar(year, month)
 
-        context["month_index"] = self.kwargs["month"]
+    previous_months_days_count = month_calendar[0].count(0)
+    next_months_days_count = month_calendar[-1].count(0)
 
-        context["month_name"] = calendar.month_name[self.kwargs["month"]]
+    previous_months_year = year if month - 1 != 0 else year - 1
+    previous_months_index = month - 1 if month - 1 != 0 else 12
 
-        context["year_index"] = self.kwargs["year"]
+    next_months_index = month + 1 if month + 1 != 13 else 1
 
-        context["current_service_id"] = self.kwargs["pk"]
+    previous_months_days = list(
+        range(
+            1,
+            calendar.monthrange(previous_months_year, previous_months_index)[1] + 1,
+        )
+    )
+    previous_months_days.reverse()
+
+    for i in reversed(range(previous_months_days_count)):
+        calendar_grid_dict.update(
+            {
+                str(previous_months_index)
+                + "_"
+                + str(previous_months_days[i]): "not_current"
+            }
+        )
 
-        return context
+    for i in range(1, calendar.monthrange(year, month)[1] + 1):
+        calendar_grid_dict.update({i: "current"})
 
-    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
-        """Check if the currently logged in user is configured as tutor in given Service object."""
-        profile = Profile.objects.get(user=request.user)
-        if profile != self.get_object().tutor:
-            LOGGER.warning(
-                "User %(username)s with id %(id)s attempting to configure services of %(service_tutor)s with id %(service_tutor_id)s!",
-                {
-                    "username": self.request.user.username,
-                    "id": self.request.user.id,
-                    "profile_owner": User.objects.get(
-                        pk=self.get_object().tutor.pk
-                    ).username,
-                    "profile_owner_id": self.get_object().tutor.pk,
-                },
+    for i in range(1, next_months_days_count + 1):
+        calendar_grid_dict.update(
+            {str(next_months_index) + "_" + str(i): "not_current"}
+        )
+
+    calendar_grid_dict_with_placeholders = OrderedDict()
+    calendar_grid_dict_with_placeholders.update({"placeholder_0": "placeholder"})
+
+    i = 1
+    for day in calendar_grid_dict:
+        if i % 7 == 0:
+            calendar_grid_dict_with_placeholders.update({day: calendar_grid_dict[day]})
+            calendar_grid_dict_with_placeholders.update(
+                {f"placeholder_{i}": "placeholder"}
             )
-            return render(
-                request=request,
-                template_name="tutoringApp/forbidden.html",
-                status=403,
-                context={
-                    "warning_message": "You are not allowe to configure tutor's services!",
-                    "redirect_link": reverse("home:home"),
-                    "redirect_destination": "home page",
-                },
+            calendar_grid_dict_with_placeholders.update(
+                {f"placeholder_{i + 1}": "placeholder"}
             )
+        else:
+            calendar_grid_dict_with_placeholders.update({day: calendar_grid_dict[day]})
+        i += 1
+
+    calendar_grid_dict_with_placeholders.update({f"placeholder_{i}": "placeholder"})
+
+    return calendar_grid_dict_with_placeholders
+
+
+def get_month_availabilites(
+    service: Service, year: int, month: int
+) -> list[list[Availability]]:
+    """Return Availability objects of a Service for given month, grouped by day.
+
+    Every Availability object starting in the given month
+    is fetched with a single query and then assigned to the
+    day of the month that it starts on.
+
+    Args:
+        service: Service whose Availability objects are fetched.
+        year: Year of the month.
+        month: Index of the month.
+
+    Returns:
+        List containing lists of Availability objects, each
+        corresponding to one day of the given month and sorted
+        by the start time.
+    """
+    month_start = make_aware(datetime.datetime(year, month, 1))
+    month_end = make_aware(datetime.datetime(year + month // 12, month % 12 + 1, 1))
+
+    availabilites = [[] for _ in range(calendar.monthrange(year, month)[1])]
+    for availability in (
+        Availability.objects.not_outdated(retention_days=Availability.RETENTION_DAYS)
+        .filter(service=service, start__gte=month_start, start__lt=month_end)
+        .order_by("start")
+    ):
+        availabilites[localtime(availability.start).day - 1].append(availability)
+    return availabilites
+
+
+class OwnServiceMixin:
+    """Fetch the Service only once and ensure it belongs to the current user."""
+
+    def get_queryset(self) -> QuerySet[Service]:
+        """Fetch the Service together with its Tutor's User object."""
+        return Service.objects.select_related("tutor__user")
 
-        return super().get(request, *args, **kwargs)
+    def _forbidden_response(self, service: Service) -> Optional[HttpResponse]:
+        """Check if the currently logged in user is configured as tutor in given Service object.
 
-    def _get_calendar_grid(self) -> dict[int, str]:
-        """Returna dictionary used to render current month's grid.
+        Args:
+            service: Service that the user is attempting to configure.
 
         Returns:
-            Dictionary with at most 42 elements, each referring to one cell
-            in a calendar grid.
+            Instance of the HttpResponse class with a warning page
+            if the Service belongs to another Tutor, None otherwise.
         """
-        calendar_grid_dict = OrderedDict()
-
-        now = datetime.datetime.now()
-        month_calendar = calendar.monthcalendar(
-            self.kwargs["year"], self.kwargs["month"]
+        if self.request.user.pk == service.tutor_id:
+            return None
+        LOGGER.warning(
+            "User %(username)s with id %(id)s attempting to configure services of %(profile_owner)s with id %(profile_owner_id)s!",
+            {
+                "username": self.request.user.username,
+                "id": self.request.user.id,
+                "profile_owner": service.tutor.user.username,
+                "profile_owner_id": service.tutor_id,
+            },
+        )
+        return render(
+            request=self.request,
+            template_name="tutoringApp/forbidden.html",
+            status=403,
+            context={
+                "warning_message": "You are not allowe to configure tutor's services!",
+                "redirect_link": reverse("home:home"),
+                "redirect_destination": "home page",
+            },
         )
 
-        previous_months_days_count = month_calendar[0].count(0)
-        next_months_days_count = month_calendar[-1].count(0)
 
-        previous_months_year = (
-            self.kwargs["year"]
-            if self.kwargs["month"] - 1 != 0
-            else self.kwargs["year"] - 1
-        )
-        previous_months_index = (
-            self.kwargs["month"] - 1 if self.kwargs["month"] - 1 != 0 else 12
+class AvailabilityInputView(OwnServiceMixin, DetailView, LoginRequiredMixin):
+    template_name = "tutors/availability_input.html"
+    model = Service
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+
+        context["availabilites"] = get_month_availabilites(
+            self.object, self.kwargs["year"], self.kwargs["month"]
         )
 
-        # next_months_year = self.kwargs["year"] if self.kwargs["month"] + 1 != 13 else self.kwargs["year"] + 1
-        next_months_index = (
-            self.kwargs["month"] + 1 if self.kwargs["month"] + 1 != 13 else 1
+        context["services"] = (
+            Service.objects.filter(tutor=self.object.tutor_id)
+            .filter(is_default=True)
+            .select_related("subject")
         )
 
-        previous_months_days = list(
-            range(
-                1,
-                calendar.monthrange(previous_months_year, previous_months_index)[1] + 1,
-            )
+        context["calendar_grid"] = get_calendar_grid(
+            self.kwargs["year"], self.kwargs["month"]
         )
-        previous_months_days.reverse()
-
-        for i in reversed(range(previous_months_days_count)):
-            calendar_grid_dict.update(
-                {
-                    str(previous_months_index)
-                    + "_"
-                    + str(previous_months_days[i]): "not_current"
-                }
-            )
 
-        for i in range(
-            1, calendar.monthrange(self.kwargs["year"], self.kwargs["month"])[1] + 1
-        ):
-            calendar_grid_dict.update({i: "current"})
+        context["month_index"] = self.kwargs["month"]
 
-        for i in range(1, next_months_days_count + 1):
-            calendar_grid_dict.update(
-                {str(next_months_index) + "_" + str(i): "not_current"}
-            )
+        context["month_name"] = calendar.month_name[self.kwargs["month"]]
 
-        calendar_grid_dict_with_placeholders = OrderedDict()
-        calendar_grid_dict_with_placeholders.update({"placeholder_0": "placeholder"})
-
-        i = 1
-        for day in calendar_grid_dict:
-            if i % 7 == 0:
-                calendar_grid_dict_with_placeholders.update(
-                    {day: calendar_grid_dict[day]}
-                )
-                calendar_grid_dict_with_placeholders.update(
-                    {f"placeholder_{i}": "placeholder"}
-                )
-                calendar_grid_dict_with_placeholders.update(
-                    {f"placeholder_{i + 1}": "placeholder"}
-                )
-            else:
-                calendar_grid_dict_with_placeholders.update(
-                    {day: calendar_grid_dict[day]}
-                )
-            i += 1
-
-        calendar_grid_dict_with_placeholders.update({f"placeholder_{i}": "placeholder"})
-
-        return calendar_grid_dict_with_placeholders
-
-    def _get_availabilites(self) -> list[QuerySet]:
-        """Return a list with Availability objects for given month.
+        context["year_index"] = self.kwargs["year"]
 
-        Returns:
-            List containing availability QuerySets, each corresponding
-            to one day of the given month.
-        """
-        days_in_month = calendar.monthrange(self.kwargs["year"], self.kwargs["month"])[
-            1
-        ]
-        return [
-            Availability.objects.filter(service=self.get_object()).filter(
-                start__year=self.kwargs["year"],
-                start__month=self.kwargs["month"],
-                start__day=i,
-            )
-            for i in range(1, days_in_month + 1)
-        ]
+        context["current_service_id"] = self.kwargs["pk"]
+
+        return context
+
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        """Check if the currently logged in user is configured as tutor in given Service object."""
+        self.object = self.get_object()
+        forbidden_response = self._forbidden_response(self.object)
+        if forbidden_response:
+            return forbidden_response
+
+        context = self.get_context_data(object=self.object)
+        return self.render_to_response(context)
@@ -1,11 +1,16 @@
 """Endpoints for interacting with models from `Tutors` app."""
+import calendar
+
 from django.http import HttpRequest
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from tutors.models import Availability
-from tutors.serializers import AvailabilitySerializer
+from tutors.models import Availability, Service
+from tutors.schedule_cache import get_cached_schedule
+from tutors.serializers import AvailabilityRecurrenceSerializer, AvailabilitySerializer
+
+from .availability import get_calendar_grid, get_month_availabilites
 
 
 class AvailabilityAPIView(APIView):
@@ -82,3 +87,91 @@ class AvailabilityAPIView(APIView):
         return Response(
             availability_serializer.errors, status=status.HTTP_400_BAD_REQUEST
         )
+
+
+class AvailabilityRecurrenceAPIView(APIView):
+    """API for creating Availability objects based on a weekly pattern."""
+
+    def post(self, request: HttpRequest) -> Response:
+        """Create every Availability object described by the weekly pattern.
+
+        The pattern is expanded on the server, every generated
+        time slot is validated at once and all of them are created
+        in a single transaction, so the client sends one request
+        instead of one request per time slot.
+
+        Args:
+            request: Instance of the HttpRequest class containing
+                    every information about the request sent to the
+                    server, including the weekly pattern.
+        Returns:
+            Instance of the `Response` class with an appropraite
+            status code and or data about newly created `Availability`
+            instances.
+        """
+        recurrence_serializer = AvailabilityRecurrenceSerializer(data=request.data)
+        if not recurrence_serializer.is_valid():
+            return Response(
+                recurrence_serializer.errors, status=status.HTTP_400_BAD_REQUEST
+            )
+        if recurrence_serializer.validated_data["service"].tutor_id != request.user.pk:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        availabilities = recurrence_serializer.save()
+        return Response(
+            AvailabilitySerializer(availabilities, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class AvailabilityMonthAPIView(APIView):
+    """API for fetching the availability calendar of a Service for given month."""
+
+    def get(self, request: HttpRequest, pk: int, month: int, year: int) -> Response:
+        """Return the calendar grid and Availability objects for given month.
+
+        The response carries the same data that is rendered on the
+        availability input page, which allows the page to switch
+        between months without being rendered again by the server.
+        Serialized Availability objects are cached per Tutor, see
+        `tutors.schedule_cache`.
+
+        Args:
+            request: Instance of the HttpRequest class containing
+                    every information about the request sent to the
+                    server.
+            pk: Primary key of the Service whose availability is fetched.
+            month: Index of the month.
+            year: Year of the month.
+        Returns:
+            Instance of the `Response` class with an appropraite
+            status code and or data about the calendar grid (list of
+            cells in the order of rendering) and Availability objects
+            grouped by the day of the month.
+        """
+        if not 1 <= month <= 12:
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        try:
+            service = Service.objects.get(pk=pk)
+        except Service.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        if service.tutor_id != request.user.pk:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        return Response(
+            {
+                "service": service.pk,
+                "month": month,
+                "month_name": calendar.month_name[month],
+                "year": year,
+                "calendar_grid": list(get_calendar_grid(year, month).items()),
+                "availabilites": get_cached_schedule(
+                    service.tutor_id,
+                    f"month:{service.pk}:{year}:{month}",
+                    lambda: [
+                        list(AvailabilitySerializer(day_availabilites, many=True).data)
+                        for day_availabilites in get_month_availabilites(
+                            service, year, month
+                        )
+                    ],
+                ),
+            }
+        )
@@ -0,0 +1,22 @@
+"""Utilities for benchmarking performance-critical code paths."""
+from .benchmark_command import BenchmarkCommand
+from .channel_layers import BenchmarkChannelLayer
+from .fixtures import (
+    bulk_create_tutors,
+    create_chat_pairs,
+    create_default_service,
+    create_profile,
+    delete_chat_pairs,
+    get_chat_benchmark_settings,
+)
+
+__all__ = [
+    "BenchmarkCommand",
+    "BenchmarkChannelLayer",
+    "create_profile",
+    "create_default_service",
+    "bulk_create_tutors",
+    "create_chat_pairs",
+    "delete_chat_pairs",
+    "get_chat_benchmark_settings",
+]
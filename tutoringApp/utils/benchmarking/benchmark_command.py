@@ -0,0 +1,111 @@
+"""Base class for management commands measuring latency of a code path."""
+import json
+from statistics import median
+from time import perf_counter
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+
+class BenchmarkCommand(BaseCommand):
+    """Measure latency of a code path for growing amounts of data.
+
+    Subclasses populate the database in `set_up` and exercise the
+    measured code path in `run_once`. Every dataset size is
+    benchmarked inside a transaction that gets rolled back
+    afterwards, so the benchmark never leaves any data behind
+    in the database it is run against.
+    """
+
+    default_sizes = [100, 1000, 10000]
+    default_repeat = 50
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add arguments shared by every benchmark."""
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=self.default_sizes,
+            help="Dataset sizes the code path will be benchmarked for.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=self.default_repeat,
+            help="Number of timed runs for every dataset size.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Print the results as JSON instead of a table.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Run the benchmark for every dataset size and print the results."""
+        results = [
+            self._benchmark_size(size=size, repeat=options["repeat"])
+            for size in options["sizes"]
+        ]
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f"{'size':>10} {'median [ms]':>12} {'p95 [ms]':>10} {'queries':>8}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result['size']:>10} {result['median_ms']:>12.3f} "
+                f"{result['p95_ms']:>10.3f} {result['queries']:>8}"
+            )
+
+    def set_up(self, size: int) -> Any:
+        """Populate the database with a dataset of a given size.
+
+        Args:
+            size: Size of the dataset, interpreted by the subclass.
+
+        Returns:
+            Any object that will be passed to every `run_once` call.
+        """
+        raise NotImplementedError
+
+    def run_once(self, context: Any) -> None:
+        """Exercise the benchmarked code path once.
+
+        Args:
+            context: Object returned by `set_up`.
+        """
+        raise NotImplementedError
+
+    def _benchmark_size(self, size: int, repeat: int) -> dict[str, Any]:
+        """Time the benchmarked code path for a single dataset size.
+
+        Args:
+            size: Size of the dataset.
+            repeat: Number of timed runs.
+
+        Returns:
+            A dictionary with the median and 95th percentile latency
+            in milliseconds and the number of database queries
+            issued by a single run.
+        """
+        with transaction.atomic():
+            context = self.set_up(size)
+            with CaptureQueriesContext(connection) as queries:
+                self.run_once(context)
+            timings = []
+            for _ in range(repeat):
+                start = perf_counter()
+                self.run_once(context)
+                timings.append((perf_counter() - start) * 1000)
+            transaction.set_rollback(True)
+        timings.sort()
+        return {
+            "size": size,
+            "median_ms": median(timings),
+            "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+            "queries": len(queries),
+        }
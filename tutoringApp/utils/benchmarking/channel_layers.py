@@ -0,0 +1,28 @@
+"""Channel layer standing in for Redis in chat benchmarks."""
+from time import monotonic
+
+from channels.layers import InMemoryChannelLayer
+
+
+class BenchmarkChannelLayer(InMemoryChannelLayer):
+    """In-memory channel layer removing expired messages at most once a second.
+
+    The in-memory layer looks for expired messages and group memberships
+    of every channel and group whenever a message is received or sent to
+    a group, so with thousands of connections the cleanup, which Redis
+    does without any work of the process, would outweigh the handling
+    of the messages being measured.
+    """
+
+    cleanup_interval = 1
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Create an empty layer, see `InMemoryChannelLayer` for the arguments."""
+        super().__init__(*args, **kwargs)
+        self._cleaned = monotonic()
+
+    def _clean_expired(self) -> None:
+        """Remove expired messages and group memberships, unless done recently."""
+        if monotonic() - self._cleaned >= self.cleanup_interval:
+            self._cleaned = monotonic()
+            super()._clean_expired()
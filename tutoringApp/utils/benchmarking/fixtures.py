@@ -0,0 +1,206 @@
+"""Functions populating the database with data used in benchmarks and their settings."""
+from typing import Any
+
+from django.contrib.auth.models import User
+from django.utils.timezone import now
+
+from chat.models import Conversation
+from profiles.models import Profile
+from subscriptions.models import Subscription
+from tutors.models import Service, Subject
+
+
+def create_profile(username: str, student: bool = False) -> Profile:
+    """Create a User and a related Profile object.
+
+    Unlike the registration view, the function does not
+    hash any password which keeps populating the database
+    with thousands of profiles fast.
+
+    Args:
+        username: Username of the newly created User.
+        student: Flag indicating whether the Profile should
+                be a Student's profile.
+
+    Returns:
+        Newly created Profile model instance.
+    """
+    user = User.objects.create(
+        username=username,
+        first_name=f"{username} first name",
+        last_name=f"{username} last name",
+    )
+    return Profile.objects.create(user=user, teaching_since=None if student else now())
+
+
+def create_default_service(
+    tutor: Profile, subject: Subject, session_length: int = 60
+) -> Service:
+    """Create a default, 1 session Service offered by a given Tutor.
+
+    Args:
+        tutor: Profile of the Tutor offering the Service.
+        subject: Subject taught in the Service's sessions.
+        session_length: Duration of one session in minutes.
+
+    Returns:
+        Newly created Service model instance.
+    """
+    return Service.objects.create(
+        tutor=tutor,
+        subject=subject,
+        number_of_hours=1,
+        price_per_hour=100,
+        session_length=session_length,
+        is_default=True,
+    )
+
+
+FIRST_NAMES = [
+    "Anna",
+    "Jan",
+    "Maria",
+    "Piotr",
+    "Ewa",
+    "Tomasz",
+    "Zofia",
+    "Adam",
+    "Julia",
+    "Marek",
+]
+LAST_NAMES = [
+    "Nowak",
+    "Kowalski",
+    "Wisniewski",
+    "Wojcik",
+    "Kaminski",
+    "Lewandowski",
+    "Zielinski",
+]
+CHAT_SUBJECT_NAME = "Benchmark chat subject"
+CITIES = ["Warszawa", "Krakow", "Gdansk", "Poznan", "Wroclaw"]
+
+
+def bulk_create_tutors(prefix: str, count: int) -> list[Profile]:
+    """Create many Tutors with bulk inserts.
+
+    Names and cities of the Tutors repeat in a fixed pattern,
+    so that searching for them returns a predictable share of
+    the Tutors. Bulk inserts bypass signal handlers, so any
+    denormalized data of the Tutors has to be rebuilt afterwards.
+
+    Args:
+        prefix: Prefix of the created Users' usernames.
+        count: Number of created Tutors.
+
+    Returns:
+        A list with the newly created Profile model instances.
+    """
+    User.objects.bulk_create(
+        [
+            User(
+                username=f"{prefix}_{i}",
+                first_name=FIRST_NAMES[i % len(FIRST_NAMES)],
+                last_name=LAST_NAMES[i % len(LAST_NAMES)],
+            )
+            for i in range(count)
+        ],
+        batch_size=1000,
+    )
+    return Profile.objects.bulk_create(
+        [
+            Profile(
+                user=user,
+                teaching_since=now(),
+                city=CITIES[user.pk % len(CITIES)],
+                description=f"{user.first_name} teaches in {CITIES[user.pk % len(CITIES)]}.",
+            )
+            for user in User.objects.filter(
+                username__startswith=f"{prefix}_"
+            ).iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+def create_chat_pairs(
+    prefix: str, tutors: int, students_per_tutor: int
+) -> list[Conversation]:
+    """Create Tutors with subscribed Students and Conversations between them.
+
+    Every Tutor gets their own Students, so the number of created
+    Conversations is `tutors * students_per_tutor`.
+
+    Args:
+        prefix: Prefix of the created Users' usernames.
+        tutors: Number of created Tutors.
+        students_per_tutor: Number of Students subscribed to every Tutor.
+
+    Returns:
+        A list with the newly created Conversation model instances,
+        with their Tutors' and Students' Profiles and Users fetched.
+    """
+    subject, _ = Subject.objects.get_or_create(
+        name=CHAT_SUBJECT_NAME, defaults={"category": 0}
+    )
+    conversations = []
+    for tutor_number in range(tutors):
+        tutor = create_profile(f"{prefix}_tutor_{tutor_number}")
+        for student_number in range(students_per_tutor):
+            student = create_profile(
+                f"{prefix}_student_{tutor_number}_{student_number}", student=True
+            )
+            Subscription.objects.create(tutor=tutor, student=student, subject=subject)
+            conversations.append(Conversation(tutor=tutor, student=student))
+    return Conversation.objects.bulk_create(conversations)
+
+
+def delete_chat_pairs(conversations: list[Conversation]) -> None:
+    """Delete the Users of the Tutors and Students created by `create_chat_pairs`.
+
+    Their Profiles, Subscriptions, Conversations and messages are
+    deleted together with them, followed by the Subject of the
+    Subscriptions.
+
+    Args:
+        conversations: Conversations returned by `create_chat_pairs`.
+    """
+    User.objects.filter(
+        pk__in={
+            user_id
+            for conversation in conversations
+            for user_id in (conversation.tutor.user_id, conversation.student.user_id)
+        }
+    ).delete()
+    Subject.objects.filter(name=CHAT_SUBJECT_NAME).delete()
+
+
+def get_chat_benchmark_settings(capacity: int = 100) -> dict[str, Any]:
+    """Get the settings chat benchmarks run with, e.g. with `override_settings`.
+
+    An in-memory channel layer, see `BenchmarkChannelLayer`, stands in
+    for Redis, and the rate limits and outbound queues of the consumers
+    are lifted, so that every sent message gets delivered however fast
+    it is sent.
+
+    Args:
+        capacity: Number of events every channel can hold before
+                    further events sent to its groups are dropped.
+
+    Returns:
+        A dictionary of setting names and their values.
+    """
+    unlimited = 10**9
+    return {
+        "CHANNEL_LAYERS": {
+            "default": {
+                "BACKEND": "utils.benchmarking.channel_layers.BenchmarkChannelLayer",
+                "CONFIG": {"capacity": capacity},
+            }
+        },
+        "CHAT_CONNECTION_RATE": unlimited,
+        "CHAT_CONNECTION_BURST": unlimited,
+        "CHAT_USER_RATE": unlimited,
+        "CHAT_USER_BURST": unlimited,
+        "CHAT_OUTBOX_SIZE": unlimited,
+    }
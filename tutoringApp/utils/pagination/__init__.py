@@ -0,0 +1,11 @@
+"""Keyset (cursor) pagination of list views."""
+from .keyset import Cursor, InvalidCursor, KeysetPage, KeysetPaginator
+from .mixins import KeysetPaginationMixin
+
+__all__ = [
+    "Cursor",
+    "InvalidCursor",
+    "KeysetPage",
+    "KeysetPaginator",
+    "KeysetPaginationMixin",
+]
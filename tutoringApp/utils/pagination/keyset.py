@@ -0,0 +1,385 @@
+"""Keyset (cursor) pagination of QuerySets.
+
+Instead of skipping a number of rows with OFFSET, every page is
+fetched with a filter comparing the ordering fields with the values
+of the last row of the previous page (the key), so a page deep in the
+results costs as much as the first one, provided that the ordering
+fields are indexed. Cursors carry the key, signed so that they
+cannot be tampered with, and stay valid when rows are added or
+removed before them.
+"""
+import json
+from dataclasses import dataclass, replace
+from datetime import date, datetime, time
+from decimal import Decimal
+from math import ceil
+from typing import Any, Iterator, Optional, Sequence
+
+from django.core import signing
+from django.db.models import F, Model, Q, QuerySet
+from django.http import QueryDict
+
+
+class InvalidCursor(Exception):
+    """Raised when a cursor cannot be decoded."""
+
+
+class CursorSerializer(signing.JSONSerializer):
+    """JSON serializer that keeps the full precision of dates, times and decimals."""
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serialize an object, converting dates, times and decimals to strings."""
+        return json.dumps(obj, separators=(",", ":"), default=self._default).encode(
+            "latin-1"
+        )
+
+    @staticmethod
+    def _default(value: Any) -> str:
+        """Convert values that JSON cannot represent."""
+        if isinstance(value, (date, datetime, time)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        raise TypeError(
+            f"Object of type {type(value).__name__} cannot be part of a cursor."
+        )
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position of a page in the paginated QuerySet.
+
+    Attributes:
+        key: Values of the ordering fields of the row that the page
+                starts after (or ends before, when going backward),
+                None for the first and the last page.
+        backward: Boolean information about whether the page
+                ends before the key instead of starting after it.
+        number: Number of the page, None if unknown.
+        total: Approximate number of paginated objects,
+                None if they are not counted.
+        total_is_lower_bound: Boolean information about whether
+                there are more objects than `total`.
+    """
+
+    key: Optional[list[Any]] = None
+    backward: bool = False
+    number: Optional[int] = 1
+    total: Optional[int] = None
+    total_is_lower_bound: bool = False
+
+
+class KeysetPage(Sequence):
+    """Page of objects fetched by a KeysetPaginator.
+
+    Apart from the cursors of adjacent pages, the page provides query
+    strings linking to them, which preserve every other query parameter
+    of the request (e.g. filters).
+    """
+
+    def __init__(
+        self,
+        object_list: list[Model],
+        paginator: "KeysetPaginator",
+        cursor: Cursor,
+        next_cursor: Optional[Cursor],
+        previous_cursor: Optional[Cursor],
+        params: Optional[QueryDict] = None,
+    ) -> None:
+        """Intialization of the KeysetPage class instance.
+
+        Args:
+            object_list: Objects on the page.
+            paginator: Paginator that fetched the page.
+            cursor: Cursor of the page.
+            next_cursor: Cursor of the next page, None if it is the last page.
+            previous_cursor: Cursor of the previous page, None if it is the first page.
+            params: Query parameters of the request, other than the cursor.
+        """
+        self.object_list = object_list
+        self.paginator = paginator
+        self.number = cursor.number
+        self.total = cursor.total
+        self.total_is_lower_bound = cursor.total_is_lower_bound
+        self._cursor = cursor
+        self._next_cursor = next_cursor
+        self._previous_cursor = previous_cursor
+        self._params = params if params is not None else QueryDict()
+
+    def __len__(self) -> int:
+        """Number of objects on the page."""
+        return len(self.object_list)
+
+    def __getitem__(self, index: Any) -> Any:
+        """Get an object (or a slice of objects) on the page."""
+        return self.object_list[index]
+
+    def __iter__(self) -> Iterator[Model]:
+        """Iterate over objects on the page."""
+        return iter(self.object_list)
+
+    def __repr__(self) -> str:
+        """String representation of the page."""
+        return f"<KeysetPage {self.number or '?'} of {self.num_pages or '?'}>"
+
+    @property
+    def num_pages(self) -> Optional[int]:
+        """Approximate number of pages, None if the objects are not counted."""
+        if self.total is None:
+            return None
+        return max(1, ceil(self.total / self.paginator.per_page))
+
+    def has_next(self) -> bool:
+        """Boolean information about whether there is a next page."""
+        return self._next_cursor is not None
+
+    def has_previous(self) -> bool:
+        """Boolean information about whether there is a previous page."""
+        return self._previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        """Boolean information about whether there are other pages."""
+        return self.has_next() or self.has_previous()
+
+    @property
+    def cursors(self) -> tuple[Cursor, Optional[Cursor], Optional[Cursor]]:
+        """Decoded cursors of the page, the next page and the previous page."""
+        return self._cursor, self._next_cursor, self._previous_cursor
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        """Encoded cursor of the next page."""
+        return (
+            self.paginator.encode_cursor(self._next_cursor) if self.has_next() else None
+        )
+
+    @property
+    def previous_cursor(self) -> Optional[str]:
+        """Encoded cursor of the previous page."""
+        return (
+            self.paginator.encode_cursor(self._previous_cursor)
+            if self.has_previous()
+            else None
+        )
+
+    @property
+    def first_query(self) -> str:
+        """Query string of the first page."""
+        return self._query(None)
+
+    @property
+    def previous_query(self) -> str:
+        """Query string of the previous page."""
+        return self._query(self.previous_cursor)
+
+    @property
+    def next_query(self) -> str:
+        """Query string of the next page."""
+        return self._query(self.next_cursor)
+
+    @property
+    def last_query(self) -> str:
+        """Query string of the last page."""
+        number = None if self.total_is_lower_bound else self.num_pages
+        return self._query(
+            self.paginator.encode_cursor(
+                replace(self._cursor, key=None, backward=True, number=number)
+            )
+        )
+
+    def _query(self, cursor: Optional[str]) -> str:
+        """Encode the query parameters of the request with a given cursor."""
+        params = self._params.copy()
+        if cursor is not None:
+            params[self.paginator.cursor_kwarg] = cursor
+        return params.urlencode()
+
+
+class KeysetPaginator:
+    """Paginate a QuerySet by the values of its ordering fields.
+
+    The ordering has to be unique (usually by ending with the primary
+    key), otherwise rows with equal keys on the border of two pages
+    could be skipped. Annotations of the QuerySet can be used in the
+    ordering. Optionally, the objects are counted when the first page
+    is fetched, but no more than `count_limit` of them, so that the
+    count stays cheap for large results. The count is then passed on
+    in cursors of further pages instead of being repeated.
+    """
+
+    def __init__(
+        self,
+        queryset: QuerySet,
+        per_page: int,
+        ordering: Sequence[str],
+        count_limit: Optional[int] = None,
+        salt: str = "",
+        cursor_kwarg: str = "cursor",
+    ) -> None:
+        """Intialization of the KeysetPaginator class instance.
+
+        Args:
+            queryset: The paginated QuerySet.
+            per_page: Maximum number of objects on a page.
+            ordering: Names of the ordering fields, prefixed with "-"
+                        for descending order, e.g. ("-start", "pk").
+            count_limit: Maximum number of counted objects,
+                        the objects are not counted if not provided.
+            salt: Salt of the cursors' signatures, distinguishing
+                        cursors of different paginated lists.
+            cursor_kwarg: Name of the query parameter with the cursor.
+        """
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = list(ordering)
+        self.count_limit = count_limit
+        self.cursor_kwarg = cursor_kwarg
+        self._salt = f"utils.pagination:{salt}:{','.join(self.ordering)}"
+        self._fields = [name.lstrip("-") for name in self.ordering]
+        self._descending = [name.startswith("-") for name in self.ordering]
+
+    def encode_cursor(self, cursor: Cursor) -> str:
+        """Encode a cursor into an opaque string.
+
+        Args:
+            cursor: The encoded cursor.
+
+        Returns:
+            A signed, URL safe representation of the cursor.
+        """
+        return signing.dumps(
+            [
+                cursor.key,
+                cursor.backward,
+                cursor.number,
+                cursor.total,
+                cursor.total_is_lower_bound,
+            ],
+            salt=self._salt,
+            serializer=CursorSerializer,
+        )
+
+    def decode_cursor(self, value: str) -> Cursor:
+        """Decode a cursor encoded by `encode_cursor`.
+
+        Args:
+            value: The encoded cursor.
+
+        Returns:
+            The decoded cursor.
+
+        Raises:
+            InvalidCursor: In case that the cursor has been tampered with
+                            or was created for a different ordering.
+        """
+        try:
+            key, backward, number, total, total_is_lower_bound = signing.loads(
+                value, salt=self._salt, serializer=CursorSerializer
+            )
+        except (signing.BadSignature, TypeError, ValueError) as error:
+            raise InvalidCursor(f"Invalid cursor: {value}") from error
+        if key is not None and len(key) != len(self._fields):
+            raise InvalidCursor(f"Invalid cursor: {value}")
+        return Cursor(key, backward, number, total, total_is_lower_bound)
+
+    def page(
+        self, value: Optional[str] = None, params: Optional[QueryDict] = None
+    ) -> KeysetPage:
+        """Fetch a page of objects with a single query.
+
+        Args:
+            value: Encoded cursor of the page, the first page is fetched if not provided.
+            params: Query parameters of the request, other than the cursor.
+
+        Returns:
+            The fetched page.
+
+        Raises:
+            InvalidCursor: In case that the cursor cannot be decoded.
+        """
+        cursor = self.decode_cursor(value) if value else self._count(Cursor())
+        queryset, aliases = self._annotate_keys(self.queryset)
+        ordering = self.ordering
+        if cursor.backward:
+            ordering = [
+                name[1:] if name.startswith("-") else f"-{name}" for name in ordering
+            ]
+        if cursor.key is not None:
+            queryset = queryset.filter(self._beyond(cursor.key, cursor.backward))
+        rows = list(queryset.order_by(*ordering)[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if cursor.backward:
+            rows.reverse()
+            has_next, has_previous = cursor.key is not None, has_more
+            if not has_previous:
+                cursor = replace(cursor, number=1)
+        else:
+            has_next, has_previous = has_more, cursor.key is not None
+        number = cursor.number
+        return KeysetPage(
+            object_list=rows,
+            paginator=self,
+            cursor=cursor,
+            next_cursor=replace(
+                cursor,
+                key=self._key(rows[-1], aliases),
+                backward=False,
+                number=number + 1 if number else None,
+            )
+            if has_next
+            else None,
+            previous_cursor=replace(
+                cursor,
+                key=self._key(rows[0], aliases),
+                backward=True,
+                number=number - 1 if number and number > 1 else None,
+            )
+            if has_previous
+            else None,
+            params=params,
+        )
+
+    def _count(self, cursor: Cursor) -> Cursor:
+        """Count the paginated objects, up to the count limit."""
+        if self.count_limit is None:
+            return cursor
+        total = self.queryset.order_by()[: self.count_limit + 1].count()
+        return replace(
+            cursor,
+            total=min(total, self.count_limit),
+            total_is_lower_bound=total > self.count_limit,
+        )
+
+    def _annotate_keys(self, queryset: QuerySet) -> tuple[QuerySet, list[str]]:
+        """Annotate the QuerySet with values of the ordering fields.
+
+        Returns:
+            The annotated QuerySet and names of the
+            annotations holding the values of the key.
+        """
+        aliases = []
+        annotations = {}
+        for i, field in enumerate(self._fields):
+            if field in queryset.query.annotations:
+                aliases.append(field)
+            else:
+                aliases.append(f"keyset_{i}")
+                annotations[f"keyset_{i}"] = F(field)
+        return queryset.annotate(**annotations), aliases
+
+    def _beyond(self, key: list[Any], backward: bool) -> Q:
+        """Create a filter of rows following (or preceding) the key in the ordering."""
+        condition = Q()
+        for i, (field, descending) in enumerate(zip(self._fields, self._descending)):
+            lookup = "lt" if descending != backward else "gt"
+            term = Q(**{f"{field}__{lookup}": key[i]})
+            for previous_field, value in zip(self._fields[:i], key[:i]):
+                term &= Q(**{previous_field: value})
+            condition |= term
+        return condition
+
+    @staticmethod
+    def _key(row: Model, aliases: list[str]) -> list[Any]:
+        """Get values of the ordering fields of a row."""
+        return [getattr(row, alias) for alias in aliases]
@@ -0,0 +1,63 @@
+"""Mixin replacing the offset pagination of list views with keyset pagination."""
+from typing import Any, Optional, Sequence
+
+from django.db.models import QuerySet
+from django.http import Http404, QueryDict
+
+from .keyset import InvalidCursor, KeysetPage, KeysetPaginator
+
+
+class KeysetPaginationMixin:
+    """Paginate the objects of a ListView with cursors instead of page numbers.
+
+    The view's QuerySet is ordered by `keyset_ordering` (which should
+    end with a unique field and consist of indexed fields) and every
+    page is fetched with a single query, regardless of how deep it is.
+    The current page is read from the `cursor_kwarg` query parameter.
+    Setting `count_limit` enables an approximate count of the objects,
+    calculated once for the first page.
+    """
+
+    keyset_ordering: Sequence[str] = ("pk",)
+    cursor_kwarg = "cursor"
+    count_limit: Optional[int] = None
+
+    def get_keyset_ordering(self) -> Sequence[str]:
+        """Get names of the fields the objects are paginated by."""
+        return self.keyset_ordering
+
+    def get_paginator(
+        self, queryset: QuerySet, per_page: int, *args: Any, **kwargs: Any
+    ) -> KeysetPaginator:
+        """Create a KeysetPaginator for the view's QuerySet."""
+        return KeysetPaginator(
+            queryset,
+            per_page,
+            ordering=self.get_keyset_ordering(),
+            count_limit=self.count_limit,
+            salt=f"{type(self).__module__}.{type(self).__qualname__}",
+            cursor_kwarg=self.cursor_kwarg,
+        )
+
+    def get_page_params(self) -> QueryDict:
+        """Get query parameters of the request preserved in links to other pages."""
+        params = self.request.GET.copy()
+        params.pop(self.cursor_kwarg, None)
+        return params
+
+    def paginate_queryset(
+        self, queryset: QuerySet, page_size: int
+    ) -> tuple[KeysetPaginator, KeysetPage, list[Any], bool]:
+        """Fetch the page of objects pointed at by the cursor in the query parameters.
+
+        Raises:
+            Http404: In case that the cursor is invalid.
+        """
+        paginator = self.get_paginator(queryset, page_size)
+        try:
+            page = paginator.page(
+                self.request.GET.get(self.cursor_kwarg), self.get_page_params()
+            )
+        except InvalidCursor as error:
+            raise Http404("Invalid cursor.") from error
+        return (paginator, page, page.object_list, page.has_other_pages())